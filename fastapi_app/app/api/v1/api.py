@@ -6,7 +6,7 @@ Main API router for the Professional Audio Sync Analyzer.
 from fastapi import APIRouter, Depends, HTTPException, Query, Path, BackgroundTasks
 from typing import List, Optional
 
-from app.api.v1.endpoints import analysis, files, reports, ai, health, batch, repair, analyze_and_repair, ui_state
+from app.api.v1.endpoints import analysis, files, reports, ai, health, batch, repair, analyze_and_repair, ui_state, catalog
 
 # Create main API router
 api_router = APIRouter()
@@ -65,3 +65,9 @@ api_router.include_router(
     prefix="/ui/state",
     tags=["ui-state"]
 )
+
+api_router.include_router(
+    catalog.router,
+    prefix="/catalog",
+    tags=["catalog"]
+)
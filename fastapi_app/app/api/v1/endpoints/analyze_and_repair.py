@@ -124,7 +124,10 @@ async def _run_analysis(request: AnalyzeAndRepairRequest, workflow_id: str) -> D
         detector = OptimizedLargeFileDetector(
             gpu_enabled=request.enable_gpu,
             chunk_size=request.chunk_size,
-            max_chunks=50  # Allow more chunks for comprehensive analysis
+            max_chunks=50,  # Allow more chunks for comprehensive analysis
+            workers=getattr(settings, 'CHUNKED_WORKERS', 1),
+            stream_decode=getattr(settings, 'CHUNKED_STREAM_DECODE', False),
+            sparse_decode=getattr(settings, 'CHUNKED_SPARSE_DECODE', False)
         )
         
         # Run analysis
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Fingerprint catalog endpoints: index masters and identify which master an
+unknown dub belongs to (with its estimated offset), before running a full
+sync analysis on the pair.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from pathlib import Path as PathLib
+from typing import List, Optional
+
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel, Field
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+
+class CatalogAddRequest(BaseModel):
+    paths: List[str] = Field(..., description="Master files to index (under the mount)")
+
+
+class CatalogIdentifyRequest(BaseModel):
+    path: str = Field(..., description="Dub file to identify (under the mount)")
+    top_k: int = Field(default=5, ge=1, le=50)
+    query_seconds: Optional[float] = Field(default=120.0, gt=0, description="Dub audio fingerprinted (None = all)")
+
+
+def _checked_path(path: str) -> str:
+    try:
+        resolved = PathLib(path).resolve()
+        mount = PathLib(settings.MOUNT_PATH).resolve()
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid path")
+    if not str(resolved).startswith(str(mount)):
+        raise HTTPException(status_code=403, detail="Access denied")
+    if not resolved.is_file():
+        raise HTTPException(status_code=404, detail=f"File not found: {path}")
+    return str(resolved)
+
+
+def _catalog():
+    if not settings.ENABLE_FINGERPRINT_CATALOG:
+        raise HTTPException(status_code=503, detail="Fingerprint catalog is disabled")
+    from sync_analyzer.core.fingerprint_catalog import get_fingerprint_catalog
+    return get_fingerprint_catalog()
+
+
+@router.get("/masters")
+async def list_masters():
+    """Masters currently indexed in the catalog."""
+    catalog = _catalog()
+    masters = await asyncio.to_thread(catalog.masters)
+    return {"success": True, "count": len(masters), "masters": masters}
+
+
+@router.post("/masters")
+async def add_masters(request: CatalogAddRequest):
+    """Fingerprint and index master files (unchanged masters are skipped)."""
+    catalog = _catalog()
+    paths = [_checked_path(p) for p in request.paths]
+    added, skipped, failed = [], [], []
+    for path in paths:
+        try:
+            master_id = await asyncio.to_thread(catalog.add, path)
+        except Exception as e:
+            logger.error(f"Catalog add failed for {path}: {e}")
+            failed.append({"path": path, "error": str(e)})
+            continue
+        (skipped if master_id is None else added).append(path)
+    return {"success": not failed, "added": added, "skipped": skipped, "failed": failed}
+
+
+@router.post("/identify")
+async def identify_dub(request: CatalogIdentifyRequest):
+    """Top matching masters for a dub, with the offset each implies."""
+    catalog = _catalog()
+    path = _checked_path(request.path)
+    try:
+        matches = await asyncio.to_thread(catalog.identify, path, request.top_k, request.query_seconds)
+    except Exception as e:
+        logger.error(f"Catalog identify failed for {path}: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+    return {"success": True, "path": path, "matches": [m.to_dict() for m in matches]}
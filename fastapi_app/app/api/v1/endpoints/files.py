@@ -3,20 +3,23 @@
 File management endpoints for browsing and uploading files.
 """
 
+import asyncio
 import logging
 import os
 import uuid
+from types import SimpleNamespace
 from datetime import datetime
 from pathlib import Path as PathLib
 from typing import List, Optional
-from fastapi import APIRouter, HTTPException, Query, UploadFile, File, Form, Depends, Path
-from fastapi.responses import JSONResponse, FileResponse, StreamingResponse
+from fastapi import APIRouter, HTTPException, Query, UploadFile, File, Form, Depends, Path, Header
+from fastapi.responses import JSONResponse, FileResponse, StreamingResponse, Response
 import mimetypes
 
-from app.core.config import settings, get_file_type_info
+from app.core.config import settings
 from app.core.exceptions import FileValidationError, FileNotFoundError, FileTypeNotSupportedError
 from app.models.sync_models import (
-    FileListResponse, FileInfo, FileType, FileUploadRequest, FileUploadResponse, DirectoryInfo
+    FileListResponse, FileInfo, FileType, FileUploadRequest, FileUploadResponse, DirectoryInfo,
+    FileMetadataBatchRequest, FileMetadataBatchResponse, MetadataMode
 )
 
 logger = logging.getLogger(__name__)
@@ -25,7 +28,8 @@ router = APIRouter()
 
 @router.get("/", response_model=FileListResponse)
 async def list_files(
-    path: str = Query(settings.MOUNT_PATH, description="Directory path to list")
+    path: str = Query(settings.MOUNT_PATH, description="Directory path to list"),
+    metadata: MetadataMode = Query(MetadataMode.LAZY, description="lazy: stat info plus cached media metadata; full: probe every media file")
 ):
     """
     List files and directories in the specified path.
@@ -36,6 +40,10 @@ async def list_files(
     ## Query Parameters
     
     * **path**: Directory path to list (default: mount path)
+    * **metadata**: `lazy` (default) returns immediately with stat info and any
+      media metadata already in the probe cache; rows still to be probed have
+      `metadata_pending: true` and can be filled with `POST /files/metadata`.
+      `full` probes every media file (bounded by `PROBE_CONCURRENCY`).
     
     ## Supported File Types
     
@@ -95,40 +103,13 @@ async def list_files(
         if not os.path.isdir(path):
             raise FileValidationError("Path is not a directory", file_path=path)
         
-        # Get file type information
-        file_types = get_file_type_info()
-        
-        files = []
-        directories = []
-        
-        # List directory contents
-        for item in os.listdir(path):
-            item_path = os.path.join(path, item)
-            
-            try:
-                if os.path.isdir(item_path):
-                    # Directory
-                    try:
-                        item_count = len(os.listdir(item_path))
-                    except (OSError, PermissionError):
-                        item_count = 0
-                    
-                    directories.append(DirectoryInfo(
-                        name=item,
-                        path=item_path,
-                        item_count=item_count,
-                        created_at=datetime.fromtimestamp(os.path.getctime(item_path)),
-                        modified_at=datetime.fromtimestamp(os.path.getmtime(item_path))
-                    ))
-                elif os.path.isfile(item_path):
-                    # File
-                    file_ext = PathLib(item).suffix.lower()
-                    if file_ext in settings.ALLOWED_EXTENSIONS:
-                        file_info = await _get_file_info(item_path, item, file_ext)
-                        files.append(file_info)
-            except (OSError, PermissionError) as e:
-                logger.warning(f"Error accessing {item_path}: {e}")
-                continue
+        # Answer from the mount index when it covers the path, else scan off the event loop
+        index = _get_index(path)
+        if index is not None:
+            entries, directories = await asyncio.to_thread(_list_from_index, index, path)
+        else:
+            entries, directories = await asyncio.to_thread(_scan_directory, path)
+        files = await _get_file_infos(entries, probe_missing=(metadata == MetadataMode.FULL))
         
         # Calculate parent path
         parent_path = str(PathLib(path).parent) if PathLib(path).parent != PathLib(path) else None
@@ -152,6 +133,95 @@ async def list_files(
         logger.error(f"Error listing files: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/metadata", response_model=FileMetadataBatchResponse)
+async def batch_file_metadata(request: FileMetadataBatchRequest):
+    """
+    Probe media metadata for a batch of files.
+
+    Intended for the rows currently visible in the file browser after a
+    `metadata=lazy` listing. Files are probed concurrently (bounded by
+    `PROBE_CONCURRENCY`); results are cached by path, size and mtime, so
+    repeated calls are cheap.
+
+    ## Curl Example
+
+    ```bash
+    curl -X POST "http://localhost:8000/api/v1/files/metadata" \
+      -H "Content-Type: application/json" \
+      -d '{"paths": ["/mnt/data/master.mxf", "/mnt/data/dub.mxf"]}'
+    ```
+    """
+    entries = []
+    errors = {}
+    for file_path in dict.fromkeys(request.paths):
+        if not _is_safe_path(file_path):
+            errors[file_path] = "Invalid or unsafe path"
+        elif not os.path.isfile(file_path):
+            errors[file_path] = "File not found"
+        else:
+            name = os.path.basename(file_path)
+            entries.append((file_path, name, PathLib(name).suffix.lower(), None))
+    files = await _get_file_infos(entries, probe_missing=True)
+    return FileMetadataBatchResponse(
+        files=files,
+        errors=errors,
+        message=f"Retrieved metadata for {len(files)} files"
+    )
+
+@router.get("/search", response_model=FileListResponse)
+async def search_files(
+    q: Optional[str] = Query(None, description="Case-insensitive substring of the file name"),
+    ext: Optional[List[str]] = Query(None, description="Extensions to include, e.g. ext=.mov&ext=.mxf"),
+    under: str = Query(settings.MOUNT_PATH, description="Directory subtree to search"),
+    limit: int = Query(500, ge=1, le=5000, description="Maximum number of results")
+):
+    """
+    Recursive file search by name and extension, answered from the mount index.
+
+    ## Curl Example
+
+    ```bash
+    curl "http://localhost:8000/api/v1/files/search?q=ep101&ext=.mov&under=/mnt/data/show"
+    ```
+    """
+    if not _is_safe_path(under):
+        raise HTTPException(status_code=400, detail="Invalid or unsafe path")
+    index = _get_index(under)
+    if index is None:
+        raise HTTPException(status_code=503, detail="Media index is not available yet")
+    hits = await asyncio.to_thread(index.search, q, ext, under, limit)
+    files = await _get_file_infos([_indexed_entry(f) for f in hits], probe_missing=False)
+    return FileListResponse(
+        files=files,
+        current_path=under,
+        total_count=len(files),
+        message=f"Found {len(files)} files"
+    )
+
+@router.get("/pairs")
+async def find_pairs(
+    master_pattern: str = Query(..., description="Glob for master file names, e.g. *Original*"),
+    dub_pattern: str = Query(..., description="Glob for dub file names, e.g. *v1.1*"),
+    under: str = Query(settings.MOUNT_PATH, description="Directory subtree to search")
+):
+    """
+    Master/dub pair discovery from the mount index.
+
+    A pair is a master and a dub matching the patterns in the same directory,
+    the rule used by `find_file_pairs` in the batch processor.
+    """
+    if not _is_safe_path(under):
+        raise HTTPException(status_code=400, detail="Invalid or unsafe path")
+    index = _get_index(under)
+    if index is None:
+        raise HTTPException(status_code=503, detail="Media index is not available yet")
+    pairs = await asyncio.to_thread(index.find_pairs, [(master_pattern, dub_pattern)], under)
+    return JSONResponse({
+        "success": True,
+        "pairs": [{"master": m, "dub": d} for m, d in pairs],
+        "total_count": len(pairs),
+    })
+
 @router.post("/upload", response_model=FileUploadResponse)
 async def upload_file(
     file: UploadFile = File(..., description="File to upload"),
@@ -279,20 +349,11 @@ async def probe_file(path: str = Query(..., description="Absolute path under mou
     if not os.path.exists(path) or not os.path.isfile(path):
         raise HTTPException(status_code=404, detail="File not found")
     try:
-        import subprocess, json, shutil
-        ffprobe_bin = shutil.which("ffprobe") or "/home/linuxbrew/.linuxbrew/bin/ffprobe"
-        cmd = [
-            ffprobe_bin,
-            "-v", "quiet",
-            "-print_format", "json",
-            "-show_format",
-            "-show_streams",
-            path,
-        ]
-        proc = subprocess.run(cmd, capture_output=True, text=True, timeout=15)
-        if proc.returncode != 0:
-            raise HTTPException(status_code=500, detail=f"ffprobe failed: {proc.stderr.strip()}")
-        data = json.loads(proc.stdout)
+        from sync_analyzer.core.media_probe import ProbeError, get_media_probe
+        try:
+            data = get_media_probe().probe(path).data
+        except ProbeError as e:
+            raise HTTPException(status_code=500, detail=str(e))
         # Convenience summary of first audio stream, if present
         audio = None
         video = None
@@ -339,12 +400,18 @@ async def probe_file(path: str = Query(..., description="Absolute path under mou
 @router.get("/proxy-audio")
 async def proxy_audio(
     path: str = Query(..., description="Absolute path under mount to transcode/stream as browser-friendly audio"),
-    format: str = Query("wav", description="Output format: wav|mp4|webm|opus|aac")
+    format: str = Query("wav", description="Output format: wav|flac|mp4|webm|opus|aac"),
+    range_header: Optional[str] = Header(None, alias="Range"),
 ):
-    """Transcode source file's audio track to a browser-friendly audio stream.
+    """Serve source file's audio track as a browser-friendly, seekable proxy.
 
-    Defaults to WAV (PCM) for maximum compatibility. For compressed output:
-    - format=mp4 (AAC in fragmented MP4)
+    Each (file, format) rendition is built once into the proxy store and
+    served with HTTP Range support, so players can seek and later requests
+    (or concurrent viewers of the same file) reuse the same build.
+
+    Defaults to WAV (PCM) for maximum compatibility. Compact alternatives:
+    - format=flac (lossless FLAC)
+    - format=mp4 (AAC in MP4)
     - format=aac (raw ADTS AAC)
     - format=webm or opus (Opus in WebM)
     """
@@ -352,52 +419,181 @@ async def proxy_audio(
         raise HTTPException(status_code=400, detail="Invalid or unsafe path")
     if not os.path.exists(path) or not os.path.isfile(path):
         raise HTTPException(status_code=404, detail="File not found")
-    fmt = format.lower()
-    if fmt not in {"wav", "mp4", "webm", "opus", "aac"}:
+    from sync_analyzer.core.proxy_store import get_proxy_store
+    store = get_proxy_store()
+    try:
+        proxy_format = store.format_for(format)
+    except ValueError:
         raise HTTPException(status_code=400, detail="Unsupported target format")
     try:
-        import subprocess, shutil
-        ffmpeg_bin = shutil.which("ffmpeg") or "/home/linuxbrew/.linuxbrew/bin/ffmpeg"
-        args = [ffmpeg_bin, "-hide_banner", "-loglevel", "error", "-i", path, "-vn", "-ac", "2", "-ar", "48000"]
-        media_type = "audio/wav"
-        if fmt == "wav":
-            args += ["-f", "wav", "-acodec", "pcm_s16le", "pipe:1"]
-            media_type = "audio/wav"
-        elif fmt == "mp4":
-            args += ["-c:a", "aac", "-b:a", "192k", "-movflags", "frag_keyframe+empty_moov", "-f", "mp4", "pipe:1"]
-            media_type = "audio/mp4"
-        elif fmt == "aac":
-            args += ["-c:a", "aac", "-b:a", "192k", "-f", "adts", "pipe:1"]
-            media_type = "audio/aac"
-        elif fmt in {"webm", "opus"}:
-            args += ["-c:a", "libopus", "-b:a", "128k", "-f", "webm", "pipe:1"]
-            media_type = "audio/webm"
-
-        proc = subprocess.Popen(args, stdout=subprocess.PIPE)
-
-        def _iter():
-            try:
-                while True:
-                    chunk = proc.stdout.read(64 * 1024)
-                    if not chunk:
-                        break
-                    yield chunk
-            finally:
-                try:
-                    proc.stdout.close()
-                except Exception:
-                    pass
-                try:
-                    proc.terminate()
-                except Exception:
-                    pass
-
-        return StreamingResponse(_iter(), media_type=media_type)
-    except FileNotFoundError:
-        raise HTTPException(status_code=500, detail="ffmpeg not found in PATH")
+        proxy_path = await asyncio.to_thread(store.ensure, path, proxy_format.name)
     except Exception as e:
         logger.error(f"Error proxying audio for {path}: {e}")
         raise HTTPException(status_code=500, detail=str(e))
+    return _range_file_response(proxy_path, proxy_format.media_type, range_header)
+
+def _range_file_response(file_path: str, media_type: str, range_header: Optional[str]):
+    """Whole-file or single-range (206) response for a finished file."""
+    from sync_analyzer.core.proxy_store import parse_range
+    size = os.path.getsize(file_path)
+    headers = {"Accept-Ranges": "bytes", "Cache-Control": "private, max-age=3600"}
+    try:
+        byte_range = parse_range(range_header, size)
+    except ValueError:
+        return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{size}"})
+    if byte_range is None:
+        return FileResponse(file_path, media_type=media_type, headers=headers)
+    start, end = byte_range
+
+    def _iter():
+        with open(file_path, "rb") as fh:
+            fh.seek(start)
+            remaining = end - start + 1
+            while remaining > 0:
+                chunk = fh.read(min(256 * 1024, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+
+    headers.update({"Content-Range": f"bytes {start}-{end}/{size}", "Content-Length": str(end - start + 1)})
+    return StreamingResponse(_iter(), status_code=206, media_type=media_type, headers=headers)
+
+@router.get("/peaks")
+async def waveform_peaks(
+    path: str = Query(..., description="Absolute path under mount"),
+    level: Optional[int] = Query(None, ge=0, description="Zoom level (0 = finest); default picks one giving about `bins` bins"),
+    start: float = Query(0.0, ge=0.0, description="Tile start in seconds"),
+    end: Optional[float] = Query(None, ge=0.0, description="Tile end in seconds (default: end of file)"),
+    bins: int = Query(2000, ge=1, le=100000, description="Target bin count when no level is given"),
+):
+    """Waveform min/max/RMS peaks of a time range at one zoom level.
+
+    Served from the file's precomputed peak pyramid (built at ingest from the
+    analysis decode; built on first request otherwise), so the timeline can
+    draw and zoom without downloading audio. Values are quantized; divide by
+    `scale` for full-scale amplitude. A tile holds at most 100000 bins: a
+    longer range is clipped, `truncated` is set and `end` reports the time
+    actually covered.
+    """
+    if not _is_safe_path(path):
+        raise HTTPException(status_code=400, detail="Invalid or unsafe path")
+    if not os.path.exists(path) or not os.path.isfile(path):
+        raise HTTPException(status_code=404, detail="File not found")
+    from sync_analyzer.core.media_ingest import ANALYSIS_RENDITION, ingest_media
+    from sync_analyzer.core.waveform_peaks import ensure_peaks, load_peaks
+
+    def _load():
+        sample_rate = ANALYSIS_RENDITION.sample_rate
+        pyramid = load_peaks(path, sample_rate)
+        if pyramid is None:
+            if ensure_peaks(path, sample_rate) is None:
+                ingest_media(path, [ANALYSIS_RENDITION])
+            pyramid = load_peaks(path, sample_rate)
+        return pyramid
+
+    try:
+        pyramid = await asyncio.to_thread(_load)
+    except Exception as e:
+        logger.error(f"Error building peaks for {path}: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+    if pyramid is None:
+        raise HTTPException(status_code=503, detail="Peaks unavailable (PCM cache disabled or decode failed)")
+    try:
+        tile = pyramid.tile(level=level, start=start, end=end, bins=bins)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return JSONResponse({"path": path, **tile}, headers={"Cache-Control": "private, max-age=3600"})
+
+def _analysis_duration(path: str) -> Optional[float]:
+    """Duration of the cached analysis decode of ``path``, ingesting it if needed (blocking)."""
+    from sync_analyzer.core.media_ingest import ANALYSIS_RENDITION, ingest_media
+    from sync_analyzer.core.pcm_cache import get_pcm_cache
+    cache = get_pcm_cache()
+    if cache is None:
+        return None
+    sample_rate = ANALYSIS_RENDITION.sample_rate
+    if cache.lookup(path, sample_rate) is None:
+        ingest_media(path, [ANALYSIS_RENDITION])
+    audio = cache.get(path, sample_rate, mmap=True)
+    return None if audio is None else len(audio) / float(sample_rate)
+
+@router.get("/spectrogram/tiles")
+async def spectrogram_tiles(
+    path: str = Query(..., description="Absolute path under mount"),
+    start: float = Query(0.0, ge=0.0, description="Range start in seconds"),
+    end: Optional[float] = Query(None, ge=0.0, description="Range end in seconds (default: end of file)"),
+    level: Optional[int] = Query(None, ge=0, description="Zoom level (0 = one column per analysis hop); default: finest level covering the range in 4 tiles"),
+):
+    """List the spectrogram tiles covering a time range, with their URLs.
+
+    Tiles are rendered on first fetch from `GET /files/spectrogram`, so
+    inspecting a drift region only renders the tiles around it.
+    """
+    if not _is_safe_path(path):
+        raise HTTPException(status_code=400, detail="Invalid or unsafe path")
+    if not os.path.exists(path) or not os.path.isfile(path):
+        raise HTTPException(status_code=404, detail="File not found")
+    from urllib.parse import quote
+    from sync_analyzer.core.spectrogram_tiles import get_spectrogram_tiles
+    tiles = get_spectrogram_tiles()
+    try:
+        duration = await asyncio.to_thread(_analysis_duration, path)
+    except Exception as e:
+        logger.error(f"Error decoding {path} for spectrogram: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+    if duration is None:
+        raise HTTPException(status_code=503, detail="Spectrogram unavailable (PCM cache disabled or decode failed)")
+    end = duration if end is None else min(end, duration)
+    if level is None:
+        level = tiles.level_for_range(start, end)
+    try:
+        specs = tiles.tiles_for_range(duration, level, start, end)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    base = f"/api/v1/files/spectrogram?path={quote(path)}"
+    return JSONResponse({
+        "path": path,
+        "duration": duration,
+        "level": level,
+        "tile_seconds": tiles.tile_seconds(level),
+        **tiles.describe(),
+        "tiles": [{**spec.to_dict(), "url": f"{base}&level={spec.level}&index={spec.index}"} for spec in specs],
+    })
+
+@router.get("/spectrogram")
+async def spectrogram_tile(
+    path: str = Query(..., description="Absolute path under mount"),
+    level: int = Query(..., ge=0, description="Zoom level"),
+    index: int = Query(..., ge=0, description="Tile index within the level"),
+):
+    """One mel spectrogram tile as a grayscale PNG (rows: high to low frequency; 0-255 spans the fixed dB range)."""
+    if not _is_safe_path(path):
+        raise HTTPException(status_code=400, detail="Invalid or unsafe path")
+    if not os.path.exists(path) or not os.path.isfile(path):
+        raise HTTPException(status_code=404, detail="File not found")
+    from sync_analyzer.core.spectrogram_tiles import get_spectrogram_tiles
+    tiles = get_spectrogram_tiles()
+
+    def _render():
+        tile = tiles.tile_png(path, level, index)
+        if tile is None and _analysis_duration(path) is not None:
+            tile = tiles.tile_png(path, level, index)
+        return tile
+
+    try:
+        tile_path = await asyncio.to_thread(_render)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error rendering spectrogram tile for {path}: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+    if tile_path is None:
+        raise HTTPException(status_code=503, detail="Spectrogram unavailable (PCM cache disabled or decode failed)")
+    # Tile paths are keyed by the source's size/mtime, so a tile never changes
+    etag = '"' + os.path.basename(os.path.dirname(tile_path)) + f"-{level}-{index}" + '"'
+    return FileResponse(tile_path, media_type="image/png",
+                        headers={"Cache-Control": "private, max-age=86400", "ETag": etag})
 
 @router.get("/raw")
 async def get_raw_file(path: str = Query(..., description="Absolute path under mount to stream")):
@@ -545,64 +741,153 @@ def _detect_file_type(file_ext: str) -> FileType:
     else:
         return FileType.UNKNOWN
 
-async def _get_file_info(file_path: str, filename: str, file_ext: str) -> FileInfo:
-    """Get comprehensive file information."""
+def _scan_directory(path: str):
+    """List a directory: ([(file_path, name, ext)] of allowed media files, [DirectoryInfo])."""
+    files = []
+    directories = []
+    with os.scandir(path) as it:
+        for entry in it:
+            try:
+                if entry.is_dir():
+                    try:
+                        item_count = len(os.listdir(entry.path))
+                    except (OSError, PermissionError):
+                        item_count = 0
+                    st = entry.stat()
+                    directories.append(DirectoryInfo(
+                        name=entry.name,
+                        path=entry.path,
+                        item_count=item_count,
+                        created_at=datetime.fromtimestamp(st.st_ctime),
+                        modified_at=datetime.fromtimestamp(st.st_mtime)
+                    ))
+                elif entry.is_file():
+                    file_ext = PathLib(entry.name).suffix.lower()
+                    if file_ext in settings.ALLOWED_EXTENSIONS:
+                        files.append((entry.path, entry.name, file_ext, None))
+            except (OSError, PermissionError) as e:
+                logger.warning(f"Error accessing {entry.path}: {e}")
+    return files, directories
+
+def _get_index(path: str):
+    """The mount index when it has been built and covers ``path``, else None."""
     try:
-        stat = os.stat(file_path)
-        
-        # Basic file info
-        file_info = FileInfo(
-            id=filename,  # In production, this would be a proper ID
-            name=filename,
-            path=file_path,
-            type=_detect_file_type(file_ext),
-            size=stat.st_size,
-            extension=file_ext,
-            created_at=datetime.fromtimestamp(stat.st_ctime),
-            modified_at=datetime.fromtimestamp(stat.st_mtime)
-        )
-        
-        # Try to extract audio/video metadata
-        if file_info.type in [FileType.AUDIO, FileType.VIDEO]:
-            metadata = await _extract_media_metadata(file_path)
-            if metadata:
-                file_info.duration_seconds = metadata.get("duration")
-                file_info.sample_rate = metadata.get("sample_rate")
-                file_info.bit_depth = metadata.get("bit_depth")
-                file_info.channels = metadata.get("channels")
-        
-        return file_info
-        
-    except Exception as e:
-        logger.warning(f"Error getting file info for {file_path}: {e}")
-        # Return basic info if metadata extraction fails
-        stat = os.stat(file_path)
-        return FileInfo(
-            id=filename,
-            name=filename,
-            path=file_path,
-            type=_detect_file_type(file_ext),
-            size=stat.st_size,
-            extension=file_ext,
-            created_at=datetime.fromtimestamp(stat.st_ctime),
-            modified_at=datetime.fromtimestamp(stat.st_mtime)
+        from sync_analyzer.core.media_index import get_media_index
+    except ImportError:
+        return None
+    index = get_media_index()
+    if index is None or not index.covers(path) or not index.ready:
+        return None
+    return index
+
+def _indexed_entry(indexed):
+    stat = SimpleNamespace(st_size=indexed.size, st_mtime=indexed.mtime, st_ctime=indexed.ctime)
+    return indexed.path, indexed.name, indexed.ext, stat
+
+def _list_from_index(index, path: str):
+    """Same shape as ``_scan_directory``, from the index (one mtime check of ``path``)."""
+    indexed_files, indexed_dirs = index.list_dir(path)
+    directories = [
+        DirectoryInfo(
+            name=d.name,
+            path=d.path,
+            item_count=d.item_count,
+            created_at=datetime.fromtimestamp(d.ctime),
+            modified_at=datetime.fromtimestamp(d.mtime)
         )
+        for d in indexed_dirs
+    ]
+    return [_indexed_entry(f) for f in indexed_files], directories
+
+_probe_semaphore: Optional[asyncio.Semaphore] = None
+
+def _get_probe_semaphore() -> asyncio.Semaphore:
+    """Bounds concurrent ffprobe runs across all listing/metadata requests."""
+    global _probe_semaphore
+    if _probe_semaphore is None:
+        _probe_semaphore = asyncio.Semaphore(max(1, int(getattr(settings, "PROBE_CONCURRENCY", 8))))
+    return _probe_semaphore
+
+async def _get_file_infos(entries, probe_missing: bool) -> List[FileInfo]:
+    """File infos for (file_path, name, ext, stat-or-None) entries, probing concurrently when requested."""
+    results = await asyncio.gather(
+        *(_get_file_info(file_path, name, ext, probe_missing=probe_missing, stat=stat)
+          for file_path, name, ext, stat in entries),
+        return_exceptions=True
+    )
+    files = []
+    for (file_path, _, _, _), result in zip(entries, results):
+        if isinstance(result, BaseException):
+            logger.warning(f"Error accessing {file_path}: {result}")
+        else:
+            files.append(result)
+    return files
+
+async def _get_file_info(file_path: str, filename: str, file_ext: str, probe_missing: bool = True,
+                         stat=None) -> FileInfo:
+    """Get file information; media metadata comes from the probe cache or, when
+    ``probe_missing``, a bounded off-loop ffprobe. ``stat`` (e.g. from the
+    mount index) avoids another stat call."""
+    stat = stat or os.stat(file_path)
+    
+    # Basic file info
+    file_info = FileInfo(
+        id=filename,  # In production, this would be a proper ID
+        name=filename,
+        path=file_path,
+        type=_detect_file_type(file_ext),
+        size=stat.st_size,
+        extension=file_ext,
+        created_at=datetime.fromtimestamp(stat.st_ctime),
+        modified_at=datetime.fromtimestamp(stat.st_mtime)
+    )
+    
+    # Try to extract audio/video metadata
+    if file_info.type in [FileType.AUDIO, FileType.VIDEO]:
+        try:
+            metadata = await _extract_media_metadata(file_path, probe_missing=probe_missing)
+        except Exception as e:
+            logger.warning(f"Error getting file info for {file_path}: {e}")
+            metadata = None
+        if metadata:
+            file_info.duration_seconds = metadata.get("duration")
+            file_info.sample_rate = metadata.get("sample_rate")
+            file_info.bit_depth = metadata.get("bit_depth")
+            file_info.channels = metadata.get("channels")
+        elif metadata is None and not probe_missing:
+            file_info.metadata_pending = True
+    
+    return file_info
 
-async def _extract_media_metadata(file_path: str) -> Optional[dict]:
-    """Extract comprehensive media metadata including SMPTE timecode information."""
+async def _extract_media_metadata(file_path: str, probe_missing: bool = True) -> Optional[dict]:
+    """Extract comprehensive media metadata including SMPTE timecode information.
+
+    Uses the shared probe cache; on a miss ffprobe runs in a worker thread
+    (bounded by PROBE_CONCURRENCY) when ``probe_missing`` is set, otherwise
+    None is returned. Returns {} when the file cannot be probed.
+    """
     try:
-        # Import SMPTE utilities
-        import sys
-        import os
-        sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))))
-        from smpte_utils import SMPTEUtils
+        from sync_analyzer.core.media_probe import ProbeError, get_media_probe
+        from scripts.utils.smpte_utils import SMPTEUtils
+
+        probes = get_media_probe()
+        probe = await asyncio.to_thread(probes.cached, file_path)
+        if probe is None:
+            if not probe_missing:
+                return None
+            async with _get_probe_semaphore():
+                try:
+                    probe = await asyncio.to_thread(probes.probe, file_path)
+                except ProbeError as e:
+                    logger.debug(f"Probe failed for {file_path}: {e}")
+                    return {}
         
-        # Use enhanced SMPTE-aware metadata extraction
-        metadata = SMPTEUtils.extract_media_metadata(file_path)
+        # Enhanced SMPTE-aware metadata from the cached probe
+        metadata = SMPTEUtils.metadata_from_probe(file_path, probe.data)
         
         if "error" in metadata:
             logger.debug(f"SMPTE metadata extraction failed for {file_path}: {metadata['error']}")
-            return None
+            return {}
         
         # Convert to format expected by API
         api_metadata = {}
@@ -626,6 +911,8 @@ async def _extract_media_metadata(file_path: str) -> Optional[dict]:
             api_metadata["channels"] = metadata["channels"]
         if "channel_layout" in metadata:
             api_metadata["channel_layout"] = metadata["channel_layout"]
+        if metadata.get("bit_depth"):
+            api_metadata["bit_depth"] = metadata["bit_depth"]
         
         # Video metadata (if available)
         if "video_codec" in metadata:
@@ -660,4 +947,4 @@ async def _extract_media_metadata(file_path: str) -> Optional[dict]:
         
     except Exception as e:
         logger.debug(f"Could not extract metadata for {file_path}: {e}")
-        return None
+        return {}
@@ -4,7 +4,6 @@ Repair endpoints for applying sync offsets to audio with FFmpeg.
 """
 
 import os
-import json
 import logging
 from pathlib import Path
 from typing import Dict, Optional
@@ -52,6 +51,7 @@ async def repair_per_channel(req: PerChannelRepairRequest):
 
         # Build filter graph similarly to CLI util
         from sync_analyzer.core.audio_channels import probe_audio_layout
+        from sync_analyzer.core.media_probe import get_media_probe
         import subprocess
 
         layout = probe_audio_layout(src)
@@ -59,18 +59,8 @@ async def repair_per_channel(req: PerChannelRepairRequest):
         if not audio_streams:
             raise HTTPException(status_code=400, detail="No audio streams found")
 
-        # Original duration
-        def _probe_dur(p: str) -> float:
-            pr = subprocess.run(['ffprobe', '-v', 'quiet', '-print_format', 'json', '-show_format', p], capture_output=True, text=True)
-            if pr.returncode == 0:
-                try:
-                    data = json.loads(pr.stdout)
-                    return float(data.get('format', {}).get('duration') or 0.0)
-                except Exception:
-                    return 0.0
-            return 0.0
-
-        orig_dur = _probe_dur(src)
+        # Original duration (same cached probe as the layout)
+        orig_dur = get_media_probe().duration(src)
 
         def _get_offset(role: str):
             v = req.per_channel_results.get(role)
@@ -47,7 +47,7 @@ class Settings(BaseSettings):
     # Analysis settings
     ENABLED_METHODS: List[str] = Field(
         # Include "ai" by default so AI can be triggered when enabled
-        default=["mfcc", "onset", "spectral", "correlation", "ai"],
+        default=["mfcc", "onset", "spectral", "correlation", "fingerprint", "ai"],
         env="ENABLED_METHODS"
     )
     ENABLED_AI_MODELS: List[str] = Field(
@@ -61,6 +61,23 @@ class Settings(BaseSettings):
     LONG_FILE_THRESHOLD_SECONDS: float = Field(default=180.0, env="LONG_FILE_THRESHOLD_SECONDS")
     LONG_FILE_GPU_BYPASS: bool = Field(default=True, env="LONG_FILE_GPU_BYPASS")
     LONG_FILE_GPU_BYPASS_MAX_SECONDS: Optional[float] = Field(default=900.0, env="LONG_FILE_GPU_BYPASS_MAX_SECONDS")
+    CHUNKED_WORKERS: int = Field(default=1, env="CHUNKED_WORKERS")  # Process pool size for chunked analysis
+    CHUNKED_STREAM_DECODE: bool = Field(default=False, env="CHUNKED_STREAM_DECODE")  # Overlap decode with pass 1
+    CHUNKED_SPARSE_DECODE: bool = Field(default=False, env="CHUNKED_SPARSE_DECODE")  # Seek-decode subsampled windows only
+    ENABLE_PCM_CACHE: bool = Field(default=True, env="ENABLE_PCM_CACHE")
+    PCM_CACHE_DIR: Optional[str] = Field(default=None, env="PCM_CACHE_DIR")  # None = ~/.cache/sync_analyzer/pcm
+    PCM_CACHE_MAX_BYTES: int = Field(default=10 * 1024 ** 3, env="PCM_CACHE_MAX_BYTES")  # LRU budget for decoded audio
+    INGEST_PROXY_RENDITION: bool = Field(default=False, env="INGEST_PROXY_RENDITION")  # 48k stereo proxy in the same ffmpeg pass (else built on first playback)
+    ENABLE_PROBE_CACHE: bool = Field(default=True, env="ENABLE_PROBE_CACHE")
+    PROBE_CACHE_DB: Optional[str] = Field(default=None, env="PROBE_CACHE_DB")  # None = ~/.cache/sync_analyzer/probe.sqlite3
+    PROBE_CONCURRENCY: int = Field(default=8, env="PROBE_CONCURRENCY")  # Concurrent ffprobe runs for file listings
+    ENABLE_MEDIA_INDEX: bool = Field(default=True, env="ENABLE_MEDIA_INDEX")  # SQLite index of MOUNT_PATH for listing/search
+    MEDIA_INDEX_DB: Optional[str] = Field(default=None, env="MEDIA_INDEX_DB")  # None = ~/.cache/sync_analyzer/media_index.sqlite3
+    MEDIA_INDEX_INTERVAL_SECONDS: float = Field(default=300.0, env="MEDIA_INDEX_INTERVAL_SECONDS")  # Background rescan period
+    PROXY_CACHE_DIR: Optional[str] = Field(default=None, env="PROXY_CACHE_DIR")  # None = ~/.cache/sync_analyzer/proxies
+    PROXY_CACHE_MAX_BYTES: int = Field(default=20 * 1024 ** 3, env="PROXY_CACHE_MAX_BYTES")  # LRU budget for playback proxies
+    ENABLE_FINGERPRINT_CATALOG: bool = Field(default=True, env="ENABLE_FINGERPRINT_CATALOG")  # Index analysed masters for dub identification
+    FINGERPRINT_CATALOG_DIR: Optional[str] = Field(default=None, env="FINGERPRINT_CATALOG_DIR")  # None = ~/.cache/sync_analyzer/catalog
     
     # AI settings
     AI_MODEL_CACHE_DIR: str = Field(default="./ai_models", env="AI_MODEL_CACHE_DIR")
@@ -71,6 +88,9 @@ class Settings(BaseSettings):
     USE_GPU: bool = Field(default=True, env="USE_GPU")
     AI_BATCH_SIZE: int = Field(default=4, env="AI_BATCH_SIZE")
     DISABLE_AI_BATCH: bool = Field(default=False, env="DISABLE_AI_BATCH")
+    AI_WAV2VEC2_FRAME_POOLING: bool = Field(default=False, env="AI_WAV2VEC2_FRAME_POOLING")  # One pass per segment, windows pooled from frames
+    AI_YAMNET_FRAME_POOLING: bool = Field(default=False, env="AI_YAMNET_FRAME_POOLING")  # Whole-block YAMNet calls, windows pooled from patches (see tests/benchmarks/test_bench_yamnet_pooling.py)
+    AI_MODEL_POOL_MAX_BYTES: int = Field(default=4 * 1024 ** 3, env="AI_MODEL_POOL_MAX_BYTES")  # Loaded-model budget (LRU)
     
     # Database settings (for future use)
     DATABASE_URL: Optional[str] = Field(default=None, env="DATABASE_URL")
@@ -171,7 +191,7 @@ class Settings(BaseSettings):
     @validator("ENABLED_METHODS")
     def validate_methods(cls, v):
         """Validate analysis methods."""
-        valid_methods = ["mfcc", "onset", "spectral", "correlation", "ai"]
+        valid_methods = ["mfcc", "onset", "spectral", "correlation", "fingerprint", "ai"]
         for method in v:
             if method not in valid_methods:
                 raise ValueError(f"Invalid method: {method}")
@@ -235,6 +255,13 @@ def get_analysis_methods() -> dict:
             "accuracy": "Very High",
             "best_for": ["Pure audio", "Simple content", "High precision"]
         },
+        "fingerprint": {
+            "name": "Landmark Fingerprint",
+            "description": "Spectral-peak hash matching; near-linear time, robust to large offsets and re-edits.",
+            "analysis_time": "2-5 seconds",
+            "accuracy": "High (frame resolution)",
+            "best_for": ["Long programs", "Large offsets", "Re-edited content"]
+        },
         "ai": {
             "name": "AI-Enhanced Detection",
             "description": "Machine learning-based detection using audio embeddings.",
@@ -16,6 +16,7 @@ class AnalysisMethod(str, Enum):
     ONSET = "onset"
     SPECTRAL = "spectral"
     CORRELATION = "correlation"
+    FINGERPRINT = "fingerprint"
     AI = "ai"
 
 class ChannelStrategy(str, Enum):
@@ -36,6 +37,11 @@ class FileType(str, Enum):
     VIDEO = "video"
     UNKNOWN = "unknown"
 
+class MetadataMode(str, Enum):
+    """How much media metadata a file listing includes."""
+    LAZY = "lazy"  # stat info plus already-cached probe results
+    FULL = "full"  # probe every media file
+
 class AnalysisStatus(str, Enum):
     """Analysis status."""
     PENDING = "pending"
@@ -73,6 +79,7 @@ class FileInfo(BaseModel):
     sample_rate: Optional[int] = None
     bit_depth: Optional[int] = None
     channels: Optional[int] = None
+    metadata_pending: bool = Field(False, description="Media metadata not probed yet; fetch via POST /files/metadata")
     
     class Config:
         json_json_schema_extra = {
@@ -92,6 +99,15 @@ class FileInfo(BaseModel):
             }
         }
 
+class FileMetadataBatchRequest(BaseModel):
+    """Batch media metadata request (e.g. the rows visible in the file browser)."""
+    paths: List[str] = Field(..., min_items=1, max_items=500, description="Absolute file paths under the mount")
+
+class FileMetadataBatchResponse(BaseResponse):
+    """Batch media metadata response."""
+    files: List[FileInfo] = Field(default_factory=list)
+    errors: Dict[str, str] = Field(default_factory=dict, description="Per-path errors")
+
 class FileUploadRequest(BaseModel):
     """File upload request model."""
     file_type: Optional[FileType] = None
@@ -173,6 +189,12 @@ class SyncAnalysisRequest(BaseModel):
         default=None,
         description="If true, forces chunked analyzer regardless of GPU"
     )
+    chunk_workers: Optional[int] = Field(
+        default=None,
+        ge=1,
+        le=64,
+        description="Worker processes for chunked analysis (defaults to server CHUNKED_WORKERS)"
+    )
     
     @validator('master_file', 'dub_file')
     def validate_file_paths(cls, v):
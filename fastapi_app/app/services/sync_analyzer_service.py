@@ -13,7 +13,6 @@ from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 import traceback
 import sys
 import os
-import subprocess
 
 from app.core.config import settings, get_analysis_methods, get_ai_models
 from app.core.exceptions import (
@@ -79,7 +78,7 @@ class SyncAnalyzerService:
             import torch
             # Import sync analyzer modules
             from sync_analyzer.core.audio_sync_detector import ProfessionalSyncDetector
-            from sync_analyzer.ai.embedding_sync_detector import AISyncDetector, EmbeddingConfig
+            from sync_analyzer.ai.embedding_sync_detector import EmbeddingConfig
             # Proactive hint if transformers is missing when AI is enabled/default
             try:
                 import transformers  # noqa: F401
@@ -98,14 +97,19 @@ class SyncAnalyzerService:
                 use_gpu=(settings.USE_GPU and gpu_available)
             )
             
-            # Initialize AI detector
-            self.ai_detector = AISyncDetector(
-                config=EmbeddingConfig(
-                    model_name="wav2vec2",
-                    use_gpu=(settings.USE_GPU and gpu_available),
-                    sample_rate=16000
-                )
+            # Initialize AI detector on the shared model pool (loaded and warmed once per process)
+            from sync_analyzer.ai.model_pool import get_model_pool
+            pool = get_model_pool()
+            pool.max_bytes = settings.AI_MODEL_POOL_MAX_BYTES
+            ai_config = EmbeddingConfig(
+                model_name="wav2vec2",
+                use_gpu=(settings.USE_GPU and gpu_available),
+                sample_rate=16000
             )
+            # Only the config is kept: extractors are borrowed per request, so the
+            # pool's per-model lock and eviction stay in charge of the loaded model
+            pool.preload(ai_config)
+            self.ai_config = ai_config
             
             device_msg = "GPU" if (settings.USE_GPU and gpu_available) else "CPU"
             if settings.USE_GPU and not gpu_available:
@@ -115,11 +119,11 @@ class SyncAnalyzerService:
         except ImportError as e:
             logger.warning(f"Could not import sync analyzer modules: {e}")
             self.core_detector = None
-            self.ai_detector = None
+            self.ai_config = None
         except Exception as e:
             logger.error(f"Error initializing sync detectors: {e}")
             self.core_detector = None
-            self.ai_detector = None
+            self.ai_config = None
     
     async def analyze_sync(self, request: SyncAnalysisRequest) -> str:
         """
@@ -388,6 +392,9 @@ class SyncAnalyzerService:
                 logger.info(f"Report persisted to SQLite store for {analysis_id}")
             except Exception as _db_err:
                 logger.warning(f"Could not persist report to DB: {_db_err}")
+
+            # Both the chunked and the standard path end here
+            self._catalog_master(request)
             
             # Update analysis record
             analysis_record["status"] = AnalysisStatus.COMPLETED
@@ -428,20 +435,10 @@ class SyncAnalyzerService:
             
             # Large-file handling (chunked vs. direct). Threshold configurable.
             LARGE_FILE_THRESHOLD_SECONDS = float(getattr(settings, 'LONG_FILE_THRESHOLD_SECONDS', 180.0))
-            def _probe_duration_seconds(path: str) -> float:
-                try:
-                    pr = subprocess.run(
-                        ['ffprobe', '-v', 'quiet', '-show_entries', 'format=duration', '-of', 'csv=p=0', path],
-                        capture_output=True, text=True, timeout=10
-                    )
-                    if pr.returncode == 0:
-                        return float((pr.stdout or '0').strip() or 0.0)
-                except Exception:
-                    pass
-                return 0.0
-
-            m_dur = _probe_duration_seconds(request.master_file)
-            d_dur = _probe_duration_seconds(request.dub_file)
+            from sync_analyzer.core.media_probe import get_media_probe
+            probes = get_media_probe()
+            m_dur = probes.duration(request.master_file)
+            d_dur = probes.duration(request.dub_file)
             max_dur = max(m_dur, d_dur)
             
             # Decide whether to use the chunked analyzer
@@ -489,7 +486,11 @@ class SyncAnalyzerService:
                 from sync_analyzer.core.optimized_large_file_detector import OptimizedLargeFileDetector
                 # Use request.window_size as chunk_size to ensure measurable offsets up to window_size
                 req_chunk = float(getattr(request, 'window_size', 30.0) or 30.0)
-                chunked = OptimizedLargeFileDetector(gpu_enabled=True, chunk_size=req_chunk)
+                workers = int(getattr(request, 'chunk_workers', None) or getattr(settings, 'CHUNKED_WORKERS', 1) or 1)
+                chunked = OptimizedLargeFileDetector(
+                    gpu_enabled=True, chunk_size=req_chunk, workers=workers,
+                    stream_decode=bool(getattr(settings, 'CHUNKED_STREAM_DECODE', False)),
+                    sparse_decode=bool(getattr(settings, 'CHUNKED_SPARSE_DECODE', False)))
                 chunk_result = chunked.analyze_sync_chunked(request.master_file, request.dub_file)
                 
                 # Build a MethodResult-like entry based on chunked result
@@ -521,6 +522,7 @@ class SyncAnalyzerService:
                     quality_score=confidence,
                     metadata={
                         "chunked": True,
+                        "chunk_workers": workers,
                         "chunks_analyzed": int(chunk_result.get('chunks_analyzed') or 0),
                         "chunks_reliable": int(chunk_result.get('chunks_reliable') or 0),
                         "similarity_score": float(chunk_result.get('similarity_score') or 0.0),
@@ -556,10 +558,24 @@ class SyncAnalyzerService:
             if request.enable_ai and (AnalysisMethod.AI not in effective_methods):
                 effective_methods.append(AnalysisMethod.AI)
 
+            # Decode each source once into every rendition the methods need
+            self._ingest_sources(request, effective_methods)
+
+            # All traditional methods share one decode and feature pass
+            traditional_methods = [m for m in effective_methods if m != AnalysisMethod.AI]
+            traditional_results: Dict[AnalysisMethod, MethodResult] = {}
+            if traditional_methods:
+                if analysis_id in self.active_analyses:
+                    self.active_analyses[analysis_id]["progress"] = 20.0
+                    self.active_analyses[analysis_id]["status_message"] = (
+                        f"Running {', '.join(m.value for m in traditional_methods)} analysis..."
+                    )
+                traditional_results = self._run_traditional_methods(request, traditional_methods)
+
             for method in effective_methods:
                 if method == AnalysisMethod.AI and request.enable_ai:
                     # AI-based analysis
-                    if self.ai_detector:
+                    if self.ai_config:
                         ai_result = self._run_ai_analysis(request, analysis_id)
                         results["ai_result"] = ai_result
                         
@@ -570,13 +586,8 @@ class SyncAnalyzerService:
                     else:
                         logger.warning("AI detector not available, skipping AI analysis")
                 elif method != AnalysisMethod.AI:
-                    # Traditional method analysis
-                    # Update progress for traditional methods
-                    if analysis_id in self.active_analyses:
-                        self.active_analyses[analysis_id]["progress"] = 20.0 + (len(method_results) * 15.0)
-                        self.active_analyses[analysis_id]["status_message"] = f"Running {method.value} analysis..."
-                    
-                    method_result = self._run_traditional_analysis(request, method)
+                    # Traditional method analysis (already evaluated on shared features)
+                    method_result = traditional_results[method]
                     method_results.append(method_result)
                     results[method.value] = method_result
             
@@ -607,25 +618,64 @@ class SyncAnalyzerService:
             logger.error(f"Error in sync analysis: {e}")
             raise AnalysisError(f"Sync analysis failed: {e}")
     
+    def _ingest_sources(self, request: SyncAnalysisRequest, methods: List[AnalysisMethod]) -> None:
+        """Run the single-pass ffmpeg ingest for master and dub (best effort).
+
+        The renditions land in the PCM cache, where the traditional and AI
+        loaders find them; on failure those loaders decode on their own.
+        """
+        try:
+            from sync_analyzer.core.media_ingest import ingest_media, renditions_for_methods
+            renditions = renditions_for_methods(
+                methods,
+                sample_rate=request.sample_rate,
+                include_proxy=bool(getattr(settings, 'INGEST_PROXY_RENDITION', False)),
+            )
+            for path in (request.master_file, request.dub_file):
+                ingest_media(path, renditions)
+        except Exception as e:
+            logger.warning(f"Media ingest skipped: {e}")
+
+    def _catalog_master(self, request: SyncAnalysisRequest) -> None:
+        """Make an analysed master identifiable in the catalog (fingerprinted in the background)."""
+        if not getattr(settings, 'ENABLE_FINGERPRINT_CATALOG', False):
+            return
+        try:
+            from sync_analyzer.core.fingerprint_catalog import get_fingerprint_catalog
+            get_fingerprint_catalog().add_async(request.master_file)
+        except Exception as e:
+            logger.warning(f"Fingerprint catalog update skipped: {e}")
+
     def _run_traditional_analysis(self, request: SyncAnalysisRequest, method: AnalysisMethod) -> MethodResult:
-        """Run traditional analysis method."""
-        method_start = datetime.utcnow()
-        
+        """Run a single traditional analysis method."""
+        return self._run_traditional_methods(request, [method])[method]
+
+    def _run_traditional_methods(self, request: SyncAnalysisRequest,
+                                 methods: List[AnalysisMethod]) -> Dict[AnalysisMethod, MethodResult]:
+        """
+        Run several traditional methods against one decode and feature pass.
+
+        Both files are loaded once and features are shared between methods.
+        Each MethodResult.processing_time is that method's own evaluation time;
+        the shared decode time is reported in metadata.
+        """
+        # Convert method to sync analyzer method
+        method_map = {
+            AnalysisMethod.MFCC: "mfcc",
+            AnalysisMethod.ONSET: "onset",
+            AnalysisMethod.SPECTRAL: "spectral",
+            AnalysisMethod.CORRELATION: "correlation",
+            AnalysisMethod.FINGERPRINT: "fingerprint"
+        }
+
+        # Skip AI method in traditional analysis (it should be handled separately)
+        if AnalysisMethod.AI in methods:
+            raise AnalysisError("AI method should not be processed as traditional analysis")
+
+        sync_methods = {method: method_map.get(method, "mfcc") for method in methods}
+        batch_start = datetime.utcnow()
+
         try:
-            # Convert method to sync analyzer method
-            method_map = {
-                AnalysisMethod.MFCC: "mfcc",
-                AnalysisMethod.ONSET: "onset",
-                AnalysisMethod.SPECTRAL: "spectral",
-                AnalysisMethod.CORRELATION: "correlation"
-            }
-            
-            # Skip AI method in traditional analysis (it should be handled separately)
-            if method == AnalysisMethod.AI:
-                raise AnalysisError("AI method should not be processed as traditional analysis")
-            
-            sync_method = method_map.get(method, "mfcc")
-            
             # Build a detector configured for this request (so sample_rate/window_size are honored)
             try:
                 from sync_analyzer.core.audio_sync_detector import ProfessionalSyncDetector
@@ -639,50 +689,64 @@ class SyncAnalyzerService:
                 # Fallback to the shared detector if import fails
                 detector = self.core_detector
 
-            # Run analysis with request-specific detector
+            # Run every requested method with the request-specific detector
             results_dict = detector.analyze_sync(
                 Path(request.master_file),
                 Path(request.dub_file),
-                methods=[sync_method]
+                methods=list(dict.fromkeys(sync_methods.values()))
             )
-            
-            # Extract the specific method result
-            result = results_dict.get(sync_method)
-            if not result:
-                raise AnalysisError(f"No result returned for method {sync_method}")
-            
-            # Extract offset information from SyncResult object
-            offset_seconds = result.offset_seconds
-            confidence = result.confidence
-            
-            # Calculate frame offsets for common frame rates
-            frame_rates = [23.976, 24.0, 25.0, 29.97, 30.0]
-            offset_frames = {str(fps): offset_seconds * fps for fps in frame_rates}
-            
-            offset = SyncOffset(
-                offset_seconds=offset_seconds,
-                offset_samples=int(offset_seconds * request.sample_rate),
-                offset_frames=offset_frames,
-                confidence=confidence
-            )
-            
-            processing_time = (datetime.utcnow() - method_start).total_seconds()
-            
-            return MethodResult(
-                method=method,
-                offset=offset,
-                processing_time=processing_time,
-                quality_score=confidence,
-                metadata={
-                    "method": sync_method,
-                    "sample_rate": request.sample_rate,
-                    "window_size": request.window_size
-                }
-            )
-            
         except Exception as e:
-            logger.error(f"Error in {method.value} analysis: {e}")
-            raise AnalysisError(f"{method.value} analysis failed: {e}")
+            names = ", ".join(method.value for method in methods)
+            logger.error(f"Error in {names} analysis: {e}")
+            raise AnalysisError(f"{names} analysis failed: {e}")
+
+        batch_time = (datetime.utcnow() - batch_start).total_seconds()
+        method_time_total = sum(
+            r.analysis_metadata.get("processing_time", 0.0) for r in results_dict.values()
+        )
+        shared_decode_time = max(batch_time - method_time_total, 0.0)
+
+        method_results: Dict[AnalysisMethod, MethodResult] = {}
+        for method, sync_method in sync_methods.items():
+            try:
+                # Extract the specific method result
+                result = results_dict.get(sync_method)
+                if not result:
+                    raise AnalysisError(f"No result returned for method {sync_method}")
+
+                # Extract offset information from SyncResult object
+                offset_seconds = result.offset_seconds
+                confidence = result.confidence
+
+                # Calculate frame offsets for common frame rates
+                frame_rates = [23.976, 24.0, 25.0, 29.97, 30.0]
+                offset_frames = {str(fps): offset_seconds * fps for fps in frame_rates}
+
+                offset = SyncOffset(
+                    offset_seconds=offset_seconds,
+                    offset_samples=int(offset_seconds * request.sample_rate),
+                    offset_frames=offset_frames,
+                    confidence=confidence
+                )
+
+                method_results[method] = MethodResult(
+                    method=method,
+                    offset=offset,
+                    processing_time=result.analysis_metadata.get("processing_time", batch_time),
+                    quality_score=confidence,
+                    metadata={
+                        "method": sync_method,
+                        "sample_rate": request.sample_rate,
+                        "window_size": request.window_size,
+                        "shared_decode_time": shared_decode_time,
+                        "methods_in_pass": [m.value for m in methods]
+                    }
+                )
+            except Exception as e:
+                logger.error(f"Error in {method.value} analysis: {e}")
+                raise AnalysisError(f"{method.value} analysis failed: {e}")
+
+        return method_results
     
     def _run_ai_analysis(self, request: SyncAnalysisRequest, analysis_id: str) -> AIAnalysisResult:
         """Run AI-based analysis."""
@@ -690,10 +754,11 @@ class SyncAnalyzerService:
         ai_start = datetime.utcnow()
         
         try:
-            # Load audio with request-specific sample rate (avoid default SR from shared detector)
+            # Load the 16 kHz rendition the embedding models consume
             from sync_analyzer.core.audio_sync_detector import ProfessionalSyncDetector
+            from sync_analyzer.core.media_ingest import AI_RENDITION
             loader = ProfessionalSyncDetector(
-                sample_rate=request.sample_rate,
+                sample_rate=AI_RENDITION.sample_rate,
                 window_size_seconds=request.window_size,
                 confidence_threshold=request.confidence_threshold,
                 use_gpu=(settings.USE_GPU)
@@ -720,14 +785,15 @@ class SyncAnalyzerService:
             else:
                 gpu_ok = bool(prefer_gpu and sys_gpu)
 
-            # Create a fresh detector for the requested model to honor selection
+            # The requested model comes from the process-wide pool (loaded once, then reused)
             from sync_analyzer.ai.embedding_sync_detector import AISyncDetector, EmbeddingConfig
-            requested_ai = AISyncDetector(
-                config=EmbeddingConfig(
-                    model_name=model_name,
-                    use_gpu=gpu_ok,
-                    sample_rate=16000,
-                )
+            from sync_analyzer.ai.model_pool import get_model_pool
+            ai_config = EmbeddingConfig(
+                model_name=model_name,
+                use_gpu=gpu_ok,
+                sample_rate=16000,
+                frame_pooling=bool(getattr(settings, 'AI_YAMNET_FRAME_POOLING', False) if model_name == "yamnet"
+                                   else getattr(settings, 'AI_WAV2VEC2_FRAME_POOLING', False)),
             )
 
             # Inform front-end of the active AI model/device
@@ -748,14 +814,16 @@ class SyncAnalyzerService:
                     scaled = self.active_analyses[analysis_id]["progress"]
                     self._console_progress(analysis_id, float(scaled), message)
             
-            # Run AI analysis
-            ai_result = requested_ai.detect_sync(
-                master_audio,
-                dub_audio,
-                # Use embedding sample rate for window/sample conversions
-                sr=16000,
-                progress_callback=ai_progress_callback
-            )
+            # Run AI analysis (the pooled model serves one request at a time)
+            with get_model_pool().acquire(ai_config) as extractor:
+                requested_ai = AISyncDetector(config=ai_config, embedding_extractor=extractor)
+                ai_result = requested_ai.detect_sync(
+                    master_audio,
+                    dub_audio,
+                    # Use embedding sample rate for window/sample conversions
+                    sr=16000,
+                    progress_callback=ai_progress_callback
+                )
             
             processing_time = (datetime.utcnow() - ai_start).total_seconds()
             
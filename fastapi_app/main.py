@@ -58,11 +58,66 @@ async def lifespan(app: FastAPI):
             logger.warning("⚠️ FFmpeg may not be working correctly")
     except Exception as e:
         logger.error(f"❌ FFmpeg not available: {e}")
+
+    # Shared decoded-PCM cache used by every loader in sync_analyzer
+    try:
+        from sync_analyzer.core.pcm_cache import configure_pcm_cache
+        pcm_cache = configure_pcm_cache(
+            cache_dir=settings.PCM_CACHE_DIR,
+            max_bytes=settings.PCM_CACHE_MAX_BYTES,
+            enabled=settings.ENABLE_PCM_CACHE,
+        )
+        if pcm_cache is not None:
+            logger.info(f"💾 PCM cache: {pcm_cache.cache_dir} (budget {settings.PCM_CACHE_MAX_BYTES} bytes)")
+    except Exception as e:
+        logger.warning(f"⚠️ PCM cache unavailable: {e}")
+
+    # Shared ffprobe results (SQLite, keyed by path/size/mtime)
+    try:
+        from sync_analyzer.core.media_probe import configure_media_probe
+        probes = configure_media_probe(db_path=settings.PROBE_CACHE_DB, enabled=settings.ENABLE_PROBE_CACHE)
+        logger.info(f"🔎 Probe cache: {probes.db_path or 'memory only'}")
+    except Exception as e:
+        logger.warning(f"⚠️ Probe cache unavailable: {e}")
+
+    # Build-once browser playback proxies (served with HTTP Range support)
+    try:
+        from sync_analyzer.core.proxy_store import configure_proxy_store
+        proxies = configure_proxy_store(cache_dir=settings.PROXY_CACHE_DIR, max_bytes=settings.PROXY_CACHE_MAX_BYTES)
+        logger.info(f"🎧 Proxy store: {proxies.cache_dir} (budget {proxies.max_bytes} bytes)")
+    except Exception as e:
+        logger.warning(f"⚠️ Proxy store unavailable: {e}")
+
+    # Landmark-hash catalog of masters (which master does this dub belong to?)
+    if settings.ENABLE_FINGERPRINT_CATALOG:
+        try:
+            from sync_analyzer.core.fingerprint_catalog import configure_fingerprint_catalog
+            catalog = configure_fingerprint_catalog(settings.FINGERPRINT_CATALOG_DIR)
+            logger.info(f"🧬 Fingerprint catalog: {catalog.catalog_dir} ({len(catalog.masters())} masters)")
+        except Exception as e:
+            logger.warning(f"⚠️ Fingerprint catalog unavailable: {e}")
+
+    # Incremental directory index of the mount (listing, search, pair discovery)
+    media_index = None
+    if settings.ENABLE_MEDIA_INDEX and os.path.isdir(settings.MOUNT_PATH):
+        try:
+            from sync_analyzer.core.media_index import configure_media_index
+            media_index = configure_media_index(
+                settings.MOUNT_PATH,
+                settings.MEDIA_INDEX_DB or os.path.join(os.path.expanduser("~"), ".cache", "sync_analyzer", "media_index.sqlite3"),
+                extensions=settings.ALLOWED_EXTENSIONS,
+                interval_seconds=settings.MEDIA_INDEX_INTERVAL_SECONDS,
+            )
+            logger.info(f"🗂️ Media index: {media_index.db_path} (rescan every {settings.MEDIA_INDEX_INTERVAL_SECONDS:.0f}s)")
+        except Exception as e:
+            logger.warning(f"⚠️ Media index unavailable: {e}")
     
     yield
     
     # Shutdown
     logger.info("🛑 Shutting down Professional Audio Sync Analyzer API...")
+    if media_index is not None:
+        media_index.stop()
 
 def create_application() -> FastAPI:
     """Create and configure the FastAPI application."""
@@ -87,7 +142,7 @@ def create_application() -> FastAPI:
         ### Quick Start
         1) Browse files: `GET /api/v1/files/?path=/mnt/data`
         2) Probe media: `GET /api/v1/files/probe?path=/abs/video_or_audio`
-        3) Stream proxy audio: `GET /api/v1/files/proxy-audio?path=/abs/media&format=wav`
+        3) Stream proxy audio: `GET /api/v1/files/proxy-audio?path=/abs/media&format=wav` (built once, seekable via HTTP Range)
         4) Analyze sync: `POST /api/v1/analysis/sync` with master/dub paths
         """,
         version="2.0.0",
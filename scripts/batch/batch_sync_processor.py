@@ -12,7 +12,7 @@ import json
 import subprocess
 import argparse
 from pathlib import Path
-from typing import List, Tuple, Dict
+from typing import List, Tuple, Dict, Optional
 from concurrent.futures import ProcessPoolExecutor, as_completed
 
 def get_gpu_count():
@@ -92,8 +92,20 @@ def process_file_pair(args_tuple):
             'error': str(e)
         }
 
-def find_file_pairs(directory: str, pattern_pairs: List[Tuple[str, str]]) -> List[Tuple[str, str]]:
-    """Find matching file pairs in directory"""
+def find_file_pairs(directory: str, pattern_pairs: List[Tuple[str, str]],
+                    index_db: Optional[str] = None) -> List[Tuple[str, str]]:
+    """Find matching file pairs in directory
+
+    With ``index_db`` the tree is kept in an incremental SQLite index, so repeat
+    runs only rescan directories that changed.
+    """
+    if index_db:
+        sys.path.append(os.path.join(os.path.dirname(__file__), '../..'))
+        from sync_analyzer.core.media_index import MediaIndex
+        index = MediaIndex(directory, index_db)
+        index.refresh()
+        return index.find_pairs(pattern_pairs, under=directory)
+
     pairs = []
     directory = Path(directory)
     
@@ -109,6 +121,26 @@ def find_file_pairs(directory: str, pattern_pairs: List[Tuple[str, str]]) -> Lis
                     
     return pairs
 
+def pair_with_catalog(dubs: List[str], catalog_dir: str,
+                      min_confidence: float = 0.3) -> List[Tuple[str, str]]:
+    """Pair each dub with the master the fingerprint catalog identifies for it
+
+    Dubs without a confident match are reported and left out.
+    """
+    sys.path.append(os.path.join(os.path.dirname(__file__), '../..'))
+    from sync_analyzer.core.fingerprint_catalog import FingerprintCatalog
+    catalog = FingerprintCatalog(catalog_dir)
+    pairs = []
+    for dub in dubs:
+        matches = catalog.identify(dub, top_k=1)
+        if matches and matches[0].confidence >= min_confidence:
+            print(f"🧬 {Path(dub).name} -> {Path(matches[0].path).name} "
+                  f"(offset {matches[0].offset_seconds:+.2f}s, confidence {matches[0].confidence:.2f})")
+            pairs.append((matches[0].path, dub))
+        else:
+            print(f"⚠️ No catalog master identified for {dub}")
+    return pairs
+
 def main():
     parser = argparse.ArgumentParser(
         description="Batch Multi-GPU Sync Processor",
@@ -121,6 +153,9 @@ Examples:
   # Auto-find pairs in directory  
   %(prog)s --directory /path/to/files --patterns "*Original*.mov:*v1.1*.mov" --output-dir results/
   
+  # Pair dubs with their masters through the fingerprint catalog
+  %(prog)s --dubs incoming/*.mov --catalog ~/.cache/sync_analyzer/catalog --output-dir results/
+
   # Use all 3 GPUs with custom settings
   %(prog)s --pairs file1.mov file2.mov file3.mov file4.mov --output-dir results/ --max-workers 3
         """
@@ -129,9 +164,14 @@ Examples:
     group = parser.add_mutually_exclusive_group(required=True)
     group.add_argument('--pairs', nargs='+', help='List of master/dub file pairs (master1 dub1 master2 dub2 ...)')
     group.add_argument('--directory', help='Directory to search for file pairs')
+    group.add_argument('--dubs', nargs='+', help='Dub files to pair with their masters via --catalog')
     
     parser.add_argument('--patterns', nargs='+', default=['*Original*:*v1.1*'], 
                        help='Pattern pairs for auto-discovery (master_pattern:dub_pattern)')
+    parser.add_argument('--index-db', help='SQLite index for --directory (incremental rescans on repeat runs)')
+    parser.add_argument('--catalog', help='Fingerprint catalog directory used to pair --dubs')
+    parser.add_argument('--min-confidence', type=float, default=0.3,
+                       help='Minimum catalog match confidence for --dubs (default: 0.3)')
     parser.add_argument('--output-dir', required=True, help='Output directory for results')
     parser.add_argument('--chunk-size', type=float, default=45.0, help='Chunk size in seconds')
     parser.add_argument('--max-workers', type=int, help='Max parallel processes (default: GPU count)')
@@ -145,10 +185,15 @@ Examples:
             print("Error: --pairs requires even number of arguments (master1 dub1 master2 dub2 ...)")
             sys.exit(1)
         file_pairs = [(args.pairs[i], args.pairs[i+1]) for i in range(0, len(args.pairs), 2)]
+    elif args.dubs:
+        if not args.catalog:
+            print("Error: --dubs requires --catalog")
+            sys.exit(1)
+        file_pairs = pair_with_catalog(args.dubs, args.catalog, args.min_confidence)
     else:
         # Auto-discover pairs
         pattern_pairs = [tuple(p.split(':')) for p in args.patterns]
-        file_pairs = find_file_pairs(args.directory, pattern_pairs)
+        file_pairs = find_file_pairs(args.directory, pattern_pairs, index_db=args.index_db)
         
     if not file_pairs:
         print("Error: No file pairs found")
@@ -10,8 +10,6 @@ Provides comprehensive SMPTE timecode support including:
 """
 
 import re
-import subprocess
-import json
 from typing import Optional, Tuple, Dict, Any
 from dataclasses import dataclass
 from pathlib import Path
@@ -77,23 +75,25 @@ class SMPTEUtils:
             Dictionary containing metadata including timecode, frame rate, duration
         """
         try:
-            # Use ffprobe to get detailed media information
-            cmd = [
-                "ffprobe",
-                "-v", "quiet",
-                "-print_format", "json", 
-                "-show_format",
-                "-show_streams",
-                "-show_chapters",
-                file_path
-            ]
-            
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
-            
-            if result.returncode != 0:
-                return {"error": f"ffprobe failed: {result.stderr}"}
-                
-            data = json.loads(result.stdout)
+            # Shared, cached ffprobe (-show_format -show_streams) per file version
+            from sync_analyzer.core.media_probe import ProbeError, get_media_probe
+            try:
+                data = get_media_probe().probe(file_path).data
+            except ProbeError as e:
+                return {"error": str(e)}
+            return SMPTEUtils.metadata_from_probe(file_path, data)
+
+        except Exception as e:
+            return {"error": f"Failed to extract metadata: {str(e)}"}
+
+    @staticmethod
+    def metadata_from_probe(file_path: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Build the metadata dictionary from ffprobe ``format``/``streams`` JSON.
+
+        Lets callers holding a cached probe skip running ffprobe again.
+        """
+        try:
             metadata = {
                 "file_path": file_path,
                 "file_name": Path(file_path).name
@@ -195,7 +195,8 @@ class SMPTEUtils:
             "audio_codec": audio_stream.get("codec_name", "unknown"),
             "sample_rate": int(audio_stream.get("sample_rate", 0)),
             "channels": int(audio_stream.get("channels", 0)),
-            "channel_layout": audio_stream.get("channel_layout", "unknown")
+            "channel_layout": audio_stream.get("channel_layout", "unknown"),
+            "bit_depth": int(audio_stream.get("bits_per_raw_sample") or audio_stream.get("bits_per_sample") or 0) or None
         }
     
     @staticmethod
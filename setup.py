@@ -46,6 +46,7 @@ setup(
     entry_points={
         "console_scripts": [
             "sync-analyzer=sync_analyzer.cli.sync_cli:main",
+            "sync-catalog=sync_analyzer.cli.catalog_cli:main",
             "sync-analyzer-web=web_ui.server:main",
         ],
     },
@@ -40,6 +40,10 @@ class EmbeddingConfig:
     sample_rate: int = 16000
     normalize_embeddings: bool = True
     use_gpu: bool = True
+    batch_size: Optional[int] = None  # windows per forward pass (None = sized to free memory)
+    frame_pooling: bool = False     # wav2vec2/YAMNet: one pass over long segments, windows pooled from frames
+    segment_seconds: float = 30.0   # frame pooling: segment length per forward pass
+    segment_context_seconds: float = 1.0  # frame pooling: extra audio on each side of a segment
 
 @dataclass
 class AISyncResult:
@@ -51,6 +55,100 @@ class AISyncResult:
     temporal_consistency: float
     method_details: Dict[str, Any]
 
+def select_device(use_gpu: bool) -> torch.device:
+    """Device an extractor runs on (GPUs are spread round-robin by process ID)."""
+    if use_gpu and torch.cuda.is_available():
+        gpu_count = torch.cuda.device_count()
+        gpu_id = (os.getpid() % gpu_count) if gpu_count > 1 else 0
+        return torch.device(f'cuda:{gpu_id}')
+    return torch.device('cpu')
+
+# Peak wav2vec2 (base) inference memory per second of input audio, mostly the
+# convolutional feature encoder's activations; used to size batches
+WAV2VEC2_BYTES_PER_SECOND = 24 * 1024 ** 2
+MAX_BATCH_SIZE = 64
+
+def available_memory_bytes(device: torch.device) -> Optional[int]:
+    """Free memory on ``device`` (None when it cannot be determined)."""
+    try:
+        if device.type == 'cuda':
+            free, _ = torch.cuda.mem_get_info(device)
+            return int(free)
+        return int(os.sysconf('SC_AVPHYS_PAGES') * os.sysconf('SC_PAGE_SIZE'))
+    except (AttributeError, ValueError, OSError, RuntimeError):
+        return None
+
+def adaptive_batch_size(window_seconds: float, device: torch.device, memory_fraction: float = 0.25,
+                        max_batch: int = MAX_BATCH_SIZE) -> int:
+    """Windows per forward pass that fit in ``memory_fraction`` of the free memory."""
+    available = available_memory_bytes(device)
+    if available is None:
+        return 8
+    per_window = max(1.0, window_seconds * WAV2VEC2_BYTES_PER_SECOND)
+    return int(max(1, min(max_batch, available * memory_fraction // per_window)))
+
+# wav2vec2 convolutional feature encoder: 400-sample receptive field, 320-sample (20 ms) stride at 16 kHz
+WAV2VEC2_FRAME_SAMPLES = 400
+WAV2VEC2_FRAME_HOP = 320
+
+# YAMNet frames its input into 0.96 s patches at a 0.48 s hop; a patch needs
+# 0.975 s of samples (patch plus one STFT window minus one STFT hop)
+YAMNET_PATCH_HOP = 7680
+YAMNET_PATCH_SAMPLES = 15600
+
+def pool_frames(frames: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """Mean of ``frames[start:end]`` for every (start, end) pair, via cumulative sums."""
+    cumulative = np.zeros((len(frames) + 1, frames.shape[1]), dtype=np.float64)
+    np.cumsum(frames, axis=0, out=cumulative[1:])
+    counts = np.maximum(ends - starts, 1)[:, None]
+    return ((cumulative[ends] - cumulative[starts]) / counts).astype(np.float32)
+
+# Spectral fallback: windows per batched STFT (~0.5 MB of spectrum per 2 s window at 16 kHz)
+SPECTRAL_BLOCK_WINDOWS = 64
+
+def _power_to_db_per_window(power: np.ndarray, amin: float = 1e-10, top_db: float = 80.0) -> np.ndarray:
+    """``librosa.power_to_db`` (ref 1.0) applied to each window of a (windows, bins, frames) stack."""
+    log_spec = 10.0 * np.log10(np.maximum(amin, power))
+    peak = log_spec.max(axis=(-2, -1), keepdims=True)
+    return np.maximum(log_spec, peak - top_db)
+
+def _spectral_window_features(windows: np.ndarray, sr: int, n_fft: int = 2048) -> np.ndarray:
+    """
+    Spectral fallback features (windows, 156) of a (windows, samples) stack.
+    
+    Matches computing ``librosa.feature.mfcc``, ``spectral_centroid``,
+    ``spectral_bandwidth``, ``spectral_rolloff``, ``chroma_stft`` and a 64-band
+    ``melspectrogram`` on each window separately, from one STFT.
+    """
+    magnitude = np.abs(librosa.stft(windows, n_fft=n_fft))
+    power = magnitude ** 2.0
+    
+    mel_db = _power_to_db_per_window(librosa.feature.melspectrogram(S=power, sr=sr, n_fft=n_fft))
+    mfccs = librosa.feature.mfcc(S=mel_db, n_mfcc=13)
+    centroid = librosa.feature.spectral_centroid(S=magnitude, sr=sr, n_fft=n_fft)
+    bandwidth = librosa.feature.spectral_bandwidth(S=magnitude, sr=sr, n_fft=n_fft, centroid=centroid)
+    rolloff = librosa.feature.spectral_rolloff(S=magnitude, sr=sr, n_fft=n_fft)
+    
+    # Chroma tuning is estimated per window; windows sharing a tuning share a filter bank
+    tunings = np.array([librosa.estimate_tuning(S=p, sr=sr, n_fft=n_fft, bins_per_octave=12) for p in power])
+    chroma = np.empty((len(windows), 12, power.shape[-1]), dtype=power.dtype)
+    for tuning in np.unique(tunings):
+        group = tunings == tuning
+        chroma_fb = librosa.filters.chroma(sr=sr, n_fft=n_fft, tuning=tuning, n_chroma=12)
+        raw = np.einsum("cf,...ft->...ct", chroma_fb, power[group], optimize=True)
+        chroma[group] = librosa.util.normalize(raw, norm=np.inf, axis=-2)
+    
+    mel64_db = _power_to_db_per_window(librosa.feature.melspectrogram(S=power, sr=sr, n_fft=n_fft, n_mels=64))
+    return np.concatenate([
+        mfccs.mean(axis=-1),
+        centroid.mean(axis=(-2, -1))[:, None],
+        bandwidth.mean(axis=(-2, -1))[:, None],
+        rolloff.mean(axis=(-2, -1))[:, None],
+        chroma.mean(axis=-1),
+        mel64_db.mean(axis=-1),
+        mel64_db.std(axis=-1),
+    ], axis=1)
+
 class AudioEmbeddingExtractor:
     """
     Extracts deep learning embeddings from audio using pretrained models.
@@ -66,15 +164,9 @@ class AudioEmbeddingExtractor:
         self.config = config
         
         # Multi-GPU support: distribute load across available GPUs
-        if config.use_gpu and torch.cuda.is_available():
-            gpu_count = torch.cuda.device_count()
-            # Use round-robin GPU selection based on process ID or thread ID
-            import os
-            gpu_id = (os.getpid() % gpu_count) if gpu_count > 1 else 0
-            self.device = torch.device(f'cuda:{gpu_id}')
-            logger.info(f"Using GPU {gpu_id} of {gpu_count} available GPUs")
-        else:
-            self.device = torch.device('cpu')
+        self.device = select_device(config.use_gpu)
+        if self.device.type == 'cuda':
+            logger.info(f"Using {self.device} of {torch.cuda.device_count()} available GPUs")
         
         # Initialize model based on configuration
         self.model_type = "unknown"
@@ -228,41 +320,128 @@ class AudioEmbeddingExtractor:
             audio = librosa.resample(audio, orig_sr=sr, target_sr=16000)
             sr = 16000
         
+        if self.config.frame_pooling:
+            return self._extract_wav2vec2_pooled_embeddings(audio, sr, progress_callback)
+        
         # Split into windows
         window_samples = int(self.config.window_size * sr)
         hop_samples = int(self.config.hop_size * sr)
         
         # Calculate total windows for progress tracking
-        total_windows = len(range(0, len(audio) - window_samples + 1, hop_samples))
+        window_positions = list(range(0, len(audio) - window_samples + 1, hop_samples))
+        total_windows = len(window_positions)
+        
+        # Equal-length windows are stacked into one (B, T) batch per forward pass;
+        # no padding is involved, so each window's embedding is unchanged
+        batch_size = self.config.batch_size or adaptive_batch_size(self.config.window_size, self.device)
         
         embeddings = []
         
-        for i, start in enumerate(range(0, len(audio) - window_samples + 1, hop_samples)):
-            window = audio[start:start + window_samples]
+        for batch_start in range(0, total_windows, batch_size):
+            batch_positions = window_positions[batch_start:batch_start + batch_size]
+            windows = [audio[start:start + window_samples] for start in batch_positions]
             
             # Process with Wav2Vec2
             with torch.no_grad():
                 inputs = self.processor(
-                    window, 
+                    windows, 
                     sampling_rate=sr, 
                     return_tensors="pt"
                 ).input_values.to(self.device)
                 
                 outputs = self.model(inputs)
                 # Use last hidden state, average over time
-                embedding = outputs.last_hidden_state.mean(dim=1).cpu().numpy()
-                embeddings.append(embedding.flatten())
+                embeddings.extend(outputs.last_hidden_state.mean(dim=1).cpu().numpy())
+            
+            for i in range(batch_start, batch_start + len(batch_positions)):
+                # Report progress
+                if progress_callback:
+                    progress_percent = (i + 1) / total_windows * 100
+                    progress_callback(progress_percent, f"Processing window {i+1}/{total_windows}")
+                
+                # For console logging
+                if (i + 1) % 10 == 0 or (i + 1) == total_windows:
+                    logger.info(f"Processed {i+1}/{total_windows} audio windows ({(i+1)/total_windows*100:.1f}%)")
+        
+        embeddings = np.array(embeddings)
+        
+        if self.config.normalize_embeddings:
+            embeddings = embeddings / (np.linalg.norm(embeddings, axis=1, keepdims=True) + 1e-8)
+        
+        return embeddings
+    
+    def _extract_wav2vec2_pooled_embeddings(self, audio: np.ndarray, sr: int, progress_callback=None) -> np.ndarray:
+        """
+        Wav2Vec2 window embeddings pooled from one frame-level pass.
+        
+        Overlapping windows send every sample through the model
+        ``window_size / hop_size`` times. Here the model runs once over long
+        segments (with ``segment_context_seconds`` of extra audio on each side
+        so edge frames see the same context as interior ones), and each window
+        embedding is the mean of the 20 ms frames that a window-by-window pass
+        would have produced for it. Windows are pooled as soon as the segment
+        holding their last frame is done; only frames still needed by later
+        windows are carried, so memory does not grow with the file length.
+        
+        Embeddings differ slightly from the windowed path: input normalization
+        is per segment rather than per window, and self-attention sees the whole
+        segment (plus context) instead of one window, which changes the frames.
+        """
+        window_samples = int(self.config.window_size * sr)
+        hop_samples = int(self.config.hop_size * sr)
+        window_positions = np.arange(0, len(audio) - window_samples + 1, hop_samples)
+        if len(window_positions) == 0:
+            return np.array([])
+        
+        # Frames a window-by-window pass produces for each window
+        frames_per_window = (window_samples - WAV2VEC2_FRAME_SAMPLES) // WAV2VEC2_FRAME_HOP + 1
+        first_frame = window_positions // WAV2VEC2_FRAME_HOP
+        total_frames = int(first_frame[-1]) + frames_per_window
+        if np.any(window_positions % WAV2VEC2_FRAME_HOP):
+            logger.warning("Window hop is not a multiple of the wav2vec2 frame stride; pooled windows are approximate")
+        
+        # Segment bounds and context are whole frames, so frame k of a segment
+        # input starting at sample a is global frame a / 320 + k
+        segment_frames = max(1, int(self.config.segment_seconds * sr) // WAV2VEC2_FRAME_HOP)
+        context_frames = int(self.config.segment_context_seconds * sr) // WAV2VEC2_FRAME_HOP
+        segment_starts = list(range(0, total_frames, segment_frames))
+        window_ends = first_frame + frames_per_window
+        pooled = []
+        next_window = 0
+        pending, pending_start = None, 0  # frames from pending_start still needed by unpooled windows
+        
+        for j, seg_start in enumerate(segment_starts):
+            seg_end = min(seg_start + segment_frames, total_frames)
+            input_start = max(0, seg_start - context_frames)
+            input_end = min(len(audio), (seg_end + context_frames) * WAV2VEC2_FRAME_HOP + WAV2VEC2_FRAME_SAMPLES)
+            
+            with torch.no_grad():
+                inputs = self.processor(
+                    audio[input_start * WAV2VEC2_FRAME_HOP:input_end],
+                    sampling_rate=sr,
+                    return_tensors="pt"
+                ).input_values.to(self.device)
+                hidden = self.model(inputs).last_hidden_state[0].cpu().numpy()
+            
+            segment = hidden[seg_start - input_start:seg_end - input_start]
+            pending = segment if pending is None else np.concatenate((pending, segment))
+            
+            # Pool every window whose frames are now complete, then drop frames no later window reads
+            done = int(np.searchsorted(window_ends, seg_end, side="right"))
+            if done > next_window:
+                starts = first_frame[next_window:done] - pending_start
+                pooled.append(pool_frames(pending, starts, starts + frames_per_window))
+                next_window = done
+            keep_from = int(first_frame[next_window]) if next_window < len(first_frame) else seg_end
+            pending, pending_start = pending[keep_from - pending_start:], keep_from
             
             # Report progress
             if progress_callback:
-                progress_percent = (i + 1) / total_windows * 100
-                progress_callback(progress_percent, f"Processing window {i+1}/{total_windows}")
-            
-            # For console logging
-            if (i + 1) % 10 == 0 or (i + 1) == total_windows:
-                logger.info(f"Processed {i+1}/{total_windows} audio windows ({(i+1)/total_windows*100:.1f}%)")
+                progress_percent = (j + 1) / len(segment_starts) * 100
+                progress_callback(progress_percent, f"Processing segment {j+1}/{len(segment_starts)}")
+            logger.info(f"Processed {j+1}/{len(segment_starts)} audio segments ({(j+1)/len(segment_starts)*100:.1f}%)")
         
-        embeddings = np.array(embeddings)
+        embeddings = np.concatenate(pooled)
         
         if self.config.normalize_embeddings:
             embeddings = embeddings / (np.linalg.norm(embeddings, axis=1, keepdims=True) + 1e-8)
@@ -271,13 +450,16 @@ class AudioEmbeddingExtractor:
     
     def _extract_yamnet_embeddings(self, audio: np.ndarray, sr: int, progress_callback=None) -> np.ndarray:
         """Extract embeddings using YAMNet."""
-        import tensorflow as tf
-        
         # Resample if needed
         if sr != 16000:
             audio = librosa.resample(audio, orig_sr=sr, target_sr=16000)
             sr = 16000
         
+        if self.config.frame_pooling:
+            return self._extract_yamnet_pooled_embeddings(audio, sr, progress_callback)
+        
+        import tensorflow as tf
+        
         # Split into windows
         window_samples = int(self.config.window_size * sr)
         hop_samples = int(self.config.hop_size * sr)
@@ -315,8 +497,72 @@ class AudioEmbeddingExtractor:
         
         return embeddings
     
+    def _run_yamnet(self, waveform: np.ndarray) -> np.ndarray:
+        """Per-patch YAMNet embeddings (n_patches, 1024) of a 16 kHz waveform."""
+        import tensorflow as tf
+        
+        scores, embedding, spectrogram = self.model(tf.constant(waveform.astype(np.float32)))
+        return embedding.numpy()
+    
+    def _extract_yamnet_pooled_embeddings(self, audio: np.ndarray, sr: int, progress_callback=None) -> np.ndarray:
+        """
+        YAMNet window embeddings pooled from whole-block inference.
+        
+        Blocks of ``segment_seconds`` go to YAMNet in one call each, instead of
+        one graph invocation per overlapping window. Blocks start on the 0.48 s
+        patch grid and are cut to whole patches, so block edges need no
+        padding. Each window embedding is the mean of the patches centred
+        inside it; the patch grid does not follow the window hop, so this is
+        close to, not identical with, the per-window path.
+        """
+        window_samples = int(self.config.window_size * sr)
+        hop_samples = int(self.config.hop_size * sr)
+        window_positions = np.arange(0, len(audio) - window_samples + 1, hop_samples)
+        total_patches = (len(audio) - YAMNET_PATCH_SAMPLES) // YAMNET_PATCH_HOP + 1
+        if len(window_positions) == 0 or total_patches < 1:
+            return np.array([])
+        
+        block_patches = max(1, int(self.config.segment_seconds * sr) // YAMNET_PATCH_HOP)
+        block_starts = list(range(0, total_patches, block_patches))
+        frames = None
+        
+        for j, first in enumerate(block_starts):
+            last = min(first + block_patches, total_patches)
+            start = first * YAMNET_PATCH_HOP
+            patches = self._run_yamnet(audio[start:(last - 1) * YAMNET_PATCH_HOP + YAMNET_PATCH_SAMPLES])
+            if frames is None:
+                frames = np.zeros((total_patches, patches.shape[1]), dtype=np.float32)
+            frames[first:last] = patches[:last - first]
+            
+            # Report progress
+            if progress_callback:
+                progress_percent = (j + 1) / len(block_starts) * 100
+                progress_callback(progress_percent, f"Processing YAMNet block {j+1}/{len(block_starts)}")
+            logger.info(f"Processed {j+1}/{len(block_starts)} YAMNet blocks ({(j+1)/len(block_starts)*100:.1f}%)")
+        
+        # Patches whose centre lies inside each window (at least one)
+        centres = np.arange(total_patches) * YAMNET_PATCH_HOP + YAMNET_PATCH_SAMPLES // 2
+        starts = np.minimum(np.searchsorted(centres, window_positions), total_patches - 1)
+        ends = np.maximum(np.searchsorted(centres, window_positions + window_samples), starts + 1)
+        embeddings = pool_frames(frames, starts, ends)
+        
+        if self.config.normalize_embeddings:
+            embeddings = embeddings / (np.linalg.norm(embeddings, axis=1, keepdims=True) + 1e-8)
+        
+        return embeddings
+    
     def _extract_spectral_embeddings(self, audio: np.ndarray, sr: int, progress_callback=None) -> np.ndarray:
-        """Extract spectral-based embeddings as fallback."""
+        """
+        Extract spectral-based embeddings as fallback.
+        
+        Each window is described by MFCC, centroid, bandwidth, rolloff and
+        chroma means plus 64-band log-mel means and deviations, exactly as
+        librosa computes them on the window alone (so frame grids and edge
+        padding are per window). Instead of six STFTs per window and one
+        librosa call per feature and window, a block of windows shares one
+        batched STFT, and every feature is derived from it with vectorized
+        operations across the block.
+        """
         # Split into windows
         window_samples = int(self.config.window_size * sr)
         hop_samples = int(self.config.hop_size * sr)
@@ -326,56 +572,22 @@ class AudioEmbeddingExtractor:
         total_windows = len(window_positions)
         
         embeddings = []
+        if total_windows:
+            windows = np.lib.stride_tricks.sliding_window_view(audio, window_samples)[::hop_samples]
         
-        for i, start in enumerate(window_positions):
-            window = audio[start:start + window_samples]
-            
-            # Extract comprehensive spectral features
-            features = []
-            
-            # MFCC features
-            mfccs = librosa.feature.mfcc(y=window, sr=sr, n_mfcc=13)
-            features.append(np.mean(mfccs, axis=1))
-            
-            # Spectral features
-            spectral_centroid = librosa.feature.spectral_centroid(y=window, sr=sr)
-            spectral_bandwidth = librosa.feature.spectral_bandwidth(y=window, sr=sr)
-            spectral_rolloff = librosa.feature.spectral_rolloff(y=window, sr=sr)
-            
-            features.extend([
-                np.mean(spectral_centroid),
-                np.mean(spectral_bandwidth),
-                np.mean(spectral_rolloff)
-            ])
+        for block_start in range(0, total_windows, SPECTRAL_BLOCK_WINDOWS):
+            block = np.ascontiguousarray(windows[block_start:block_start + SPECTRAL_BLOCK_WINDOWS])
+            embeddings.extend(_spectral_window_features(block, sr))
             
-            # Chroma features
-            chroma = librosa.feature.chroma_stft(y=window, sr=sr)
-            features.append(np.mean(chroma, axis=1))
-            
-            # Mel spectrogram statistics
-            mel_spec = librosa.feature.melspectrogram(y=window, sr=sr, n_mels=64)
-            mel_spec_db = librosa.power_to_db(mel_spec)
-            features.extend([
-                np.mean(mel_spec_db, axis=1),
-                np.std(mel_spec_db, axis=1)
-            ])
-            
-            # Combine all features
-            embedding = np.concatenate([
-                f.flatten() if hasattr(f, 'flatten') else [f] 
-                for f in features
-            ])
-            
-            embeddings.append(embedding)
-            
-            # Report progress
-            if progress_callback:
-                progress_percent = (i + 1) / total_windows * 100
-                progress_callback(progress_percent, f"Processing spectral window {i+1}/{total_windows}")
-            
-            # For console logging
-            if (i + 1) % 10 == 0 or (i + 1) == total_windows:
-                logger.info(f"Processed {i+1}/{total_windows} spectral windows ({(i+1)/total_windows*100:.1f}%)")
+            for i in range(block_start, block_start + len(block)):
+                # Report progress
+                if progress_callback:
+                    progress_percent = (i + 1) / total_windows * 100
+                    progress_callback(progress_percent, f"Processing spectral window {i+1}/{total_windows}")
+                
+                # For console logging
+                if (i + 1) % 10 == 0 or (i + 1) == total_windows:
+                    logger.info(f"Processed {i+1}/{total_windows} spectral windows ({(i+1)/total_windows*100:.1f}%)")
         
         embeddings = np.array(embeddings)
         
@@ -397,15 +609,18 @@ class AISyncDetector:
     AI-powered sync detector using deep learning embeddings.
     """
     
-    def __init__(self, config: Optional[EmbeddingConfig] = None):
+    def __init__(self, config: Optional[EmbeddingConfig] = None,
+                 embedding_extractor: Optional[AudioEmbeddingExtractor] = None):
         """
         Initialize AI sync detector.
         
         Args:
             config: Configuration for embedding extraction
+            embedding_extractor: Already loaded extractor to use (e.g. from the
+                model pool); a new one is loaded when omitted
         """
         self.config = config or EmbeddingConfig()
-        self.embedding_extractor = AudioEmbeddingExtractor(self.config)
+        self.embedding_extractor = embedding_extractor or AudioEmbeddingExtractor(self.config)
         
         logger.info("AISyncDetector initialized")
     
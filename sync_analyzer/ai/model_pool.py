@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Process-wide pool of loaded embedding models.
+
+Loading Wav2Vec2 (``from_pretrained``) or YAMNet (``hub.load``) takes
+seconds and hundreds of MB, and the API used to pay that on every AI
+request. ``EmbeddingModelPool`` keeps one ``AudioEmbeddingExtractor`` per
+(model name, device), loaded once and warmed with a dummy forward pass
+(first-call kernel selection and allocator growth happen at load time, not
+in a request). Requests borrow an extractor through ``acquire``, which holds
+its lock for the duration, so one model serves one inference at a time.
+Models not in use are evicted least recently used first when their
+parameter memory exceeds the budget.
+
+Configuration (environment, read by ``get_model_pool``):
+    SYNC_MODEL_POOL_MAX_BYTES  parameter memory budget (default 4 GiB)
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field, replace
+from typing import Callable, Dict, Iterator, Optional, Tuple
+
+import numpy as np
+
+try:
+    from .embedding_sync_detector import AudioEmbeddingExtractor, EmbeddingConfig, select_device
+except ImportError:  # pragma: no cover - fallback for direct execution
+    from embedding_sync_detector import AudioEmbeddingExtractor, EmbeddingConfig, select_device
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BYTES = 4 * 1024 ** 3
+YAMNET_BYTES = 16 * 1024 ** 2   # SavedModel weights are not introspected; roughly 3.7M float32 parameters
+
+
+def model_bytes(extractor) -> int:
+    """Parameter and buffer memory of an extractor's model (0 for spectral)."""
+    model = getattr(extractor, "model", None)
+    if model is None or getattr(extractor, "model_type", None) == "spectral":
+        return 0
+    if hasattr(model, "parameters"):
+        tensors = list(model.parameters()) + list(model.buffers())
+        return int(sum(t.numel() * t.element_size() for t in tensors))
+    return YAMNET_BYTES
+
+
+@dataclass
+class _Entry:
+    extractor: object
+    size_bytes: int
+    lock: threading.Lock = field(default_factory=threading.Lock)
+    last_used: float = field(default_factory=time.monotonic)
+    users: int = 0
+
+
+class EmbeddingModelPool:
+    """
+    Loaded embedding models shared across requests.
+
+    Usage:
+        pool = get_model_pool()
+        with pool.acquire(EmbeddingConfig(model_name="wav2vec2")) as extractor:
+            embeddings = extractor.extract_embeddings(audio, 16000)
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES,
+                 factory: Callable[[EmbeddingConfig], object] = AudioEmbeddingExtractor,
+                 warmup: bool = True):
+        self.max_bytes = int(max_bytes)
+        self.factory = factory
+        self.warmup = warmup
+        self._entries: Dict[Tuple[str, str], _Entry] = {}
+        self._loading: Dict[Tuple[str, str], threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(config: EmbeddingConfig) -> Tuple[str, str]:
+        return config.model_name, str(select_device(config.use_gpu))
+
+    def _warm(self, extractor, config: EmbeddingConfig) -> None:
+        started = time.perf_counter()
+        silence = np.zeros(int(config.window_size * config.sample_rate), dtype=np.float32)
+        try:
+            extractor.extract_embeddings(silence, config.sample_rate)
+        except Exception as e:
+            logger.warning(f"Warm-up of {config.model_name} failed: {e}")
+            return
+        logger.info(f"Warmed {config.model_name} ({getattr(extractor, 'model_type', '?')}) "
+                    f"in {time.perf_counter() - started:.2f}s")
+
+    def _entry(self, config: EmbeddingConfig) -> _Entry:
+        key = self.key(config)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.users += 1
+                return entry
+            load_lock = self._loading.setdefault(key, threading.Lock())
+        # One load per key; concurrent first requests wait for it
+        with load_lock:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    entry.users += 1
+                    return entry
+            started = time.perf_counter()
+            extractor = self.factory(config)
+            if self.warmup:
+                self._warm(extractor, config)
+            entry = _Entry(extractor=extractor, size_bytes=model_bytes(extractor), users=1)
+            logger.info(f"Model pool: loaded {key[0]} on {key[1]} ({entry.size_bytes / 1024 ** 2:.0f} MB) "
+                        f"in {time.perf_counter() - started:.2f}s")
+            with self._lock:
+                self._entries[key] = entry
+                self._loading.pop(key, None)
+        self.evict()
+        return entry
+
+    @contextmanager
+    def acquire(self, config: EmbeddingConfig) -> Iterator[object]:
+        """Exclusive use of the loaded extractor for ``config``'s model and device."""
+        entry = self._entry(config)
+        try:
+            with entry.lock:
+                # Window/hop settings are per request; the loaded model is shared
+                entry.extractor.config = replace(config)
+                yield entry.extractor
+        finally:
+            with self._lock:
+                entry.users -= 1
+                entry.last_used = time.monotonic()
+
+    def preload(self, config: EmbeddingConfig) -> None:
+        """Load and warm ``config``'s model ahead of the first request."""
+        with self.acquire(config):
+            pass
+
+    def size_bytes(self) -> int:
+        with self._lock:
+            return sum(e.size_bytes for e in self._entries.values())
+
+    def loaded(self) -> Dict[Tuple[str, str], int]:
+        with self._lock:
+            return {key: e.size_bytes for key, e in self._entries.items()}
+
+    def evict(self) -> None:
+        """Drop idle models, least recently used first, until within the budget."""
+        evicted = []
+        with self._lock:
+            total = sum(e.size_bytes for e in self._entries.values())
+            for key, entry in sorted(self._entries.items(), key=lambda item: item[1].last_used):
+                if total <= self.max_bytes:
+                    break
+                if entry.users > 0:
+                    continue
+                del self._entries[key]
+                total -= entry.size_bytes
+                evicted.append(key)
+        for name, device in evicted:
+            logger.info(f"Model pool: evicted {name} on {device}")
+            if device.startswith("cuda"):
+                try:
+                    import torch
+                    torch.cuda.empty_cache()
+                except Exception:
+                    pass
+
+
+_default_pool: Optional[EmbeddingModelPool] = None
+_default_lock = threading.Lock()
+
+
+def configure_model_pool(max_bytes: Optional[int] = None) -> EmbeddingModelPool:
+    """Set the process-wide model pool (e.g. from application settings)."""
+    global _default_pool
+    _default_pool = EmbeddingModelPool(max_bytes=max_bytes if max_bytes is not None else DEFAULT_MAX_BYTES)
+    return _default_pool
+
+
+def get_model_pool() -> EmbeddingModelPool:
+    """Process-wide model pool, configured from the environment on first use."""
+    with _default_lock:
+        if _default_pool is None:
+            env = os.environ.get("SYNC_MODEL_POOL_MAX_BYTES")
+            configure_model_pool(int(env) if env else None)
+        return _default_pool
@@ -2,7 +2,9 @@ from pathlib import Path
 from typing import List, Optional, Tuple
 
 from .core.audio_sync_detector import ProfessionalSyncDetector
+from .core.media_ingest import AI_RENDITION, ingest_media, renditions_for_methods
 from .ai.embedding_sync_detector import AISyncDetector, EmbeddingConfig
+from .ai.model_pool import get_model_pool
 
 
 def analyze(
@@ -12,6 +14,7 @@ def analyze(
     enable_ai: bool = False,
     ai_model: str = "wav2vec2",
     use_gpu: bool = False,
+    include_proxy: bool = False,
 ) -> Tuple[object, dict, Optional[object]]:
     """Run sync analysis and return consensus result.
 
@@ -28,6 +31,8 @@ def analyze(
         Name of the AI model to use when ``enable_ai`` is True.
     use_gpu:
         Enable GPU acceleration when available.
+    include_proxy:
+        Also produce the 48 kHz stereo browser proxy rendition during ingest.
 
     Returns
     -------
@@ -41,6 +46,15 @@ def analyze(
         methods = ["mfcc", "onset", "spectral"]
 
     detector = ProfessionalSyncDetector(use_gpu=use_gpu)
+
+    # Decode each source once into every rendition this run needs; the
+    # loaders below then read them from the PCM cache.
+    renditions = renditions_for_methods(methods + (["ai"] if enable_ai else []),
+                                        sample_rate=detector.sample_rate,
+                                        include_proxy=include_proxy)
+    for path in (master, dub):
+        ingest_media(str(path), renditions)
+
     sync_results = detector.analyze_sync(master, dub, methods)
     consensus = detector.get_consensus_result(sync_results)
 
@@ -51,9 +65,13 @@ def analyze(
             sample_rate=16000,
             use_gpu=use_gpu,
         )
-        ai_detector = AISyncDetector(config)
-        master_audio, _ = detector.load_and_preprocess_audio(master)
-        dub_audio, _ = detector.load_and_preprocess_audio(dub)
-        ai_result = ai_detector.detect_sync(master_audio, dub_audio, 16000)
+        # Embeddings run at 16 kHz; load that rendition directly
+        ai_loader = ProfessionalSyncDetector(sample_rate=AI_RENDITION.sample_rate, use_gpu=use_gpu)
+        master_audio, _ = ai_loader.load_and_preprocess_audio(master)
+        dub_audio, _ = ai_loader.load_and_preprocess_audio(dub)
+        # Repeated calls (batch runs) reuse the loaded model
+        with get_model_pool().acquire(config) as extractor:
+            ai_detector = AISyncDetector(config, embedding_extractor=extractor)
+            ai_result = ai_detector.detect_sync(master_audio, dub_audio, AI_RENDITION.sample_rate)
 
     return consensus, sync_results, ai_result
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Fingerprint Catalog CLI
+=======================
+
+Index master files by their landmark fingerprints and identify which master
+an unknown dub belongs to, with the offset the match implies.
+
+Examples:
+  sync-catalog add /mnt/data/masters/*.mov
+  sync-catalog identify /mnt/data/incoming/final_v3.mov --top 3
+  sync-catalog list
+"""
+
+import argparse
+import json
+import logging
+import sys
+from pathlib import Path
+
+try:
+    from ..core.fingerprint_catalog import DEFAULT_QUERY_SECONDS, FingerprintCatalog, get_fingerprint_catalog
+except ImportError:  # pragma: no cover - fallback for direct execution
+    sys.path.append(str(Path(__file__).parent.parent))
+    from core.fingerprint_catalog import DEFAULT_QUERY_SECONDS, FingerprintCatalog, get_fingerprint_catalog
+
+
+def parse_arguments(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Fingerprint catalog: identify which master a dub belongs to")
+    parser.add_argument("--catalog", help="Catalog directory (default: $SYNC_FINGERPRINT_CATALOG_DIR "
+                                          "or ~/.cache/sync_analyzer/catalog)")
+    parser.add_argument("--json", action="store_true", help="Print JSON instead of text")
+    parser.add_argument("--verbose", "-v", action="store_true", help="Verbose logging")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    add = sub.add_parser("add", help="Index master files")
+    add.add_argument("paths", nargs="+", type=Path)
+    add.add_argument("--compact", action="store_true", help="Merge index segments afterwards")
+
+    identify = sub.add_parser("identify", help="Find the masters a dub belongs to")
+    identify.add_argument("path", type=Path)
+    identify.add_argument("--top", type=int, default=5, help="Number of candidates (default: 5)")
+    identify.add_argument("--query-seconds", type=float, default=DEFAULT_QUERY_SECONDS,
+                          help=f"Dub audio fingerprinted (default: {DEFAULT_QUERY_SECONDS:.0f}; 0 = all)")
+
+    sub.add_parser("list", help="List indexed masters")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_arguments(argv)
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING,
+                        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s", datefmt="%H:%M:%S")
+    catalog = FingerprintCatalog(args.catalog) if args.catalog else get_fingerprint_catalog()
+
+    if args.command == "add":
+        status = 0
+        for path in args.paths:
+            try:
+                master_id = catalog.add(str(path))
+                print(f"{'skipped' if master_id is None else 'indexed'}  {path}")
+            except Exception as e:
+                print(f"failed   {path}: {e}", file=sys.stderr)
+                status = 1
+        if args.compact:
+            catalog.compact()
+        return status
+
+    if args.command == "identify":
+        if not args.path.is_file():
+            print(f"File not found: {args.path}", file=sys.stderr)
+            return 1
+        matches = catalog.identify(str(args.path), top_k=args.top, query_seconds=args.query_seconds or None)
+        if args.json:
+            print(json.dumps([m.to_dict() for m in matches], indent=2))
+        elif not matches:
+            print("No matching master in the catalog")
+        else:
+            for rank, m in enumerate(matches, 1):
+                print(f"{rank}. {m.path}\n   offset {m.offset_seconds:+.3f}s  votes {m.votes}  "
+                      f"confidence {m.confidence:.2f}")
+        return 0
+
+    masters = catalog.masters()
+    if args.json:
+        print(json.dumps(masters, indent=2))
+    else:
+        for m in masters:
+            print(f"{m['master_id']:5d}  {m['duration']:8.1f}s  {m['hash_count']:8d} hashes  {m['path']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
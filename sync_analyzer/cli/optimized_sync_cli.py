@@ -140,6 +140,7 @@ def main():
 Examples:
   %(prog)s master.mov dub.mov
   %(prog)s master.mov dub.mov --gpu --chunk-size 20 --max-chunks 8
+  %(prog)s master.mov dub.mov --max-chunks 0 --workers 8
   %(prog)s master.mov dub.mov --output-dir ./large_file_reports --verbose
   %(prog)s master.mov dub.mov --auto-repair --repair-threshold 100
   %(prog)s master.mov dub.mov --auto-repair --create-package --repair-output repaired.mov
@@ -157,6 +158,12 @@ Examples:
                        help='Size of analysis chunks in seconds (default: 30.0)')
     parser.add_argument('--max-chunks', type=int, default=10,
                        help='Maximum number of chunks to analyze (default: 10)')
+    parser.add_argument('--workers', type=int, default=1,
+                       help='Number of worker processes for chunk analysis (default: 1; serial on CUDA GPUs)')
+    parser.add_argument('--stream-decode', action='store_true',
+                       help='Start pass 1 while ffmpeg is still decoding (pipe decode, no temp WAV)')
+    parser.add_argument('--sparse-decode', action='store_true',
+                       help='Decode only the windows selected by --max-chunks (seek-based quick QC)')
     
     # Output options
     parser.add_argument('--output-dir', type=str, default='./optimized_sync_reports',
@@ -209,6 +216,9 @@ Examples:
         print(f"   GPU Acceleration: {'Enabled' if args.gpu else 'Disabled'}")
         print(f"   Chunk Size: {args.chunk_size}s")
         print(f"   Max Chunks: {args.max_chunks}")
+        print(f"   Workers: {args.workers}")
+        print(f"   Streaming Decode: {'Enabled' if args.stream_decode else 'Disabled'}")
+        print(f"   Sparse Decode: {'Enabled' if args.sparse_decode else 'Disabled'}")
         print(f"   Output Directory: {args.output_dir}")
         print()
     
@@ -220,7 +230,10 @@ Examples:
         detector = OptimizedLargeFileDetector(
             gpu_enabled=args.gpu,
             chunk_size=args.chunk_size,
-            max_chunks=args.max_chunks
+            max_chunks=args.max_chunks,
+            workers=args.workers,
+            stream_decode=args.stream_decode,
+            sparse_decode=args.sparse_decode
         )
         
         # Run analysis
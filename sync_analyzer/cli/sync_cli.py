@@ -21,10 +21,12 @@ from typing import Optional, List
 try:
     from ..analysis import analyze
     from ..core.audio_channels import probe_audio_layout  # used in repair
+    from ..core.media_probe import get_media_probe
 except ImportError:  # pragma: no cover - fallback for direct execution
     sys.path.append(str(Path(__file__).parent.parent))
     from analysis import analyze
     from core.audio_channels import probe_audio_layout  # used in repair
+    from core.media_probe import get_media_probe
 
 
 def setup_logging(verbose: bool = False):
@@ -59,7 +61,7 @@ Examples:
     parser.add_argument(
         "--methods",
         nargs="+",
-        choices=["mfcc", "onset", "spectral", "all"],
+        choices=["mfcc", "onset", "spectral", "fingerprint", "all"],
         default=["all"],
         help="Sync detection methods to use (default: all)",
     )
@@ -213,29 +215,8 @@ def _repair_per_channel(
 
     layout = probe_audio_layout(str(dub_input))
 
-    # Probe original duration (format duration)
-    def _probe_duration_seconds(p: Path) -> float:
-        import subprocess, json as _json
-
-        cmd = [
-            "ffprobe",
-            "-v",
-            "quiet",
-            "-print_format",
-            "json",
-            "-show_format",
-            str(p),
-        ]
-        pr = subprocess.run(cmd, capture_output=True, text=True)
-        if pr.returncode == 0:
-            try:
-                data = _json.loads(pr.stdout)
-                return float(data.get("format", {}).get("duration") or 0.0)
-            except Exception:
-                return 0.0
-        return 0.0
-
-    orig_dur = _probe_duration_seconds(dub_input)
+    # Original duration (format duration; shares the probe used for the layout)
+    orig_dur = get_media_probe().duration(str(dub_input))
     audio_streams = [s for s in layout.get("streams", [])]
     if not audio_streams:
         raise RuntimeError("No audio streams found in dub input")
@@ -5,14 +5,22 @@ Channel probing and stem extraction utilities for multi-channel analysis.
 
 from __future__ import annotations
 
-import json
 import os
 import shutil
 import subprocess
 import tempfile
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Sequence, Tuple
+
+try:
+    from .media_probe import get_media_probe
+    from .pcm_cache import PCMCache
+except ImportError:  # pragma: no cover - fallback for direct execution
+    from media_probe import get_media_probe
+    from pcm_cache import PCMCache
+
+STEM_SAMPLE_RATE = 48000
 
 
 @dataclass
@@ -24,23 +32,6 @@ class ChannelSpec:
     role: Optional[str] = None  # e.g., FL, FR, FC, LFE, SL, SR, DL, DR
 
 
-def _run_ffprobe_json(path: str) -> dict:
-    cmd = [
-        "ffprobe",
-        "-v",
-        "quiet",
-        "-print_format",
-        "json",
-        "-show_format",
-        "-show_streams",
-        path,
-    ]
-    proc = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
-    if proc.returncode != 0:
-        raise RuntimeError(f"ffprobe failed: {proc.stderr.strip()}")
-    return json.loads(proc.stdout)
-
-
 def probe_audio_layout(path: str) -> Dict:
     """Return a simplified description of audio streams and channels.
 
@@ -48,28 +39,10 @@ def probe_audio_layout(path: str) -> Dict:
     - streams: list of {index, codec_name, channels, channel_layout}
     - has_multichannel_stream: bool
     - has_multi_mono: bool (more than one mono stream)
+
+    Raises RuntimeError (ProbeError) when the file cannot be probed.
     """
-    data = _run_ffprobe_json(path)
-    streams = []
-    for s in data.get("streams", []):
-        if s.get("codec_type") != "audio":
-            continue
-        streams.append(
-            {
-                "index": s.get("index"),
-                "codec_name": s.get("codec_name"),
-                "channels": int(s.get("channels", 0) or 0),
-                "channel_layout": s.get("channel_layout") or "",
-            }
-        )
-    mono_count = sum(1 for s in streams if s["channels"] == 1)
-    has_multichannel_stream = any(s["channels"] > 1 for s in streams)
-    has_multi_mono = mono_count > 1
-    return {
-        "streams": streams,
-        "has_multichannel_stream": has_multichannel_stream,
-        "has_multi_mono": has_multi_mono,
-    }
+    return get_media_probe().probe(path).audio_layout
 
 
 def _layout_roles(layout: str, channels: int) -> List[str]:
@@ -182,30 +155,107 @@ def extract_stem(input_path: str, out_wav: str, spec: ChannelSpec) -> None:
         raise RuntimeError(f"ffmpeg stem extraction failed ({spec}): {proc.stderr.strip()}")
 
 
-def extract_all_stems(input_path: str, out_dir: str) -> Dict[str, str]:
+def _spec_role(spec: ChannelSpec) -> str:
+    return spec.role or (f"c{spec.channel_index}" if spec.channel_index is not None else f"S{spec.stream_index}")
+
+
+def stem_channels_key(role: str) -> str:
+    """PCM cache channel selector for a stem (cache key: source identity, 48 kHz, role)."""
+    return f"stem:{role}"
+
+
+def build_stems_command(input_path: str, outputs: Sequence[Tuple[ChannelSpec, str]]) -> List[str]:
+    """Single ffmpeg command writing every stem in ``outputs`` from one demux/decode.
+
+    Channels of a multichannel stream are fanned out with ``asplit`` and
+    isolated with ``pan`` by channel index; mono streams are mapped directly.
+    """
+    by_stream: Dict[int, List[Tuple[ChannelSpec, str]]] = {}
+    for spec, out_wav in outputs:
+        if spec.kind != "stream":
+            by_stream.setdefault(spec.stream_index, []).append((spec, out_wav))
+
+    filters: List[str] = []
+    labels: Dict[str, str] = {}
+    for si, items in by_stream.items():
+        if len(items) == 1:
+            sources = [f"0:a:{si}"]
+        else:
+            sources = [f"s{si}_{n}" for n in range(len(items))]
+            filters.append(f"[0:a:{si}]asplit={len(items)}" + "".join(f"[{x}]" for x in sources))
+        for (spec, out_wav), src in zip(items, sources):
+            label = f"a{si}_{spec.channel_index or 0}"
+            filters.append(f"[{src}]pan=mono|c0=c{spec.channel_index or 0}[{label}]")
+            labels[out_wav] = f"[{label}]"
+
+    cmd = ["ffmpeg", "-hide_banner", "-loglevel", "error", "-y", "-i", input_path]
+    if filters:
+        cmd += ["-filter_complex", ";".join(filters)]
+    for spec, out_wav in outputs:
+        source = f"0:a:{spec.stream_index}" if spec.kind == "stream" else labels[out_wav]
+        cmd += ["-map", source, "-vn", "-ac", "1", "-ar", str(STEM_SAMPLE_RATE), "-c:a", "pcm_s16le", out_wav]
+    return cmd
+
+
+def extract_all_stems(input_path: str, out_dir: str, cache: Optional[PCMCache] = None) -> Dict[str, str]:
     """Extract all detectable channels to mono WAV stems. Returns role->path map.
 
     Role keys are best-effort: FL/FR/FC/LFE/SL/SR when available, otherwise
     placeholders like c0/c1 for multichannel, or S0/S1 for mono streams.
+
+    All stems come from a single ffmpeg run, so a 5.1/7.1 deliverable is
+    demuxed and decoded once. With ``cache`` the stems are also stored in the
+    PCM cache, and when every stem is already cached they are written from
+    the cache without running ffmpeg.
     """
-    stems: Dict[str, str] = {}
     specs = list_channel_specs(input_path)
-    for spec in specs:
-        role = spec.role or (f"c{spec.channel_index}" if spec.channel_index is not None else f"S{spec.stream_index}")
-        out_wav = str(Path(out_dir) / f"{Path(input_path).stem}_{role}.wav")
-        extract_stem(input_path, out_wav, spec)
-        stems[role] = out_wav
+    Path(out_dir).mkdir(parents=True, exist_ok=True)
+    outputs = [(spec, str(Path(out_dir) / f"{Path(input_path).stem}_{_spec_role(spec)}.wav")) for spec in specs]
+    stems = {_spec_role(spec): out_wav for spec, out_wav in outputs}
+    if not outputs:
+        return stems
+
+    if cache is not None and all(
+        cache.export_wav(input_path, STEM_SAMPLE_RATE, out_wav, channels=stem_channels_key(role))
+        for role, out_wav in stems.items()
+    ):
+        return stems
+
+    proc = subprocess.run(build_stems_command(input_path, outputs), capture_output=True, text=True, timeout=600)
+    if proc.returncode != 0:
+        raise RuntimeError(f"ffmpeg stem extraction failed ({input_path}): {proc.stderr.strip()}")
+    if cache is not None:
+        for role, out_wav in stems.items():
+            cache.put_file(input_path, STEM_SAMPLE_RATE, out_wav, channels=stem_channels_key(role))
     return stems
 
 
-def make_temp_stems(input_path: str) -> Tuple[str, Dict[str, str]]:
+def extract_stems_to_cache(input_path: str, cache: PCMCache) -> Dict[str, str]:
+    """Decode every stem of ``input_path`` into the PCM cache. Returns role->``.npy`` entry.
+
+    Cached stems are memory-mappable with ``np.load(entry, mmap_mode="r")``;
+    stems already in the cache are not decoded again.
+    """
+    roles = [_spec_role(spec) for spec in list_channel_specs(input_path)]
+    entries = {role: cache.lookup(input_path, STEM_SAMPLE_RATE, stem_channels_key(role)) for role in roles}
+    if any(entry is None for entry in entries.values()):
+        work_dir = tempfile.mkdtemp(prefix="stems_")
+        try:
+            extract_all_stems(input_path, work_dir, cache=cache)
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+        entries = {role: cache.lookup(input_path, STEM_SAMPLE_RATE, stem_channels_key(role)) for role in roles}
+    return {role: entry for role, entry in entries.items() if entry is not None}
+
+
+def make_temp_stems(input_path: str, cache: Optional[PCMCache] = None) -> Tuple[str, Dict[str, str]]:
     """Create a temporary directory with stems for all channels.
 
     Returns (temp_dir, role_to_path). Caller should remove the directory when done.
     """
     tmp = tempfile.mkdtemp(prefix="stems_")
     try:
-        mapping = extract_all_stems(input_path, tmp)
+        mapping = extract_all_stems(input_path, tmp, cache=cache)
         return tmp, mapping
     except Exception:
         shutil.rmtree(tmp, ignore_errors=True)
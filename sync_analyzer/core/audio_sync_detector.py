@@ -16,19 +16,34 @@ import librosa
 import scipy.signal
 import torch
 import torch.nn.functional as F
-from typing import Dict, List, Tuple, Optional, Any
+from typing import Dict, List, Tuple, Optional, Any, Callable, Iterator
 from dataclasses import dataclass
 from pathlib import Path
 import logging
+import time
 from scipy import signal
 from sklearn.metrics.pairwise import cosine_similarity
 import warnings
 
+try:
+    from .correlation_engine import correlate_peak, seconds_to_lag
+    from .feature_graph import SpectralFeatureGraph
+    from .fingerprint import landmarks_from_magnitude, match_landmarks
+    from .pcm_cache import get_pcm_cache
+except ImportError:  # pragma: no cover - fallback for direct execution
+    from correlation_engine import correlate_peak, seconds_to_lag
+    from feature_graph import SpectralFeatureGraph
+    from fingerprint import landmarks_from_magnitude, match_landmarks
+    from pcm_cache import get_pcm_cache
+
 warnings.filterwarnings("ignore", category=FutureWarning)
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Offsets within this distance of a confident fingerprint result count as agreeing
+FINGERPRINT_AGREEMENT_SECONDS = 0.1
+
 @dataclass
 class SyncResult:
     """Container for sync analysis results."""
@@ -41,15 +56,48 @@ class SyncResult:
     frame_rate: float
     analysis_metadata: Dict[str, Any]
 
-@dataclass
+def _lazy_feature(name: str) -> property:
+    """Property that computes a feature on first access and memoizes it."""
+    def getter(self: "AudioFeatures") -> Any:
+        if name not in self._values:
+            extractor = self._extractors.get(name)
+            if extractor is None:
+                raise AttributeError(f"Feature '{name}' is not available")
+            self._values[name] = extractor()
+        return self._values[name]
+    return property(getter, doc=f"{name} (computed on first access)")
+
+
 class AudioFeatures:
-    """Container for extracted audio features."""
-    mfcc: np.ndarray
-    spectral_centroid: np.ndarray
-    chroma: np.ndarray
-    tempo: float
-    onset_frames: np.ndarray
-    rms: np.ndarray
+    """
+    Container for extracted audio features.
+
+    Features are computed lazily: only the features a sync method actually
+    reads are extracted, each at most once. Precomputed values can be passed
+    as keyword arguments (e.g. ``AudioFeatures(mfcc=..., rms=...)``).
+    """
+
+    FEATURE_NAMES = ('mfcc', 'spectral_centroid', 'chroma', 'tempo', 'onset_frames', 'rms', 'landmarks')
+
+    mfcc = _lazy_feature('mfcc')
+    spectral_centroid = _lazy_feature('spectral_centroid')
+    chroma = _lazy_feature('chroma')
+    tempo = _lazy_feature('tempo')
+    onset_frames = _lazy_feature('onset_frames')
+    rms = _lazy_feature('rms')
+    landmarks = _lazy_feature('landmarks')
+
+    def __init__(self, extractors: Optional[Dict[str, Callable[[], Any]]] = None, **values: Any):
+        unknown = set(values) - set(self.FEATURE_NAMES)
+        if unknown:
+            raise TypeError(f"Unknown audio features: {sorted(unknown)}")
+        self._extractors = dict(extractors or {})
+        self._values: Dict[str, Any] = dict(values)
+
+    @property
+    def computed(self) -> List[str]:
+        """Names of the features that have been extracted so far."""
+        return [name for name in self.FEATURE_NAMES if name in self._values]
 
 class ProfessionalSyncDetector:
     """
@@ -66,7 +114,8 @@ class ProfessionalSyncDetector:
                  n_fft: int = 2048,
                  window_size_seconds: float = 30.0,
                  confidence_threshold: float = 0.3,
-                 use_gpu: bool = False):
+                 use_gpu: bool = False,
+                 max_lag_seconds: Optional[float] = None):
         """
         Initialize the sync detector with professional audio analysis parameters.
         
@@ -77,6 +126,7 @@ class ProfessionalSyncDetector:
             n_fft: Length of FFT window
             window_size_seconds: Analysis window size in seconds
             confidence_threshold: Minimum confidence for reliable detection
+            max_lag_seconds: Optional bound on the offset search range (None = unbounded)
         """
         self.sample_rate = sample_rate
         self.hop_length = hop_length
@@ -84,6 +134,7 @@ class ProfessionalSyncDetector:
         self.n_fft = n_fft
         self.window_size_seconds = window_size_seconds
         self.confidence_threshold = confidence_threshold
+        self.max_lag_seconds = max_lag_seconds
         
         # Analysis parameters
         self.window_size_samples = int(window_size_seconds * sample_rate)
@@ -119,32 +170,26 @@ class ProfessionalSyncDetector:
         logger.info(f"Initialized ProfessionalSyncDetector with SR={sample_rate}, "
                    f"window={window_size_seconds}s, MFCC={n_mfcc}")
     
-    def load_and_preprocess_audio(self, audio_path: Path) -> Tuple[np.ndarray, float]:
+    def load_and_preprocess_audio(self, audio_path: Path,
+                                  max_seconds: Optional[float] = None) -> Tuple[np.ndarray, float]:
         """
         Load and preprocess audio file with professional audio standards.
         
         Args:
             audio_path: Path to audio file
+            max_seconds: Load only the first ``max_seconds``; read from a cached
+                decode when there is one, otherwise decoded alone (the partial
+                decode is not stored in the PCM cache)
             
         Returns:
             Tuple of (audio_samples, original_sample_rate)
         """
         try:
-            # Load with librosa for consistent preprocessing
-            audio, original_sr = librosa.load(
-                str(audio_path), 
-                sr=self.sample_rate,
-                mono=True,
-                dtype=np.float32
-            )
-            
-            # Normalize audio to prevent clipping
-            if np.max(np.abs(audio)) > 0:
-                audio = audio / np.max(np.abs(audio)) * 0.95
+            audio = self.load_audio(audio_path, max_seconds=max_seconds)
+            original_sr = self.sample_rate
             
-            # Apply gentle high-pass filter to remove DC offset and low-freq noise
-            sos = signal.butter(4, 80, btype='high', fs=self.sample_rate, output='sos')
-            audio = signal.sosfilt(sos, audio)
+            # Normalize and high-pass into a single float32 buffer
+            audio = self._normalize_and_highpass(audio)
             
             logger.info(f"Loaded {audio_path.name}: {len(audio)/self.sample_rate:.2f}s, "
                        f"{original_sr}->{self.sample_rate} Hz")
@@ -155,17 +200,102 @@ class ProfessionalSyncDetector:
             logger.error(f"Error loading {audio_path}: {e}")
             raise
     
+    def load_audio(self, audio_path: Path, max_seconds: Optional[float] = None) -> np.ndarray:
+        """
+        Mono analysis-rate samples of ``audio_path`` before preprocessing.
+        
+        Cached decodes are returned memory-mapped; ``max_seconds`` behaves as in
+        ``load_and_preprocess_audio``.
+        """
+        def decode() -> np.ndarray:
+            # Load with librosa for consistent preprocessing
+            audio, _ = librosa.load(
+                str(audio_path), 
+                sr=self.sample_rate,
+                mono=True,
+                dtype=np.float32,
+                duration=max_seconds or None
+            )
+            return audio
+
+        # Decoded PCM is shared across requests through the on-disk cache;
+        # hits are memory-mapped rather than read into RAM
+        cache = get_pcm_cache()
+        if max_seconds:
+            audio = cache.get(audio_path, self.sample_rate, channels="mono", mmap=True) if cache else None
+            return decode() if audio is None else audio[:int(max_seconds * self.sample_rate)]
+        if cache is not None:
+            return cache.get_or_decode(audio_path, self.sample_rate, decode, channels="mono", mmap=True)
+        return decode()
+    
+    def _normalize_and_highpass(self, audio: np.ndarray, block_size: int = 1 << 20) -> np.ndarray:
+        """
+        Peak-normalize to 0.95 and apply the 80 Hz high-pass filter block by block.
+        
+        Filter state carries across blocks, so the output equals filtering the
+        whole signal at once, but only one float32 copy of the file is resident
+        (sosfilt alone would upcast the full signal to float64).
+        """
+        out = np.empty(len(audio), dtype=np.float32)
+        i = 0
+        for block in self.iter_preprocessed_blocks(audio, block_size):
+            out[i:i + len(block)] = block
+            i += len(block)
+        return out
+    
+    def iter_preprocessed_blocks(self, audio: np.ndarray, block_size: int = 1 << 20) -> Iterator[np.ndarray]:
+        """Normalized, high-passed float32 blocks of ``audio`` (see ``_normalize_and_highpass``)."""
+        n = len(audio)
+        if n == 0:
+            return
+        
+        # Normalize audio to prevent clipping
+        peak = max(np.max(np.abs(audio[i:i + block_size])) for i in range(0, n, block_size))
+        
+        # Apply gentle high-pass filter to remove DC offset and low-freq noise
+        sos = signal.butter(4, 80, btype='high', fs=self.sample_rate, output='sos')
+        zi = np.zeros((sos.shape[0], 2))
+        for i in range(0, n, block_size):
+            block = np.asarray(audio[i:i + block_size], dtype=np.float32)
+            if peak > 0:
+                block = block / peak * 0.95
+            out, zi = signal.sosfilt(sos, block, zi=zi)
+            yield out.astype(np.float32)
+    
     def extract_audio_features(self, audio: np.ndarray) -> AudioFeatures:
         """
-        Extract comprehensive audio features for sync analysis.
+        Prepare audio features for sync analysis.
+        
+        Features are extracted lazily on first access, so a request for a single
+        method (e.g. MFCC) only pays for the features that method reads.
         
         Args:
             audio: Audio samples
             
         Returns:
-            AudioFeatures object containing all extracted features
+            AudioFeatures object that computes each feature on demand
         """
-        # MFCC features - primary for sync detection (GPU via torchaudio when enabled)
+        # One magnitude STFT and one mel spectrogram feed every derived feature
+        graph = SpectralFeatureGraph(audio, sr=self.sample_rate, n_fft=self.n_fft,
+                                     hop_length=self.hop_length)
+        return AudioFeatures(extractors={
+            'mfcc': lambda: self._extract_mfcc(audio, graph),
+            # Spectral centroid - for timbral matching
+            'spectral_centroid': graph.spectral_centroid,
+            # Chroma features - for harmonic content matching
+            'chroma': graph.chroma,
+            # Tempo (not used by the sync methods; computed only if read)
+            'tempo': graph.tempo,
+            'onset_frames': graph.onset_frames,
+            # RMS energy for dynamic matching
+            'rms': graph.rms,
+            # Spectral-peak landmark hashes (from the shared magnitude STFT)
+            'landmarks': lambda: landmarks_from_magnitude(graph.magnitude,
+                                                          self.sample_rate / self.hop_length),
+        })
+
+    def _extract_mfcc(self, audio: np.ndarray, graph: SpectralFeatureGraph) -> np.ndarray:
+        """MFCC features - primary for sync detection (GPU via torchaudio when enabled)."""
         mfcc = None
         if self.use_gpu and self._torchaudio_available:
             try:
@@ -189,56 +319,8 @@ class ProfessionalSyncDetector:
             except Exception:
                 mfcc = None
         if mfcc is None:
-            mfcc = librosa.feature.mfcc(
-                y=audio,
-                sr=self.sample_rate,
-                n_mfcc=self.n_mfcc,
-                hop_length=self.hop_length,
-                n_fft=self.n_fft
-            )
-        
-        # Spectral centroid - for timbral matching
-        spectral_centroid = librosa.feature.spectral_centroid(
-            y=audio,
-            sr=self.sample_rate,
-            hop_length=self.hop_length
-        )
-        
-        # Chroma features - for harmonic content matching
-        chroma = librosa.feature.chroma_stft(
-            y=audio,
-            sr=self.sample_rate,
-            hop_length=self.hop_length
-        )
-        
-        # Tempo and onset detection
-        tempo, _ = librosa.beat.beat_track(
-            y=audio,
-            sr=self.sample_rate,
-            hop_length=self.hop_length
-        )
-        
-        onset_frames = librosa.onset.onset_detect(
-            y=audio,
-            sr=self.sample_rate,
-            hop_length=self.hop_length,
-            units='frames'
-        )
-        
-        # RMS energy for dynamic matching
-        rms = librosa.feature.rms(
-            y=audio,
-            hop_length=self.hop_length
-        )
-        
-        return AudioFeatures(
-            mfcc=mfcc,
-            spectral_centroid=spectral_centroid,
-            chroma=chroma,
-            tempo=tempo,
-            onset_frames=onset_frames,
-            rms=rms
-        )
+            mfcc = graph.mfcc(n_mfcc=self.n_mfcc)
+        return mfcc
     
     def mfcc_cross_correlation_sync(self, 
                                    master_features: AudioFeatures,
@@ -262,27 +344,18 @@ class ProfessionalSyncDetector:
         dub_mfcc = (dub_mfcc - np.mean(dub_mfcc)) / (np.std(dub_mfcc) + 1e-8)
         
         # Cross-correlation (correlate dub against master to find dub's position)
-        correlation = scipy.signal.correlate(master_mfcc, dub_mfcc, mode='full')
-        
-        # Find peak
-        peak_idx = np.argmax(np.abs(correlation))
-        peak_value = correlation[peak_idx]
+        peak = correlate_peak(master_mfcc, dub_mfcc, max_lag=self._max_lag_frames())
+        correlation = peak.correlation
+        peak_idx = peak.peak_index
+        peak_value = peak.peak_value
         
-        # Convert to sample offset
-        # For correlate(master, dub, mode='full'), zero-lag index is len(dub)-1
-        offset_frames = peak_idx - (len(dub_mfcc) - 1)
+        # Convert to sample offset (lag is relative to the dub, as in correlate(master, dub))
+        offset_frames = peak.lag
         offset_samples = offset_frames * self.hop_length
         offset_seconds = offset_samples / self.sample_rate
         
-        # Calculate confidence based on peak prominence (more lenient scoring)
-        correlation_abs = np.abs(correlation)
-        peak_height = correlation_abs[peak_idx]
-        mean_correlation = np.mean(correlation_abs)
-        std_correlation = np.std(correlation_abs)
-
         # Use signal-to-noise ratio approach: (peak - mean) / std
-        snr = (peak_height - mean_correlation) / (std_correlation + 1e-8)
-        confidence = min(max(snr / 5, 0.0), 1.0)  # Normalize SNR to 0-1 range
+        confidence = min(max(peak.snr / 5, 0.0), 1.0)  # Normalize SNR to 0-1 range
         
         # Quality assessment
         quality_score = self._assess_correlation_quality(correlation, peak_idx)
@@ -341,18 +414,17 @@ class ProfessionalSyncDetector:
                                                 np.hanning(5), mode='same')
         
         # Cross-correlate
-        correlation = scipy.signal.correlate(master_onset_signal, dub_onset_signal, mode='full')
-        peak_idx = np.argmax(correlation)
+        peak = correlate_peak(master_onset_signal, dub_onset_signal,
+                              max_lag=self._max_lag_frames(), use_abs=False)
+        peak_idx = peak.peak_index
         
-        # Zero-lag at len(dub)-1 for correlate(master, dub)
-        offset_frames = peak_idx - (len(dub_onset_signal) - 1)
+        offset_frames = peak.lag
         offset_samples = offset_frames * self.hop_length
         offset_seconds = offset_samples / self.sample_rate
         
         # Calculate confidence
-        peak_value = correlation[peak_idx]
-        mean_correlation = np.mean(np.abs(correlation))
-        confidence = min(peak_value / (mean_correlation + 1e-8) / 5, 1.0)
+        peak_value = peak.peak_value
+        confidence = min(peak_value / (peak.mean_abs + 1e-8) / 5, 1.0)
         
         return SyncResult(
             offset_samples=int(offset_samples),
@@ -399,34 +471,24 @@ class ProfessionalSyncDetector:
         dub_spectral = (dub_spectral - np.mean(dub_spectral, axis=1, keepdims=True)) / \
                       (np.std(dub_spectral, axis=1, keepdims=True) + 1e-8)
         
-        # Calculate cross-correlation for each feature
-        correlations = []
-        for i in range(master_spectral.shape[0]):
-            corr = scipy.signal.correlate(master_spectral[i], dub_spectral[i], mode='full')
-            correlations.append(corr)
-        
-        # Combine correlations (weighted average)
+        # Combine per-feature correlations (weighted average)
         # Give higher weight to chroma features (indices 0-11) vs spectral centroid (index 12)
         weights = np.array([0.8/12] * 12 + [0.2])  # Normalize chroma weights, single weight for spectral centroid
-        if len(weights) != len(correlations):
+        if len(weights) != master_spectral.shape[0]:
             # Fallback to equal weights if mismatch
             weights = None
-        combined_correlation = np.average(correlations, axis=0, weights=weights)
-        
-        # Find peak
-        peak_idx = np.argmax(np.abs(combined_correlation))
-        peak_value = combined_correlation[peak_idx]
+        # All feature rows are correlated in one batched FFT pass
+        peak = correlate_peak(master_spectral, dub_spectral,
+                              max_lag=self._max_lag_frames(), weights=weights)
+        peak_idx = peak.peak_index
+        peak_value = peak.peak_value
         
-        # Convert to sample offset (zero-lag at len(dub)-1)
-        offset_frames = peak_idx - (dub_spectral.shape[1] - 1)
+        offset_frames = peak.lag
         offset_samples = offset_frames * self.hop_length
         offset_seconds = offset_samples / self.sample_rate
         
         # Calculate confidence
-        correlation_abs = np.abs(combined_correlation)
-        peak_height = correlation_abs[peak_idx]
-        mean_correlation = np.mean(correlation_abs)
-        confidence = min(peak_height / (mean_correlation + 1e-8) / 8, 1.0)
+        confidence = min(peak.peak_abs / (peak.mean_abs + 1e-8) / 8, 1.0)
         
         return SyncResult(
             offset_samples=int(offset_samples),
@@ -443,6 +505,40 @@ class ProfessionalSyncDetector:
             }
         )
 
+    def fingerprint_sync(self,
+                         master_features: AudioFeatures,
+                         dub_features: AudioFeatures) -> SyncResult:
+        """
+        Perform sync detection by matching spectral-peak landmark hashes.
+
+        Every hash shared by master and dub votes for the time difference of
+        its anchors; the offset is the histogram peak. Cost is near-linear in
+        duration and independent of the offset size.
+        """
+        master_landmarks = master_features.landmarks
+        dub_landmarks = dub_features.landmarks
+        match = match_landmarks(master_landmarks, dub_landmarks, max_lag_frames=self._max_lag_frames())
+        if match.votes == 0:
+            return self._create_low_confidence_result("Landmark Fingerprint - No matches")
+
+        offset_samples = int(round(match.offset_frames * self.hop_length))
+        return SyncResult(
+            offset_samples=offset_samples,
+            offset_seconds=offset_samples / self.sample_rate,
+            confidence=match.confidence,
+            method_used="Landmark Fingerprint",
+            correlation_peak=float(match.votes),
+            quality_score=min(match.votes / max(len(dub_landmarks), 1) * 10.0, 1.0),
+            frame_rate=self.sample_rate / self.hop_length,
+            analysis_metadata={
+                "master_hashes": len(master_landmarks),
+                "dub_hashes": len(dub_landmarks),
+                "hash_matches": match.matches,
+                "peak_votes": match.votes,
+                "runner_up_votes": match.runner_up,
+            }
+        )
+
     def raw_audio_cross_correlation(self, master_audio: np.ndarray, dub_audio: np.ndarray) -> SyncResult:
         """
         Fallback method using direct raw audio cross-correlation for difficult cases.
@@ -466,23 +562,18 @@ class ProfessionalSyncDetector:
             return self._create_low_confidence_result("Raw Audio - Empty audio")
 
         # Cross-correlation
-        correlation = scipy.signal.correlate(master_down, dub_down, mode='full')
-        peak_idx = np.argmax(np.abs(correlation))
-        peak_value = correlation[peak_idx]
+        max_lag = seconds_to_lag(self.max_lag_seconds, self.sample_rate / downsample_factor)
+        peak = correlate_peak(master_down, dub_down, max_lag=max_lag)
+        correlation = peak.correlation
+        peak_value = peak.peak_value
 
         # Convert to sample offset (accounting for downsampling)
-        offset_frames = peak_idx - (len(dub_down) - 1)
+        offset_frames = peak.lag
         offset_samples = offset_frames * downsample_factor
         offset_seconds = offset_samples / self.sample_rate
 
         # Calculate confidence
-        correlation_abs = np.abs(correlation)
-        peak_height = correlation_abs[peak_idx]
-        mean_correlation = np.mean(correlation_abs)
-        std_correlation = np.std(correlation_abs)
-
-        snr = (peak_height - mean_correlation) / (std_correlation + 1e-8)
-        confidence = min(max(snr / 6, 0.0), 1.0)
+        confidence = min(max(peak.snr / 6, 0.0), 1.0)
 
         return SyncResult(
             offset_samples=int(offset_samples),
@@ -499,6 +590,18 @@ class ProfessionalSyncDetector:
             }
         )
 
+    @staticmethod
+    def _timed(runner: Callable[[], SyncResult]) -> SyncResult:
+        """Run one sync method and record its wall time in the result metadata."""
+        start = time.perf_counter()
+        result = runner()
+        result.analysis_metadata["processing_time"] = time.perf_counter() - start
+        return result
+
+    def _max_lag_frames(self) -> Optional[int]:
+        """Lag search bound in feature frames, or None when unbounded."""
+        return seconds_to_lag(self.max_lag_seconds, self.sample_rate / self.hop_length)
+
     def _assess_correlation_quality(self, correlation: np.ndarray, peak_idx: int) -> float:
         """Assess the quality of correlation result."""
         correlation_abs = np.abs(correlation)
@@ -542,7 +645,7 @@ class ProfessionalSyncDetector:
         Args:
             master_path: Path to master audio file
             dub_path: Path to dub audio file
-            methods: List of methods to use ['mfcc', 'onset', 'spectral', 'ai']
+            methods: List of methods to use ['mfcc', 'onset', 'spectral', 'fingerprint', 'ai']
                     If None, uses all available methods
                     
         Returns:
@@ -557,30 +660,34 @@ class ProfessionalSyncDetector:
         master_audio, _ = self.load_and_preprocess_audio(master_path)
         dub_audio, _ = self.load_and_preprocess_audio(dub_path)
         
-        # Extract features
+        # Prepare features (extracted lazily, only for the requested methods)
         logger.info("Extracting audio features...")
         master_features = self.extract_audio_features(master_audio)
         dub_features = self.extract_audio_features(dub_audio)
         
-        # Perform analysis with selected methods
+        # Perform analysis with selected methods. Audio and features are shared,
+        # so each method's processing_time covers only the work it triggers.
         results = {}
-        
-        if 'mfcc' in methods:
-            logger.info("Performing MFCC cross-correlation analysis...")
-            results['mfcc'] = self.mfcc_cross_correlation_sync(master_features, dub_features)
-        
-        if 'onset' in methods:
-            logger.info("Performing onset-based sync analysis...")
-            results['onset'] = self.onset_based_sync(master_features, dub_features)
-        
-        if 'spectral' in methods:
-            logger.info("Performing spectral feature analysis...")
-            results['spectral'] = self.spectral_sync_detection(master_features, dub_features)
+        method_runners = [
+            ('mfcc', "Performing MFCC cross-correlation analysis...",
+             lambda: self.mfcc_cross_correlation_sync(master_features, dub_features)),
+            ('onset', "Performing onset-based sync analysis...",
+             lambda: self.onset_based_sync(master_features, dub_features)),
+            ('spectral', "Performing spectral feature analysis...",
+             lambda: self.spectral_sync_detection(master_features, dub_features)),
+            ('fingerprint', "Performing landmark fingerprint analysis...",
+             lambda: self.fingerprint_sync(master_features, dub_features)),
+        ]
+        for name, message, runner in method_runners:
+            if name in methods:
+                logger.info(message)
+                results[name] = self._timed(runner)
 
         # Add robust raw audio fallback if all methods have low confidence
         if all(result.confidence < 0.2 for result in results.values()):
             logger.info("All methods low confidence, adding raw audio cross-correlation...")
-            results['raw_audio'] = self.raw_audio_cross_correlation(master_audio, dub_audio)
+            results['raw_audio'] = self._timed(
+                lambda: self.raw_audio_cross_correlation(master_audio, dub_audio))
 
         logger.info(f"Sync analysis complete. Results: {list(results.keys())}")
         return results
@@ -603,6 +710,18 @@ class ProfessionalSyncDetector:
             method: result for method, result in results.items()
             if result.confidence >= self.confidence_threshold
         }
+
+        # A confident fingerprint match identifies the alignment from content
+        # hashes; correlation methods that locked onto a different peak
+        # (repetitive content, large offsets) are left out of the average.
+        outvoted = []
+        anchor = high_confidence_results.get('fingerprint')
+        if anchor is not None:
+            tolerance = max(2.0 / anchor.frame_rate, FINGERPRINT_AGREEMENT_SECONDS)
+            outvoted = [m for m, r in high_confidence_results.items()
+                        if abs(r.offset_seconds - anchor.offset_seconds) > tolerance]
+            for method in outvoted:
+                del high_confidence_results[method]
         
         if high_confidence_results:
             # Use highest confidence result
@@ -632,7 +751,8 @@ class ProfessionalSyncDetector:
                 analysis_metadata={
                     "primary_method": best_method,
                     "contributing_methods": list(high_confidence_results.keys()),
-                    "method_results": {m: r.offset_seconds for m, r in high_confidence_results.items()}
+                    "method_results": {m: r.offset_seconds for m, r in high_confidence_results.items()},
+                    "outvoted_methods": outvoted
                 }
             )
         else:
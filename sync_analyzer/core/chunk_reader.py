@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Chunk window reader for the chunked sync detector.
+
+Each (file, window) pair is read exactly once and the same buffer is handed
+to feature extraction and to offset correlation. Both files are kept open for
+the lifetime of the reader, and the next window is read on a background
+thread while the current one is being analyzed.
+
+Analysis audio stored as float32 ``.npy`` is opened with ``np.memmap``
+instead: windows are zero-copy slices, and worker processes reading the same
+file share its pages through the OS cache.
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import soundfile as sf
+
+
+@dataclass
+class ChunkWindow:
+    """Decoded master/dub samples for one analysis window."""
+    index: int
+    start_time: float
+    end_time: float
+    master: np.ndarray
+    dub: np.ndarray
+
+
+def is_npy(path: str) -> bool:
+    return str(path).lower().endswith('.npy')
+
+
+def open_pcm(path: str) -> np.ndarray:
+    """Open float32 ``.npy`` analysis audio as a read-only memory map."""
+    return np.load(path, mmap_mode='r', allow_pickle=False)
+
+
+def slice_window(pcm: np.ndarray, sample_rate: int, start_time: float, end_time: float) -> np.ndarray:
+    """Zero-copy mono window of memory-mapped PCM, using ``read_window``'s frame arithmetic."""
+    start_frame = int(start_time * sample_rate)
+    n_frames = int((end_time - start_time) * sample_rate)
+    if n_frames <= 0 or start_frame >= len(pcm):
+        return np.zeros(0, dtype=np.float32)
+    y = pcm[start_frame:start_frame + n_frames]
+    if y.ndim > 1:
+        # Downmix is the only copy on this path
+        return y.mean(axis=1, dtype=np.float32)
+    return np.asarray(y)
+
+
+def pcm_duration(path: str, sample_rate: int) -> float:
+    """Duration in seconds of ``.npy`` analysis audio stored at ``sample_rate``."""
+    return len(open_pcm(path)) / float(sample_rate)
+
+
+def read_window(handle: sf.SoundFile, sample_rate: int, start_time: float, end_time: float) -> np.ndarray:
+    """Read a mono float32 window from an open file.
+
+    Frame arithmetic matches the detector's historic ``sf.read(start=, frames=)``
+    calls: ``int(start * sr)`` and ``int((end - start) * sr)``.
+    """
+    start_frame = int(start_time * sample_rate)
+    n_frames = int((end_time - start_time) * sample_rate)
+    if n_frames <= 0 or start_frame >= handle.frames:
+        return np.zeros(0, dtype=np.float32)
+    handle.seek(start_frame)
+    y = handle.read(n_frames, dtype='float32', always_2d=False)
+    if y.ndim > 1:
+        y = y.mean(axis=1)
+    return y
+
+
+class ChunkWindowReader:
+    """
+    Iterate decoded master/dub windows with single-read, prefetching access.
+
+    Usage:
+        with ChunkWindowReader(master_wav, dub_wav, 22050, chunks) as reader:
+            for window in reader:
+                ...
+    """
+
+    def __init__(self, master_path: str, dub_path: str, sample_rate: int,
+                 windows: Sequence[Tuple[float, float]], prefetch: bool = True):
+        self.master_path = master_path
+        self.dub_path = dub_path
+        self.sample_rate = int(sample_rate)
+        self.windows: List[Tuple[float, float]] = list(windows)
+        self.prefetch = prefetch
+        self._master: Optional[Union[sf.SoundFile, np.ndarray]] = None
+        self._dub: Optional[Union[sf.SoundFile, np.ndarray]] = None
+        # A single worker keeps all reads on one thread, so file handles are never shared
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def __enter__(self) -> "ChunkWindowReader":
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def open(self) -> None:
+        if self._master is None:
+            self._master = self._open(self.master_path)
+            self._dub = self._open(self.dub_path)
+        # Memory-mapped windows are free to produce; only file reads are prefetched
+        mapped = isinstance(self._master, np.ndarray) and isinstance(self._dub, np.ndarray)
+        if self.prefetch and not mapped and self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="chunk_prefetch")
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        for handle in (self._master, self._dub):
+            if isinstance(handle, sf.SoundFile):
+                try:
+                    handle.close()
+                except Exception:
+                    pass
+        self._master = None
+        self._dub = None
+
+    @staticmethod
+    def _open(path: str) -> Union[sf.SoundFile, np.ndarray]:
+        return open_pcm(path) if is_npy(path) else sf.SoundFile(path)
+
+    def _read(self, source: Union[sf.SoundFile, np.ndarray], start: float, end: float) -> np.ndarray:
+        if isinstance(source, np.ndarray):
+            return slice_window(source, self.sample_rate, start, end)
+        return read_window(source, self.sample_rate, start, end)
+
+    def _load(self, index: int) -> ChunkWindow:
+        start, end = self.windows[index]
+        return ChunkWindow(
+            index=index,
+            start_time=start,
+            end_time=end,
+            master=self._read(self._master, start, end),
+            dub=self._read(self._dub, start, end),
+        )
+
+    def _submit(self, index: int) -> Optional[Future]:
+        if index >= len(self.windows):
+            return None
+        return self._executor.submit(self._load, index)
+
+    def __len__(self) -> int:
+        return len(self.windows)
+
+    def __iter__(self) -> Iterator[ChunkWindow]:
+        self.open()
+        if self._executor is None:
+            for i in range(len(self.windows)):
+                yield self._load(i)
+            return
+
+        pending = self._submit(0)
+        for i in range(len(self.windows)):
+            current = pending
+            # Start reading the next window before handing out the current one
+            pending = self._submit(i + 1)
+            yield current.result()
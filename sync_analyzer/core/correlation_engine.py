@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Shared FFT cross-correlation engine for sync detection.
+
+All correlation-based detectors (chunked raw-audio correlation, MFCC, onset,
+spectral and raw-audio methods) go through this module so that lag
+conventions, peak picking and SNR-style confidence statistics are computed
+in exactly one place, from a single correlation pass.
+
+Lag convention matches ``np.correlate(x, y, mode='full')``: a positive lag
+means ``x`` (master) is delayed relative to ``y`` (dub), i.e.
+``corr[lag] = sum_n x[n + lag] * y[n]``.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+from scipy import fft as sp_fft
+
+
+@dataclass
+class CorrelationPeak:
+    """Peak and noise statistics from one correlation pass."""
+    lag: int                 # lag of the peak in samples/frames (see module docstring)
+    peak_index: int          # index of the peak within ``correlation``
+    peak_value: float        # signed correlation value at the peak
+    peak_abs: float          # |correlation| at the peak
+    mean_abs: float          # mean of |correlation| over all evaluated lags
+    std_abs: float           # std of |correlation| over all evaluated lags
+    snr: float               # (peak_abs - mean_abs) / (std_abs + 1e-8)
+    min_lag: int             # lag represented by correlation[0]
+    correlation: np.ndarray  # correlation values for lags min_lag .. min_lag + len - 1
+
+
+def _lag_bounds(len_x: int, len_y: int, max_lag: Optional[int]) -> Tuple[int, int]:
+    """Return the inclusive (min_lag, max_lag) range that will be evaluated."""
+    lo, hi = -(len_y - 1), len_x - 1
+    if max_lag is not None:
+        max_lag = max(int(max_lag), 0)
+        lo, hi = max(lo, -max_lag), min(hi, max_lag)
+    return lo, hi
+
+
+def fft_correlate(x: np.ndarray, y: np.ndarray,
+                  max_lag: Optional[int] = None) -> Tuple[np.ndarray, int]:
+    """
+    Cross-correlate ``x`` against ``y`` along the last axis using one real FFT.
+
+    Args:
+        x: Master signal(s), shape (..., N)
+        y: Dub signal(s), shape (..., M), broadcastable against ``x``
+        max_lag: Optional bound on |lag| in samples; None evaluates all lags
+
+    Returns:
+        Tuple of (correlation, min_lag). ``correlation[..., i]`` is the value at
+        lag ``min_lag + i``. Without ``max_lag`` the output is identical in
+        layout to ``np.correlate(x, y, mode='full')``.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n, m = x.shape[-1], y.shape[-1]
+    lo, hi = _lag_bounds(n, m, max_lag)
+    if n == 0 or m == 0 or hi < lo:
+        return np.zeros(x.shape[:-1] + (0,)), 0
+
+    nfft = sp_fft.next_fast_len(n + m - 1, real=True)
+    spec = sp_fft.rfft(x, nfft, axis=-1) * np.conj(sp_fft.rfft(y, nfft, axis=-1))
+    circ = sp_fft.irfft(spec, nfft, axis=-1)
+
+    # Circular result holds non-negative lags at the front, negative lags at the back
+    neg = circ[..., nfft + lo:] if lo < 0 else circ[..., :0]
+    pos = circ[..., max(lo, 0):hi + 1]
+    return np.concatenate([neg, pos], axis=-1), lo
+
+
+def overlap_add_correlate(x: np.ndarray, y: np.ndarray, max_lag: int,
+                          block_size: Optional[int] = None) -> Tuple[np.ndarray, int]:
+    """
+    Bounded-lag cross-correlation of 1-D signals via overlap-add over blocks of ``y``.
+
+    Each block of the dub only needs the master samples within ``max_lag`` of
+    it, so FFT sizes scale with ``block_size + 2 * max_lag`` rather than with
+    the full signal length. Results match ``fft_correlate(x, y, max_lag)``.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n, m = len(x), len(y)
+    lo, hi = _lag_bounds(n, m, max_lag)
+    if n == 0 or m == 0 or hi < lo:
+        return np.zeros(0), 0
+
+    span = hi - lo + 1
+    if block_size is None:
+        block_size = max(4 * span, 8192)
+    out = np.zeros(span, dtype=np.float64)
+
+    for b0 in range(0, m, block_size):
+        yb = y[b0:b0 + block_size]
+        # Master samples that can pair with this block for lags in [lo, hi]
+        x0 = max(b0 + lo, 0)
+        x1 = min(b0 + len(yb) + hi, n)
+        if x1 <= x0:
+            continue
+        corr, blo = fft_correlate(x[x0:x1], yb)
+        # Lags in block coordinates are offset by (x0 - b0)
+        shift = (x0 - b0) + blo - lo
+        a = max(shift, 0)
+        z = min(shift + len(corr), span)
+        if z > a:
+            out[a:z] += corr[a - shift:z - shift]
+    return out, lo
+
+
+def correlate_peak(x: np.ndarray, y: np.ndarray,
+                   max_lag: Optional[int] = None,
+                   use_abs: bool = True,
+                   weights: Optional[Sequence[float]] = None) -> CorrelationPeak:
+    """
+    Correlate master against dub once and return the peak with SNR statistics.
+
+    Args:
+        x: Master signal, 1-D or (features, frames)
+        y: Dub signal, same rank as ``x``
+        max_lag: Optional bound on |lag| in samples/frames
+        use_abs: Pick the peak on |correlation| (True) or on the signed value
+        weights: For 2-D input, per-row weights used to combine row correlations
+
+    Returns:
+        CorrelationPeak describing the best lag and the correlation noise floor
+    """
+    x = np.asarray(x)
+    y = np.asarray(y)
+    m = y.shape[-1]
+    if x.ndim == 1 and max_lag is not None and m > 4 * (2 * int(max_lag) + 1):
+        correlation, min_lag = overlap_add_correlate(x, y, max_lag)
+    else:
+        correlation, min_lag = fft_correlate(x, y, max_lag)
+    if correlation.ndim > 1:
+        correlation = np.average(correlation, axis=0, weights=weights)
+    return summarize_correlation(correlation, min_lag, use_abs=use_abs)
+
+
+def summarize_correlation(correlation: np.ndarray, min_lag: int,
+                          use_abs: bool = True) -> CorrelationPeak:
+    """
+    Pick the peak of an already computed correlation and derive SNR statistics.
+
+    Used directly by callers that compute the correlation elsewhere (e.g. on GPU).
+    """
+    correlation = np.asarray(correlation, dtype=np.float64)
+    if correlation.size == 0:
+        return CorrelationPeak(lag=0, peak_index=0, peak_value=0.0, peak_abs=0.0,
+                               mean_abs=0.0, std_abs=0.0, snr=0.0,
+                               min_lag=min_lag, correlation=correlation)
+
+    corr_abs = np.abs(correlation)
+    peak_index = int(np.argmax(corr_abs if use_abs else correlation))
+    peak_abs = float(corr_abs[peak_index])
+    mean_abs = float(np.mean(corr_abs))
+    std_abs = float(np.std(corr_abs))
+    return CorrelationPeak(
+        lag=int(min_lag + peak_index),
+        peak_index=peak_index,
+        peak_value=float(correlation[peak_index]),
+        peak_abs=peak_abs,
+        mean_abs=mean_abs,
+        std_abs=std_abs,
+        snr=(peak_abs - mean_abs) / (std_abs + 1e-8),
+        min_lag=int(min_lag),
+        correlation=correlation,
+    )
+
+
+def seconds_to_lag(max_lag_seconds: Optional[float], rate: float) -> Optional[int]:
+    """Convert an optional lag bound in seconds to samples/frames at ``rate``."""
+    if max_lag_seconds is None:
+        return None
+    return int(np.ceil(float(max_lag_seconds) * float(rate)))
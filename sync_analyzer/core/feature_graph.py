@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Shared spectral feature graph for sync analysis.
+
+librosa's feature functions each compute their own STFT when given raw
+samples, so extracting MFCC, chroma, spectral centroid, onsets and RMS from
+the same file costs five full-file FFT passes. ``SpectralFeatureGraph``
+computes one magnitude STFT and one mel spectrogram per signal and derives
+every feature from those intermediates. Intermediates are built on first use
+and cached, so a request that only needs MFCC never builds the chroma path.
+
+With librosa's default parameters the derived features match the
+per-feature calls exactly. RMS stays in the time domain: it needs no FFT, and
+the spectrogram-based estimate is scaled by the analysis window's energy.
+"""
+
+from __future__ import annotations
+
+from typing import Optional
+
+import numpy as np
+import librosa
+
+
+class SpectralFeatureGraph:
+    """
+    Lazily evaluated STFT -> mel -> feature graph for one signal.
+
+    Usage:
+        graph = SpectralFeatureGraph(audio, sr=22050, n_fft=2048, hop_length=512)
+        mfcc = graph.mfcc(n_mfcc=13)
+        chroma = graph.chroma()
+    """
+
+    def __init__(self, audio: np.ndarray, sr: int, n_fft: int = 2048,
+                 hop_length: int = 512, n_mels: int = 128):
+        self.audio = audio
+        self.sr = int(sr)
+        self.n_fft = int(n_fft)
+        self.hop_length = int(hop_length)
+        self.n_mels = int(n_mels)
+        self._magnitude: Optional[np.ndarray] = None
+        self._log_mel: Optional[np.ndarray] = None
+
+    # ------------------------------------------------------------------
+    # Shared intermediates
+    # ------------------------------------------------------------------
+
+    @property
+    def magnitude(self) -> np.ndarray:
+        """Magnitude STFT, shape (1 + n_fft // 2, frames). Computed once."""
+        if self._magnitude is None:
+            stft = librosa.stft(self.audio, n_fft=self.n_fft, hop_length=self.hop_length)
+            # Drop the complex buffer as soon as the magnitude exists
+            self._magnitude = np.abs(stft)
+            del stft
+        return self._magnitude
+
+    def power(self) -> np.ndarray:
+        """Power spectrogram; transient, not cached, to keep one spectrogram resident."""
+        return np.square(self.magnitude)
+
+    @property
+    def log_mel(self) -> np.ndarray:
+        """Log-power mel spectrogram shared by MFCC and onset strength."""
+        if self._log_mel is None:
+            mel_basis = librosa.filters.mel(sr=self.sr, n_fft=self.n_fft, n_mels=self.n_mels)
+            mel = mel_basis.dot(self.power())
+            self._log_mel = librosa.power_to_db(mel)
+        return self._log_mel
+
+    # ------------------------------------------------------------------
+    # Derived features
+    # ------------------------------------------------------------------
+
+    def mfcc(self, n_mfcc: int = 13) -> np.ndarray:
+        return librosa.feature.mfcc(S=self.log_mel, sr=self.sr, n_mfcc=n_mfcc)
+
+    def chroma(self) -> np.ndarray:
+        return librosa.feature.chroma_stft(S=self.power(), sr=self.sr, n_fft=self.n_fft,
+                                           hop_length=self.hop_length)
+
+    def spectral_centroid(self) -> np.ndarray:
+        return librosa.feature.spectral_centroid(S=self.magnitude, sr=self.sr, n_fft=self.n_fft,
+                                                 hop_length=self.hop_length)
+
+    def onset_strength(self) -> np.ndarray:
+        return librosa.onset.onset_strength(S=self.log_mel, sr=self.sr, n_fft=self.n_fft,
+                                            hop_length=self.hop_length)
+
+    def onset_frames(self) -> np.ndarray:
+        return librosa.onset.onset_detect(onset_envelope=self.onset_strength(), sr=self.sr,
+                                          hop_length=self.hop_length, units='frames')
+
+    def tempo(self) -> float:
+        tempo, _ = librosa.beat.beat_track(onset_envelope=self.onset_strength(), sr=self.sr,
+                                           hop_length=self.hop_length)
+        return tempo
+
+    def rms(self) -> np.ndarray:
+        return librosa.feature.rms(y=self.audio, frame_length=self.n_fft,
+                                   hop_length=self.hop_length)
+
+    def release(self) -> None:
+        """Free cached spectrograms."""
+        self._magnitude = None
+        self._log_mel = None
@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+"""
+Persistent landmark-hash catalog of master files.
+
+Deliveries with unhelpful filenames used to be paired by running full sync
+analyses against every candidate master. ``FingerprintCatalog`` keeps the
+landmark hashes (see ``fingerprint.py``) of every indexed master in an
+inverted index: hash-sorted ``uint32`` hash, ``int32`` anchor frame and
+``uint32`` master id arrays, memory-mapped from ``.npy`` segment files, with
+master metadata in SQLite. Identifying a dub is a binary search of its
+hashes into each segment plus a vote per (master, time offset), so the top
+masters and their estimated offsets come back in well under a second, and
+the full sync analysis then runs on the right pair.
+
+New masters are appended as small segments; ``compact`` merges segments (and
+drops masters that were replaced or removed) once there are more than
+``MAX_SEGMENTS``.
+
+Configuration (environment, read by ``get_fingerprint_catalog``):
+    SYNC_FINGERPRINT_CATALOG_DIR  catalog directory (default ~/.cache/sync_analyzer/catalog)
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    from .fingerprint import Landmarks, MAX_HASH_OCCURRENCES, landmarks_from_blocks
+except ImportError:  # pragma: no cover - fallback for direct execution
+    from fingerprint import Landmarks, MAX_HASH_OCCURRENCES, landmarks_from_blocks
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CATALOG_DIR = os.path.join(os.path.expanduser("~"), ".cache", "sync_analyzer", "catalog")
+MAX_SEGMENTS = 8
+DEFAULT_QUERY_SECONDS = 120.0   # dub audio fingerprinted for identification
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS masters (
+    id INTEGER PRIMARY KEY AUTOINCREMENT, path TEXT NOT NULL, size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL, frames INTEGER NOT NULL, frame_rate REAL NOT NULL,
+    hash_count INTEGER NOT NULL, active INTEGER NOT NULL DEFAULT 1, added_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS masters_path ON masters (path);
+CREATE TABLE IF NOT EXISTS segments (name TEXT PRIMARY KEY, postings INTEGER NOT NULL, created REAL NOT NULL);
+"""
+
+
+@dataclass
+class CatalogMatch:
+    """One candidate master for a queried dub."""
+    master_id: int
+    path: str
+    offset_seconds: float   # master delayed relative to the dub (correlation-engine convention)
+    votes: int              # hashes agreeing on the offset (±1 frame)
+    matched_fraction: float  # votes / query hashes
+    confidence: float
+
+    def to_dict(self) -> Dict:
+        return {
+            "master_id": self.master_id, "path": self.path, "offset_seconds": self.offset_seconds,
+            "votes": self.votes, "matched_fraction": self.matched_fraction, "confidence": self.confidence,
+        }
+
+
+def landmarks_for_file(path: str, max_seconds: Optional[float] = None, detector=None) -> Landmarks:
+    """
+    Landmarks of a media file through the detector's decode (PCM cache aware)
+    and preprocessing, optionally of its first ``max_seconds`` only (only that
+    much is decoded and filtered).
+
+    Preprocessing and the STFT run block by block over the (memory-mapped,
+    when cached) decode, so a full-length master is fingerprinted in bounded
+    memory.
+    """
+    if detector is None:
+        try:
+            from .audio_sync_detector import ProfessionalSyncDetector
+        except ImportError:  # pragma: no cover - fallback for direct execution
+            from audio_sync_detector import ProfessionalSyncDetector
+        detector = ProfessionalSyncDetector(use_gpu=False)
+    audio = detector.load_audio(Path(path), max_seconds=max_seconds)
+    return landmarks_from_blocks(detector.iter_preprocessed_blocks(audio), detector.sample_rate,
+                                 n_fft=detector.n_fft, hop_length=detector.hop_length)
+
+
+class FingerprintCatalog:
+    """
+    Inverted index of master landmark hashes.
+
+    Usage:
+        catalog = FingerprintCatalog("/var/cache/sync/catalog")
+        catalog.add("/mnt/data/masters/ep101.mov")
+        best = catalog.identify("/mnt/data/incoming/final_v3.mov", top_k=3)
+    """
+
+    def __init__(self, catalog_dir: str = DEFAULT_CATALOG_DIR):
+        self.catalog_dir = os.path.abspath(catalog_dir)
+        self.db_path = os.path.join(self.catalog_dir, "catalog.sqlite3")
+        self._lock = threading.Lock()
+        self._segments: Dict[str, Tuple[np.ndarray, np.ndarray, np.ndarray]] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+        os.makedirs(self.catalog_dir, exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    # ------------------------------------------------------------------
+    # Segments
+    # ------------------------------------------------------------------
+
+    def _segment_files(self, name: str) -> Tuple[str, str, str]:
+        base = os.path.join(self.catalog_dir, name)
+        return f"{base}.hashes.npy", f"{base}.times.npy", f"{base}.masters.npy"
+
+    def _load_segments(self) -> List[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        with self._connect() as conn:
+            names = [r[0] for r in conn.execute("SELECT name FROM segments ORDER BY created")]
+        loaded = []
+        for name in names:
+            arrays = self._segments.get(name)
+            if arrays is None:
+                arrays = tuple(np.load(f, mmap_mode="r") for f in self._segment_files(name))
+                self._segments[name] = arrays
+            loaded.append(arrays)
+        for stale in set(self._segments) - set(names):
+            del self._segments[stale]
+        return loaded
+
+    def _write_segment(self, conn: sqlite3.Connection, hashes: np.ndarray, times: np.ndarray,
+                       masters: np.ndarray) -> str:
+        order = np.argsort(hashes, kind="stable")
+        name = f"seg_{int(time.time() * 1000)}_{uuid.uuid4().hex[:8]}"
+        for path, array in zip(self._segment_files(name), (hashes[order], times[order], masters[order])):
+            tmp = f"{path}.tmp.npy"
+            np.save(tmp, np.ascontiguousarray(array))
+            os.replace(tmp, path)
+        conn.execute("INSERT INTO segments (name, postings, created) VALUES (?, ?, ?)",
+                     (name, int(len(hashes)), time.time()))
+        return name
+
+    # ------------------------------------------------------------------
+    # Indexing
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _identity(path: str) -> Tuple[str, int, int]:
+        real = os.path.realpath(str(path))
+        st = os.stat(real)
+        return real, st.st_size, st.st_mtime_ns
+
+    def contains(self, path: str) -> bool:
+        """True when the current version of ``path`` is indexed."""
+        try:
+            ident = self._identity(path)
+        except OSError:
+            return False
+        with self._connect() as conn:
+            return conn.execute("SELECT 1 FROM masters WHERE path = ? AND size = ? AND mtime_ns = ? AND active = 1",
+                                ident).fetchone() is not None
+
+    def add(self, path: str, landmarks: Optional[Landmarks] = None) -> Optional[int]:
+        """
+        Index ``path`` as a master (its landmarks are extracted unless given).
+
+        Returns the master id, or None when this version is already indexed.
+        An earlier version of the same path is deactivated.
+        """
+        if self.contains(path):
+            return None
+        real, size, mtime_ns = self._identity(path)
+        if landmarks is None:
+            landmarks = landmarks_for_file(real)
+        with self._lock, self._connect() as conn:
+            conn.execute("UPDATE masters SET active = 0 WHERE path = ?", (real,))
+            cur = conn.execute(
+                "INSERT INTO masters (path, size, mtime_ns, frames, frame_rate, hash_count, added_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (real, size, mtime_ns, landmarks.frames, landmarks.frame_rate, len(landmarks), time.time()))
+            master_id = int(cur.lastrowid)
+            self._write_segment(conn, np.asarray(landmarks.hashes, dtype=np.uint32),
+                                np.asarray(landmarks.times, dtype=np.int32),
+                                np.full(len(landmarks), master_id, dtype=np.uint32))
+            conn.commit()
+            segment_count = conn.execute("SELECT COUNT(*) FROM segments").fetchone()[0]
+        logger.info(f"Catalog: indexed {os.path.basename(real)} ({len(landmarks)} hashes)")
+        if segment_count > MAX_SEGMENTS:
+            self.compact()
+        return master_id
+
+    def add_async(self, path: str) -> Future:
+        """Index ``path`` on a background thread (one at a time)."""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="fingerprint_catalog")
+        return self._executor.submit(self.add, path)
+
+    def remove(self, path: str) -> None:
+        with self._connect() as conn:
+            conn.execute("UPDATE masters SET active = 0 WHERE path = ?", (os.path.realpath(str(path)),))
+
+    def compact(self) -> None:
+        """Merge all segments into one and drop postings of inactive masters."""
+        with self._lock, self._connect() as conn:
+            names = [r[0] for r in conn.execute("SELECT name FROM segments ORDER BY created")]
+            if not names:
+                return
+            active = np.array([r[0] for r in conn.execute("SELECT id FROM masters WHERE active = 1")],
+                              dtype=np.uint32)
+            parts = [tuple(np.load(f) for f in self._segment_files(name)) for name in names]
+            hashes = np.concatenate([p[0] for p in parts])
+            times = np.concatenate([p[1] for p in parts])
+            masters = np.concatenate([p[2] for p in parts])
+            keep = np.isin(masters, active)
+            self._write_segment(conn, hashes[keep], times[keep], masters[keep])
+            conn.executemany("DELETE FROM segments WHERE name = ?", [(n,) for n in names])
+            conn.commit()
+        for name in names:
+            self._segments.pop(name, None)
+            for f in self._segment_files(name):
+                try:
+                    os.remove(f)
+                except OSError:
+                    pass
+
+    def masters(self) -> List[Dict]:
+        with self._connect() as conn:
+            rows = conn.execute("SELECT id, path, frames, frame_rate, hash_count, added_at FROM masters"
+                                " WHERE active = 1 ORDER BY path").fetchall()
+        return [{"master_id": r[0], "path": r[1], "duration": r[2] / r[3] if r[3] else 0.0,
+                 "hash_count": r[4], "added_at": r[5]} for r in rows]
+
+    # ------------------------------------------------------------------
+    # Identification
+    # ------------------------------------------------------------------
+
+    def match(self, query: Landmarks, top_k: int = 5,
+              max_occurrences: int = MAX_HASH_OCCURRENCES * 4) -> List[CatalogMatch]:
+        """Top masters for ``query`` landmarks, by votes for a single offset."""
+        if len(query) == 0:
+            return []
+        with self._lock:
+            segments = self._load_segments()
+        keys = []
+        q_hashes = np.asarray(query.hashes, dtype=np.uint32)
+        q_times = np.asarray(query.times, dtype=np.int64)
+        for hashes, times, masters in segments:
+            lo = np.searchsorted(hashes, q_hashes, side="left")
+            hi = np.searchsorted(hashes, q_hashes, side="right")
+            counts = hi - lo
+            use = (counts > 0) & (counts <= max_occurrences)
+            if not np.any(use):
+                continue
+            lo, counts, qt = lo[use], counts[use], q_times[use]
+            total = int(counts.sum())
+            idx = np.repeat(lo - np.concatenate(([0], np.cumsum(counts)[:-1])), counts) + np.arange(total)
+            deltas = times[idx].astype(np.int64) - np.repeat(qt, counts)
+            # One int64 key per (master, offset) vote
+            keys.append((masters[idx].astype(np.int64) << 32) + (deltas + (1 << 31)))
+        if not keys:
+            return []
+        unique, counts = np.unique(np.concatenate(keys), return_counts=True)
+        # Votes within ±1 frame of each (master, offset)
+        votes = counts.copy()
+        for step in (-1, 1):
+            pos = np.searchsorted(unique, unique + step)
+            pos = np.minimum(pos, len(unique) - 1)
+            votes += np.where(unique[pos] == unique + step, counts[pos], 0)
+        master_ids = unique >> 32
+
+        # Best offset per master, then the strongest masters
+        order = np.lexsort((-votes, master_ids))
+        first = np.concatenate(([True], master_ids[order][1:] != master_ids[order][:-1]))
+        best = order[first]
+        best = best[np.argsort(-votes[best], kind="stable")]
+
+        with self._connect() as conn:
+            info = {r[0]: r[1:] for r in conn.execute(
+                "SELECT id, path, frame_rate FROM masters WHERE active = 1")}
+        # Chance votes: a master that does not contain the dub still collects a few
+        background = float(np.median(votes[best])) if len(best) > 1 else 0.0
+        results: List[CatalogMatch] = []
+        for i in best:
+            master_id = int(master_ids[i])
+            if master_id not in info:
+                continue
+            path, frame_rate = info[master_id]
+            frames = float((unique[i] & 0xFFFFFFFF) - (1 << 31))
+            v = int(votes[i])
+            distinct = 1.0 - (background + 1.0) / (v + 1.0)
+            results.append(CatalogMatch(
+                master_id=master_id, path=path, offset_seconds=frames / frame_rate, votes=v,
+                matched_fraction=v / float(len(query)),
+                confidence=float(max(0.0, distinct) * min(v / 20.0, 1.0))))
+            if len(results) >= top_k:
+                break
+        return results
+
+    def identify(self, path: str, top_k: int = 5,
+                 query_seconds: Optional[float] = DEFAULT_QUERY_SECONDS) -> List[CatalogMatch]:
+        """Top masters for the dub at ``path`` (fingerprinting its first ``query_seconds``)."""
+        return self.match(landmarks_for_file(path, max_seconds=query_seconds), top_k=top_k)
+
+
+_default_catalog: Optional[FingerprintCatalog] = None
+_default_lock = threading.Lock()
+
+
+def configure_fingerprint_catalog(catalog_dir: Optional[str] = None) -> FingerprintCatalog:
+    """Set the process-wide catalog (e.g. from application settings)."""
+    global _default_catalog
+    _default_catalog = FingerprintCatalog(catalog_dir or DEFAULT_CATALOG_DIR)
+    return _default_catalog
+
+
+def get_fingerprint_catalog() -> FingerprintCatalog:
+    """Process-wide catalog, configured from the environment on first use."""
+    with _default_lock:
+        if _default_catalog is None:
+            configure_fingerprint_catalog(os.environ.get("SYNC_FINGERPRINT_CATALOG_DIR"))
+        return _default_catalog
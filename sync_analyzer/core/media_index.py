@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+"""
+Incremental SQLite index of a media tree.
+
+Listing a delivery mount with ``os.listdir`` (plus one more ``listdir`` per
+subdirectory for its item count) costs seconds once the tree holds hundreds
+of thousands of files, and recursive searches or master/dub pair discovery
+(``rglob``) cost far more. ``MediaIndex`` walks the tree with ``os.scandir``
+and stores directories and media files in SQLite. A rescan re-reads only
+directories whose mtime changed, since adding, removing or renaming an entry
+updates its parent's mtime, and reuses the stored children of every other
+directory. Listings, name/extension searches and pair discovery are then
+answered from the index.
+
+A file rewritten in place does not change its directory's mtime, so its
+stored size/mtime can lag until ``refresh(full=True)``.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+UNSCANNED_MTIME_NS = -1  # placeholder row for a directory seen in its parent but not yet scanned
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS dirs (
+    path TEXT PRIMARY KEY, parent TEXT, name TEXT NOT NULL,
+    mtime_ns INTEGER NOT NULL, ctime REAL NOT NULL, item_count INTEGER NOT NULL, scanned_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS dirs_parent ON dirs (parent);
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY, dir TEXT NOT NULL, name TEXT NOT NULL, ext TEXT NOT NULL,
+    size INTEGER NOT NULL, mtime REAL NOT NULL, ctime REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS files_dir ON files (dir);
+CREATE INDEX IF NOT EXISTS files_ext ON files (ext);
+CREATE INDEX IF NOT EXISTS files_name ON files (name COLLATE NOCASE);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value REAL NOT NULL);
+"""
+
+
+@dataclass
+class IndexedDir:
+    path: str
+    name: str
+    item_count: int
+    mtime: float
+    ctime: float
+
+
+@dataclass
+class IndexedFile:
+    path: str
+    name: str
+    ext: str
+    size: int
+    mtime: float
+    ctime: float
+
+    @property
+    def dir(self) -> str:
+        return os.path.dirname(self.path)
+
+
+@dataclass
+class RefreshStats:
+    dirs_scanned: int = 0
+    dirs_unchanged: int = 0
+    dirs_removed: int = 0
+    seconds: float = 0.0
+
+
+def _escape_like(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+class MediaIndex:
+    """
+    Directory/file index of one tree, kept current by mtime-driven rescans.
+
+    Usage:
+        index = MediaIndex("/mnt/data", "/var/cache/sync/index.sqlite3", extensions={".mov", ".wav"})
+        index.refresh()
+        files, dirs = index.list_dir("/mnt/data/show/ep101")
+        hits = index.search("ep101", extensions=[".mov"])
+    """
+
+    def __init__(self, root: str, db_path: str, extensions: Optional[Iterable[str]] = None):
+        self.root = os.path.realpath(root)
+        self.db_path = os.path.abspath(db_path)
+        self.extensions = {e.lower() for e in extensions} if extensions else None
+        self._write_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.last_refresh: Optional[float] = None
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def covers(self, path: str) -> bool:
+        real = os.path.realpath(path)
+        return real == self.root or real.startswith(self.root + os.sep)
+
+    @property
+    def ready(self) -> bool:
+        """True once a full walk of this root has completed (persisted across restarts)."""
+        with self._connect() as conn:
+            return conn.execute("SELECT 1 FROM meta WHERE key = ?", (self._full_refresh_key,)).fetchone() is not None
+
+    @property
+    def _full_refresh_key(self) -> str:
+        # Per root: a database reused for another tree is not ready until that tree is walked
+        return f"full_refresh:{self.root}"
+
+    # ------------------------------------------------------------------
+    # Scanning
+    # ------------------------------------------------------------------
+
+    def refresh(self, path: Optional[str] = None, full: bool = False, recursive: bool = True) -> RefreshStats:
+        """
+        Bring the index up to date below ``path`` (default: the root).
+
+        Directories whose mtime is unchanged keep their stored entries unless
+        ``full`` is set; with ``recursive`` False only ``path`` itself is checked.
+        """
+        stats = RefreshStats()
+        start = time.perf_counter()
+        top = os.path.realpath(path or self.root)
+        if not self.covers(top):
+            raise ValueError(f"{path} is outside the indexed root {self.root}")
+        with self._connect() as conn:
+            pending = [top]
+            while pending:
+                current = pending.pop()
+                # Lock per directory so listings are not held up by a full walk
+                with self._write_lock:
+                    subdirs = self._refresh_dir(conn, current, full, stats)
+                    conn.commit()
+                if recursive:
+                    pending.extend(subdirs)
+            if top == self.root and recursive:
+                self.last_refresh = time.time()
+                with self._write_lock:
+                    conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                                 (self._full_refresh_key, self.last_refresh))
+                    conn.commit()
+        stats.seconds = time.perf_counter() - start
+        return stats
+
+    def _refresh_dir(self, conn: sqlite3.Connection, path: str, full: bool, stats: RefreshStats) -> List[str]:
+        """Rescan one directory if it changed; return its subdirectories."""
+        try:
+            st = os.stat(path)
+        except OSError:
+            self._remove_tree(conn, path)
+            stats.dirs_removed += 1
+            return []
+        row = conn.execute("SELECT mtime_ns FROM dirs WHERE path = ?", (path,)).fetchone()
+        if row is not None and row[0] == st.st_mtime_ns and not full:
+            stats.dirs_unchanged += 1
+            return [r[0] for r in conn.execute("SELECT path FROM dirs WHERE parent = ?", (path,))]
+
+        stats.dirs_scanned += 1
+        subdirs: List[str] = []
+        files: List[Tuple] = []
+        item_count = 0
+        try:
+            with os.scandir(path) as it:
+                for entry in it:
+                    item_count += 1
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            subdirs.append(entry.path)
+                        elif entry.is_file():
+                            ext = os.path.splitext(entry.name)[1].lower()
+                            if self.extensions is None or ext in self.extensions:
+                                est = entry.stat()
+                                files.append((entry.path, path, entry.name, ext, est.st_size,
+                                              est.st_mtime, est.st_ctime))
+                    except OSError as e:
+                        logger.debug(f"Index skipped {entry.path}: {e}")
+        except OSError as e:
+            logger.warning(f"Index could not scan {path}: {e}")
+            return []
+
+        # Subdirectories that vanished since the last scan
+        known = {r[0] for r in conn.execute("SELECT path FROM dirs WHERE parent = ?", (path,))}
+        for gone in known - set(subdirs):
+            self._remove_tree(conn, gone)
+            stats.dirs_removed += 1
+        # New subdirectories get a placeholder so a later walk or listing scans them
+        conn.executemany(
+            "INSERT OR IGNORE INTO dirs (path, parent, name, mtime_ns, ctime, item_count, scanned_at)"
+            " VALUES (?, ?, ?, ?, 0, 0, 0)",
+            [(d, path, os.path.basename(d), UNSCANNED_MTIME_NS) for d in subdirs if d not in known])
+
+        parent = os.path.dirname(path) if path != self.root else None
+        conn.execute(
+            "INSERT OR REPLACE INTO dirs (path, parent, name, mtime_ns, ctime, item_count, scanned_at)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (path, parent, os.path.basename(path), st.st_mtime_ns, st.st_ctime, item_count, time.time()),
+        )
+        conn.execute("DELETE FROM files WHERE dir = ?", (path,))
+        conn.executemany("INSERT INTO files (path, dir, name, ext, size, mtime, ctime) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                         files)
+        return subdirs
+
+    @staticmethod
+    def _remove_tree(conn: sqlite3.Connection, path: str) -> None:
+        prefix = _escape_like(path.rstrip(os.sep) + os.sep) + "%"
+        conn.execute("DELETE FROM files WHERE dir = ? OR dir LIKE ? ESCAPE '\\'", (path, prefix))
+        conn.execute("DELETE FROM dirs WHERE path = ? OR path LIKE ? ESCAPE '\\'", (path, prefix))
+
+    def start(self, interval_seconds: float = 60.0) -> "MediaIndex":
+        """Refresh the whole tree now and then every ``interval_seconds`` on a daemon thread."""
+        if self._thread is not None:
+            return self
+
+        def _loop():
+            while not self._stop.is_set():
+                try:
+                    stats = self.refresh()
+                    logger.info(f"Media index refreshed in {stats.seconds:.2f}s "
+                                f"({stats.dirs_scanned} scanned, {stats.dirs_unchanged} unchanged)")
+                except Exception as e:
+                    logger.warning(f"Media index refresh failed: {e}")
+                self._stop.wait(interval_seconds)
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=_loop, name="media_index", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _file(row: Sequence) -> IndexedFile:
+        return IndexedFile(path=row[0], name=row[1], ext=row[2], size=row[3], mtime=row[4], ctime=row[5])
+
+    def list_dir(self, path: str) -> Tuple[List[IndexedFile], List[IndexedDir]]:
+        """Media files and subdirectories of ``path`` (after a cheap mtime check of ``path``)."""
+        real = os.path.realpath(path)
+        self.refresh(real, recursive=False)
+        with self._connect() as conn:
+            unscanned = [r[0] for r in conn.execute(
+                "SELECT path FROM dirs WHERE parent = ? AND mtime_ns = ?", (real, UNSCANNED_MTIME_NS))]
+        for subdir in unscanned:
+            self.refresh(subdir, recursive=False)
+        with self._connect() as conn:
+            files = [self._file(r) for r in conn.execute(
+                "SELECT path, name, ext, size, mtime, ctime FROM files WHERE dir = ? ORDER BY name COLLATE NOCASE",
+                (real,))]
+            dirs = [IndexedDir(path=r[0], name=r[1], item_count=r[2], mtime=r[3] / 1e9, ctime=r[4])
+                    for r in conn.execute(
+                        "SELECT path, name, item_count, mtime_ns, ctime FROM dirs WHERE parent = ?"
+                        " ORDER BY name COLLATE NOCASE", (real,))]
+        return files, dirs
+
+    def search(self, query: Optional[str] = None, extensions: Optional[Iterable[str]] = None,
+               under: Optional[str] = None, limit: int = 500) -> List[IndexedFile]:
+        """
+        Files whose name contains ``query`` (case-insensitive), optionally by
+        extension, below ``under`` (default: the index root).
+        """
+        clauses, params = [], []
+        if query:
+            clauses.append("name LIKE ? ESCAPE '\\'")
+            params.append(f"%{_escape_like(query)}%")
+        exts = [e.lower() if e.startswith(".") else f".{e.lower()}" for e in (extensions or [])]
+        if exts:
+            clauses.append(f"ext IN ({', '.join('?' * len(exts))})")
+            params.extend(exts)
+        real = os.path.realpath(under or self.root)
+        clauses.append("(dir = ? OR dir LIKE ? ESCAPE '\\')")
+        params.extend([real, _escape_like(real.rstrip(os.sep) + os.sep) + "%"])
+        where = f"WHERE {' AND '.join(clauses)}"
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT path, name, ext, size, mtime, ctime FROM files {where} ORDER BY path LIMIT ?",
+                (*params, int(limit)))
+            return [self._file(r) for r in rows]
+
+    def find_pairs(self, pattern_pairs: Sequence[Tuple[str, str]],
+                   under: Optional[str] = None) -> List[Tuple[str, str]]:
+        """
+        Master/dub pairs: files matching the master and dub glob patterns in
+        the same directory (the ``find_file_pairs`` rule, answered by one join),
+        below ``under`` (default: the index root).
+        """
+        pairs: List[Tuple[str, str]] = []
+        real = os.path.realpath(under or self.root)
+        scope = " AND (m.dir = ? OR m.dir LIKE ? ESCAPE '\\')"
+        params = [real, _escape_like(real.rstrip(os.sep) + os.sep) + "%"]
+        with self._connect() as conn:
+            for master_pattern, dub_pattern in pattern_pairs:
+                rows = conn.execute(
+                    "SELECT m.path, d.path FROM files m JOIN files d ON d.dir = m.dir"
+                    " WHERE m.name GLOB ? AND d.name GLOB ? AND m.path != d.path" + scope +
+                    " ORDER BY m.path, d.path",
+                    (master_pattern, dub_pattern, *params))
+                pairs.extend((m, d) for m, d in rows)
+        return pairs
+
+    def counts(self) -> Dict[str, int]:
+        with self._connect() as conn:
+            return {
+                "directories": conn.execute("SELECT COUNT(*) FROM dirs").fetchone()[0],
+                "files": conn.execute("SELECT COUNT(*) FROM files").fetchone()[0],
+            }
+
+
+_default_index: Optional[MediaIndex] = None
+
+
+def configure_media_index(root: str, db_path: str, extensions: Optional[Iterable[str]] = None,
+                          interval_seconds: Optional[float] = 60.0) -> MediaIndex:
+    """Create the process-wide index (e.g. over MOUNT_PATH) and start background refreshes."""
+    global _default_index
+    if _default_index is not None:
+        _default_index.stop()
+    _default_index = MediaIndex(root, db_path, extensions)
+    if interval_seconds:
+        _default_index.start(interval_seconds)
+    return _default_index
+
+
+def get_media_index() -> Optional[MediaIndex]:
+    """Process-wide index, or None when none is configured."""
+    return _default_index
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Single-pass multi-rendition ingest for source media.
+
+One analysis used to demux and decode each source up to three times: 22050 Hz
+mono for the core detectors, 16 kHz mono for the AI embeddings and 48 kHz
+stereo for browser proxies. On multi-GB ProRes/MXF sources the container
+demux and decode dominates, so ``ingest_media`` runs ffmpeg once per source
+with one output per rendition. Each rendition is stored in the decoded-PCM
+cache under the same key the loaders look up, so they find it without
+decoding. An artifact manifest per source records what was produced.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Dict, Iterable, List, Optional, Sequence
+
+try:
+    from .pcm_cache import PCMCache, get_pcm_cache
+    from .waveform_peaks import ensure_peaks
+except ImportError:  # pragma: no cover - fallback for direct execution
+    from pcm_cache import PCMCache, get_pcm_cache
+    from waveform_peaks import ensure_peaks
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Rendition:
+    """One decoded audio rendition of a source."""
+    name: str
+    sample_rate: int
+    channels: int  # 1 = mono downmix, 2 = stereo
+    codec: str = "pcm_f32le"
+
+    @property
+    def channel_key(self) -> str:
+        """Channel selection used for the PCM cache key."""
+        return "mono" if self.channels == 1 else "stereo" if self.channels == 2 else f"{self.channels}ch"
+
+
+ANALYSIS_RENDITION = Rendition("analysis", 22050, 1)   # core detectors
+AI_RENDITION = Rendition("ai", 16000, 1)               # wav2vec2 / YAMNet embeddings
+PROXY_RENDITION = Rendition("proxy", 48000, 2, "pcm_s16le")  # browser playback / waveform
+
+_AI_METHODS = {"ai"}
+
+
+def renditions_for_methods(methods: Iterable[str], sample_rate: int = ANALYSIS_RENDITION.sample_rate,
+                           include_proxy: bool = False) -> List[Rendition]:
+    """Renditions needed by the requested analysis methods (by method name)."""
+    names = {str(getattr(m, "value", m)).lower() for m in methods}
+    renditions: List[Rendition] = []
+    if names - _AI_METHODS:
+        renditions.append(Rendition(ANALYSIS_RENDITION.name, int(sample_rate), 1))
+    if names & _AI_METHODS:
+        renditions.append(AI_RENDITION)
+    if include_proxy:
+        renditions.append(PROXY_RENDITION)
+    return renditions
+
+
+@dataclass
+class ArtifactManifest:
+    """Renditions produced for one source file (identity: path, size, mtime)."""
+    source: str
+    size: int
+    mtime_ns: int
+    created: float = field(default_factory=time.time)
+    renditions: Dict[str, Dict] = field(default_factory=dict)
+
+    def path_for(self, name: str) -> Optional[str]:
+        info = self.renditions.get(name)
+        if info and os.path.exists(info["path"]):
+            return info["path"]
+        return None
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+def build_ingest_command(source: str, outputs: Sequence[tuple], ffmpeg_bin: str = "ffmpeg") -> List[str]:
+    """
+    ffmpeg command decoding ``source`` once into several WAV outputs.
+
+    Args:
+        source: Input media path
+        outputs: (Rendition, output_wav_path) pairs
+
+    Every output uses ffmpeg's default audio stream selection, like the
+    single-output decoders it replaces.
+    """
+    cmd = [ffmpeg_bin, "-hide_banner", "-loglevel", "error", "-y", "-i", source]
+    for rendition, out_path in outputs:
+        cmd += ["-vn", "-sn", "-dn",
+                "-ac", str(rendition.channels),
+                "-ar", str(rendition.sample_rate),
+                "-c:a", rendition.codec,
+                out_path]
+    return cmd
+
+
+def _source_identity(source: str) -> Optional[tuple]:
+    try:
+        real = os.path.realpath(source)
+        st = os.stat(real)
+    except OSError:
+        return None
+    return real, st.st_size, st.st_mtime_ns
+
+
+def manifest_path(cache: PCMCache, source: str) -> Optional[str]:
+    ident = _source_identity(source)
+    if ident is None:
+        return None
+    digest = hashlib.sha1(f"{ident[0]}|{ident[1]}|{ident[2]}".encode("utf-8")).hexdigest()
+    return os.path.join(cache.cache_dir, "manifests", f"{digest}.json")
+
+
+def load_manifest(source: str, cache: Optional[PCMCache] = None) -> Optional[ArtifactManifest]:
+    """Manifest for the current version of ``source``, or None."""
+    cache = cache or get_pcm_cache()
+    if cache is None:
+        return None
+    path = manifest_path(cache, source)
+    if path is None or not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r") as fh:
+            return ArtifactManifest(**json.load(fh))
+    except (OSError, ValueError, TypeError):
+        return None
+
+
+def _save_manifest(cache: PCMCache, manifest: ArtifactManifest) -> None:
+    path = manifest_path(cache, manifest.source)
+    if path is None:
+        return
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as fh:
+        json.dump(manifest.to_dict(), fh, indent=2)
+    os.replace(tmp, path)
+
+
+def ingest_media(source: str, renditions: Sequence[Rendition],
+                 cache: Optional[PCMCache] = None,
+                 ffmpeg_bin: Optional[str] = None,
+                 timeout: Optional[float] = None,
+                 peaks: bool = True) -> Optional[ArtifactManifest]:
+    """
+    Decode ``source`` once into every missing rendition and register them.
+
+    Renditions already in the PCM cache are not decoded again. With ``peaks``
+    the waveform peak pyramid is built from the analysis rendition. Returns
+    the updated manifest, or None when the cache is disabled, ffmpeg is
+    missing, or the decode fails (callers then fall back to their own loaders).
+    """
+    cache = cache or get_pcm_cache()
+    ffmpeg_bin = ffmpeg_bin or shutil.which("ffmpeg")
+    ident = _source_identity(source)
+    if cache is None or ffmpeg_bin is None or ident is None:
+        return None
+
+    manifest = load_manifest(source, cache) or ArtifactManifest(source=ident[0], size=ident[1], mtime_ns=ident[2])
+    missing = []
+    decoded = set()
+    for rendition in renditions:
+        # Renditions sharing a cache key (rate + channels) are decoded once
+        key = (rendition.sample_rate, rendition.channel_key)
+        if key in decoded:
+            continue
+        decoded.add(key)
+        entry = cache.lookup(source, rendition.sample_rate, rendition.channel_key)
+        if entry is not None:
+            manifest.renditions[rendition.name] = {
+                "path": entry, "sample_rate": rendition.sample_rate, "channels": rendition.channels,
+            }
+        else:
+            missing.append(rendition)
+
+    if missing:
+        work_dir = tempfile.mkdtemp(prefix="sync_ingest_")
+        try:
+            outputs = [(r, os.path.join(work_dir, f"{r.name}_{r.sample_rate}_{r.channels}.wav")) for r in missing]
+            cmd = build_ingest_command(source, outputs, ffmpeg_bin)
+            logger.info(f"Ingesting {os.path.basename(source)} -> {', '.join(r.name for r in missing)}")
+            start = time.perf_counter()
+            proc = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
+            if proc.returncode != 0:
+                logger.error(f"ffmpeg ingest failed for {source}: {proc.stderr.strip()}")
+                return None
+            for rendition, wav in outputs:
+                entry = cache.put_file(source, rendition.sample_rate, wav, channels=rendition.channel_key)
+                if entry is None:
+                    logger.warning(f"Rendition {rendition.name} of {source} not cached (budget or write error)")
+                    continue
+                manifest.renditions[rendition.name] = {
+                    "path": entry, "sample_rate": rendition.sample_rate, "channels": rendition.channels,
+                }
+            logger.info(f"Ingest of {os.path.basename(source)} took {time.perf_counter() - start:.2f}s")
+        except (OSError, subprocess.SubprocessError) as e:
+            logger.error(f"ffmpeg ingest failed for {source}: {e}")
+            return None
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    analysis = manifest.renditions.get(ANALYSIS_RENDITION.name)
+    if peaks and analysis is not None:
+        try:
+            peaks_file = ensure_peaks(source, analysis["sample_rate"], cache)
+            if peaks_file is not None:
+                manifest.renditions["peaks"] = {"path": peaks_file, "sample_rate": analysis["sample_rate"],
+                                                "channels": 1}
+        except (OSError, ValueError) as e:
+            logger.warning(f"Peak pyramid for {source} not built: {e}")
+
+    try:
+        _save_manifest(cache, manifest)
+    except OSError as e:
+        logger.warning(f"Could not write artifact manifest for {source}: {e}")
+    return manifest
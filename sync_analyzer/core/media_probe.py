@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+"""
+Unified media probe service.
+
+Durations, channel layouts, timecode and frame rate used to come from
+separate ffprobe runs in the API service, the chunked detector, the web UI,
+the repair endpoints and the SMPTE helpers, often several times for the same
+file in one request. ``MediaProbeService`` runs one ``-show_format
+-show_streams`` probe per file version and keeps the JSON in SQLite keyed by
+(resolved path, size, mtime), so a file is probed once until it changes.
+Concurrent callers asking for the same file wait on a single in-flight probe.
+
+Configuration (environment, read by ``get_media_probe``):
+    SYNC_PROBE_CACHE      "0" keeps results in memory only (no SQLite file)
+    SYNC_PROBE_CACHE_DB   database path (default ~/.cache/sync_analyzer/probe.sqlite3)
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import shutil
+import sqlite3
+import subprocess
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB_PATH = os.path.join(os.path.expanduser("~"), ".cache", "sync_analyzer", "probe.sqlite3")
+_TIMECODE_TAGS = ("timecode", "time_code", "tc")
+
+
+class ProbeError(RuntimeError):
+    """ffprobe could not read the file."""
+
+
+def _parse_rate(value: Optional[str]) -> Optional[float]:
+    """'24000/1001' -> 23.976; None for missing or 0/0 rates."""
+    if not value:
+        return None
+    try:
+        if "/" in str(value):
+            num, den = str(value).split("/", 1)
+            return float(num) / float(den) if float(den) else None
+        return float(value) or None
+    except ValueError:
+        return None
+
+
+@dataclass
+class MediaProbe:
+    """ffprobe ``format``/``streams`` for one version of a file, with typed accessors."""
+    path: str
+    size: int
+    mtime_ns: int
+    data: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def format(self) -> Dict[str, Any]:
+        return self.data.get("format") or {}
+
+    @property
+    def streams(self) -> List[Dict[str, Any]]:
+        return self.data.get("streams") or []
+
+    @property
+    def audio_streams(self) -> List[Dict[str, Any]]:
+        return [s for s in self.streams if s.get("codec_type") == "audio"]
+
+    @property
+    def video_streams(self) -> List[Dict[str, Any]]:
+        return [s for s in self.streams if s.get("codec_type") == "video"]
+
+    @property
+    def duration(self) -> float:
+        """Container duration in seconds (longest stream when the container has none)."""
+        try:
+            value = float(self.format.get("duration") or 0.0)
+        except (TypeError, ValueError):
+            value = 0.0
+        if value > 0:
+            return value
+        durations = []
+        for s in self.streams:
+            try:
+                durations.append(float(s.get("duration") or 0.0))
+            except (TypeError, ValueError):
+                pass
+        return max(durations, default=0.0)
+
+    @property
+    def audio_layout(self) -> Dict[str, Any]:
+        """Audio streams and channel layouts (the ``probe_audio_layout`` shape)."""
+        streams = [
+            {
+                "index": s.get("index"),
+                "codec_name": s.get("codec_name"),
+                "channels": int(s.get("channels", 0) or 0),
+                "channel_layout": s.get("channel_layout") or "",
+            }
+            for s in self.audio_streams
+        ]
+        return {
+            "streams": streams,
+            "has_multichannel_stream": any(s["channels"] > 1 for s in streams),
+            "has_multi_mono": sum(1 for s in streams if s["channels"] == 1) > 1,
+        }
+
+    @property
+    def frame_rate(self) -> Optional[float]:
+        """Frame rate of the first video stream (r_frame_rate, then avg_frame_rate)."""
+        for s in self.video_streams:
+            rate = _parse_rate(s.get("r_frame_rate")) or _parse_rate(s.get("avg_frame_rate"))
+            if rate:
+                return rate
+        return None
+
+    @property
+    def timecode(self) -> Optional[str]:
+        """Start timecode from the container tags, else from any stream (e.g. a tmcd track)."""
+        for tags in [self.format.get("tags") or {}] + [s.get("tags") or {} for s in self.streams]:
+            for key, value in tags.items():
+                if str(key).lower() in _TIMECODE_TAGS and value:
+                    return str(value)
+        return None
+
+    @property
+    def sample_rate(self) -> Optional[int]:
+        """Sample rate of the first audio stream."""
+        for s in self.audio_streams:
+            try:
+                return int(s.get("sample_rate") or 0) or None
+            except (TypeError, ValueError):
+                return None
+        return None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"path": self.path, "size": self.size, "mtime_ns": self.mtime_ns, **self.data}
+
+
+class MediaProbeService:
+    """
+    Probe-once store of ffprobe results keyed by file identity.
+
+    Usage:
+        probes = MediaProbeService("/var/cache/sync/probe.sqlite3")
+        seconds = probes.duration("/mnt/data/master.mov")
+        layout = probes.probe("/mnt/data/dub.mxf").audio_layout
+    """
+
+    def __init__(self, db_path: Optional[str] = DEFAULT_DB_PATH, ffprobe_bin: Optional[str] = None,
+                 timeout: float = 30.0, memory_entries: int = 4096):
+        self.db_path = os.path.abspath(db_path) if db_path else None
+        self.ffprobe_bin = ffprobe_bin or shutil.which("ffprobe") or "ffprobe"
+        self.timeout = timeout
+        self.memory_entries = int(memory_entries)
+        self._memory: "OrderedDict[Tuple[str, int, int], MediaProbe]" = OrderedDict()
+        self._inflight: Dict[Tuple[str, int, int], Future] = {}
+        self._lock = threading.Lock()
+        if self.db_path:
+            os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+            with self._connect() as conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS probes ("
+                    " path TEXT PRIMARY KEY, size INTEGER NOT NULL, mtime_ns INTEGER NOT NULL,"
+                    " data TEXT NOT NULL, probed_at REAL NOT NULL)"
+                )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    @staticmethod
+    def _identity(path: str) -> Tuple[str, int, int]:
+        real = os.path.realpath(str(path))
+        try:
+            st = os.stat(real)
+        except OSError as e:
+            raise ProbeError(f"cannot stat {path}: {e}") from e
+        return real, st.st_size, st.st_mtime_ns
+
+    # ------------------------------------------------------------------
+    # Probing
+    # ------------------------------------------------------------------
+
+    def probe(self, path: str) -> MediaProbe:
+        """Probe result for the current version of ``path``. Raises ProbeError."""
+        ident = self._identity(path)
+        with self._lock:
+            hit = self._memory.get(ident)
+            if hit is not None:
+                self._memory.move_to_end(ident)
+                return hit
+            future = self._inflight.get(ident)
+            owner = future is None
+            if owner:
+                future = self._inflight[ident] = Future()
+        if not owner:
+            return future.result()
+
+        try:
+            result = self._load(ident) or self._run_probe(ident)
+        except BaseException as e:
+            with self._lock:
+                self._inflight.pop(ident, None)
+            future.set_exception(e)
+            raise
+        with self._lock:
+            self._inflight.pop(ident, None)
+            self._memory[ident] = result
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+        future.set_result(result)
+        return result
+
+    def cached(self, path: str) -> Optional[MediaProbe]:
+        """Stored probe of the current version of ``path`` without running ffprobe, or None."""
+        try:
+            ident = self._identity(path)
+        except ProbeError:
+            return None
+        with self._lock:
+            hit = self._memory.get(ident)
+        if hit is None:
+            hit = self._load(ident)
+            if hit is not None:
+                with self._lock:
+                    self._memory[ident] = hit
+                    while len(self._memory) > self.memory_entries:
+                        self._memory.popitem(last=False)
+        return hit
+
+    def _load(self, ident: Tuple[str, int, int]) -> Optional[MediaProbe]:
+        if not self.db_path:
+            return None
+        try:
+            with self._connect() as conn:
+                row = conn.execute(
+                    "SELECT data FROM probes WHERE path = ? AND size = ? AND mtime_ns = ?", ident
+                ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"Probe cache read failed: {e}")
+            return None
+        if row is None:
+            return None
+        return MediaProbe(*ident, data=json.loads(row[0]))
+
+    def _run_probe(self, ident: Tuple[str, int, int]) -> MediaProbe:
+        cmd = [self.ffprobe_bin, "-v", "quiet", "-print_format", "json", "-show_format", "-show_streams", ident[0]]
+        try:
+            proc = subprocess.run(cmd, capture_output=True, text=True, timeout=self.timeout)
+        except (OSError, subprocess.SubprocessError) as e:
+            raise ProbeError(f"ffprobe failed for {ident[0]}: {e}") from e
+        if proc.returncode != 0:
+            raise ProbeError(f"ffprobe failed for {ident[0]}: {proc.stderr.strip()}")
+        try:
+            data = json.loads(proc.stdout or "{}")
+        except ValueError as e:
+            raise ProbeError(f"ffprobe returned invalid JSON for {ident[0]}: {e}") from e
+        data = {"format": data.get("format") or {}, "streams": data.get("streams") or []}
+        if self.db_path:
+            try:
+                with self._connect() as conn:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO probes (path, size, mtime_ns, data, probed_at) VALUES (?, ?, ?, ?, ?)",
+                        (*ident, json.dumps(data), time.time()),
+                    )
+            except sqlite3.Error as e:
+                logger.warning(f"Probe cache write failed: {e}")
+        return MediaProbe(*ident, data=data)
+
+    def invalidate(self, path: str) -> None:
+        """Forget any stored probe of ``path``."""
+        real = os.path.realpath(str(path))
+        with self._lock:
+            for ident in [k for k in self._memory if k[0] == real]:
+                del self._memory[ident]
+        if self.db_path:
+            with self._connect() as conn:
+                conn.execute("DELETE FROM probes WHERE path = ?", (real,))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+        if self.db_path:
+            with self._connect() as conn:
+                conn.execute("DELETE FROM probes")
+
+    # ------------------------------------------------------------------
+    # Typed accessors (failures map to empty values, like the helpers they replace)
+    # ------------------------------------------------------------------
+
+    def _try_probe(self, path: str) -> Optional[MediaProbe]:
+        try:
+            return self.probe(path)
+        except ProbeError as e:
+            logger.debug(str(e))
+            return None
+
+    def duration(self, path: str) -> float:
+        probe = self._try_probe(path)
+        return probe.duration if probe else 0.0
+
+    def audio_layout(self, path: str) -> Dict[str, Any]:
+        probe = self._try_probe(path)
+        return probe.audio_layout if probe else {"streams": [], "has_multichannel_stream": False,
+                                                 "has_multi_mono": False}
+
+    def timecode(self, path: str) -> Optional[str]:
+        probe = self._try_probe(path)
+        return probe.timecode if probe else None
+
+    def frame_rate(self, path: str) -> Optional[float]:
+        probe = self._try_probe(path)
+        return probe.frame_rate if probe else None
+
+
+_default_service: Optional[MediaProbeService] = None
+_default_lock = threading.Lock()
+
+
+def configure_media_probe(db_path: Optional[str] = None, enabled: bool = True) -> MediaProbeService:
+    """Set the process-wide probe service (e.g. from application settings).
+
+    With ``enabled`` False results are kept in memory only.
+    """
+    global _default_service
+    try:
+        service = MediaProbeService(db_path or DEFAULT_DB_PATH if enabled else None)
+    except (OSError, sqlite3.Error) as e:
+        logger.warning(f"Probe cache database unavailable, using memory only: {e}")
+        service = MediaProbeService(None)
+    _default_service = service
+    return service
+
+
+def get_media_probe() -> MediaProbeService:
+    """Process-wide probe service, configured from the environment on first use."""
+    with _default_lock:
+        if _default_service is None:
+            enabled = os.environ.get("SYNC_PROBE_CACHE", "1").strip().lower() not in {"0", "false", "no", "off"}
+            configure_media_probe(os.environ.get("SYNC_PROBE_CACHE_DB"), enabled=enabled)
+        return _default_service
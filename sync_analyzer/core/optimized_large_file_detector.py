@@ -13,22 +13,49 @@ import soundfile as sf
 import subprocess
 import tempfile
 import logging
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
 from contextlib import nullcontext
 from pathlib import Path
-from typing import Dict, List, Tuple, Optional, Any
+from typing import Dict, List, Tuple, Optional, Any, Union
 from datetime import datetime
 
+try:
+    from .correlation_engine import correlate_peak, summarize_correlation, seconds_to_lag
+    from .chunk_reader import ChunkWindowReader, is_npy, open_pcm, pcm_duration
+    from .media_probe import get_media_probe
+    from .pcm_cache import get_pcm_cache, write_npy_from_file
+    from .pcm_stream import MappedPCM, PCMStream, StreamingWindowReader, build_pipe_command
+    from .sparse_decode import DEFAULT_MAX_COVERAGE, decode_windows_to_npy, plan_spans, span_coverage
+except ImportError:  # pragma: no cover - fallback for direct execution
+    from correlation_engine import correlate_peak, summarize_correlation, seconds_to_lag
+    from chunk_reader import ChunkWindowReader, is_npy, open_pcm, pcm_duration
+    from media_probe import get_media_probe
+    from pcm_cache import get_pcm_cache, write_npy_from_file
+    from pcm_stream import MappedPCM, PCMStream, StreamingWindowReader, build_pipe_command
+    from sparse_decode import DEFAULT_MAX_COVERAGE, decode_windows_to_npy, plan_spans, span_coverage
+
 class OptimizedLargeFileDetector:
     """
     Intelligent multi-pass sync detector for large video files using adaptive chunking strategies
     """
 
-    def __init__(self, gpu_enabled=True, chunk_size=30.0, max_chunks=10, enable_multi_pass=True):
+    def __init__(self, gpu_enabled=True, chunk_size=30.0, max_chunks=10, enable_multi_pass=True,
+                 max_lag_seconds=None, workers=1, stream_decode=False, sparse_decode=False,
+                 create_temp_dir=True):
         self.gpu_enabled = gpu_enabled
         self.chunk_size = chunk_size  # seconds
         self.max_chunks = max_chunks
+        self.max_lag_seconds = max_lag_seconds  # Optional bound on per-chunk lag search (None = full window)
+        self.workers = max(1, int(workers or 1))  # >1 analyzes chunks in a process pool
+        self._chunk_pool = None
+        self.stream_decode = stream_decode  # Overlap pass 1 with an ffmpeg pipe decode (no temp WAV)
+        self.sparse_decode = sparse_decode  # Seek-decode only the subsampled windows (max_chunks > 0)
+        self.sparse_decode_jobs = min(8, os.cpu_count() or 1)  # Concurrent ffmpeg seek decodes
         self.sample_rate = 22050
-        self.temp_dir = tempfile.mkdtemp(prefix="sync_analysis_")
+        # Chunk workers only analyze windows handed to them and need no scratch directory
+        self.temp_dir = tempfile.mkdtemp(prefix="sync_analysis_") if create_temp_dir else None
         self.logger = self._setup_logging()
 
         # Enhanced multi-pass analysis settings
@@ -51,6 +78,12 @@ class OptimizedLargeFileDetector:
         self._torchaudio_available = False
         if gpu_enabled:
             self._detect_gpu()
+        if self.workers > 1 and self.gpu_available:
+            # Chunk workers run on the CPU; GPU MFCC and correlation kernels would
+            # give different results than a serial run, so keep chunks on the GPU
+            self.logger.warning(f"Chunk workers run on the CPU and would not reproduce {self.device} "
+                                f"results; analyzing chunks serially instead of with {self.workers} workers")
+            self.workers = 1
     
     def _setup_logging(self):
         """Setup logging"""
@@ -88,12 +121,24 @@ class OptimizedLargeFileDetector:
             self.logger.info("PyTorch not available; running on CPU")
     
     def extract_audio_from_video(self, video_path: str) -> Optional[str]:
-        """Extract audio from video file using ffmpeg with optimized parameters"""
+        """Extract analysis audio as float32 ``.npy`` (memory-mapped by the chunk readers).
+
+        Returns the PCM cache entry when the cache is enabled, otherwise a
+        ``.npy`` in the temp directory.
+        """
         try:
             if not os.path.exists(video_path):
                 self.logger.error(f"Video file not found: {video_path}")
                 return None
             
+            # Reuse a cached decode of this source when one exists
+            cache = get_pcm_cache()
+            if cache is not None:
+                entry = cache.lookup(video_path, self.sample_rate, channels="mono")
+                if entry is not None:
+                    self.logger.info(f"Audio found in PCM cache: {entry}")
+                    return entry
+
             # Generate output filename
             base_name = os.path.splitext(os.path.basename(video_path))[0]
             audio_file = os.path.join(self.temp_dir, f"{base_name}.wav")
@@ -115,21 +160,26 @@ class OptimizedLargeFileDetector:
             if result.returncode != 0:
                 self.logger.error(f"FFmpeg failed: {result.stderr}")
                 return None
+
+            # Convert to float32 .npy so chunk windows are zero-copy memmap slices
+            pcm_file = cache.put_file(video_path, self.sample_rate, audio_file, channels="mono") if cache else None
+            if pcm_file is None:
+                pcm_file = write_npy_from_file(audio_file, os.path.join(self.temp_dir, f"{base_name}.npy"))
+            self._cleanup_temp_files([audio_file])
             
-            self.logger.info(f"Audio extracted: {audio_file}")
-            return audio_file
+            self.logger.info(f"Audio extracted: {pcm_file}")
+            return pcm_file
             
         except Exception as e:
             self.logger.error(f"Error extracting audio: {e}")
             return None
     
     def get_audio_duration(self, audio_path: str) -> float:
-        """Get audio duration efficiently (ffprobe only)."""
+        """Get audio duration efficiently (array length for .npy, otherwise the shared probe)."""
         try:
-            cmd = ["ffprobe", "-v", "quiet", "-show_entries", "format=duration", "-of", "csv=p=0", audio_path]
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            if result.returncode == 0:
-                return float(result.stdout.strip())
+            if is_npy(audio_path):
+                return pcm_duration(audio_path, self.sample_rate)
+            return get_media_probe().duration(audio_path)
         except Exception as e:
             self.logger.error(f"Error getting duration: {e}")
         return 0.0
@@ -184,17 +234,33 @@ class OptimizedLargeFileDetector:
         self.logger.info(f"Created {len(chunks)} overlapping chunks for {duration:.1f}s audio (continuous monitoring)")
         return chunks
     
-    def extract_chunk_features(self, audio_path: str, start_time: float, end_time: float) -> Dict[str, Any]:
-        """Extract features from audio chunk with GPU acceleration if available"""
+    def _read_segment(self, audio_path: str, start_time: float, duration: float) -> np.ndarray:
+        """Read a mono float32 segment (audio already resampled to self.sample_rate by ffmpeg)"""
+        sr = self.sample_rate  # Use resampled rate, not metadata rate
+        start_frame = int(start_time * sr)
+        n_frames = int(duration * sr)
+        if is_npy(audio_path):
+            # Zero-copy slice; processes mapping the same file share its pages
+            y = open_pcm(audio_path)[start_frame:start_frame + n_frames]
+            return y.mean(axis=1, dtype=np.float32) if y.ndim > 1 else np.asarray(y)
+        y, _ = sf.read(audio_path, start=start_frame, frames=n_frames, dtype='float32', always_2d=False)
+        if y.ndim > 1:
+            y = y.mean(axis=1)
+        return y
+
+    def extract_chunk_features(self, audio_path: str, start_time: float, end_time: float,
+                               audio: Optional[np.ndarray] = None) -> Dict[str, Any]:
+        """Extract features from audio chunk with GPU acceleration if available.
+
+        When ``audio`` is given (a window already loaded by ChunkWindowReader) the
+        file is not re-read.
+        """
         try:
-            # Load audio chunk using soundfile (audio already resampled to self.sample_rate by ffmpeg)
-            info = sf.info(audio_path)
-            sr = self.sample_rate  # Use resampled rate, not metadata rate
-            start_frame = int(start_time * sr)
-            n_frames = int((end_time - start_time) * sr)
-            y, _ = sf.read(audio_path, start=start_frame, frames=n_frames, dtype='float32', always_2d=False)
-            if y.ndim > 1:
-                y = y.mean(axis=1)
+            sr = self.sample_rate
+            if audio is None:
+                y = self._read_segment(audio_path, start_time, end_time - start_time)
+            else:
+                y = audio
             
             if len(y) == 0:
                 return {}
@@ -203,7 +269,7 @@ class OptimizedLargeFileDetector:
             
             # 1. MFCC features (prefer torchaudio on GPU when available)
             mfcc = None
-            if self.gpu_enabled and self._torchaudio_available:
+            if self._torchaudio_available:
                 try:
                     import torch
                     import torchaudio
@@ -553,25 +619,17 @@ class OptimizedLargeFileDetector:
             return chunk_result
 
     def detect_offset_cross_correlation(self, audio1_path: str, audio2_path: str,
-                                      start_time: float = 0.0, duration: float = 30.0) -> Dict[str, Any]:
-        """Detect offset using cross-correlation on a specific segment"""
+                                      start_time: float = 0.0, duration: float = 30.0,
+                                      audio1: Optional[np.ndarray] = None,
+                                      audio2: Optional[np.ndarray] = None) -> Dict[str, Any]:
+        """Detect offset using cross-correlation on a specific segment.
+
+        ``audio1``/``audio2`` may carry the already loaded master/dub windows;
+        otherwise the segments are read from disk (pre-resampled by ffmpeg extract).
+        """
         try:
-            # Load audio segments with soundfile (pre-resampled by ffmpeg extract)
-            info1 = sf.info(audio1_path)
-            sr1 = self.sample_rate  # Use resampled rate, not metadata rate
-            s1 = int(start_time * sr1)
-            n1 = int(duration * sr1)
-            y1, _ = sf.read(audio1_path, start=s1, frames=n1, dtype='float32', always_2d=False)
-            if y1.ndim > 1:
-                y1 = y1.mean(axis=1)
-
-            info2 = sf.info(audio2_path)
-            sr2 = self.sample_rate  # Use resampled rate, not metadata rate
-            s2 = int(start_time * sr2)
-            n2 = int(duration * sr2)
-            y2, _ = sf.read(audio2_path, start=s2, frames=n2, dtype='float32', always_2d=False)
-            if y2.ndim > 1:
-                y2 = y2.mean(axis=1)
+            y1 = audio1 if audio1 is not None else self._read_segment(audio1_path, start_time, duration)
+            y2 = audio2 if audio2 is not None else self._read_segment(audio2_path, start_time, duration)
             
             if len(y1) == 0 or len(y2) == 0:
                 return {'offset_seconds': 0.0, 'confidence': 0.0}
@@ -580,9 +638,10 @@ class OptimizedLargeFileDetector:
             min_len = min(len(y1), len(y2))
             y1 = y1[:min_len]
             y2 = y2[:min_len]
-            # Cross-correlation (GPU-accelerated via PyTorch when available)
-            max_corr_idx = None
-            max_corr_val = None
+            # Cross-correlation (GPU-accelerated via PyTorch when available).
+            # A single correlation pass yields both the peak and the SNR statistics.
+            max_lag = seconds_to_lag(self.max_lag_seconds, self.sample_rate)
+            peak = None
             used_gpu = False
             if self.gpu_available:
                 try:
@@ -593,57 +652,37 @@ class OptimizedLargeFileDetector:
                         w = torch.from_numpy(y2.astype(np.float32)[::-1].copy()).to(self.device).view(1, 1, -1)
                         # full correlation via conv1d with padding
                         pad = w.shape[-1] - 1
-                        corr = F.conv1d(x, w, padding=pad).view(-1)
-                        max_corr_idx_t = torch.argmax(corr)
-                        max_corr_idx = int(max_corr_idx_t.item())
-                        max_corr_val = float(corr[max_corr_idx_t].item())
-                        used_gpu = self.device.startswith('cuda')
+                        corr_full = F.conv1d(x, w, padding=pad).view(-1).detach().cpu().numpy()
+                    min_lag = -(len(y2) - 1)
+                    if max_lag is not None:
+                        lo = max(min_lag, -max_lag)
+                        hi = min(len(y1) - 1, max_lag)
+                        corr_full = corr_full[lo - min_lag:hi - min_lag + 1]
+                        min_lag = lo
+                    peak = summarize_correlation(corr_full, min_lag, use_abs=False)
+                    used_gpu = self.device.startswith('cuda')
                 except Exception as e:
                     self.logger.debug(f"GPU cross-correlation fallback to numpy due to: {e}")
-                    max_corr_idx = None
+                    peak = None
                     used_gpu = False
-            if max_corr_idx is None:
-                # CPU fallback
-                correlation = np.correlate(y1, y2, mode='full')
-                max_corr_idx = int(np.argmax(correlation))
-                max_corr_val = float(correlation[max_corr_idx])
+            if peak is None:
+                # CPU path: FFT correlation instead of direct O(N^2) np.correlate
+                peak = correlate_peak(y1, y2, max_lag=max_lag, use_abs=False)
                 used_gpu = False
 
-            # For np.correlate(y1, y2, mode='full'), zero-lag index is len(y2) - 1
-            # Use y2 (dub) as the reference to convert index -> lag
-            offset_samples = max_corr_idx - (len(y2) - 1)
-            # Use the resampled rate (22050 Hz) not the original file rate
+            # Lag is relative to y2 (dub) as the reference, matching np.correlate(y1, y2, 'full').
             # Files were resampled by FFmpeg extraction to self.sample_rate
+            offset_samples = peak.lag
             offset_seconds = offset_samples / float(self.sample_rate)
 
-            # Improved confidence calculation using signal-to-noise ratio approach
-            if max_corr_idx is not None and used_gpu:
-                # For GPU path, get full correlation array
-                import torch
-                with torch.no_grad():
-                    x = torch.from_numpy(y1.astype(np.float32)).to(self.device).view(1, 1, -1)
-                    w = torch.from_numpy(y2.astype(np.float32)[::-1].copy()).to(self.device).view(1, 1, -1)
-                    pad = w.shape[-1] - 1
-                    corr_full = torch.nn.functional.conv1d(x, w, padding=pad).view(-1).detach().cpu().numpy()
-            else:
-                # For CPU path, use existing correlation
-                corr_full = np.correlate(y1, y2, mode='full')
-
-            # Calculate confidence using peak-to-average ratio
-            corr_abs = np.abs(corr_full)
-            peak_val = corr_abs[max_corr_idx] if max_corr_idx < len(corr_abs) else max_corr_val
-            mean_corr = np.mean(corr_abs)
-            std_corr = np.std(corr_abs)
-
-            # SNR-based confidence calculation
-            snr = (peak_val - mean_corr) / (std_corr + 1e-8)
-            confidence = min(max(snr / 8, 0.0), 1.0)  # Normalize to 0-1 range
-            
+            # SNR-based confidence calculation using peak-to-average ratio
+            confidence = min(max(peak.snr / 8, 0.0), 1.0)  # Normalize to 0-1 range
+
             return {
                 'offset_seconds': float(offset_seconds),
                 'offset_samples': int(offset_samples),
                 'confidence': float(confidence),
-                'correlation_peak': float(max_corr_val),
+                'correlation_peak': float(peak.peak_value),
                 'gpu_used': bool(used_gpu)
             }
             
@@ -658,30 +697,61 @@ class OptimizedLargeFileDetector:
         self.logger.info(f"  Dub: {os.path.basename(dub_path)}")
         self.logger.info(f"  Multi-pass enabled: {self.enable_multi_pass}")
 
+        streams = None
         try:
-            # Extract audio from videos
-            master_audio = self.extract_audio_from_video(master_path)
-            dub_audio = self.extract_audio_from_video(dub_path)
+            sparse = None
+            pass2_sources = None  # set when pass 2 must seek-decode its regions from the sources
+            if self.sparse_decode and not self._all_cached(master_path, dub_path):
+                sparse = self._extract_sparse(master_path, dub_path)
+
+            if sparse is not None:
+                # The sparse files hold only the pass-1 windows; pass 2 seek-decodes those sides
+                master_audio, dub_audio, master_duration, dub_duration, chunks, pass2_sources = sparse
+                self.logger.info("🔍 PASS 1: Coarse drift detection (sparse decode)")
+                pass1_results = self._analyze_pass1_coarse(
+                    master_audio, dub_audio, master_duration, dub_duration, chunks=chunks)
+            elif self.stream_decode and not self._all_cached(master_path, dub_path):
+                # Durations come from the sources; decoding overlaps with pass 1
+                master_duration = self.get_audio_duration(master_path)
+                dub_duration = self.get_audio_duration(dub_path)
+                self.logger.info(f"Durations - Master: {master_duration:.1f}s, Dub: {dub_duration:.1f}s")
+
+                self.logger.info("🔍 PASS 1: Coarse drift detection (streaming decode)")
+                chunks = self.create_audio_chunks(master_path, min(master_duration, dub_duration))
+                streams = self._open_pcm_streams(master_path, dub_path, chunks)
+                pass1_results = self._analyze_pass1_coarse(
+                    master_path, dub_path, master_duration, dub_duration, chunks=chunks, streams=streams)
+                # Finish decoding; cache entries (cached or teed) serve pass 2 and later requests
+                master_audio, dub_audio = (stream.finish() for stream in streams)
+                streams = None
+                if master_audio is None or dub_audio is None:
+                    pass2_sources = (master_path if master_audio is None else None,
+                                     dub_path if dub_audio is None else None)
+            else:
+                # Extract audio from videos
+                master_audio = self.extract_audio_from_video(master_path)
+                dub_audio = self.extract_audio_from_video(dub_path)
 
-            if not master_audio or not dub_audio:
-                return {'error': 'Failed to extract audio from video files'}
+                if not master_audio or not dub_audio:
+                    return {'error': 'Failed to extract audio from video files'}
 
-            # Get durations
-            master_duration = self.get_audio_duration(master_audio)
-            dub_duration = self.get_audio_duration(dub_audio)
+                # Get durations
+                master_duration = self.get_audio_duration(master_audio)
+                dub_duration = self.get_audio_duration(dub_audio)
 
-            self.logger.info(f"Durations - Master: {master_duration:.1f}s, Dub: {dub_duration:.1f}s")
+                self.logger.info(f"Durations - Master: {master_duration:.1f}s, Dub: {dub_duration:.1f}s")
 
-            # PASS 1: Coarse analysis with standard chunking
-            self.logger.info("🔍 PASS 1: Coarse drift detection")
-            pass1_results = self._analyze_pass1_coarse(master_audio, dub_audio, master_duration, dub_duration)
+                # PASS 1: Coarse analysis with standard chunking
+                self.logger.info("🔍 PASS 1: Coarse drift detection")
+                pass1_results = self._analyze_pass1_coarse(master_audio, dub_audio, master_duration, dub_duration)
 
             # Determine if Pass 2 refinement is needed
             final_result = pass1_results
             if self.enable_multi_pass and self._should_perform_pass2(pass1_results):
                 self.logger.info("🎯 PASS 2: Targeted refinement triggered")
                 pass2_results = self._analyze_pass2_targeted(
-                    master_audio, dub_audio, master_duration, dub_duration, pass1_results
+                    master_audio, dub_audio, master_duration, dub_duration, pass1_results,
+                    sources=pass2_sources
                 )
                 # Combine results from both passes
                 final_result = self._combine_multipass_results(pass1_results, pass2_results)
@@ -697,72 +767,280 @@ class OptimizedLargeFileDetector:
         except Exception as e:
             self.logger.error(f"Error in multi-pass analysis: {e}")
             return {'error': str(e)}
+        finally:
+            for stream in streams or ():
+                stream.close()
+            self._shutdown_chunk_pool()
+
+    def _all_cached(self, *paths: str) -> bool:
+        """True when every source already has a cached analysis decode (nothing to stream)"""
+        return all(entry is not None for entry in self._cached_entries(*paths))
+
+    def _cached_entries(self, *paths: str) -> List[Optional[str]]:
+        """Cached analysis decode of each source, or None where there is none"""
+        cache = get_pcm_cache()
+        return [cache.lookup(p, self.sample_rate, channels="mono") if cache else None for p in paths]
 
-    def _analyze_pass1_coarse(self, master_audio: str, dub_audio: str, master_duration: float, dub_duration: float) -> Dict[str, Any]:
+    def _extract_sparse(self, master_path: str, dub_path: str):
         """
-        Pass 1: Coarse analysis using standard chunking with content classification
+        Seek-decode only the pass-1 windows of the sources not already cached.
+
+        Returns (master_npy, dub_npy, master_duration, dub_duration, chunks,
+        pass2_sources), or None when the windows cover enough of the program
+        that a full decode is as cheap (no ``max_chunks`` limit, short files).
+        A cached source is used through its entry; ``pass2_sources`` names
+        only the sources that were decoded sparsely (None for the others).
         """
-        # Create standard chunks for initial analysis
-        chunks = self.create_audio_chunks(master_audio, min(master_duration, dub_duration))
-        self.logger.info(f"Pass 1: Analyzing {len(chunks)} coarse chunks")
+        if self.max_chunks <= 0:
+            return None
+        master_duration = self.get_audio_duration(master_path)
+        dub_duration = self.get_audio_duration(dub_path)
+        if master_duration <= 0 or dub_duration <= 0:
+            return None
+        chunks = self.create_audio_chunks(master_path, min(master_duration, dub_duration))
+        total_frames = int(min(master_duration, dub_duration) * self.sample_rate)
+        coverage = span_coverage(plan_spans(chunks, self.sample_rate, total_frames=total_frames), total_frames)
+        if coverage > DEFAULT_MAX_COVERAGE:
+            self.logger.info(f"Windows cover {coverage:.0%} of the program; using a full decode")
+            return None
 
-        chunk_results = []
-        try:
-            from tqdm import tqdm
-            iterator = tqdm(enumerate(chunks), total=len(chunks), desc="Pass 1 chunks", unit="chunk")
-        except Exception:
-            iterator = enumerate(chunks)
-
-        for i, (start, end) in iterator:
-            # Extract features from both files
-            master_features = self.extract_chunk_features(master_audio, start, end)
-            dub_features = self.extract_chunk_features(dub_audio, start, end)
-
-            # Classify content type for adaptive processing
-            master_content = self.classify_audio_content(master_features)
-            dub_content = self.classify_audio_content(dub_features)
-
-            # Skip silence regions (but keep them in results for timeline)
-            if (master_content.get('content_type') == 'silence' and
-                dub_content.get('content_type') == 'silence'):
-                chunk_result = {
-                    'chunk_index': i,
-                    'start_time': start,
-                    'end_time': end,
-                    'duration': end - start,
-                    'content_type': 'silence',
-                    'similarities': {'overall': 0.0, 'skipped': True},
-                    'offset_detection': {'offset_seconds': 0.0, 'confidence': 0.0},
-                    'quality': 'Skipped'
-                }
-                chunk_results.append(chunk_result)
+        self.logger.info(f"Durations - Master: {master_duration:.1f}s, Dub: {dub_duration:.1f}s")
+        start = time.perf_counter()
+        master_entry, dub_entry = self._cached_entries(master_path, dub_path)
+        pass2_sources = (None if master_entry else master_path, None if dub_entry else dub_path)
+        master_npy, dub_npy = self._extract_windows(
+            pass2_sources[0], pass2_sources[1], master_duration, dub_duration, chunks, "sparse")
+        self.logger.info(f"Sparse decode of {len(chunks)} windows ({coverage:.1%} of the program) "
+                         f"took {time.perf_counter() - start:.2f}s")
+        return (master_npy or master_entry, dub_npy or dub_entry, master_duration, dub_duration, chunks,
+                pass2_sources)
+
+    def _extract_windows(self, master_path: Optional[str], dub_path: Optional[str], master_duration: float,
+                         dub_duration: float, windows: List[Tuple[float, float]],
+                         tag: str) -> Tuple[Optional[str], Optional[str]]:
+        """Seek-decode ``windows`` of the given sources (None: skipped) into sparse ``.npy`` files in temp_dir"""
+        outputs = []
+        for i, (path, duration) in enumerate(((master_path, master_duration), (dub_path, dub_duration))):
+            if path is None:
+                outputs.append(None)
                 continue
+            base_name = os.path.splitext(os.path.basename(path))[0]
+            out_path = os.path.join(self.temp_dir, f"{base_name}_{i}_{tag}.npy")
+            outputs.append(decode_windows_to_npy(path, out_path, windows, self.sample_rate, duration,
+                                                 jobs=self.sparse_decode_jobs))
+        return outputs[0], outputs[1]
+
+    def _open_pcm_streams(self, master_path: str, dub_path: str, chunks: List[Tuple[float, float]]
+                          ) -> Tuple[Union[PCMStream, MappedPCM], Union[PCMStream, MappedPCM]]:
+        """
+        Start ffmpeg pipe decodes of the sources that are not cached.
 
-            # Compute content-aware similarity
-            similarities = self.compute_chunk_similarity(
-                master_features, dub_features, master_content, dub_content
-            )
-
-            # Detect offset for this chunk
-            offset_result = self.detect_offset_cross_correlation(
-                master_audio, dub_audio, start, end - start)
-
-            chunk_result = {
-                'chunk_index': i,
+        A cached source is read from its memory-mapped entry (``MappedPCM``).
+        Streamed PCM is teed into the PCM cache when one is configured; without
+        a cache nothing is written, and pass 2 seek-decodes its regions instead.
+        """
+        capacity = StreamingWindowReader.capacity_for(chunks, self.sample_rate)
+        cache = get_pcm_cache()
+        streams = []
+        try:
+            for path, entry in zip((master_path, dub_path), self._cached_entries(master_path, dub_path)):
+                if entry is not None:
+                    streams.append(MappedPCM(entry))
+                    continue
+                tee = cache.stream_writer(path, self.sample_rate, channels="mono") if cache else None
+                command = build_pipe_command(path, self.sample_rate)
+                streams.append(PCMStream(command, capacity, tee=tee).start())
+        except Exception:
+            for stream in streams:
+                stream.close()
+            raise
+        return streams[0], streams[1]
+
+    def _analyze_chunk(self, index: int, start: float, end: float,
+                       master_y: np.ndarray, dub_y: np.ndarray, pass_number: int,
+                       master_audio: str = "", dub_audio: str = "") -> Dict[str, Any]:
+        """
+        Analyze one chunk window: features, content classification, similarity and offset
+        """
+        # Extract features from both files (the loaded windows are shared with correlation)
+        master_features = self.extract_chunk_features(master_audio, start, end, audio=master_y)
+        dub_features = self.extract_chunk_features(dub_audio, start, end, audio=dub_y)
+
+        # Classify content type for adaptive processing
+        master_content = self.classify_audio_content(master_features)
+        dub_content = self.classify_audio_content(dub_features)
+
+        # Pass 1 skips silence regions (but keeps them in results for timeline)
+        if (pass_number == 1 and
+            master_content.get('content_type') == 'silence' and
+            dub_content.get('content_type') == 'silence'):
+            return {
+                'chunk_index': index,
                 'start_time': start,
                 'end_time': end,
                 'duration': end - start,
-                'master_content': master_content,
-                'dub_content': dub_content,
-                'similarities': similarities,
-                'offset_detection': offset_result,
-                'quality': self._assess_chunk_quality(similarities, offset_result),
-                'pass_number': 1
+                'content_type': 'silence',
+                'similarities': {'overall': 0.0, 'skipped': True},
+                'offset_detection': {'offset_seconds': 0.0, 'confidence': 0.0},
+                'quality': 'Skipped'
             }
 
-            # Apply ensemble confidence scoring
-            enhanced_chunk_result = self.ensemble_confidence_scoring(chunk_result)
-            chunk_results.append(enhanced_chunk_result)
+        # Compute content-aware similarity
+        similarities = self.compute_chunk_similarity(
+            master_features, dub_features, master_content, dub_content
+        )
+
+        # Detect offset for this chunk
+        offset_result = self.detect_offset_cross_correlation(
+            master_audio, dub_audio, start, end - start, audio1=master_y, audio2=dub_y)
+
+        chunk_result = {
+            'chunk_index': index,
+            'start_time': start,
+            'end_time': end,
+            'duration': end - start,
+            'master_content': master_content,
+            'dub_content': dub_content,
+            'similarities': similarities,
+            'offset_detection': offset_result,
+            'quality': self._assess_chunk_quality(similarities, offset_result),
+            'pass_number': pass_number
+        }
+        if pass_number == 2:
+            chunk_result['refinement_chunk'] = True
+
+        # Apply ensemble confidence scoring
+        return self.ensemble_confidence_scoring(chunk_result)
+
+    def _worker_settings(self) -> Dict[str, Any]:
+        """Detector settings needed to reproduce _analyze_chunk in a worker process"""
+        return {
+            'chunk_size': self.chunk_size,
+            'max_chunks': self.max_chunks,
+            'max_lag_seconds': self.max_lag_seconds,
+            'sample_rate': self.sample_rate,
+            # Workers must compute MFCCs with the same backend as a serial run
+            'torchaudio_mfcc': bool(self.gpu_enabled and self._torchaudio_available),
+        }
+
+    def _get_chunk_pool(self) -> ProcessPoolExecutor:
+        """Lazily start the chunk worker pool (reused across pass 1 and pass 2)"""
+        if self._chunk_pool is None:
+            # spawn keeps workers independent of any CUDA/thread state in the parent
+            self._chunk_pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_chunk_worker,
+                initargs=(self._worker_settings(),),
+            )
+            self.logger.info(f"Started chunk worker pool with {self.workers} processes")
+        return self._chunk_pool
+
+    def _shutdown_chunk_pool(self):
+        """Stop the chunk worker pool if one was started"""
+        if self._chunk_pool is not None:
+            self._chunk_pool.shutdown(wait=True)
+            self._chunk_pool = None
+
+    def _run_chunk_pass(self, master_audio: str, dub_audio: str,
+                        chunks: List[Tuple[float, float]], pass_number: int,
+                        streams: Optional[Tuple[PCMStream, PCMStream]] = None) -> List[Dict[str, Any]]:
+        """
+        Analyze a list of chunk windows, reading each (file, window) once with prefetch.
+
+        With ``workers > 1`` chunks are analyzed in a process pool; results are
+        returned in chunk order so aggregation is identical to the serial path.
+        With ``streams`` windows come from in-progress pipe decodes and are
+        analyzed as soon as they are complete.
+        """
+        if streams is not None:
+            return self._run_chunk_pass_streaming(master_audio, dub_audio, chunks, pass_number, streams)
+        if self.workers > 1 and len(chunks) > 1:
+            return self._run_chunk_pass_parallel(master_audio, dub_audio, chunks, pass_number)
+
+        chunk_results = []
+        with ChunkWindowReader(master_audio, dub_audio, self.sample_rate, chunks) as reader:
+            try:
+                from tqdm import tqdm
+                iterator = tqdm(reader, total=len(chunks), desc=f"Pass {pass_number} chunks", unit="chunk")
+            except Exception:
+                iterator = reader
+
+            for window in iterator:
+                chunk_results.append(self._analyze_chunk(
+                    window.index, window.start_time, window.end_time,
+                    window.master, window.dub, pass_number,
+                    master_audio=master_audio, dub_audio=dub_audio
+                ))
+        return chunk_results
+
+    def _run_chunk_pass_streaming(self, master_audio: str, dub_audio: str,
+                                  chunks: List[Tuple[float, float]], pass_number: int,
+                                  streams: Tuple[PCMStream, PCMStream]) -> List[Dict[str, Any]]:
+        """
+        Analyze windows while the sources are still decoding.
+
+        Serially each window is analyzed in-process; with ``workers > 1`` the
+        decoded windows are shipped to the pool, so several chunks are analyzed
+        while the decoder runs ahead.
+        """
+        reader = StreamingWindowReader(streams[0], streams[1], self.sample_rate, chunks)
+        use_pool = self.workers > 1 and len(chunks) > 1
+        started = time.perf_counter()
+        futures, chunk_results = [], []
+        try:
+            from tqdm import tqdm
+            iterator = tqdm(reader, total=len(chunks), desc=f"Pass {pass_number} chunks", unit="chunk")
+        except Exception:
+            iterator = reader
+
+        for window in iterator:
+            if window.index == 0:
+                self.logger.info(f"First chunk ready after {time.perf_counter() - started:.2f}s of decoding")
+            if use_pool:
+                futures.append(self._get_chunk_pool().submit(_analyze_window_in_worker, (
+                    window.index, window.start_time, window.end_time, window.master, window.dub,
+                    pass_number, master_audio, dub_audio)))
+            else:
+                chunk_results.append(self._analyze_chunk(
+                    window.index, window.start_time, window.end_time,
+                    window.master, window.dub, pass_number,
+                    master_audio=master_audio, dub_audio=dub_audio
+                ))
+        if use_pool:
+            chunk_results = [future.result() for future in futures]
+        return chunk_results
+
+    def _run_chunk_pass_parallel(self, master_audio: str, dub_audio: str,
+                                 chunks: List[Tuple[float, float]], pass_number: int) -> List[Dict[str, Any]]:
+        """
+        Process-parallel variant of _run_chunk_pass; each worker reads its own windows
+        """
+        tasks = [
+            (i, start, end, master_audio, dub_audio, pass_number)
+            for i, (start, end) in enumerate(chunks)
+        ]
+        # Executor.map yields results in submission order regardless of completion order
+        results = self._get_chunk_pool().map(_analyze_chunk_in_worker, tasks)
+        try:
+            from tqdm import tqdm
+            results = tqdm(results, total=len(tasks), desc=f"Pass {pass_number} chunks", unit="chunk")
+        except Exception:
+            pass
+        return list(results)
+
+    def _analyze_pass1_coarse(self, master_audio: str, dub_audio: str, master_duration: float, dub_duration: float,
+                              chunks: Optional[List[Tuple[float, float]]] = None,
+                              streams: Optional[Tuple[PCMStream, PCMStream]] = None) -> Dict[str, Any]:
+        """
+        Pass 1: Coarse analysis using standard chunking with content classification
+        """
+        # Create standard chunks for initial analysis
+        if chunks is None:
+            chunks = self.create_audio_chunks(master_audio, min(master_duration, dub_duration))
+        self.logger.info(f"Pass 1: Analyzing {len(chunks)} coarse chunks")
+
+        chunk_results = self._run_chunk_pass(master_audio, dub_audio, chunks, pass_number=1, streams=streams)
 
         # Aggregate results from Pass 1
         pass1_result = self._aggregate_chunk_results(chunk_results, master_duration, dub_duration)
@@ -813,9 +1091,14 @@ class OptimizedLargeFileDetector:
             return False
 
     def _analyze_pass2_targeted(self, master_audio: str, dub_audio: str, master_duration: float,
-                               dub_duration: float, pass1_results: Dict[str, Any]) -> Dict[str, Any]:
+                               dub_duration: float, pass1_results: Dict[str, Any],
+                               sources: Optional[Tuple[str, str]] = None) -> Dict[str, Any]:
         """
         Pass 2: Targeted refinement in problematic regions identified in Pass 1
+
+        With ``sources`` (master, dub media paths; None for a side whose audio
+        already covers the program) the refinement regions of those sources
+        are seek-decoded first, for when no decode covering them exists.
         """
         # Identify regions needing refinement
         target_regions = self._identify_refinement_regions(pass1_results)
@@ -836,48 +1119,15 @@ class OptimizedLargeFileDetector:
 
         self.logger.info(f"Pass 2: Analyzing {len(pass2_chunks)} refinement chunks")
 
-        chunk_results = []
+        decoded: Tuple[Optional[str], Optional[str]] = (None, None)
+        if sources is not None:
+            decoded = self._extract_windows(
+                sources[0], sources[1], master_duration, dub_duration, pass2_chunks, "pass2")
+            master_audio, dub_audio = decoded[0] or master_audio, decoded[1] or dub_audio
         try:
-            from tqdm import tqdm
-            iterator = tqdm(enumerate(pass2_chunks), total=len(pass2_chunks), desc="Pass 2 chunks", unit="chunk")
-        except Exception:
-            iterator = enumerate(pass2_chunks)
-
-        for i, (start, end) in iterator:
-            # Extract features from both files
-            master_features = self.extract_chunk_features(master_audio, start, end)
-            dub_features = self.extract_chunk_features(dub_audio, start, end)
-
-            # Classify content type
-            master_content = self.classify_audio_content(master_features)
-            dub_content = self.classify_audio_content(dub_features)
-
-            # Compute content-aware similarity
-            similarities = self.compute_chunk_similarity(
-                master_features, dub_features, master_content, dub_content
-            )
-
-            # Detect offset for this chunk
-            offset_result = self.detect_offset_cross_correlation(
-                master_audio, dub_audio, start, end - start)
-
-            chunk_result = {
-                'chunk_index': i,
-                'start_time': start,
-                'end_time': end,
-                'duration': end - start,
-                'master_content': master_content,
-                'dub_content': dub_content,
-                'similarities': similarities,
-                'offset_detection': offset_result,
-                'quality': self._assess_chunk_quality(similarities, offset_result),
-                'pass_number': 2,
-                'refinement_chunk': True
-            }
-
-            # Apply ensemble confidence scoring
-            enhanced_chunk_result = self.ensemble_confidence_scoring(chunk_result)
-            chunk_results.append(enhanced_chunk_result)
+            chunk_results = self._run_chunk_pass(master_audio, dub_audio, pass2_chunks, pass_number=2)
+        finally:
+            self._cleanup_temp_files([path for path in decoded if path])
 
         # Aggregate results from Pass 2
         pass2_result = self._aggregate_chunk_results(chunk_results, master_duration, dub_duration)
@@ -1428,9 +1678,12 @@ class OptimizedLargeFileDetector:
         }
     
     def _cleanup_temp_files(self, file_paths: List[str]):
-        """Clean up temporary files"""
+        """Clean up temporary files (only those under temp_dir, never PCM cache entries)"""
+        if not self.temp_dir:
+            return
+        temp_root = os.path.join(os.path.abspath(self.temp_dir), "")
         for file_path in file_paths:
-            if file_path and os.path.exists(file_path):
+            if file_path and os.path.abspath(file_path).startswith(temp_root) and os.path.exists(file_path):
                 try:
                     os.remove(file_path)
                     self.logger.info(f"Cleaned up: {file_path}")
@@ -1439,9 +1692,59 @@ class OptimizedLargeFileDetector:
     
     def __del__(self):
         """Cleanup temp directory on destruction"""
-        if hasattr(self, 'temp_dir') and os.path.exists(self.temp_dir):
+        pool = getattr(self, '_chunk_pool', None)
+        if pool is not None:
+            try:
+                pool.shutdown(wait=False)
+            except Exception:
+                pass
+        if getattr(self, 'temp_dir', None) and os.path.exists(self.temp_dir):
             import shutil
             try:
                 shutil.rmtree(self.temp_dir)
             except:
                 pass
+
+
+# Per-process detector used by the chunk worker pool (see OptimizedLargeFileDetector.workers)
+_WORKER_DETECTOR: Optional[OptimizedLargeFileDetector] = None
+
+
+def _init_chunk_worker(settings: Dict[str, Any]) -> None:
+    """
+    Build the worker-local detector once per pool process
+
+    Workers run on the CPU (no CUDA context per process) and without a temp
+    directory: they only analyze windows read from already decoded PCM. They
+    keep the parent's MFCC backend (torchaudio transform on the CPU when the
+    parent uses torchaudio), so chunk results are identical to a serial run.
+    A detector on a CUDA device never starts workers (see ``__init__``).
+    """
+    global _WORKER_DETECTOR
+    detector = OptimizedLargeFileDetector(
+        gpu_enabled=False,
+        chunk_size=settings['chunk_size'],
+        max_chunks=settings['max_chunks'],
+        max_lag_seconds=settings['max_lag_seconds'],
+        create_temp_dir=False,
+    )
+    detector.sample_rate = settings['sample_rate']
+    detector._torchaudio_available = settings['torchaudio_mfcc']
+    _WORKER_DETECTOR = detector
+
+
+def _analyze_window_in_worker(task: Tuple[int, float, float, np.ndarray, np.ndarray, int, str, str]) -> Dict[str, Any]:
+    """Analyze one already decoded chunk window (streaming decode) in a pool process"""
+    index, start, end, master_y, dub_y, pass_number, master_audio, dub_audio = task
+    return _WORKER_DETECTOR._analyze_chunk(index, start, end, master_y, dub_y, pass_number,
+                                           master_audio=master_audio, dub_audio=dub_audio)
+
+
+def _analyze_chunk_in_worker(task: Tuple[int, float, float, str, str, int]) -> Dict[str, Any]:
+    """Read one chunk window from both files and analyze it in a pool process"""
+    index, start, end, master_audio, dub_audio, pass_number = task
+    detector = _WORKER_DETECTOR
+    master_y = detector._read_segment(master_audio, start, end - start)
+    dub_y = detector._read_segment(dub_audio, start, end - start)
+    return detector._analyze_chunk(index, start, end, master_y, dub_y, pass_number,
+                                   master_audio=master_audio, dub_audio=dub_audio)
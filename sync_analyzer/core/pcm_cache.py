@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+"""
+Content-addressed on-disk cache of decoded PCM audio.
+
+Decoding is the dominant fixed cost of every analysis. Entries are keyed by
+the source file's identity (resolved path, size, mtime) plus the decode
+parameters (sample rate, channel selection), so re-analysing the same master
+against a new dub skips the master decode entirely. Any change to the source
+file changes its key, which makes stale entries unreachable; they age out
+under LRU eviction.
+
+Entries are float32 ``.npy`` files: 1-D for mono/stem audio, ``(frames,
+channels)`` for multichannel selections such as ``"stereo"``. Writes go
+through a temporary file and an atomic rename, so concurrent processes can
+share one cache directory. Artifacts derived from entries (waveform peaks,
+spectrogram tiles) live in subdirectories and share the same LRU budget.
+
+Configuration (environment, read by ``get_pcm_cache``):
+    SYNC_PCM_CACHE            "0" disables the cache
+    SYNC_PCM_CACHE_DIR        cache directory (default ~/.cache/sync_analyzer/pcm)
+    SYNC_PCM_CACHE_MAX_BYTES  LRU byte budget (default 10 GiB)
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import threading
+import uuid
+from typing import Callable, Optional
+
+import numpy as np
+import soundfile as sf
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BYTES = 10 * 1024 ** 3
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "sync_analyzer", "pcm")
+DERIVED_DIRS = ("peaks", "spectrograms")  # subdirectories evicted together with the entries
+
+
+class PCMCache:
+    """
+    LRU-bounded store of decoded float32 PCM keyed by source identity.
+
+    Usage:
+        cache = PCMCache("/var/cache/sync/pcm", max_bytes=20 * 1024 ** 3)
+        audio = cache.get_or_decode(path, 22050, lambda: decode(path), channels="mono")
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.cache_dir = os.path.abspath(cache_dir)
+        self.max_bytes = int(max_bytes)
+        self._lock = threading.Lock()
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def key(self, path: str, sample_rate: int, channels: str = "mono") -> Optional[str]:
+        """Cache key for a decode of ``path``; None when the source cannot be stat'ed."""
+        try:
+            real = os.path.realpath(str(path))
+            st = os.stat(real)
+        except OSError:
+            return None
+        ident = f"{real}|{st.st_size}|{st.st_mtime_ns}|{int(sample_rate)}|{channels}"
+        return hashlib.sha1(ident.encode("utf-8")).hexdigest()
+
+    def entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.npy")
+
+    def lookup(self, path: str, sample_rate: int, channels: str = "mono") -> Optional[str]:
+        """Return the entry file for a cached decode (marking it recently used), or None."""
+        key = self.key(path, sample_rate, channels)
+        if key is None:
+            return None
+        entry = self.entry_path(key)
+        if not os.path.exists(entry):
+            return None
+        self.touch(entry)
+        return entry
+
+    def get(self, path: str, sample_rate: int, channels: str = "mono",
+            mmap: bool = False) -> Optional[np.ndarray]:
+        """Load a cached decode (read-only memory map when ``mmap``), or None on a miss."""
+        entry = self.lookup(path, sample_rate, channels)
+        if entry is None:
+            return None
+        try:
+            return np.load(entry, mmap_mode="r" if mmap else None, allow_pickle=False)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Discarding unreadable PCM cache entry {entry}: {e}")
+            self._remove(entry)
+            return None
+
+    def put(self, path: str, sample_rate: int, audio: np.ndarray, channels: str = "mono") -> Optional[str]:
+        """Store a decode and enforce the byte budget. Returns the entry path."""
+        key = self.key(path, sample_rate, channels)
+        if key is None:
+            return None
+        audio = np.ascontiguousarray(audio, dtype=np.float32)
+        if audio.nbytes > self.max_bytes:
+            return None
+        entry = self.entry_path(key)
+        tmp = os.path.join(self.cache_dir, f".{key}.{uuid.uuid4().hex}.tmp")
+        try:
+            with open(tmp, "wb") as fh:
+                np.save(fh, audio, allow_pickle=False)
+            os.replace(tmp, entry)
+        except OSError as e:
+            logger.warning(f"Could not write PCM cache entry for {path}: {e}")
+            self._remove(tmp)
+            return None
+        self.evict()
+        return entry
+
+    def put_file(self, path: str, sample_rate: int, pcm_file: str, channels: str = "mono",
+                 block_frames: int = 1 << 20) -> Optional[str]:
+        """Store an already decoded audio file (e.g. an ffmpeg WAV) block by block."""
+        key = self.key(path, sample_rate, channels)
+        if key is None:
+            return None
+        entry = self.entry_path(key)
+        tmp = os.path.join(self.cache_dir, f".{key}.{uuid.uuid4().hex}.tmp")
+        try:
+            with sf.SoundFile(pcm_file) as src:
+                if src.frames * src.channels * 4 > self.max_bytes:
+                    return None
+            write_npy_from_file(pcm_file, tmp, downmix=(channels == "mono"), block_frames=block_frames)
+            os.replace(tmp, entry)
+        except (OSError, RuntimeError, ValueError) as e:
+            logger.warning(f"Could not cache decoded file {pcm_file}: {e}")
+            self._remove(tmp)
+            return None
+        self.evict()
+        return entry
+
+    def export_wav(self, path: str, sample_rate: int, out_path: str, channels: str = "mono",
+                   block_frames: int = 1 << 20, subtype: str = "FLOAT") -> bool:
+        """Write a cached decode to a WAV (float by default) without decoding the source. False on a miss."""
+        entry = self.lookup(path, sample_rate, channels)
+        if entry is None:
+            return False
+        try:
+            data = np.load(entry, mmap_mode="r", allow_pickle=False)
+            n_channels = 1 if data.ndim == 1 else data.shape[1]
+            with sf.SoundFile(out_path, "w", samplerate=int(sample_rate), channels=n_channels,
+                              subtype=subtype) as dst:
+                for start in range(0, len(data), block_frames):
+                    dst.write(np.asarray(data[start:start + block_frames]))
+            return True
+        except (OSError, RuntimeError, ValueError) as e:
+            logger.warning(f"Could not export PCM cache entry {entry}: {e}")
+            return False
+
+    def stream_writer(self, path: str, sample_rate: int, channels: str = "mono") -> Optional["NpyStreamWriter"]:
+        """Writer for a decode produced incrementally (e.g. from an ffmpeg pipe).
+
+        ``close()`` publishes the entry atomically and returns its path;
+        ``abort()`` discards it.
+        """
+        key = self.key(path, sample_rate, channels)
+        if key is None:
+            return None
+        tmp = os.path.join(self.cache_dir, f".{key}.{uuid.uuid4().hex}.tmp")
+        return NpyStreamWriter(tmp, final_path=self.entry_path(key), on_commit=lambda _: self.evict())
+
+    def get_or_decode(self, path: str, sample_rate: int, decode: Callable[[], np.ndarray],
+                      channels: str = "mono", mmap: bool = False) -> np.ndarray:
+        """Return cached PCM for ``path`` or run ``decode`` and cache its float32 result."""
+        audio = self.get(path, sample_rate, channels, mmap=mmap)
+        if audio is not None:
+            logger.info(f"PCM cache hit: {os.path.basename(str(path))} @ {sample_rate} Hz ({channels})")
+            return audio
+        audio = np.asarray(decode(), dtype=np.float32)
+        self.put(path, sample_rate, audio, channels)
+        return audio
+
+    def size_bytes(self) -> int:
+        return sum(size for _, _, size in self._entries())
+
+    @staticmethod
+    def touch(path: str) -> None:
+        """Mark an entry or derived artifact recently used (LRU order is mtime)."""
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def evict(self) -> None:
+        """Remove least recently used entries and derived artifacts until the cache fits ``max_bytes``."""
+        with self._lock:
+            entries = sorted(self._entries(), key=lambda e: e[1])
+            total = sum(size for _, _, size in entries)
+            for entry, _, size in entries:
+                if total <= self.max_bytes:
+                    break
+                self._remove(entry)
+                total -= size
+                parent = os.path.dirname(entry)
+                if parent != self.cache_dir and os.path.basename(parent) not in DERIVED_DIRS:
+                    try:
+                        os.rmdir(parent)  # e.g. an emptied spectrogram tile directory
+                    except OSError:
+                        pass
+
+    def clear(self) -> None:
+        for entry, _, _ in self._entries():
+            self._remove(entry)
+
+    def _entries(self):
+        try:
+            names = os.listdir(self.cache_dir)
+        except OSError:
+            return []
+        paths = [os.path.join(self.cache_dir, name) for name in names if name.endswith(".npy")]
+        for derived in DERIVED_DIRS:
+            for root, _, files in os.walk(os.path.join(self.cache_dir, derived)):
+                paths.extend(os.path.join(root, name) for name in files
+                             if not name.startswith(".") and ".tmp" not in name)
+        entries = []
+        for full in paths:
+            try:
+                st = os.stat(full)
+            except OSError:
+                continue
+            entries.append((full, st.st_mtime, st.st_size))
+        return entries
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def write_npy_from_file(pcm_file: str, out_path: str, downmix: bool = True,
+                        block_frames: int = 1 << 20) -> str:
+    """
+    Convert a soundfile-readable file to a float32 ``.npy`` block by block.
+
+    Memory stays bounded by ``block_frames``; the result can be opened with
+    ``np.load(..., mmap_mode='r')``. Multichannel input is averaged to mono
+    when ``downmix`` is set, otherwise stored as ``(frames, channels)``.
+    """
+    with sf.SoundFile(pcm_file) as src:
+        downmix = downmix and src.channels > 1
+        shape = (src.frames,) if (downmix or src.channels == 1) else (src.frames, src.channels)
+        out = np.lib.format.open_memmap(out_path, mode="w+", dtype=np.float32, shape=shape)
+        pos = 0
+        for block in src.blocks(blocksize=block_frames, dtype="float32", always_2d=True):
+            n = len(block)
+            if len(shape) == 1:
+                out[pos:pos + n] = block.mean(axis=1) if downmix else block[:, 0]
+            else:
+                out[pos:pos + n] = block
+            pos += n
+        out.flush()
+        del out
+    return out_path
+
+
+class NpyStreamWriter:
+    """
+    Append mono float32 samples to a ``.npy`` whose length is not known up front.
+
+    A fixed-size header is reserved when the file is opened and rewritten
+    with the final shape on ``close()``.
+    """
+
+    HEADER_BYTES = 128  # magic + version + length + padded header dict
+
+    def __init__(self, path: str, final_path: Optional[str] = None,
+                 on_commit: Optional[Callable[[str], None]] = None):
+        self.path = path
+        self.final_path = final_path or path
+        self.frames = 0
+        self._on_commit = on_commit
+        self._fh = open(path, "wb")
+        self._fh.write(self._header(0))
+
+    @classmethod
+    def _header(cls, frames: int) -> bytes:
+        body = "{'descr': '<f4', 'fortran_order': False, 'shape': (%d,), }" % frames
+        body_len = cls.HEADER_BYTES - 10
+        return (b"\x93NUMPY\x01\x00" + body_len.to_bytes(2, "little")
+                + body.ljust(body_len - 1).encode("latin1") + b"\n")
+
+    def write(self, samples: np.ndarray) -> None:
+        samples = np.ascontiguousarray(samples, dtype="<f4").reshape(-1)
+        self._fh.write(samples.tobytes())
+        self.frames += len(samples)
+
+    def close(self) -> str:
+        """Finalize the header and move the file into place. Returns the final path."""
+        self._fh.seek(0)
+        self._fh.write(self._header(self.frames))
+        self._fh.close()
+        if self.final_path != self.path:
+            os.replace(self.path, self.final_path)
+        if self._on_commit is not None:
+            self._on_commit(self.final_path)
+        return self.final_path
+
+    def abort(self) -> None:
+        try:
+            self._fh.close()
+        except OSError:
+            pass
+        PCMCache._remove(self.path)
+
+
+_default_cache: Optional[PCMCache] = None
+_default_configured = False
+
+
+def configure_pcm_cache(cache_dir: Optional[str] = None, max_bytes: Optional[int] = None,
+                        enabled: bool = True) -> Optional[PCMCache]:
+    """Set the process-wide cache used by the loaders (e.g. from application settings)."""
+    global _default_cache, _default_configured
+    _default_configured = True
+    if not enabled:
+        _default_cache = None
+        return None
+    try:
+        _default_cache = PCMCache(cache_dir or DEFAULT_CACHE_DIR,
+                                  max_bytes if max_bytes is not None else DEFAULT_MAX_BYTES)
+    except OSError as e:
+        logger.warning(f"PCM cache disabled: {e}")
+        _default_cache = None
+    return _default_cache
+
+
+def get_pcm_cache() -> Optional[PCMCache]:
+    """Process-wide cache, configured from the environment on first use; None when disabled."""
+    if not _default_configured:
+        enabled = os.environ.get("SYNC_PCM_CACHE", "1").strip().lower() not in {"0", "false", "no", "off"}
+        max_bytes = os.environ.get("SYNC_PCM_CACHE_MAX_BYTES")
+        configure_pcm_cache(
+            cache_dir=os.environ.get("SYNC_PCM_CACHE_DIR"),
+            max_bytes=int(max_bytes) if max_bytes else None,
+            enabled=enabled,
+        )
+    return _default_cache
@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+Streaming ffmpeg decode for the chunked sync detector.
+
+Instead of decoding a whole file to a temporary WAV before pass 1 can start,
+``PCMStream`` reads ``s16le`` PCM from an ffmpeg ``pipe:1`` on a background
+thread into a ring buffer, and ``StreamingWindowReader`` yields analysis
+windows as soon as both files have decoded past a window's end. Chunk
+analysis therefore overlaps with decoding, and nothing is written to the
+temp directory. The decoded samples are optionally teed into a float32
+``.npy`` (normally the PCM cache entry) so later passes and later requests
+can memory-map them. A side that is already decoded (a cached entry) is
+read through ``MappedPCM`` instead of being decoded again.
+"""
+
+from __future__ import annotations
+
+import logging
+import subprocess
+import threading
+from typing import Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+try:
+    from .chunk_reader import ChunkWindow, open_pcm
+    from .pcm_cache import NpyStreamWriter
+except ImportError:  # pragma: no cover - fallback for direct execution
+    from chunk_reader import ChunkWindow, open_pcm
+    from pcm_cache import NpyStreamWriter
+
+logger = logging.getLogger(__name__)
+
+
+def build_pipe_command(source: str, sample_rate: int, ffmpeg_bin: str = "ffmpeg") -> List[str]:
+    """ffmpeg command decoding ``source`` to mono ``s16le`` on stdout."""
+    return [
+        ffmpeg_bin, "-hide_banner", "-loglevel", "error", "-nostdin",
+        "-i", source,
+        "-vn", "-sn", "-dn",
+        "-ac", "1",
+        "-ar", str(int(sample_rate)),
+        "-f", "s16le", "-acodec", "pcm_s16le",
+        "pipe:1",
+    ]
+
+
+class PCMStream:
+    """
+    Mono PCM decoded from a pipe into a bounded ring buffer.
+
+    Frames are addressed by absolute index. ``read`` blocks until the
+    requested frames are decoded (or the stream ends); ``release`` lets the
+    producer overwrite frames that no remaining window needs. The producer
+    waits when the buffer is full, so memory stays at ``capacity_frames``.
+    """
+
+    def __init__(self, command: Sequence[str], capacity_frames: int,
+                 tee: Optional[NpyStreamWriter] = None, block_frames: int = 1 << 15):
+        self.command = list(command)
+        self.capacity = int(capacity_frames)
+        self.block_frames = int(min(block_frames, self.capacity))
+        self.tee = tee
+        self._ring = np.zeros(self.capacity, dtype=np.float32)
+        self._base = 0      # oldest frame still held
+        self._end = 0       # frames decoded so far
+        self._eof = False
+        self._error: Optional[str] = None
+        self._draining = False
+        self._cond = threading.Condition()
+        self._proc: Optional[subprocess.Popen] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "PCMStream":
+        self._proc = subprocess.Popen(self.command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        self._thread = threading.Thread(target=self._produce, name="pcm_stream", daemon=True)
+        self._thread.start()
+        return self
+
+    @property
+    def frames_decoded(self) -> int:
+        with self._cond:
+            return self._end
+
+    def _produce(self) -> None:
+        bytes_per_block = self.block_frames * 2
+        pending = b""
+        try:
+            while True:
+                data = self._proc.stdout.read(bytes_per_block)
+                if not data:
+                    break
+                data = pending + data
+                usable = len(data) - (len(data) % 2)
+                pending = data[usable:]
+                block = np.frombuffer(data[:usable], dtype="<i2").astype(np.float32) / 32768.0
+                if self.tee is not None:
+                    self.tee.write(block)
+                self._push(block)
+            ret = self._proc.wait()
+            if ret != 0:
+                err = self._proc.stderr.read().decode("utf-8", "replace").strip()
+                self._fail(f"decoder exited with {ret}: {err}")
+        except Exception as e:  # surfaced to the consumer by read()
+            self._fail(str(e))
+        finally:
+            with self._cond:
+                self._eof = True
+                self._cond.notify_all()
+
+    def _push(self, block: np.ndarray) -> None:
+        n = len(block)
+        with self._cond:
+            while not self._draining and self._end + n - self._base > self.capacity and self._error is None:
+                self._cond.wait()
+            if self._draining:
+                self._base = max(self._base, self._end + n - self.capacity)
+            pos = self._end % self.capacity
+            first = min(n, self.capacity - pos)
+            self._ring[pos:pos + first] = block[:first]
+            if first < n:
+                self._ring[:n - first] = block[first:]
+            self._end += n
+            self._cond.notify_all()
+
+    def _fail(self, message: str) -> None:
+        with self._cond:
+            self._error = message
+            self._cond.notify_all()
+
+    def read(self, start_frame: int, n_frames: int) -> np.ndarray:
+        """Copy frames [start_frame, start_frame + n_frames), truncated at end of stream."""
+        if n_frames > self.capacity:
+            raise ValueError(f"window of {n_frames} frames exceeds ring capacity {self.capacity}")
+        stop = start_frame + n_frames
+        with self._cond:
+            while self._end < stop and not self._eof and self._error is None:
+                self._cond.wait()
+            if self._error is not None:
+                raise RuntimeError(self._error)
+            if start_frame < self._base:
+                raise ValueError(f"frame {start_frame} was already released (oldest held: {self._base})")
+            stop = min(stop, self._end)
+            if n_frames <= 0 or start_frame >= stop:
+                return np.zeros(0, dtype=np.float32)
+            idx = np.arange(start_frame, stop) % self.capacity
+            return self._ring[idx]
+
+    def release(self, frame: int) -> None:
+        """Allow frames before ``frame`` to be overwritten."""
+        with self._cond:
+            self._base = max(self._base, min(int(frame), self._end))
+            self._cond.notify_all()
+
+    def finish(self) -> Optional[str]:
+        """Decode to the end without holding frames, finalize the tee and return its path."""
+        with self._cond:
+            self._draining = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+        if self._error is not None:
+            self.close()
+            raise RuntimeError(self._error)
+        if self.tee is None:
+            return None
+        tee, self.tee = self.tee, None
+        return tee.close()
+
+    def close(self) -> None:
+        """Stop decoding and discard an unfinished tee."""
+        if self._proc is not None and self._proc.poll() is None:
+            try:
+                self._proc.kill()
+            except OSError:
+                pass
+        with self._cond:
+            self._draining = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        if self.tee is not None:
+            self.tee.abort()
+            self.tee = None
+        for pipe in (getattr(self._proc, "stdout", None), getattr(self._proc, "stderr", None)):
+            if pipe is not None:
+                try:
+                    pipe.close()
+                except OSError:
+                    pass
+
+
+class MappedPCM:
+    """
+    ``PCMStream`` interface over PCM that is already decoded.
+
+    Wraps a float32 ``.npy`` path (memory-mapped) or an in-memory array, so a
+    cached source can be paired with one that is still streaming.
+    """
+
+    def __init__(self, pcm: Union[str, np.ndarray]):
+        self.path = pcm if isinstance(pcm, str) else None
+        self._pcm = open_pcm(pcm) if isinstance(pcm, str) else np.asarray(pcm, dtype=np.float32)
+
+    @property
+    def frames_decoded(self) -> int:
+        return len(self._pcm)
+
+    def read(self, start_frame: int, n_frames: int) -> np.ndarray:
+        """Copy frames [start_frame, start_frame + n_frames), truncated at the end."""
+        if n_frames <= 0 or start_frame >= len(self._pcm):
+            return np.zeros(0, dtype=np.float32)
+        return np.array(self._pcm[start_frame:start_frame + n_frames], dtype=np.float32)
+
+    def release(self, frame: int) -> None:
+        pass
+
+    def finish(self) -> Optional[str]:
+        """The wrapped ``.npy`` path (None for an array)."""
+        return self.path
+
+    def close(self) -> None:
+        pass
+
+
+class StreamingWindowReader:
+    """
+    Yield master/dub windows from two PCMStreams as soon as both are decoded.
+
+    Frame arithmetic matches ``read_window``. Windows must be ordered by start
+    time (as produced by ``create_audio_chunks``); frames before the earliest
+    remaining start are released after each window. Either side may also be
+    an ``.npy`` path or an array (read through ``MappedPCM``).
+    """
+
+    def __init__(self, master: Union[PCMStream, MappedPCM, str, np.ndarray],
+                 dub: Union[PCMStream, MappedPCM, str, np.ndarray], sample_rate: int,
+                 windows: Sequence[Tuple[float, float]]):
+        self.master = master if isinstance(master, (PCMStream, MappedPCM)) else MappedPCM(master)
+        self.dub = dub if isinstance(dub, (PCMStream, MappedPCM)) else MappedPCM(dub)
+        self.sample_rate = int(sample_rate)
+        self.windows: List[Tuple[float, float]] = list(windows)
+
+    def __len__(self) -> int:
+        return len(self.windows)
+
+    def __iter__(self) -> Iterator[ChunkWindow]:
+        sr = self.sample_rate
+        for i, (start, end) in enumerate(self.windows):
+            start_frame = int(start * sr)
+            n_frames = int((end - start) * sr)
+            window = ChunkWindow(
+                index=i,
+                start_time=start,
+                end_time=end,
+                master=self.master.read(start_frame, n_frames),
+                dub=self.dub.read(start_frame, n_frames),
+            )
+            remaining = self.windows[i + 1:]
+            keep_from = min(int(s * sr) for s, _ in remaining) if remaining else start_frame + n_frames
+            self.master.release(keep_from)
+            self.dub.release(keep_from)
+            yield window
+
+    @staticmethod
+    def capacity_for(windows: Sequence[Tuple[float, float]], sample_rate: int,
+                     lookahead_seconds: float = 60.0) -> int:
+        """Ring size holding the widest span of overlapping windows plus decode lookahead."""
+        sr = int(sample_rate)
+        span = max((int((e - s) * sr) for s, e in windows), default=0)
+        # Overlapping windows: the next window can start before the current one ends
+        ordered = sorted(windows)
+        for (s0, _), (_, e1) in zip(ordered, ordered[1:]):
+            span = max(span, int((e1 - s0) * sr))
+        return span + int(lookahead_seconds * sr) + 1
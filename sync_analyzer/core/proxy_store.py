@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Size-bounded on-disk store of browser playback proxies.
+
+Streaming a live ffmpeg transcode for every playback request means each
+scrub restarts the transcode from the top, the browser cannot seek (no
+length, no byte ranges), and two viewers of one file pay for two
+transcodes. ``ProxyStore`` builds each (source, format) rendition once into
+a file, so it can be served with HTTP Range support. Entries are keyed like
+the PCM cache by the source identity (resolved path, size, mtime) and
+evicted least-recently-used beyond a byte budget. Concurrent requests for a
+proxy that is still being built wait for the one build in progress.
+
+WAV proxies (16-bit PCM) are exported from a cached 48 kHz stereo decode
+(e.g. the ingest proxy rendition) when one exists, without touching the
+source. FLAC (lossless) and Opus (lossy) renditions are compact alternatives
+for long programs.
+
+Configuration (environment, read by ``get_proxy_store``):
+    SYNC_PROXY_CACHE_DIR        directory (default ~/.cache/sync_analyzer/proxies)
+    SYNC_PROXY_CACHE_MAX_BYTES  LRU byte budget (default 20 GiB)
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import shutil
+import subprocess
+import threading
+import uuid
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+try:
+    from .pcm_cache import get_pcm_cache
+except ImportError:  # pragma: no cover - fallback for direct execution
+    from pcm_cache import get_pcm_cache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PROXY_DIR = os.path.join(os.path.expanduser("~"), ".cache", "sync_analyzer", "proxies")
+DEFAULT_MAX_BYTES = 20 * 1024 ** 3
+
+
+@dataclass(frozen=True)
+class ProxyFormat:
+    """One browser playback rendition (always 48 kHz stereo)."""
+    name: str
+    extension: str
+    media_type: str
+    codec_args: Tuple[str, ...]
+
+
+PROXY_FORMATS: Dict[str, ProxyFormat] = {f.name: f for f in (
+    ProxyFormat("wav", ".wav", "audio/wav", ("-c:a", "pcm_s16le", "-f", "wav")),
+    ProxyFormat("flac", ".flac", "audio/flac", ("-c:a", "flac", "-f", "flac")),
+    ProxyFormat("webm", ".webm", "audio/webm", ("-c:a", "libopus", "-b:a", "128k", "-f", "webm")),
+    ProxyFormat("mp4", ".m4a", "audio/mp4", ("-c:a", "aac", "-b:a", "192k", "-movflags", "+faststart", "-f", "mp4")),
+    ProxyFormat("aac", ".aac", "audio/aac", ("-c:a", "aac", "-b:a", "192k", "-f", "adts")),
+)}
+
+# Other names for the renditions above; they share one cache entry
+PROXY_FORMAT_ALIASES: Dict[str, str] = {"opus": "webm"}
+
+
+def build_proxy_command(source: str, out_path: str, fmt: ProxyFormat, ffmpeg_bin: str = "ffmpeg") -> List[str]:
+    return [ffmpeg_bin, "-hide_banner", "-loglevel", "error", "-nostdin", "-y",
+            "-i", source, "-vn", "-sn", "-dn", "-ac", "2", "-ar", "48000",
+            *fmt.codec_args, out_path]
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single ``bytes=`` Range header into an inclusive (start, end).
+
+    Returns None when there is no usable range (serve the whole file) and
+    raises ValueError for an unsatisfiable range (HTTP 416). Multi-range
+    requests are answered with the first range.
+    """
+    if not header or not header.strip().lower().startswith("bytes="):
+        return None
+    first, sep, last = header.strip()[6:].split(",")[0].strip().partition("-")
+    if not sep or not (first.isdigit() or last.isdigit()):
+        return None  # malformed: ignored, as RFC 9110 allows
+    if not first:
+        # Suffix range: the last N bytes
+        length = int(last) if last.isdigit() else 0
+        if length <= 0 or size <= 0:
+            raise ValueError(f"unsatisfiable range: {header}")
+        return max(0, size - length), size - 1
+    if not first.isdigit() or (last and not last.isdigit()):
+        return None
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or end < start:
+        raise ValueError(f"unsatisfiable range: {header}")
+    return start, end
+
+
+class ProxyStore:
+    """
+    Build-once, LRU-bounded browser proxies.
+
+    Usage:
+        store = ProxyStore("/var/cache/sync/proxies", max_bytes=50 * 1024 ** 3)
+        path = store.ensure("/mnt/data/master.mxf", "flac")
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_PROXY_DIR, max_bytes: int = DEFAULT_MAX_BYTES,
+                 ffmpeg_bin: Optional[str] = None, timeout: Optional[float] = 1800):
+        self.cache_dir = os.path.abspath(cache_dir)
+        self.max_bytes = int(max_bytes)
+        self.ffmpeg_bin = ffmpeg_bin or shutil.which("ffmpeg") or "ffmpeg"
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, Future] = {}
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    @staticmethod
+    def format_for(name: str) -> ProxyFormat:
+        try:
+            name = name.lower()
+            return PROXY_FORMATS[PROXY_FORMAT_ALIASES.get(name, name)]
+        except KeyError:
+            raise ValueError(f"unsupported proxy format: {name}") from None
+
+    def key(self, source: str, fmt: str) -> str:
+        real = os.path.realpath(source)
+        st = os.stat(real)
+        ident = f"{real}|{st.st_size}|{st.st_mtime_ns}|{self.format_for(fmt).name}"
+        return hashlib.sha1(ident.encode("utf-8")).hexdigest()
+
+    def entry_path(self, key: str, fmt: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}{self.format_for(fmt).extension}")
+
+    def get(self, source: str, fmt: str) -> Optional[str]:
+        """Existing proxy (marked recently used), or None."""
+        entry = self.entry_path(self.key(source, fmt), fmt)
+        if not os.path.exists(entry):
+            return None
+        try:
+            os.utime(entry)  # LRU order is entry mtime
+        except OSError:
+            pass
+        return entry
+
+    def ensure(self, source: str, fmt: str) -> str:
+        """Return the proxy for ``source``, building it once if needed (RuntimeError on failure)."""
+        proxy_format = self.format_for(fmt)
+        key = self.key(source, fmt)
+        entry = self.entry_path(key, fmt)
+        with self._lock:
+            if os.path.exists(entry):
+                try:
+                    os.utime(entry)
+                except OSError:
+                    pass
+                return entry
+            future = self._inflight.get(entry)
+            owner = future is None
+            if owner:
+                future = self._inflight[entry] = Future()
+        if not owner:
+            return future.result()
+
+        try:
+            self._build(source, proxy_format, entry)
+            self.evict(keep=entry)
+        except BaseException as e:
+            with self._lock:
+                self._inflight.pop(entry, None)
+            future.set_exception(e)
+            raise
+        with self._lock:
+            self._inflight.pop(entry, None)
+        future.set_result(entry)
+        return entry
+
+    def _build(self, source: str, fmt: ProxyFormat, entry: str) -> None:
+        tmp = os.path.join(self.cache_dir, f".{uuid.uuid4().hex}.tmp{fmt.extension}")
+        try:
+            pcm_cache = get_pcm_cache()
+            if fmt.name == "wav" and pcm_cache is not None and \
+                    pcm_cache.export_wav(source, 48000, tmp, channels="stereo", subtype="PCM_16"):
+                logger.info(f"WAV proxy for {os.path.basename(source)} exported from the PCM cache")
+            else:
+                cmd = build_proxy_command(source, tmp, fmt, self.ffmpeg_bin)
+                logger.info(f"Building {fmt.name} proxy: {' '.join(cmd)}")
+                try:
+                    proc = subprocess.run(cmd, capture_output=True, text=True, timeout=self.timeout)
+                except (OSError, subprocess.SubprocessError) as e:
+                    raise RuntimeError(f"ffmpeg proxy build failed: {e}") from e
+                if proc.returncode != 0:
+                    raise RuntimeError(f"ffmpeg proxy build failed: {proc.stderr.strip()}")
+            os.replace(tmp, entry)
+        finally:
+            if os.path.exists(tmp):
+                try:
+                    os.remove(tmp)
+                except OSError:
+                    pass
+
+    def _entries(self) -> List[Tuple[float, int, str]]:
+        out = []
+        try:
+            names = os.listdir(self.cache_dir)
+        except OSError:
+            return out
+        for name in names:
+            if name.startswith("."):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            out.append((st.st_mtime, st.st_size, path))
+        return out
+
+    def size_bytes(self) -> int:
+        return sum(size for _, size, _ in self._entries())
+
+    def evict(self, keep: Optional[str] = None) -> None:
+        """Remove least-recently-used proxies until the store fits its budget."""
+        with self._lock:
+            entries = sorted(self._entries())
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in entries:
+                if total <= self.max_bytes:
+                    break
+                if path == keep:
+                    continue
+                try:
+                    os.remove(path)
+                    total -= size
+                except OSError:
+                    pass
+
+
+_default_store: Optional[ProxyStore] = None
+
+
+def configure_proxy_store(cache_dir: Optional[str] = None, max_bytes: Optional[int] = None) -> ProxyStore:
+    """Set the process-wide proxy store (e.g. from application settings)."""
+    global _default_store
+    _default_store = ProxyStore(cache_dir or DEFAULT_PROXY_DIR,
+                                max_bytes if max_bytes is not None else DEFAULT_MAX_BYTES)
+    return _default_store
+
+
+def get_proxy_store() -> ProxyStore:
+    """Process-wide proxy store, configured from the environment on first use."""
+    if _default_store is None:
+        max_bytes = os.environ.get("SYNC_PROXY_CACHE_MAX_BYTES")
+        configure_proxy_store(os.environ.get("SYNC_PROXY_CACHE_DIR"),
+                              int(max_bytes) if max_bytes else None)
+    return _default_store
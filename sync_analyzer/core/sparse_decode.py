@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Seek-only partial decode for subsampled chunk analysis.
+
+With ``max_chunks`` set, ``create_audio_chunks`` keeps about ten windows of a
+feature-length file, yet the whole program used to be decoded before the
+first window was analyzed. ``decode_windows_to_npy`` decodes only the
+selected windows plus a small margin: each span is a separate ffmpeg run
+with input-side ``-ss``/``-t`` (the demuxer seeks, then decodes accurately to
+the requested time), and spans are decoded in parallel.
+
+The result is a full-length float32 ``.npy`` in which only the decoded spans
+hold audio. The file is created sparse, so the gaps cost no disk space, and
+the chunk readers and ``_read_segment`` work on it unchanged. Pass 2 refines
+regions that extend past the pass-1 windows, so the detector seek-decodes
+those regions into a second sparse file. Because the gaps are silent it is
+never stored in the PCM cache.
+"""
+
+from __future__ import annotations
+
+import logging
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MARGIN_SECONDS = 1.0   # decoded on each side of a window (resampler/decoder warm-up)
+DEFAULT_MAX_COVERAGE = 0.5     # above this fraction of the program a full decode is cheaper
+
+CommandBuilder = Callable[[str, float, float, int], List[str]]
+
+
+def build_seek_command(source: str, start: float, duration: float, sample_rate: int,
+                       ffmpeg_bin: str = "ffmpeg") -> List[str]:
+    """ffmpeg command decoding ``duration`` seconds from ``start`` to mono ``s16le`` on stdout."""
+    return [
+        ffmpeg_bin, "-hide_banner", "-loglevel", "error", "-nostdin",
+        "-ss", f"{start:.6f}",          # input-side: demuxer seek, then accurate decode
+        "-t", f"{duration:.6f}",
+        "-i", source,
+        "-vn", "-sn", "-dn",
+        "-ac", "1",
+        "-ar", str(int(sample_rate)),
+        "-f", "s16le", "-acodec", "pcm_s16le",
+        "pipe:1",
+    ]
+
+
+def plan_spans(windows: Sequence[Tuple[float, float]], sample_rate: int,
+               margin_seconds: float = DEFAULT_MARGIN_SECONDS,
+               total_frames: Optional[int] = None) -> List[Tuple[int, int]]:
+    """
+    Frame spans [start, stop) to decode for ``windows``.
+
+    Each window is widened by the margin; overlapping or touching spans are
+    merged so no audio is decoded twice. Span starts are whole frames, so a
+    span's first decoded sample lands on the same frame index as in a full
+    decode.
+    """
+    sr = int(sample_rate)
+    margin = int(round(margin_seconds * sr))
+    spans: List[Tuple[int, int]] = []
+    for start, end in sorted(windows):
+        a = max(0, int(start * sr) - margin)
+        b = int(start * sr) + int((end - start) * sr) + margin
+        if total_frames is not None:
+            b = min(b, int(total_frames))
+        if b <= a:
+            continue
+        if spans and a <= spans[-1][1]:
+            spans[-1] = (spans[-1][0], max(spans[-1][1], b))
+        else:
+            spans.append((a, b))
+    return spans
+
+
+def span_coverage(spans: Sequence[Tuple[int, int]], total_frames: int) -> float:
+    """Fraction of the program the spans decode."""
+    if total_frames <= 0:
+        return 1.0
+    return sum(b - a for a, b in spans) / float(total_frames)
+
+
+def decode_span(command: Sequence[str], timeout: Optional[float] = None) -> np.ndarray:
+    """Run one seek decode and return its samples as float32."""
+    proc = subprocess.run(list(command), capture_output=True, timeout=timeout)
+    if proc.returncode != 0:
+        raise RuntimeError(f"decoder exited with {proc.returncode}: "
+                           f"{proc.stderr.decode('utf-8', 'replace').strip()}")
+    usable = len(proc.stdout) - (len(proc.stdout) % 2)
+    return np.frombuffer(proc.stdout[:usable], dtype="<i2").astype(np.float32) / 32768.0
+
+
+def decode_windows_to_npy(source: str, out_path: str, windows: Sequence[Tuple[float, float]],
+                          sample_rate: int, total_seconds: float,
+                          margin_seconds: float = DEFAULT_MARGIN_SECONDS, jobs: int = 4,
+                          build_command: CommandBuilder = build_seek_command,
+                          timeout: Optional[float] = None) -> str:
+    """
+    Decode only the spans covering ``windows`` into a full-length sparse ``.npy``.
+
+    Args:
+        source: Input media path
+        out_path: Destination ``.npy``
+        windows: (start, end) analysis windows in seconds
+        total_seconds: Program duration; sets the array length
+        jobs: Spans decoded concurrently (each is its own ffmpeg process)
+        build_command: (source, start, duration, sample_rate) -> argv
+
+    Raises RuntimeError when any span fails to decode.
+    """
+    sr = int(sample_rate)
+    total_frames = int(total_seconds * sr)
+    spans = plan_spans(windows, sr, margin_seconds, total_frames)
+
+    pcm = np.lib.format.open_memmap(out_path, mode="w+", dtype=np.float32, shape=(total_frames,))
+    try:
+        def _decode(span: Tuple[int, int], out: np.ndarray = pcm) -> None:
+            a, b = span
+            samples = decode_span(build_command(source, a / sr, (b - a) / sr, sr), timeout=timeout)
+            n = min(len(samples), b - a)
+            out[a:a + n] = samples[:n]
+
+        with ThreadPoolExecutor(max_workers=max(1, min(int(jobs), len(spans) or 1))) as pool:
+            # list() re-raises the first decode error
+            list(pool.map(_decode, spans))
+        pcm.flush()
+    finally:
+        del pcm
+
+    logger.info(f"Sparse decode of {source}: {len(spans)} spans, "
+                f"{span_coverage(spans, total_frames):.1%} of {total_seconds:.1f}s")
+    return out_path
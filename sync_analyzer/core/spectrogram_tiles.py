@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Lazily rendered, disk-cached mel spectrogram tiles.
+
+Checking a flagged drift region used to mean loading the program audio into
+the browser. ``SpectrogramTiles`` renders fixed-width mel spectrogram tiles
+on the server instead: level 0 has one column per analysis hop (512 samples
+at 22050 Hz, ~23 ms), and each further level pools twice as many hops per
+column. A tile covers ``TILE_COLUMNS`` columns, so opening a problem region
+renders a few tiles rather than the whole file.
+
+Each tile is computed from the cached analysis decode of just its time range
+(plus STFT context), through the same STFT as the detectors'
+``SpectralFeatureGraph``. Mel power is pooled before conversion to dB and
+quantized to uint8 over a fixed dB range, so adjacent tiles and levels share
+one scale. Tiles are stored as grayscale PNGs under
+``<pcm cache>/spectrograms/<source key>/`` and served as they are; they
+count against the PCM cache budget and are evicted with it.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import os
+import struct
+import uuid
+import zlib
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import numpy as np
+import librosa
+
+try:
+    from .feature_graph import SpectralFeatureGraph
+    from .pcm_cache import PCMCache, get_pcm_cache
+except ImportError:  # pragma: no cover - fallback for direct execution
+    from feature_graph import SpectralFeatureGraph
+    from pcm_cache import PCMCache, get_pcm_cache
+
+logger = logging.getLogger(__name__)
+
+TILE_COLUMNS = 256
+MAX_LEVEL = 8            # level 8 tile: 256 * 256 hops, ~25 minutes at 22050 Hz
+BLOCK_COLUMNS = 4096     # STFT columns per render block (bounds memory of coarse tiles)
+DB_FLOOR = -80.0         # uint8 0
+DB_CEIL = 40.0           # uint8 255
+
+
+def encode_png_gray(image: np.ndarray) -> bytes:
+    """Encode a 2-D uint8 array as an 8-bit grayscale PNG (no imaging dependency)."""
+    image = np.ascontiguousarray(image, dtype=np.uint8)
+    height, width = image.shape
+    raw = np.hstack([np.zeros((height, 1), dtype=np.uint8), image]).tobytes()  # filter 0 per row
+
+    def _chunk(tag: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data) & 0xFFFFFFFF)
+
+    return (b"\x89PNG\r\n\x1a\n"
+            + _chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 0, 0, 0, 0))
+            + _chunk(b"IDAT", zlib.compress(raw, 6))
+            + _chunk(b"IEND", b""))
+
+
+@dataclass(frozen=True)
+class TileSpec:
+    """Geometry of one tile in seconds."""
+    level: int
+    index: int
+    start: float
+    end: float
+
+    def to_dict(self) -> Dict:
+        return {"level": self.level, "index": self.index, "start": self.start, "end": self.end}
+
+
+class SpectrogramTiles:
+    """
+    Spectrogram tile renderer/cache over analysis decodes in the PCM cache.
+
+    Usage:
+        tiles = SpectrogramTiles()
+        specs = tiles.tiles_for_range(duration, level=2, start=3600.0, end=3660.0)
+        png = tiles.tile_png("/mnt/data/dub.mov", level=2, index=specs[0].index)
+    """
+
+    def __init__(self, cache: Optional[PCMCache] = None, sample_rate: int = 22050,
+                 n_fft: int = 2048, hop_length: int = 512, n_mels: int = 128):
+        self._cache = cache
+        self.sample_rate = int(sample_rate)
+        self.n_fft = int(n_fft)
+        self.hop_length = int(hop_length)
+        self.n_mels = int(n_mels)
+        self._mel_basis = librosa.filters.mel(sr=self.sample_rate, n_fft=self.n_fft, n_mels=self.n_mels)
+
+    @property
+    def cache(self) -> Optional[PCMCache]:
+        return self._cache or get_pcm_cache()
+
+    def tile_seconds(self, level: int) -> float:
+        return TILE_COLUMNS * self.hop_length * (1 << level) / self.sample_rate
+
+    def tiles_for_range(self, duration: float, level: int, start: float = 0.0,
+                        end: Optional[float] = None) -> List[TileSpec]:
+        """Tiles of ``level`` covering [start, end) seconds of a ``duration``-second file."""
+        if not 0 <= level <= MAX_LEVEL:
+            raise ValueError(f"level must be between 0 and {MAX_LEVEL}")
+        end = duration if end is None else min(float(end), duration)
+        span = self.tile_seconds(level)
+        first = int(max(0.0, start) // span)
+        last = max(first, int(math.ceil(end / span)) - 1)
+        return [TileSpec(level, i, i * span, min(duration, (i + 1) * span)) for i in range(first, last + 1)]
+
+    def level_for_range(self, start: float, end: float, max_tiles: int = 4) -> int:
+        """Finest level covering [start, end) in at most ``max_tiles`` tiles."""
+        for level in range(MAX_LEVEL + 1):
+            if (end - start) / self.tile_seconds(level) <= max_tiles:
+                return level
+        return MAX_LEVEL
+
+    # ------------------------------------------------------------------
+    # Rendering
+    # ------------------------------------------------------------------
+
+    def render(self, audio: np.ndarray, level: int, index: int) -> np.ndarray:
+        """uint8 tile of shape (n_mels, TILE_COLUMNS), low frequencies in row 0."""
+        pool = 1 << level
+        hops = TILE_COLUMNS * pool
+        col0 = index * hops
+        total_cols = len(audio) // self.hop_length + 1
+        ncols = max(0, min(hops, total_cols - col0))
+        # Mel power summed per tile column; coarse levels are rendered in
+        # blocks of BLOCK_COLUMNS hops so a level-8 tile never holds its
+        # whole STFT (~33M samples) at once
+        pooled = np.zeros((self.n_mels, TILE_COLUMNS), dtype=np.float64)
+        block_cols = max(pool, BLOCK_COLUMNS // pool * pool)
+        # STFT context: frames are centered, so read n_fft on each side of each block
+        context = -(-self.n_fft // self.hop_length)
+        done = 0
+        while done < ncols:
+            start = col0 + done
+            want = min(block_cols, ncols - done)
+            first_col = max(0, start - context)
+            a = first_col * self.hop_length
+            b = min(len(audio), (start + want + context) * self.hop_length)
+            graph = SpectralFeatureGraph(np.asarray(audio[a:b], dtype=np.float32), self.sample_rate,
+                                         n_fft=self.n_fft, hop_length=self.hop_length, n_mels=self.n_mels)
+            mel = self._mel_basis.dot(graph.power())
+            offset = start - first_col
+            block = mel[:, offset:offset + want]
+            got = block.shape[1]
+            if got:
+                padded = np.zeros((self.n_mels, -(-got // pool) * pool), dtype=np.float64)
+                padded[:, :got] = block
+                column = done // pool
+                pooled[:, column:column + padded.shape[1] // pool] += \
+                    padded.reshape(self.n_mels, -1, pool).sum(axis=2)
+            done += got
+            if got < want:
+                break
+        ncols = done
+        pooled /= pool
+        db = 10.0 * np.log10(np.maximum(pooled, 1e-10))
+        tile = np.round((db - DB_FLOOR) * (255.0 / (DB_CEIL - DB_FLOOR)))
+        tile = np.clip(tile, 0, 255).astype(np.uint8)
+        valid = -(-ncols // pool)
+        tile[:, valid:] = 0
+        return tile
+
+    # ------------------------------------------------------------------
+    # Cache
+    # ------------------------------------------------------------------
+
+    def tile_dir(self, source: str) -> Optional[str]:
+        cache = self.cache
+        if cache is None:
+            return None
+        key = cache.key(source, self.sample_rate, f"spectrogram:{self.n_fft}:{self.hop_length}:{self.n_mels}")
+        if key is None:
+            return None
+        return os.path.join(cache.cache_dir, "spectrograms", key)
+
+    def tile_png(self, source: str, level: int, index: int) -> Optional[str]:
+        """
+        Path of the PNG tile, rendering it on first request. None when the
+        analysis decode of ``source`` is not in the PCM cache.
+        """
+        if not 0 <= level <= MAX_LEVEL or index < 0:
+            raise ValueError(f"invalid tile {level}/{index}")
+        directory = self.tile_dir(source)
+        if directory is None:
+            return None
+        path = os.path.join(directory, f"L{level}_{index}.png")
+        if os.path.exists(path):
+            self.cache.touch(path)
+            return path
+        audio = self.cache.get(source, self.sample_rate, "mono", mmap=True)
+        if audio is None:
+            return None
+        # PNG rows run top-down: put high frequencies at the top
+        png = encode_png_gray(self.render(audio, level, index)[::-1])
+        del audio
+        os.makedirs(directory, exist_ok=True)
+        tmp = os.path.join(directory, f".{uuid.uuid4().hex}.tmp")
+        try:
+            with open(tmp, "wb") as fh:
+                fh.write(png)
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.warning(f"Could not store spectrogram tile {path}: {e}")
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+        self.cache.evict()
+        return path
+
+    def describe(self) -> Dict:
+        return {
+            "sample_rate": self.sample_rate,
+            "n_fft": self.n_fft,
+            "hop_length": self.hop_length,
+            "n_mels": self.n_mels,
+            "tile_columns": TILE_COLUMNS,
+            "max_level": MAX_LEVEL,
+            "db_range": [DB_FLOOR, DB_CEIL],
+        }
+
+
+_default_tiles: Optional[SpectrogramTiles] = None
+
+
+def get_spectrogram_tiles() -> SpectrogramTiles:
+    """Process-wide tile renderer over the shared PCM cache."""
+    global _default_tiles
+    if _default_tiles is None:
+        _default_tiles = SpectrogramTiles()
+    return _default_tiles
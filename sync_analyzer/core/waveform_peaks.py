@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Multi-resolution waveform peak pyramids.
+
+Drawing the master/dub comparison waveforms used to mean downloading the
+full 48 kHz stereo proxy of each file, hundreds of MB per feature. A peak
+pyramid summarises the analysis PCM once: level 0 holds the min, max and RMS
+of every ``base_bin`` samples, and each further level halves the resolution
+(power-of-two zoom). Values are quantized to int8 (or int16) so a two-hour
+program fits in a few MB. The timeline then draws any zoom level from a tile
+of bins without touching the audio.
+
+Pyramids are built from the cached analysis rendition at ingest and stored
+next to the PCM cache under ``<cache>/peaks``, keyed like its entries.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import uuid
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import numpy as np
+
+try:
+    from .pcm_cache import PCMCache, get_pcm_cache
+except ImportError:  # pragma: no cover - fallback for direct execution
+    from pcm_cache import PCMCache, get_pcm_cache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BASE_BIN = 256       # samples per level-0 bin (~11.6 ms at 22050 Hz)
+DEFAULT_MIN_BINS = 512       # coarsest level still holds at least this many bins
+DEFAULT_TILE_BINS = 2000     # bins returned when a tile is requested without a level
+MAX_TILE_BINS = 100000       # most bins one tile returns (a fine level over a long range is clipped)
+
+
+@dataclass
+class PeakLevel:
+    """Quantized min/max/RMS of one zoom level."""
+    samples_per_bin: int
+    min: np.ndarray
+    max: np.ndarray
+    rms: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.max)
+
+
+@dataclass
+class PeakPyramid:
+    """Peak levels of one file; level ``k`` has ``base_bin * 2**k`` samples per bin."""
+    sample_rate: int
+    frames: int
+    bits: int
+    levels: List[PeakLevel]
+
+    @property
+    def duration(self) -> float:
+        return self.frames / float(self.sample_rate) if self.sample_rate else 0.0
+
+    @property
+    def scale(self) -> int:
+        """Quantized value corresponding to full scale (1.0)."""
+        return (1 << (self.bits - 1)) - 1
+
+    def pick_level(self, start: float, end: float, bins: int = DEFAULT_TILE_BINS) -> int:
+        """Coarsest level that still gives at least ``bins`` bins over [start, end)."""
+        span = max(0.0, end - start) * self.sample_rate
+        for index in range(len(self.levels) - 1, -1, -1):
+            if span / self.levels[index].samples_per_bin >= bins:
+                return index
+        return 0
+
+    def tile(self, level: Optional[int] = None, start: float = 0.0, end: Optional[float] = None,
+             bins: int = DEFAULT_TILE_BINS, max_bins: int = MAX_TILE_BINS) -> Dict:
+        """
+        Bins of ``level`` covering [start, end) seconds (JSON-ready).
+
+        Without a level the coarsest one giving at least ``bins`` bins is used.
+        At most ``max_bins`` bins are returned; ``truncated`` is set when the
+        range was clipped. The returned start/end are the bin-aligned times
+        actually covered.
+        """
+        end = self.duration if end is None else min(float(end), self.duration)
+        start = max(0.0, float(start))
+        if level is None:
+            level = self.pick_level(start, end, bins)
+        if not 0 <= level < len(self.levels):
+            raise ValueError(f"level must be between 0 and {len(self.levels) - 1}")
+        lvl = self.levels[level]
+        a = int(start * self.sample_rate) // lvl.samples_per_bin
+        b = min(len(lvl), -(-int(end * self.sample_rate) // lvl.samples_per_bin))
+        b = max(a, b)
+        truncated = b - a > max_bins
+        if truncated:
+            b = a + max_bins
+        return {
+            "level": level,
+            "levels": len(self.levels),
+            "samples_per_bin": lvl.samples_per_bin,
+            "sample_rate": self.sample_rate,
+            "bits": self.bits,
+            "scale": self.scale,
+            "duration": self.duration,
+            "start": a * lvl.samples_per_bin / self.sample_rate,
+            "end": min(self.frames, b * lvl.samples_per_bin) / self.sample_rate,
+            "min": lvl.min[a:b].tolist(),
+            "max": lvl.max[a:b].tolist(),
+            "rms": lvl.rms[a:b].tolist(),
+            "truncated": truncated,
+        }
+
+    def save(self, path: str) -> str:
+        """Write the pyramid as one uncompressed ``.npz`` (atomic rename)."""
+        arrays = {"meta": np.array([self.sample_rate, self.frames, self.bits, len(self.levels)], dtype=np.int64)}
+        for index, lvl in enumerate(self.levels):
+            arrays[f"spb_{index}"] = np.array([lvl.samples_per_bin], dtype=np.int64)
+            arrays[f"min_{index}"] = lvl.min
+            arrays[f"max_{index}"] = lvl.max
+            arrays[f"rms_{index}"] = lvl.rms
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp = f"{path}.{uuid.uuid4().hex}.tmp.npz"
+        try:
+            np.savez(tmp, **arrays)
+            os.replace(tmp, path)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        return path
+
+    @classmethod
+    def load(cls, path: str) -> "PeakPyramid":
+        with np.load(path, allow_pickle=False) as data:
+            sample_rate, frames, bits, count = (int(v) for v in data["meta"])
+            levels = [PeakLevel(int(data[f"spb_{i}"][0]), data[f"min_{i}"], data[f"max_{i}"], data[f"rms_{i}"])
+                      for i in range(count)]
+        return cls(sample_rate=sample_rate, frames=frames, bits=bits, levels=levels)
+
+
+def _quantize(values: np.ndarray, bits: int) -> np.ndarray:
+    scale = (1 << (bits - 1)) - 1
+    dtype = np.int8 if bits == 8 else np.int16
+    return np.clip(np.round(values * scale), -scale, scale).astype(dtype)
+
+
+def build_peak_pyramid(audio: np.ndarray, sample_rate: int, base_bin: int = DEFAULT_BASE_BIN,
+                       min_bins: int = DEFAULT_MIN_BINS, bits: int = 8,
+                       block_bins: int = 1 << 14) -> PeakPyramid:
+    """
+    Build the pyramid of ``audio`` (1-D, or (frames, channels) which is downmixed).
+
+    Level 0 is computed block by block, so a memory-mapped cache entry is
+    never loaded whole; coarser levels are reduced pairwise from the
+    float level below (min of mins, max of maxes, RMS of mean squares).
+    """
+    if bits not in (8, 16):
+        raise ValueError("bits must be 8 or 16")
+    frames = int(audio.shape[0])
+    n_bins = -(-frames // base_bin)
+    mins = np.zeros(n_bins, dtype=np.float32)
+    maxs = np.zeros(n_bins, dtype=np.float32)
+    power = np.zeros(n_bins, dtype=np.float32)
+    block = base_bin * block_bins
+    for offset in range(0, frames, block):
+        chunk = np.asarray(audio[offset:offset + block], dtype=np.float32)
+        if chunk.ndim > 1:
+            chunk = chunk.mean(axis=1)
+        first = offset // base_bin
+        whole = len(chunk) // base_bin
+        if whole:
+            grid = chunk[:whole * base_bin].reshape(whole, base_bin)
+            mins[first:first + whole] = grid.min(axis=1)
+            maxs[first:first + whole] = grid.max(axis=1)
+            power[first:first + whole] = np.mean(grid * grid, axis=1)
+        tail = chunk[whole * base_bin:]
+        if len(tail):
+            mins[first + whole] = tail.min()
+            maxs[first + whole] = tail.max()
+            power[first + whole] = np.mean(tail * tail)
+
+    levels: List[PeakLevel] = []
+    samples_per_bin = base_bin
+    while True:
+        levels.append(PeakLevel(samples_per_bin, _quantize(mins, bits), _quantize(maxs, bits),
+                                _quantize(np.sqrt(power), bits)))
+        if len(maxs) < 2 * min_bins:
+            break
+        if len(maxs) % 2:
+            # Pad odd lengths by repeating the last bin (neutral for min/max/mean power)
+            mins, maxs, power = (np.append(a, a[-1]) for a in (mins, maxs, power))
+        mins = np.minimum(mins[0::2], mins[1::2])
+        maxs = np.maximum(maxs[0::2], maxs[1::2])
+        power = 0.5 * (power[0::2] + power[1::2])
+        samples_per_bin *= 2
+    return PeakPyramid(sample_rate=int(sample_rate), frames=frames, bits=bits, levels=levels)
+
+
+def peaks_path(cache: PCMCache, source: str, sample_rate: int) -> Optional[str]:
+    """Where the pyramid of the current version of ``source`` is stored, or None."""
+    key = cache.key(source, sample_rate, "peaks")
+    if key is None:
+        return None
+    return os.path.join(cache.cache_dir, "peaks", f"{key}.npz")
+
+
+def load_peaks(source: str, sample_rate: int, cache: Optional[PCMCache] = None) -> Optional[PeakPyramid]:
+    """Stored pyramid of ``source``, or None."""
+    cache = cache or get_pcm_cache()
+    path = peaks_path(cache, source, sample_rate) if cache is not None else None
+    if path is None or not os.path.exists(path):
+        return None
+    cache.touch(path)
+    try:
+        return PeakPyramid.load(path)
+    except (OSError, ValueError, KeyError) as e:
+        logger.warning(f"Discarding unreadable peak pyramid {path}: {e}")
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        return None
+
+
+def ensure_peaks(source: str, sample_rate: int, cache: Optional[PCMCache] = None,
+                 **kwargs) -> Optional[str]:
+    """
+    Build and store the pyramid of ``source`` from its cached ``sample_rate``
+    mono decode. Returns the pyramid path, or None when there is no cache
+    entry to build from.
+    """
+    cache = cache or get_pcm_cache()
+    if cache is None:
+        return None
+    path = peaks_path(cache, source, sample_rate)
+    if path is None:
+        return None
+    if os.path.exists(path):
+        cache.touch(path)
+        return path
+    audio = cache.get(source, sample_rate, "mono", mmap=True)
+    if audio is None:
+        return None
+    pyramid = build_peak_pyramid(audio, sample_rate, **kwargs)
+    del audio
+    try:
+        pyramid.save(path)
+    except OSError as e:
+        logger.warning(f"Could not store peak pyramid for {source}: {e}")
+        return None
+    cache.evict()
+    logger.info(f"Peak pyramid for {os.path.basename(source)}: {len(pyramid.levels)} levels")
+    return path
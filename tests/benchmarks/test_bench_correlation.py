@@ -0,0 +1,50 @@
+"""Per-chunk correlation benchmark: legacy direct np.correlate vs FFT engine.
+
+Run with ``SYNC_BENCHMARKS=1 pytest -s tests/benchmarks``. The chunk length
+defaults to the detector's 30 s window at 22050 Hz and can be shortened with
+``SYNC_BENCH_CHUNK_SECONDS``.
+"""
+
+import os
+import time
+
+import numpy as np
+import pytest
+
+from sync_analyzer.core.correlation_engine import correlate_peak
+
+pytestmark = pytest.mark.skipif(
+    not os.environ.get("SYNC_BENCHMARKS"), reason="set SYNC_BENCHMARKS=1 to run benchmarks"
+)
+
+
+def test_chunk_correlation_speedup():
+    sr = 22050
+    seconds = float(os.environ.get("SYNC_BENCH_CHUNK_SECONDS", "30"))
+    n = int(seconds * sr)
+    rng = np.random.default_rng(0)
+    base = rng.standard_normal(n + sr).astype(np.float32)
+    y1, y2 = base[:n], base[441:441 + n]
+
+    # Legacy CPU path: one correlation for the peak, a second one for confidence
+    t0 = time.perf_counter()
+    legacy = np.correlate(y1, y2, mode="full")
+    legacy_idx = int(np.argmax(legacy))
+    np.correlate(y1, y2, mode="full")
+    legacy_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    peak = correlate_peak(y1, y2, use_abs=False)
+    engine_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    bounded = correlate_peak(y1, y2, max_lag=int(2.0 * sr), use_abs=False)
+    bounded_s = time.perf_counter() - t0
+
+    print(f"\nchunk {seconds:.0f}s @ {sr} Hz ({n} samples)")
+    print(f"  legacy np.correlate x2 : {legacy_s * 1000:10.1f} ms")
+    print(f"  fft engine (full lag)  : {engine_s * 1000:10.1f} ms  ({legacy_s / engine_s:6.1f}x)")
+    print(f"  fft engine (|lag|<=2s) : {bounded_s * 1000:10.1f} ms  ({legacy_s / bounded_s:6.1f}x)")
+
+    assert peak.lag == legacy_idx - (n - 1) == bounded.lag
+    assert engine_s < legacy_s
@@ -0,0 +1,73 @@
+"""Feature extraction benchmark: per-feature librosa calls vs the shared STFT graph.
+
+Run with ``SYNC_BENCHMARKS=1 pytest -s tests/benchmarks``. The input defaults
+to 60 minutes at 22050 Hz and can be shortened with
+``SYNC_BENCH_FEATURE_MINUTES``. Peak memory is measured with tracemalloc,
+which tracks numpy allocations.
+"""
+
+import os
+import time
+import tracemalloc
+
+import librosa
+import numpy as np
+import pytest
+
+from sync_analyzer.core.feature_graph import SpectralFeatureGraph
+
+pytestmark = pytest.mark.skipif(
+    not os.environ.get("SYNC_BENCHMARKS"), reason="set SYNC_BENCHMARKS=1 to run benchmarks"
+)
+
+
+def _per_feature(y, sr, hop):
+    """The original extract_audio_features path: every call runs its own STFT."""
+    return {
+        "mfcc": librosa.feature.mfcc(y=y, sr=sr, n_mfcc=13, hop_length=hop, n_fft=2048),
+        "spectral_centroid": librosa.feature.spectral_centroid(y=y, sr=sr, hop_length=hop),
+        "chroma": librosa.feature.chroma_stft(y=y, sr=sr, hop_length=hop),
+        "onset_frames": librosa.onset.onset_detect(y=y, sr=sr, hop_length=hop, units="frames"),
+        "rms": librosa.feature.rms(y=y, hop_length=hop),
+    }
+
+
+def _shared(y, sr, hop):
+    graph = SpectralFeatureGraph(y, sr=sr, n_fft=2048, hop_length=hop)
+    return {
+        "mfcc": graph.mfcc(13),
+        "spectral_centroid": graph.spectral_centroid(),
+        "chroma": graph.chroma(),
+        "onset_frames": graph.onset_frames(),
+        "rms": graph.rms(),
+    }
+
+
+def _measure(fn, *args):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    out = fn(*args)
+    elapsed = time.perf_counter() - t0
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return out, elapsed, peak
+
+
+def test_shared_feature_graph_vs_per_feature():
+    sr, hop = 22050, 512
+    minutes = float(os.environ.get("SYNC_BENCH_FEATURE_MINUTES", "60"))
+    rng = np.random.default_rng(0)
+    y = (0.1 * rng.standard_normal(int(minutes * 60 * sr))).astype(np.float32)
+
+    legacy, legacy_s, legacy_peak = _measure(_per_feature, y, sr, hop)
+    shared, shared_s, shared_peak = _measure(_shared, y, sr, hop)
+
+    mib = 1024.0 * 1024.0
+    print(f"\nfeatures for {minutes:.0f} min @ {sr} Hz")
+    print(f"  per-feature librosa : {legacy_s:8.1f} s  peak {legacy_peak / mib:8.0f} MiB")
+    print(f"  shared STFT graph   : {shared_s:8.1f} s  peak {shared_peak / mib:8.0f} MiB"
+          f"  ({legacy_s / shared_s:4.1f}x)")
+
+    np.testing.assert_allclose(shared["mfcc"], legacy["mfcc"], rtol=1e-4, atol=1e-3)
+    np.testing.assert_array_equal(shared["onset_frames"], legacy["onset_frames"])
+    assert shared_s < legacy_s
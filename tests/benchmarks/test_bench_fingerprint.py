@@ -0,0 +1,72 @@
+"""Offset detection benchmark: landmark fingerprint vs MFCC cross-correlation.
+
+Run with ``SYNC_BENCHMARKS=1 pytest -s tests/benchmarks``. The program
+defaults to 30 minutes at 22050 Hz (``SYNC_BENCH_FINGERPRINT_MINUTES``). Two
+dubs are tested: a plain 95.5 s head trim, and a re-edit that also drops 20 s
+from the middle, so only part of the dub aligns at the original offset.
+Feature extraction (both files) and matching are timed separately: the
+fingerprint's matching step is a hash join whose cost does not depend on the
+searched offset range.
+"""
+
+import os
+import time
+
+import numpy as np
+import pytest
+
+from sync_analyzer.core.audio_sync_detector import ProfessionalSyncDetector
+
+pytestmark = pytest.mark.skipif(
+    not os.environ.get("SYNC_BENCHMARKS"), reason="set SYNC_BENCHMARKS=1 to run benchmarks"
+)
+
+OFFSET_SECONDS = 95.5
+
+
+def _program(sr, seconds, seed=0):
+    rng = np.random.default_rng(seed)
+    n = int(sr * seconds)
+    audio = 0.01 * rng.standard_normal(n)
+    t = np.arange(int(0.25 * sr)) / sr
+    envelope = np.hanning(len(t))
+    for start in rng.integers(0, n - len(t), int(seconds * 6)):
+        audio[start:start + len(t)] += 0.3 * envelope * np.sin(2 * np.pi * rng.uniform(150, 5000) * t)
+    return audio.astype(np.float32)
+
+
+def _run(detector, method, feature, master, dub):
+    """(result, feature seconds, match seconds) for one method on fresh features."""
+    start = time.perf_counter()
+    features = [detector.extract_audio_features(master), detector.extract_audio_features(dub)]
+    for f in features:
+        getattr(f, feature)
+    extracted = time.perf_counter()
+    result = method(*features)
+    return result, extracted - start, time.perf_counter() - extracted
+
+
+def test_fingerprint_vs_mfcc_on_long_program():
+    detector = ProfessionalSyncDetector(use_gpu=False)
+    sr = detector.sample_rate
+    minutes = float(os.environ.get("SYNC_BENCH_FINGERPRINT_MINUTES", "30"))
+    master = _program(sr, minutes * 60)
+    rng = np.random.default_rng(1)
+    trimmed = master[int(OFFSET_SECONDS * sr):]
+    trimmed = (trimmed + 0.02 * rng.standard_normal(len(trimmed))).astype(np.float32)
+    cut = len(trimmed) // 2
+    reedited = np.concatenate([trimmed[:cut], trimmed[cut + 20 * sr:]])
+
+    frame = detector.hop_length / sr
+    print(f"\noffset detection, {minutes:.0f} min @ {sr} Hz, true offset {OFFSET_SECONDS} s")
+    for label, dub in (("head trim", trimmed), ("re-edit", reedited)):
+        runs = {
+            "mfcc": _run(detector, detector.mfcc_cross_correlation_sync, "mfcc", master, dub),
+            "fingerprint": _run(detector, detector.fingerprint_sync, "landmarks", master, dub),
+        }
+        for name, (result, feature_s, match_s) in runs.items():
+            print(f"  {label:9s} {name:11s}: features {feature_s:6.2f} s  match {match_s:7.3f} s  "
+                  f"offset {result.offset_seconds:9.3f}  conf {result.confidence:.2f}")
+        landmark = runs["fingerprint"][0]
+        assert abs(landmark.offset_seconds - OFFSET_SECONDS) <= 1.5 * frame
+        assert landmark.confidence > 0.5
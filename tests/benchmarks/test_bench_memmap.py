@@ -0,0 +1,113 @@
+"""Resident-memory benchmark: in-RAM WAV reads vs memory-mapped float32 ``.npy``.
+
+Run with ``SYNC_BENCHMARKS=1 pytest -s tests/benchmarks``. The input defaults
+to a 120 minute feature at 22050 Hz and can be shortened with
+``SYNC_BENCH_MEMMAP_MINUTES``. Each scenario runs in a fresh interpreter and
+reports peak RSS (``ru_maxrss``) above the post-import baseline, plus peak
+anonymous (private) RSS for the chunk scans, where memory-mapped pages are
+file-backed and shared between worker processes.
+"""
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+pytestmark = pytest.mark.skipif(
+    not os.environ.get("SYNC_BENCHMARKS"), reason="set SYNC_BENCHMARKS=1 to run benchmarks"
+)
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+
+SCENARIO = r"""
+import json, resource, sys
+import numpy as np
+import soundfile as sf
+from scipy import signal
+
+from sync_analyzer.core.audio_sync_detector import ProfessionalSyncDetector
+from sync_analyzer.core.chunk_reader import ChunkWindowReader, open_pcm
+
+
+def rss_kib(field):
+    with open("/proc/self/status") as fh:
+        for line in fh:
+            if line.startswith(field + ":"):
+                return int(line.split()[1])
+    return 0
+
+
+scenario, wav, npy, sr = sys.argv[1], sys.argv[2], sys.argv[3], int(sys.argv[4])
+base_max = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+base_anon = rss_kib("RssAnon")
+peak_anon = base_anon
+
+if scenario == "preprocess_wav_float64":
+    # Previous load_and_preprocess_audio: whole file in RAM, sosfilt upcasts to float64
+    audio, _ = sf.read(wav, dtype="float32")
+    audio = audio / np.max(np.abs(audio)) * 0.95
+    sos = signal.butter(4, 80, btype="high", fs=sr, output="sos")
+    audio = signal.sosfilt(sos, audio)
+elif scenario == "preprocess_npy_float32":
+    detector = ProfessionalSyncDetector(sample_rate=sr, use_gpu=False)
+    audio = detector._normalize_and_highpass(open_pcm(npy))
+else:
+    path = wav if scenario == "chunks_wav" else npy
+    duration = len(open_pcm(npy)) / sr
+    windows, start = [], 0.0
+    while start < duration - 10:
+        windows.append((start, min(start + 30.0, duration)))
+        start += 9.0
+    with ChunkWindowReader(path, path, sr, windows) as reader:
+        for window in reader:
+            float(np.dot(window.master, window.dub))
+            peak_anon = max(peak_anon, rss_kib("RssAnon"))
+
+peak_anon = max(peak_anon, rss_kib("RssAnon"))
+print(json.dumps({
+    "peak_rss_mib": (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - base_max) / 1024.0,
+    "peak_anon_mib": (peak_anon - base_anon) / 1024.0,
+}))
+"""
+
+
+def _run(scenario, wav, npy, sr):
+    out = subprocess.run(
+        [sys.executable, "-c", SCENARIO, scenario, wav, npy, str(sr)],
+        cwd=str(REPO_ROOT), capture_output=True, text=True, check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def test_memmap_resident_memory(tmp_path):
+    sr = 22050
+    minutes = float(os.environ.get("SYNC_BENCH_MEMMAP_MINUTES", "120"))
+    n = int(minutes * 60 * sr)
+    wav, npy = str(tmp_path / "feature.wav"), str(tmp_path / "feature.npy")
+
+    rng = np.random.default_rng(0)
+    pcm = np.lib.format.open_memmap(npy, mode="w+", dtype=np.float32, shape=(n,))
+    with sf.SoundFile(wav, "w", samplerate=sr, channels=1, subtype="FLOAT") as fh:
+        for i in range(0, n, 1 << 20):
+            block = (0.1 * rng.standard_normal(min(1 << 20, n - i))).astype(np.float32)
+            pcm[i:i + len(block)] = block
+            fh.write(block)
+    pcm.flush()
+    del pcm
+
+    results = {s: _run(s, wav, npy, sr) for s in (
+        "preprocess_wav_float64", "preprocess_npy_float32", "chunks_wav", "chunks_npy")}
+
+    print(f"\nresident memory for a {minutes:.0f} min feature @ {sr} Hz")
+    for name, r in results.items():
+        print(f"  {name:24s}: peak RSS {r['peak_rss_mib']:8.0f} MiB  "
+              f"peak private {r['peak_anon_mib']:8.0f} MiB")
+    legacy, mapped = results["preprocess_wav_float64"], results["preprocess_npy_float32"]
+    print(f"  preprocess RSS reduction: {legacy['peak_rss_mib'] - mapped['peak_rss_mib']:.0f} MiB")
+
+    assert mapped["peak_rss_mib"] < legacy["peak_rss_mib"]
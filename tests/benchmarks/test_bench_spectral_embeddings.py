@@ -0,0 +1,63 @@
+"""CPU benchmark: spectral-fallback embeddings, per-window librosa calls vs batched STFT.
+
+Run with ``SYNC_BENCHMARKS=1 pytest -s tests/benchmarks``. The input defaults
+to 10 minutes at 16 kHz (``SYNC_BENCH_SPECTRAL_MINUTES``), i.e. 1197 windows
+of 2 s at a 0.5 s hop. The per-window path is the original implementation
+(six STFTs and six librosa calls per window); the extractor must reproduce
+its features.
+"""
+
+import os
+import time
+
+import librosa
+import numpy as np
+import pytest
+
+from sync_analyzer.ai.embedding_sync_detector import AudioEmbeddingExtractor, EmbeddingConfig
+
+pytestmark = pytest.mark.skipif(
+    not os.environ.get("SYNC_BENCHMARKS"), reason="set SYNC_BENCHMARKS=1 to run benchmarks"
+)
+
+SR = 16000
+
+
+def _per_window(audio, sr, window=2 * SR, hop=SR // 2):
+    rows = []
+    for start in range(0, len(audio) - window + 1, hop):
+        y = audio[start:start + window]
+        mel_db = librosa.power_to_db(librosa.feature.melspectrogram(y=y, sr=sr, n_mels=64))
+        rows.append(np.concatenate([
+            np.mean(librosa.feature.mfcc(y=y, sr=sr, n_mfcc=13), axis=1),
+            [np.mean(librosa.feature.spectral_centroid(y=y, sr=sr)),
+             np.mean(librosa.feature.spectral_bandwidth(y=y, sr=sr)),
+             np.mean(librosa.feature.spectral_rolloff(y=y, sr=sr))],
+            np.mean(librosa.feature.chroma_stft(y=y, sr=sr), axis=1),
+            np.mean(mel_db, axis=1),
+            np.std(mel_db, axis=1),
+        ]))
+    return np.array(rows)
+
+
+def test_spectral_embeddings_speedup():
+    minutes = float(os.environ.get("SYNC_BENCH_SPECTRAL_MINUTES", "10"))
+    rng = np.random.default_rng(0)
+    t = np.arange(int(SR * minutes * 60)) / SR
+    audio = (0.2 * np.sin(2 * np.pi * 220 * t) * (1 + np.sin(0.3 * t))
+             + 0.05 * rng.standard_normal(len(t))).astype(np.float32)
+
+    start = time.perf_counter()
+    reference = _per_window(audio, SR)
+    per_window = time.perf_counter() - start
+
+    extractor = AudioEmbeddingExtractor(EmbeddingConfig(model_name="none", use_gpu=False, normalize_embeddings=False))
+    start = time.perf_counter()
+    embeddings = extractor.extract_embeddings(audio, SR)
+    batched = time.perf_counter() - start
+
+    n = len(reference)
+    print(f"\nspectral embeddings, {minutes:.0f} min @ {SR} Hz, {n} windows")
+    print(f"  per-window : {per_window:7.2f} s  ({n / per_window:7.1f} windows/s)")
+    print(f"  batched    : {batched:7.2f} s  ({n / batched:7.1f} windows/s)  speedup {per_window / batched:.1f}x")
+    np.testing.assert_allclose(embeddings[:, :reference.shape[1]], reference, rtol=1e-4, atol=1e-3)
@@ -0,0 +1,55 @@
+"""CPU throughput benchmark: wav2vec2 window embeddings by batch size.
+
+Run with ``SYNC_BENCHMARKS=1 pytest -s tests/benchmarks``. Needs
+``transformers``; the model is a randomly initialised wav2vec2-base
+architecture (no download), which costs the same as the pretrained weights.
+The input defaults to 60 s of audio (``SYNC_BENCH_W2V_SECONDS``), i.e. 117
+windows of 2 s at a 0.5 s hop. Batch sizes are ``SYNC_BENCH_W2V_BATCHES``
+(default ``1,4,8,16``); throughput is reported in windows per second, and
+each batched run must reproduce the window-by-window embeddings.
+"""
+
+import os
+import time
+
+import numpy as np
+import pytest
+import torch
+
+from sync_analyzer.ai.embedding_sync_detector import AudioEmbeddingExtractor, EmbeddingConfig
+
+pytestmark = pytest.mark.skipif(
+    not os.environ.get("SYNC_BENCHMARKS"), reason="set SYNC_BENCHMARKS=1 to run benchmarks"
+)
+
+SR = 16000
+
+
+def _extractor(batch_size):
+    transformers = pytest.importorskip("transformers")
+    extractor = AudioEmbeddingExtractor(EmbeddingConfig(model_name="none", use_gpu=False, batch_size=batch_size))
+    torch.manual_seed(0)
+    extractor.model = transformers.Wav2Vec2Model(transformers.Wav2Vec2Config()).eval()
+    extractor.processor = transformers.Wav2Vec2FeatureExtractor(do_normalize=True)
+    extractor.model_type = "wav2vec2"
+    return extractor
+
+
+def test_wav2vec2_throughput_by_batch_size():
+    seconds = float(os.environ.get("SYNC_BENCH_W2V_SECONDS", "60"))
+    batches = [int(b) for b in os.environ.get("SYNC_BENCH_W2V_BATCHES", "1,4,8,16").split(",")]
+    audio = (0.1 * np.random.default_rng(0).standard_normal(int(SR * seconds))).astype(np.float32)
+
+    print(f"\nwav2vec2-base on CPU ({torch.get_num_threads()} threads), {seconds:.0f} s of audio")
+    reference = None
+    for batch_size in batches:
+        extractor = _extractor(batch_size)
+        extractor.extract_embeddings(audio[:SR * 4], SR)  # warm-up
+        start = time.perf_counter()
+        embeddings = extractor.extract_embeddings(audio, SR)
+        elapsed = time.perf_counter() - start
+        print(f"  batch {batch_size:3d}: {len(embeddings) / elapsed:7.1f} windows/s  ({elapsed:6.2f} s)")
+        if reference is None:
+            reference = embeddings
+        else:
+            np.testing.assert_allclose(embeddings, reference, atol=1e-4)
@@ -0,0 +1,88 @@
+"""Cost and accuracy benchmark: windowed wav2vec2 vs frame-pooled segments.
+
+Run with ``SYNC_BENCHMARKS=1 pytest -s tests/benchmarks``. Needs
+``transformers``. The model is loaded from ``SYNC_BENCH_W2V_MODEL`` (a local
+path or hub id) when set, otherwise a randomly initialised wav2vec2-base is
+used. The input is a synthetic program (``SYNC_BENCH_W2V_SECONDS``, default
+120 s), and the dub is the same program trimmed by 7.5 s plus noise.
+
+Reported per path: wall time, per-window cosine similarity of the pooled
+embeddings to the windowed ones (mean and minimum), and the offset the AI
+detector finds from each set of embeddings.
+"""
+
+import os
+import time
+
+import numpy as np
+import pytest
+import torch
+
+from sync_analyzer.ai.embedding_sync_detector import AISyncDetector, AudioEmbeddingExtractor, EmbeddingConfig
+
+pytestmark = pytest.mark.skipif(
+    not os.environ.get("SYNC_BENCHMARKS"), reason="set SYNC_BENCHMARKS=1 to run benchmarks"
+)
+
+SR = 16000
+OFFSET_SECONDS = 7.5
+
+
+def _extractor(config):
+    transformers = pytest.importorskip("transformers")
+    extractor = AudioEmbeddingExtractor(EmbeddingConfig(**{**config.__dict__, "model_name": "none"}))
+    extractor.config = config
+    source = os.environ.get("SYNC_BENCH_W2V_MODEL")
+    torch.manual_seed(0)
+    if source:
+        extractor.model = transformers.Wav2Vec2Model.from_pretrained(source).eval()
+        extractor.processor = transformers.Wav2Vec2FeatureExtractor.from_pretrained(source)
+    else:
+        extractor.model = transformers.Wav2Vec2Model(transformers.Wav2Vec2Config()).eval()
+        extractor.processor = transformers.Wav2Vec2FeatureExtractor(do_normalize=True)
+    extractor.model_type = "wav2vec2"
+    return extractor
+
+
+def _program(seconds, seed=0):
+    rng = np.random.default_rng(seed)
+    n = int(SR * seconds)
+    audio = 0.01 * rng.standard_normal(n)
+    t = np.arange(int(0.25 * SR)) / SR
+    envelope = np.hanning(len(t))
+    for start in rng.integers(0, n - len(t), int(seconds * 6)):
+        audio[start:start + len(t)] += 0.3 * envelope * np.sin(2 * np.pi * rng.uniform(150, 5000) * t)
+    return audio.astype(np.float32)
+
+
+def test_frame_pooling_cost_and_accuracy():
+    seconds = float(os.environ.get("SYNC_BENCH_W2V_SECONDS", "120"))
+    master = _program(seconds)
+    rng = np.random.default_rng(1)
+    dub = master[int(OFFSET_SECONDS * SR):]
+    dub = (dub + 0.01 * rng.standard_normal(len(dub))).astype(np.float32)
+
+    configs = {
+        "windowed": EmbeddingConfig(use_gpu=False, batch_size=16),
+        "pooled": EmbeddingConfig(use_gpu=False, frame_pooling=True),
+    }
+    runs = {}
+    for name, config in configs.items():
+        extractor = _extractor(config)
+        start = time.perf_counter()
+        embeddings = [extractor.extract_embeddings(master, SR), extractor.extract_embeddings(dub, SR)]
+        elapsed = time.perf_counter() - start
+        detector = AISyncDetector(config, embedding_extractor=extractor)
+        offset_windows, _ = detector.find_optimal_alignment(detector.compute_similarity_matrix(*embeddings))
+        runs[name] = (embeddings, elapsed, offset_windows * config.hop_size)
+
+    windowed, pooled = runs["windowed"][0][0], runs["pooled"][0][0]
+    cosine = np.sum(windowed * pooled, axis=1) / (
+        np.linalg.norm(windowed, axis=1) * np.linalg.norm(pooled, axis=1) + 1e-12)
+    print(f"\nwav2vec2 on CPU, {seconds:.0f} s master, true offset {OFFSET_SECONDS} s")
+    for name, (_, elapsed, offset) in runs.items():
+        print(f"  {name:8s}: {elapsed:7.2f} s   offset {offset:6.2f} s")
+    print(f"  speedup {runs['windowed'][1] / runs['pooled'][1]:.2f}x   "
+          f"window cosine mean {cosine.mean():.4f}  min {cosine.min():.4f}")
+    assert windowed.shape == pooled.shape
+    assert runs["pooled"][1] < runs["windowed"][1]
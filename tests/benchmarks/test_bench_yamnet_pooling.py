@@ -0,0 +1,79 @@
+"""Cost and tolerance benchmark: per-window YAMNet vs block-pooled patches.
+
+Run with ``SYNC_BENCHMARKS=1 pytest -s tests/benchmarks``. Needs
+``tensorflow`` and ``tensorflow_hub`` and the TF-Hub YAMNet model, loaded
+from ``YAMNET_MODEL_PATH`` (or ``AI_MODEL_CACHE_DIR``) or, with
+``AI_ALLOW_ONLINE_MODELS=1``, downloaded. The input is a synthetic program
+(``SYNC_BENCH_YAMNET_SECONDS``, default 120 s), and the dub is the same
+program trimmed by 7.5 s plus noise.
+
+Reported per path: wall time, per-window cosine similarity of the pooled
+embeddings to the per-window ones (mean and minimum), and the offset the AI
+detector finds from each set of embeddings. The pooled path must find the
+same offset and keep the mean cosine above ``SYNC_BENCH_YAMNET_MIN_COSINE``
+(default 0.95) before ``AI_YAMNET_FRAME_POOLING`` can be enabled.
+"""
+
+import os
+import time
+
+import numpy as np
+import pytest
+
+from sync_analyzer.ai.embedding_sync_detector import AISyncDetector, AudioEmbeddingExtractor, EmbeddingConfig
+
+pytestmark = pytest.mark.skipif(
+    not os.environ.get("SYNC_BENCHMARKS"), reason="set SYNC_BENCHMARKS=1 to run benchmarks"
+)
+
+SR = 16000
+OFFSET_SECONDS = 7.5
+
+
+def _program(seconds, seed=0):
+    rng = np.random.default_rng(seed)
+    n = int(SR * seconds)
+    audio = 0.01 * rng.standard_normal(n)
+    t = np.arange(int(0.25 * SR)) / SR
+    envelope = np.hanning(len(t))
+    for start in rng.integers(0, n - len(t), int(seconds * 6)):
+        audio[start:start + len(t)] += 0.3 * envelope * np.sin(2 * np.pi * rng.uniform(150, 5000) * t)
+    return audio.astype(np.float32)
+
+
+def test_yamnet_frame_pooling_cost_and_tolerance():
+    pytest.importorskip("tensorflow")
+    pytest.importorskip("tensorflow_hub")
+    seconds = float(os.environ.get("SYNC_BENCH_YAMNET_SECONDS", "120"))
+    min_cosine = float(os.environ.get("SYNC_BENCH_YAMNET_MIN_COSINE", "0.95"))
+    master = _program(seconds)
+    rng = np.random.default_rng(1)
+    dub = master[int(OFFSET_SECONDS * SR):]
+    dub = (dub + 0.01 * rng.standard_normal(len(dub))).astype(np.float32)
+
+    extractor = AudioEmbeddingExtractor(EmbeddingConfig(model_name="yamnet", use_gpu=False))
+    if extractor.model_type != "yamnet":
+        pytest.skip("YAMNet model not available (set YAMNET_MODEL_PATH)")
+    extractor.extract_embeddings(master[:SR * 4], SR)  # warm-up
+
+    runs = {}
+    for name, frame_pooling in (("windowed", False), ("pooled", True)):
+        extractor.config.frame_pooling = frame_pooling
+        start = time.perf_counter()
+        embeddings = [extractor.extract_embeddings(master, SR), extractor.extract_embeddings(dub, SR)]
+        elapsed = time.perf_counter() - start
+        detector = AISyncDetector(extractor.config, embedding_extractor=extractor)
+        offset_windows, _ = detector.find_optimal_alignment(detector.compute_similarity_matrix(*embeddings))
+        runs[name] = (embeddings, elapsed, offset_windows * extractor.config.hop_size)
+
+    windowed, pooled = runs["windowed"][0][0], runs["pooled"][0][0]
+    cosine = np.sum(windowed * pooled, axis=1) / (
+        np.linalg.norm(windowed, axis=1) * np.linalg.norm(pooled, axis=1) + 1e-12)
+    print(f"\nYAMNet on CPU, {seconds:.0f} s master, true offset {OFFSET_SECONDS} s")
+    for name, (_, elapsed, offset) in runs.items():
+        print(f"  {name:8s}: {elapsed:7.2f} s   offset {offset:6.2f} s")
+    print(f"  speedup {runs['windowed'][1] / runs['pooled'][1]:.2f}x   "
+          f"window cosine mean {cosine.mean():.4f}  min {cosine.min():.4f}")
+    assert windowed.shape == pooled.shape
+    assert runs["pooled"][2] == runs["windowed"][2]
+    assert cosine.mean() >= min_cosine
@@ -0,0 +1,5 @@
+import os
+
+# Keep test runs out of the user's decoded-audio and probe caches; cache tests use explicit paths.
+os.environ.setdefault("SYNC_PCM_CACHE", "0")
+os.environ.setdefault("SYNC_PROBE_CACHE", "0")
@@ -1,6 +1,13 @@
 import pytest
 
-from sync_analyzer.core.audio_channels import _layout_roles
+from sync_analyzer.core.audio_channels import (
+    ChannelSpec,
+    _layout_roles,
+    build_stems_command,
+    extract_all_stems,
+    extract_stems_to_cache,
+    stem_channels_key,
+)
 
 
 def test_layout_roles_stereo():
@@ -17,3 +24,44 @@ def test_layout_roles_unknown_fallback():
     roles = _layout_roles("weird-layout", 3)
     assert roles == ["c0", "c1", "c2"]
 
+
+
+def test_stems_command_decodes_once_with_one_output_per_channel():
+    specs = [ChannelSpec("multichannel", 0, ci, role) for ci, role in enumerate(_layout_roles("5.1", 6))]
+    specs.append(ChannelSpec("stream", 1, None, "S1"))
+    outputs = [(spec, f"/tmp/{spec.role}.wav") for spec in specs]
+    cmd = build_stems_command("in.mov", outputs)
+
+    assert cmd.count("-i") == 1
+    graph = cmd[cmd.index("-filter_complex") + 1]
+    assert graph.startswith("[0:a:0]asplit=6")
+    assert "pan=mono|c0=c3[a0_3]" in graph
+    maps = [cmd[i + 1] for i, arg in enumerate(cmd) if arg == "-map"]
+    assert maps == [f"[a0_{ci}]" for ci in range(6)] + ["0:a:1"]
+    assert cmd[-1] == "/tmp/S1.wav"
+
+
+def test_cached_stems_are_exported_without_decoding(tmp_path, monkeypatch):
+    import numpy as np
+    import soundfile as sf
+    from sync_analyzer.core import audio_channels
+    from sync_analyzer.core.pcm_cache import PCMCache
+
+    source = tmp_path / "in.mov"
+    source.write_bytes(b"x")
+    cache = PCMCache(str(tmp_path / "cache"))
+    specs = [ChannelSpec("multichannel", 0, 0, "FL"), ChannelSpec("multichannel", 0, 1, "FR")]
+    for i, spec in enumerate(specs):
+        cache.put(str(source), 48000, np.full(480, 0.1 * (i + 1), dtype=np.float32),
+                  channels=stem_channels_key(spec.role))
+    monkeypatch.setattr(audio_channels, "list_channel_specs", lambda path: specs)
+
+    def no_ffmpeg(*args, **kwargs):
+        raise AssertionError("ffmpeg should not run on a cache hit")
+
+    monkeypatch.setattr(audio_channels.subprocess, "run", no_ffmpeg)
+    stems = extract_all_stems(str(source), str(tmp_path / "out"), cache=cache)
+    assert sorted(stems) == ["FL", "FR"]
+    y, sr = sf.read(stems["FR"], dtype="float32")
+    assert sr == 48000 and np.allclose(y, 0.2)
+    assert set(extract_stems_to_cache(str(source), cache)) == {"FL", "FR"}
@@ -0,0 +1,51 @@
+import librosa
+import numpy as np
+import pytest
+
+from sync_analyzer.core.audio_sync_detector import AudioFeatures, ProfessionalSyncDetector
+
+
+def _audio(sr=22050, seconds=2.0):
+    rng = np.random.default_rng(3)
+    return rng.standard_normal(int(sr * seconds)).astype(np.float32) * 0.1
+
+
+def test_mfcc_access_computes_only_mfcc():
+    detector = ProfessionalSyncDetector(use_gpu=False)
+    audio = _audio(detector.sample_rate)
+    features = detector.extract_audio_features(audio)
+    assert features.computed == []
+
+    mfcc = features.mfcc
+    assert features.computed == ['mfcc']
+    assert features.mfcc is mfcc  # memoized
+    expected = librosa.feature.mfcc(y=audio, sr=detector.sample_rate, n_mfcc=detector.n_mfcc,
+                                    hop_length=detector.hop_length, n_fft=detector.n_fft)
+    np.testing.assert_allclose(mfcc, expected)
+
+
+def test_precomputed_values_and_missing_features():
+    features = AudioFeatures(mfcc=np.zeros((13, 4)))
+    assert features.computed == ['mfcc']
+    with pytest.raises(AttributeError):
+        features.chroma
+
+
+def test_analyze_sync_decodes_once_and_times_each_method(tmp_path, monkeypatch):
+    sf = pytest.importorskip("soundfile")
+    detector = ProfessionalSyncDetector(use_gpu=False)
+    sr = detector.sample_rate
+    audio = _audio(sr, seconds=3.0)
+    master, dub = tmp_path / "master.wav", tmp_path / "dub.wav"
+    sf.write(master, audio, sr)
+    sf.write(dub, audio[sr // 10:], sr)
+
+    loads = []
+    real_load = detector.load_and_preprocess_audio
+    monkeypatch.setattr(detector, "load_and_preprocess_audio",
+                        lambda path: loads.append(path) or real_load(path))
+
+    results = detector.analyze_sync(master, dub, methods=['mfcc', 'onset', 'spectral'])
+    assert len(loads) == 2
+    for name in ('mfcc', 'onset', 'spectral'):
+        assert results[name].analysis_metadata["processing_time"] >= 0.0
@@ -0,0 +1,155 @@
+import pytest
+import numpy as np
+import soundfile as sf
+
+from sync_analyzer.core.chunk_reader import ChunkWindowReader
+from sync_analyzer.core import optimized_large_file_detector
+from sync_analyzer.core.optimized_large_file_detector import (
+    OptimizedLargeFileDetector,
+)
+from sync_analyzer.core.pcm_cache import write_npy_from_file
+
+
+def _write(path, y, sr):
+    sf.write(str(path), y, sr, subtype="FLOAT")
+    return str(path)
+
+
+def test_reader_windows_match_direct_reads(tmp_path):
+    sr = 8000
+    rng = np.random.default_rng(0)
+    master = _write(tmp_path / "m.wav", rng.standard_normal(sr * 5).astype(np.float32), sr)
+    dub = _write(tmp_path / "d.wav", rng.standard_normal(sr * 4).astype(np.float32), sr)
+    windows = [(0.0, 1.5), (1.2, 2.7), (3.5, 4.5), (4.2, 5.0), (6.0, 7.0)]
+
+    for prefetch in (True, False):
+        with ChunkWindowReader(master, dub, sr, windows, prefetch=prefetch) as reader:
+            got = list(reader)
+        assert [w.index for w in got] == list(range(len(windows)))
+        for w, (start, end) in zip(got, windows):
+            for path, buf in ((master, w.master), (dub, w.dub)):
+                ref, _ = sf.read(path, start=int(start * sr), frames=int((end - start) * sr), dtype="float32")
+                assert np.array_equal(buf, ref)
+
+
+def test_memmapped_npy_windows_match_wav_windows(tmp_path):
+    sr = 8000
+    rng = np.random.default_rng(3)
+    master = _write(tmp_path / "m.wav", rng.standard_normal(sr * 5).astype(np.float32), sr)
+    dub = _write(tmp_path / "d.wav", rng.standard_normal(sr * 4).astype(np.float32), sr)
+    master_npy = write_npy_from_file(master, str(tmp_path / "m.npy"), block_frames=1000)
+    dub_npy = write_npy_from_file(dub, str(tmp_path / "d.npy"), block_frames=1000)
+    windows = [(0.0, 1.5), (1.2, 2.7), (3.5, 4.5), (4.2, 5.0), (6.0, 7.0)]
+
+    with ChunkWindowReader(master, dub, sr, windows) as reader:
+        expected = list(reader)
+    with ChunkWindowReader(master_npy, dub_npy, sr, windows) as reader:
+        got = list(reader)
+    for e, g in zip(expected, got):
+        assert np.array_equal(e.master, g.master) and np.array_equal(e.dub, g.dub)
+
+    d = OptimizedLargeFileDetector(gpu_enabled=False)
+    d.sample_rate = sr
+    assert d.get_audio_duration(master_npy) == 5.0
+    assert np.array_equal(d._read_segment(master_npy, 1.2, 1.5), expected[1].master)
+
+
+def test_chunk_pass_matches_path_based_detection(tmp_path):
+    d = OptimizedLargeFileDetector(gpu_enabled=False)
+    d.sample_rate = 8000
+    rng = np.random.default_rng(1)
+    base = (0.3 * rng.standard_normal(d.sample_rate * 12)).astype(np.float32)
+    master = _write(tmp_path / "m.wav", base[: d.sample_rate * 10], d.sample_rate)
+    dub = _write(tmp_path / "d.wav", base[400: 400 + d.sample_rate * 10], d.sample_rate)
+    chunks = [(0.0, 3.0), (2.0, 5.0), (6.0, 9.0)]
+
+    results = d._run_chunk_pass(master, dub, chunks, pass_number=1)
+    assert [r["chunk_index"] for r in results] == [0, 1, 2]
+    for r, (start, end) in zip(results, chunks):
+        ref = d.detect_offset_cross_correlation(master, dub, start, end - start)
+        assert r["offset_detection"]["offset_samples"] == ref["offset_samples"] == 400
+        assert r["offset_detection"]["confidence"] == ref["confidence"]
+
+
+def test_parallel_chunk_pass_matches_serial(tmp_path):
+    rng = np.random.default_rng(2)
+    sr = 8000
+    base = (0.3 * rng.standard_normal(sr * 12)).astype(np.float32)
+    master = _write(tmp_path / "m.wav", base[: sr * 10], sr)
+    dub = _write(tmp_path / "d.wav", base[250: 250 + sr * 10], sr)
+    chunks = [(0.0, 3.0), (1.0, 4.0), (2.5, 5.5), (4.0, 7.0), (6.0, 9.0)]
+
+    serial = OptimizedLargeFileDetector(gpu_enabled=False)
+    serial.sample_rate = sr
+    parallel = OptimizedLargeFileDetector(gpu_enabled=False, workers=2)
+    parallel.sample_rate = sr
+    try:
+        expected = serial._run_chunk_pass(master, dub, chunks, pass_number=1)
+        got = parallel._run_chunk_pass(master, dub, chunks, pass_number=1)
+    finally:
+        parallel._shutdown_chunk_pool()
+
+    assert [r["chunk_index"] for r in got] == list(range(len(chunks)))
+    assert repr(got) == repr(expected)
+
+
+def test_chunk_workers_run_on_cpu_without_temp_dir():
+    parent = OptimizedLargeFileDetector(gpu_enabled=True, max_lag_seconds=2.0)
+    optimized_large_file_detector._init_chunk_worker(parent._worker_settings())
+    worker = optimized_large_file_detector._WORKER_DETECTOR
+    assert worker.gpu_enabled is False and worker.device == "cpu"
+    assert worker.temp_dir is None and worker.max_lag_seconds == 2.0
+
+
+def test_parallel_chunk_pass_matches_serial_with_torchaudio_mfcc(tmp_path):
+    pytest.importorskip("torchaudio")
+    rng = np.random.default_rng(3)
+    sr = 8000
+    base = (0.3 * rng.standard_normal(sr * 12)).astype(np.float32)
+    master = _write(tmp_path / "m.wav", base[: sr * 10], sr)
+    dub = _write(tmp_path / "d.wav", base[250: 250 + sr * 10], sr)
+    chunks = [(0.0, 3.0), (2.5, 5.5), (6.0, 9.0)]
+
+    serial = OptimizedLargeFileDetector(gpu_enabled=True)
+    serial.sample_rate = sr
+    parallel = OptimizedLargeFileDetector(gpu_enabled=True, workers=2)
+    parallel.sample_rate = sr
+    assert serial._worker_settings()["torchaudio_mfcc"] is True
+    try:
+        expected = serial._run_chunk_pass(master, dub, chunks, pass_number=1)
+        got = parallel._run_chunk_pass(master, dub, chunks, pass_number=1)
+    finally:
+        parallel._shutdown_chunk_pool()
+
+    assert repr(got) == repr(expected)
+
+
+def test_parallel_chunk_pass_matches_serial_with_gpu_enabled(tmp_path):
+    rng = np.random.default_rng(4)
+    sr = 8000
+    base = (0.3 * rng.standard_normal(sr * 12)).astype(np.float32)
+    master = _write(tmp_path / "m.wav", base[: sr * 10], sr)
+    dub = _write(tmp_path / "d.wav", base[300: 300 + sr * 10], sr)
+    chunks = [(0.0, 3.0), (2.5, 5.5), (6.0, 9.0)]
+
+    # Whatever backend this host selects, workers > 1 must not change the results
+    serial = OptimizedLargeFileDetector(gpu_enabled=True)
+    serial.sample_rate = sr
+    parallel = OptimizedLargeFileDetector(gpu_enabled=True, workers=2)
+    parallel.sample_rate = sr
+    try:
+        expected = serial._run_chunk_pass(master, dub, chunks, pass_number=1)
+        got = parallel._run_chunk_pass(master, dub, chunks, pass_number=1)
+    finally:
+        parallel._shutdown_chunk_pool()
+
+    assert repr(got) == repr(expected)
+
+
+def test_cuda_detector_analyzes_chunks_serially(monkeypatch):
+    def fake_cuda(self):
+        self.gpu_available, self.device = True, "cuda:0"
+
+    monkeypatch.setattr(OptimizedLargeFileDetector, "_detect_gpu", fake_cuda)
+    assert OptimizedLargeFileDetector(gpu_enabled=True, workers=4).workers == 1
+    assert OptimizedLargeFileDetector(gpu_enabled=False, workers=4).workers == 4
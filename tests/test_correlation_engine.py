@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+from sync_analyzer.core.correlation_engine import (
+    correlate_peak,
+    fft_correlate,
+    overlap_add_correlate,
+    seconds_to_lag,
+)
+
+
+def _signals(n=4000, m=4000, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.standard_normal(n), rng.standard_normal(m)
+
+
+@pytest.mark.parametrize("n,m", [(4000, 4000), (300, 1000), (1000, 300)])
+def test_fft_correlate_matches_numpy_full(n, m):
+    x, y = _signals(n, m)
+    corr, min_lag = fft_correlate(x, y)
+    assert min_lag == -(m - 1)
+    assert np.allclose(corr, np.correlate(x, y, mode="full"))
+
+
+def test_bounded_lag_is_slice_of_full_and_overlap_add_agrees():
+    x, y = _signals()
+    full = np.correlate(x, y, mode="full")
+    corr, min_lag = fft_correlate(x, y, max_lag=50)
+    assert min_lag == -50 and len(corr) == 101
+    assert np.allclose(corr, full[len(y) - 1 - 50:len(y) + 50])
+
+    ola, ola_min = overlap_add_correlate(x, y, max_lag=50, block_size=257)
+    assert ola_min == min_lag
+    assert np.allclose(ola, corr)
+
+
+def test_correlate_peak_finds_known_lag_and_snr():
+    rng = np.random.default_rng(3)
+    base = rng.standard_normal(20000)
+    master, dub = base[300:15300], base[:15000]  # master leads by 300 samples
+    expected = np.argmax(np.correlate(master, dub, mode="full")) - (len(dub) - 1)
+
+    peak = correlate_peak(master, dub, use_abs=False)
+    assert peak.lag == expected
+    assert peak.snr > 8
+
+    bounded = correlate_peak(master, dub, max_lag=500)
+    assert bounded.lag == expected
+    assert bounded.min_lag == -500
+
+
+def test_correlate_peak_weighted_rows():
+    x, y = _signals(500, 500)
+    rows_x, rows_y = np.vstack([x, y]), np.vstack([y, x])
+    weights = [0.75, 0.25]
+    peak = correlate_peak(rows_x, rows_y, weights=weights)
+    expected = np.average(
+        [np.correlate(x, y, "full"), np.correlate(y, x, "full")], axis=0, weights=weights
+    )
+    assert np.allclose(peak.correlation, expected)
+
+
+def test_seconds_to_lag():
+    assert seconds_to_lag(None, 22050) is None
+    assert seconds_to_lag(1.5, 100) == 150
@@ -0,0 +1,177 @@
+from types import SimpleNamespace
+
+import numpy as np
+import torch
+
+from sync_analyzer.ai.embedding_sync_detector import (
+    AudioEmbeddingExtractor,
+    EmbeddingConfig,
+    adaptive_batch_size,
+    pool_frames,
+)
+
+SR = 16000
+
+
+class _Processor:
+    """Wav2Vec2 feature-extractor interface: per-example zero-mean, unit-variance input values."""
+
+    def __call__(self, audio, sampling_rate, return_tensors="pt"):
+        rows = np.atleast_2d(np.asarray(audio, dtype=np.float32))
+        rows = (rows - rows.mean(axis=1, keepdims=True)) / np.sqrt(rows.var(axis=1, keepdims=True) + 1e-7)
+        return SimpleNamespace(input_values=torch.from_numpy(rows))
+
+
+class _RawProcessor:
+    """Passes samples through unnormalized, so any two paths over the same samples agree exactly."""
+
+    def __call__(self, audio, sampling_rate, return_tensors="pt"):
+        return SimpleNamespace(input_values=torch.from_numpy(np.atleast_2d(np.asarray(audio, dtype=np.float32))))
+
+
+class _Encoder(torch.nn.Module):
+    """A strided convolution with wav2vec2's 20 ms frame rate, returning ``last_hidden_state``."""
+
+    def __init__(self):
+        super().__init__()
+        torch.manual_seed(0)
+        self.conv = torch.nn.Conv1d(1, 16, kernel_size=400, stride=320)
+
+    def forward(self, input_values):
+        hidden = torch.tanh(self.conv(input_values.unsqueeze(1))).transpose(1, 2)
+        return SimpleNamespace(last_hidden_state=hidden)
+
+
+def _wav2vec2_extractor(**config):
+    extractor = AudioEmbeddingExtractor(EmbeddingConfig(model_name="none", use_gpu=False, **config))
+    extractor.processor, extractor.model, extractor.model_type = _Processor(), _Encoder().eval(), "wav2vec2"
+    return extractor
+
+
+def test_batched_wav2vec2_matches_window_by_window_and_keeps_progress():
+    audio = np.random.default_rng(0).standard_normal(SR * 9).astype(np.float32)
+    runs = {}
+    for batch_size in (1, 7):
+        calls = []
+        extractor = _wav2vec2_extractor(batch_size=batch_size)
+        embeddings = extractor.extract_embeddings(audio, SR, lambda p, msg: calls.append((p, msg)))
+        runs[batch_size] = (embeddings, calls)
+    (single, single_calls), (batched, batched_calls) = runs[1], runs[7]
+    assert single.shape == (15, 16)
+    np.testing.assert_allclose(batched, single, atol=1e-5)
+    assert batched_calls == single_calls and batched_calls[-1][0] == 100.0
+
+
+def test_adaptive_batch_size_is_bounded():
+    size = adaptive_batch_size(2.0, torch.device("cpu"))
+    assert 1 <= size <= 64
+    assert adaptive_batch_size(2.0, torch.device("cpu"), max_batch=3) <= 3
+
+
+def test_pool_frames_matches_slice_means():
+    frames = np.random.default_rng(2).standard_normal((50, 3)).astype(np.float32)
+    starts, ends = np.array([0, 5, 20]), np.array([10, 30, 50])
+    expected = np.stack([frames[a:b].mean(axis=0) for a, b in zip(starts, ends)])
+    np.testing.assert_allclose(pool_frames(frames, starts, ends), expected, atol=1e-6)
+
+
+def test_frame_pooled_wav2vec2_reproduces_window_embeddings():
+    audio = np.random.default_rng(3).standard_normal(SR * 23).astype(np.float32)
+    windowed = _wav2vec2_extractor(batch_size=8)
+    pooled = _wav2vec2_extractor(frame_pooling=True, segment_seconds=6.0, segment_context_seconds=0.5)
+    for extractor in (windowed, pooled):
+        extractor.processor = _RawProcessor()
+    calls = []
+    expected = windowed.extract_embeddings(audio, SR)
+    actual = pooled.extract_embeddings(audio, SR, lambda p, msg: calls.append(p))
+    assert actual.shape == expected.shape == (43, 16)
+    np.testing.assert_allclose(actual, expected, atol=1e-5)
+    assert calls[-1] == 100.0 and calls == sorted(calls)
+
+
+def test_frame_pooled_wav2vec2_carries_only_overlapping_frames(monkeypatch):
+    from sync_analyzer.ai import embedding_sync_detector
+
+    pooled_lengths = []
+    real_pool = embedding_sync_detector.pool_frames
+    monkeypatch.setattr(embedding_sync_detector, "pool_frames",
+                        lambda frames, a, b: pooled_lengths.append(len(frames)) or real_pool(frames, a, b))
+    audio = np.random.default_rng(5).standard_normal(SR * 41).astype(np.float32)
+    pooled = _wav2vec2_extractor(frame_pooling=True, segment_seconds=6.0, segment_context_seconds=0.5)
+    pooled.processor = _RawProcessor()
+    assert pooled.extract_embeddings(audio, SR).shape == (79, 16)
+    # One pooling call per segment, each over at most a segment plus one window of frames
+    assert len(pooled_lengths) == 7 and max(pooled_lengths) <= 300 + 100
+
+
+def _fake_yamnet(calls):
+    """YAMNet's patching (0.975 s patches at a 0.48 s hop, zero-padded tail) with simple patch statistics."""
+
+    def run(waveform):
+        calls.append(len(waveform))
+        n = 1 + int(np.ceil(max(0, len(waveform) - 15600) / 7680))
+        padded = np.pad(waveform, (0, (n - 1) * 7680 + 15600 - len(waveform)))
+        patches = np.stack([padded[k * 7680:k * 7680 + 15600] for k in range(n)])
+        return np.stack([patches.mean(axis=1), patches.std(axis=1), np.abs(patches).max(axis=1)], axis=1)
+
+    return run
+
+
+def test_yamnet_block_pooling_is_independent_of_block_size():
+    audio = np.random.default_rng(4).standard_normal(SR * 31).astype(np.float32)
+    audio *= np.linspace(0.1, 1.0, len(audio), dtype=np.float32)
+    results = {}
+    for segment_seconds in (5.0, 1000.0):
+        calls = []
+        extractor = AudioEmbeddingExtractor(EmbeddingConfig(model_name="none", use_gpu=False, frame_pooling=True,
+                                                            segment_seconds=segment_seconds))
+        extractor.model_type, extractor._run_yamnet = "yamnet", _fake_yamnet(calls)
+        results[segment_seconds] = (extractor.extract_embeddings(audio, SR), calls)
+    (blocked, blocked_calls), (whole, whole_calls) = results[5.0], results[1000.0]
+    assert len(whole_calls) == 1 and len(blocked_calls) == 7
+    assert blocked.shape == (59, 3)
+    np.testing.assert_allclose(blocked, whole, atol=1e-5)
+
+    # Window 10 (5.0-7.0 s) pools the patches centred inside it
+    extractor.config.normalize_embeddings = False
+    patches = _fake_yamnet([])(audio)
+    centres = np.arange(len(patches)) * 7680 + 7800
+    inside = (centres >= 5 * SR) & (centres < 7 * SR)
+    np.testing.assert_allclose(extractor.extract_embeddings(audio, SR)[10], patches[inside].mean(axis=0), atol=1e-5)
+
+
+def _spectral_reference(audio, sr, window_seconds=2.0, hop_seconds=0.5):
+    """The original window-by-window spectral fallback (before normalization and padding)."""
+    import librosa
+
+    window, hop = int(window_seconds * sr), int(hop_seconds * sr)
+    rows = []
+    for start in range(0, len(audio) - window + 1, hop):
+        y = audio[start:start + window]
+        mel_db = librosa.power_to_db(librosa.feature.melspectrogram(y=y, sr=sr, n_mels=64))
+        rows.append(np.concatenate([
+            np.mean(librosa.feature.mfcc(y=y, sr=sr, n_mfcc=13), axis=1),
+            [np.mean(librosa.feature.spectral_centroid(y=y, sr=sr)),
+             np.mean(librosa.feature.spectral_bandwidth(y=y, sr=sr)),
+             np.mean(librosa.feature.spectral_rolloff(y=y, sr=sr))],
+            np.mean(librosa.feature.chroma_stft(y=y, sr=sr), axis=1),
+            np.mean(mel_db, axis=1),
+            np.std(mel_db, axis=1),
+        ]))
+    return np.array(rows)
+
+
+def test_vectorized_spectral_embeddings_match_per_window_features():
+    rng = np.random.default_rng(5)
+    t = np.arange(SR * 14) / SR
+    audio = (0.2 * np.sin(2 * np.pi * (220 + 30 * t) * t) + 0.05 * rng.standard_normal(len(t))).astype(np.float32)
+    audio[SR * 6:SR * 8] *= 0.01  # a quiet stretch exercises the per-window dB floor
+
+    reference = _spectral_reference(audio, SR)
+    extractor = AudioEmbeddingExtractor(EmbeddingConfig(model_name="none", use_gpu=False, normalize_embeddings=False))
+    calls = []
+    embeddings = extractor.extract_embeddings(audio, SR, lambda p, msg: calls.append(p))
+    assert extractor.model_type == "spectral" and embeddings.shape == (25, 256)
+    np.testing.assert_allclose(embeddings[:, :156], reference, rtol=1e-4, atol=1e-3)
+    assert not embeddings[:, 156:].any()
+    assert len(calls) == 25 and calls[-1] == 100.0
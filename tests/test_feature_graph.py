@@ -0,0 +1,43 @@
+import librosa
+import numpy as np
+
+from sync_analyzer.core.feature_graph import SpectralFeatureGraph
+
+
+def _audio(sr=22050, seconds=4.0):
+    rng = np.random.default_rng(1)
+    t = np.arange(int(sr * seconds)) / sr
+    gate = np.sin(2 * np.pi * 1.5 * t) > 0
+    return np.sin(2 * np.pi * 440 * t) * gate + 0.05 * rng.standard_normal(len(t))
+
+
+def test_shared_graph_matches_per_feature_librosa():
+    sr, hop = 22050, 512
+    y = _audio(sr)
+    graph = SpectralFeatureGraph(y, sr=sr, n_fft=2048, hop_length=hop)
+
+    np.testing.assert_allclose(
+        graph.mfcc(13), librosa.feature.mfcc(y=y, sr=sr, n_mfcc=13, hop_length=hop, n_fft=2048))
+    np.testing.assert_allclose(graph.chroma(), librosa.feature.chroma_stft(y=y, sr=sr, hop_length=hop))
+    np.testing.assert_allclose(
+        graph.spectral_centroid(), librosa.feature.spectral_centroid(y=y, sr=sr, hop_length=hop))
+    np.testing.assert_array_equal(
+        graph.onset_frames(), librosa.onset.onset_detect(y=y, sr=sr, hop_length=hop, units='frames'))
+    np.testing.assert_allclose(graph.rms(), librosa.feature.rms(y=y, hop_length=hop))
+
+
+def test_stft_is_computed_once(monkeypatch):
+    calls = []
+    real_stft = librosa.stft
+
+    def counting_stft(*args, **kwargs):
+        calls.append(1)
+        return real_stft(*args, **kwargs)
+
+    monkeypatch.setattr(librosa, "stft", counting_stft)
+    graph = SpectralFeatureGraph(_audio(seconds=1.0), sr=22050)
+    graph.mfcc()
+    graph.chroma()
+    graph.spectral_centroid()
+    graph.onset_frames()
+    assert len(calls) == 1
@@ -0,0 +1,89 @@
+import numpy as np
+
+from sync_analyzer.core.audio_sync_detector import ProfessionalSyncDetector, SyncResult
+from sync_analyzer.core.fingerprint import (
+    Landmarks,
+    landmarks_from_blocks,
+    match_landmarks,
+    pack_hashes,
+    pair_peaks,
+)
+
+
+def _program(sr, seconds, seed=0):
+    """Sparse tone bursts over low noise: distinctive, landmark-friendly content."""
+    rng = np.random.default_rng(seed)
+    n = int(sr * seconds)
+    audio = 0.01 * rng.standard_normal(n)
+    t = np.arange(int(0.25 * sr)) / sr
+    envelope = np.hanning(len(t))
+    for start in rng.integers(0, n - len(t), int(seconds * 6)):
+        audio[start:start + len(t)] += 0.3 * envelope * np.sin(2 * np.pi * rng.uniform(150, 5000) * t)
+    return audio.astype(np.float32)
+
+
+def test_hash_packing_is_uint32_and_distinct():
+    h = pack_hashes(np.array([1, 1, 2]), np.array([3, 3, 3]), np.array([5, 6, 5]))
+    assert h.dtype == np.uint32 and len(set(h.tolist())) == 3
+
+
+def test_pairing_respects_fan_out_and_target_zone():
+    times = np.array([0, 1, 2, 3, 4, 5, 6, 200], dtype=np.int32)
+    bins = np.array([10, 20, 30, 40, 50, 60, 70, 80], dtype=np.int32)
+    hashes, anchors = pair_peaks(times, bins, fan_out=3)
+    assert np.bincount(anchors).max() == 3
+    assert 200 not in anchors.tolist() and len(hashes) == len(anchors)
+
+
+def test_match_finds_shifted_votes_and_respects_max_lag():
+    rng = np.random.default_rng(1)
+    hashes = rng.integers(0, 2 ** 32, 500, dtype=np.uint64).astype(np.uint32)
+    times = rng.integers(0, 5000, 500).astype(np.int32)
+    order = np.argsort(hashes)
+    reference = Landmarks(hashes[order], times[order] + 700, 6000, 43.0)
+    query = Landmarks(hashes[order], times[order], 5000, 43.0)
+    match = match_landmarks(reference, query)
+    assert round(match.offset_frames) == 700 and match.votes == 500 and match.confidence > 0.9
+    assert match_landmarks(reference, query, max_lag_frames=100).votes < 5
+
+
+def test_fingerprint_method_detects_large_offset():
+    detector = ProfessionalSyncDetector(use_gpu=False)
+    sr = detector.sample_rate
+    program = _program(sr, 90)
+    shift = int(37.25 * sr)
+    master, dub = program, program[shift:]
+
+    result = detector.fingerprint_sync(detector.extract_audio_features(master),
+                                       detector.extract_audio_features(dub))
+    assert abs(result.offset_seconds - 37.25) <= 1.5 * detector.hop_length / sr
+    assert result.confidence > 0.5
+    assert result.analysis_metadata["peak_votes"] > 20
+
+
+def test_consensus_outvotes_methods_disagreeing_with_fingerprint():
+    detector = ProfessionalSyncDetector(use_gpu=False, confidence_threshold=0.3)
+
+    def result(offset, confidence, name):
+        return SyncResult(int(offset * 22050), offset, confidence, name, 1.0, confidence, 43.07, {})
+
+    consensus = detector.get_consensus_result({
+        "fingerprint": result(12.0, 0.8, "Landmark Fingerprint"),
+        "mfcc": result(12.02, 0.6, "MFCC"),
+        "onset": result(0.5, 0.9, "Onset"),
+    })
+    assert abs(consensus.offset_seconds - 12.0) < 0.05
+    assert consensus.analysis_metadata["outvoted_methods"] == ["onset"]
+
+
+def test_blockwise_landmarks_match_full_stft():
+    detector = ProfessionalSyncDetector(use_gpu=False)
+    sr = detector.sample_rate
+    audio = detector._normalize_and_highpass(_program(sr, 40, seed=4))
+    full = detector.extract_audio_features(audio).landmarks
+    # Odd sample blocks and small STFT blocks exercise the carried context
+    blocks = (audio[i:i + 77777] for i in range(0, len(audio), 77777))
+    blocked = landmarks_from_blocks(blocks, sr, n_fft=detector.n_fft, hop_length=detector.hop_length,
+                                    block_frames=300)
+    assert blocked.frames == full.frames and len(full) > 1000
+    assert np.array_equal(blocked.hashes, full.hashes) and np.array_equal(blocked.times, full.times)
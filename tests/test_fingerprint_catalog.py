@@ -0,0 +1,98 @@
+import os
+
+import numpy as np
+import soundfile as sf
+
+from sync_analyzer.core import audio_sync_detector, pcm_cache
+from sync_analyzer.core.fingerprint_catalog import FingerprintCatalog, MAX_SEGMENTS, landmarks_for_file
+from sync_analyzer.core.fingerprint import Landmarks
+
+SR = 22050
+
+
+def _program(seconds, seed):
+    """Sparse tone bursts over low noise: distinctive, landmark-friendly content."""
+    rng = np.random.default_rng(seed)
+    n = int(SR * seconds)
+    audio = 0.01 * rng.standard_normal(n)
+    t = np.arange(int(0.25 * SR)) / SR
+    envelope = np.hanning(len(t))
+    for start in rng.integers(0, n - len(t), int(seconds * 6)):
+        audio[start:start + len(t)] += 0.3 * envelope * np.sin(2 * np.pi * rng.uniform(150, 5000) * t)
+    return audio.astype(np.float32)
+
+
+def _random_landmarks(seed, n=400, shift=0):
+    rng = np.random.default_rng(seed)
+    hashes = rng.integers(0, 2 ** 32, n, dtype=np.uint64).astype(np.uint32)
+    times = rng.integers(0, 4000, n).astype(np.int32) + shift
+    order = np.argsort(hashes)
+    return Landmarks(hashes[order], times[order], 5000, 43.0)
+
+
+def test_identifies_master_and_offset_of_trimmed_dub(tmp_path):
+    programs = [_program(60, seed) for seed in range(3)]
+    catalog = FingerprintCatalog(str(tmp_path / "catalog"))
+    for i, program in enumerate(programs):
+        path = tmp_path / f"master_{i}.wav"
+        sf.write(path, program, SR)
+        assert catalog.add(str(path)) is not None
+
+    rng = np.random.default_rng(9)
+    dub = programs[1][int(12.5 * SR):]
+    dub = dub + 0.02 * rng.standard_normal(len(dub)).astype(np.float32)
+    sf.write(tmp_path / "unknown.wav", dub, SR)
+
+    matches = FingerprintCatalog(str(tmp_path / "catalog")).identify(str(tmp_path / "unknown.wav"), top_k=3)
+    assert os.path.basename(matches[0].path) == "master_1.wav"
+    assert abs(matches[0].offset_seconds - 12.5) < 0.05
+    assert matches[0].confidence > 0.5
+    assert all(m.votes < matches[0].votes / 5 for m in matches[1:])
+
+
+def test_unchanged_masters_are_skipped_and_changed_ones_replaced(tmp_path):
+    source = tmp_path / "master.wav"
+    sf.write(source, np.zeros(100, dtype=np.float32), SR)
+    catalog = FingerprintCatalog(str(tmp_path / "catalog"))
+    first = catalog.add(str(source), landmarks=_random_landmarks(0))
+    assert catalog.add(str(source), landmarks=_random_landmarks(0)) is None
+
+    os.utime(source, ns=(0, 1_000_000_000))
+    second = catalog.add(str(source), landmarks=_random_landmarks(1, shift=100))
+    assert second != first and [m["master_id"] for m in catalog.masters()] == [second]
+    # Postings of the replaced version no longer match
+    assert [m.master_id for m in catalog.match(_random_landmarks(0))] == []
+    best = catalog.match(_random_landmarks(1))[0]
+    assert best.master_id == second and round(best.offset_seconds * 43.0) == 100
+
+
+def test_segments_are_compacted(tmp_path):
+    catalog = FingerprintCatalog(str(tmp_path / "catalog"))
+    for i in range(MAX_SEGMENTS + 1):
+        path = tmp_path / f"m{i}.wav"
+        sf.write(path, np.zeros(10, dtype=np.float32), SR)
+        catalog.add(str(path), landmarks=_random_landmarks(i))
+    segments = [f for f in os.listdir(catalog.catalog_dir) if f.endswith(".hashes.npy")]
+    assert len(segments) == 1
+    assert len(catalog.masters()) == MAX_SEGMENTS + 1
+    assert os.path.basename(catalog.match(_random_landmarks(4))[0].path) == "m4.wav"
+
+
+def test_query_landmarks_decode_only_the_requested_prefix(tmp_path, monkeypatch):
+    cache = pcm_cache.PCMCache(str(tmp_path / "pcm"))
+    monkeypatch.setattr(pcm_cache, "_default_cache", cache)
+    monkeypatch.setattr(pcm_cache, "_default_configured", True)
+    path = str(tmp_path / "dub.wav")
+    sf.write(path, _program(60, 4), SR)
+    durations = []
+    real_load = audio_sync_detector.librosa.load
+    monkeypatch.setattr(audio_sync_detector.librosa, "load",
+                        lambda *a, **k: durations.append(k.get("duration")) or real_load(*a, **k))
+
+    landmarks = landmarks_for_file(path, max_seconds=10.0)
+    assert durations == [10.0] and cache.size_bytes() == 0  # a partial decode is never cached
+    assert landmarks.hashes.size and landmarks.times.max() <= 10.0 * landmarks.frame_rate
+
+    # With a cached full decode the prefix is sliced from it instead of decoding
+    cache.put(path, SR, real_load(path, sr=SR, mono=True, dtype=np.float32)[0])
+    assert landmarks_for_file(path, max_seconds=10.0).hashes.size and durations == [10.0]
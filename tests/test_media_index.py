@@ -0,0 +1,115 @@
+import os
+import shutil
+
+from sync_analyzer.core.media_index import MediaIndex
+
+
+def _touch(path, data=b"x"):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as fh:
+        fh.write(data)
+
+
+def _bump_mtime(path):
+    # Coarse-mtime filesystems: make the directory change visible to the index
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+
+def _tree(root):
+    for rel in ("show/ep101/Ep101_Original.mov", "show/ep101/Ep101_v1.1.mov", "show/ep101/notes.txt",
+                "show/ep102/Ep102_Original.mov", "show/ep102/Ep102_v1.1.mov", "show/ep102/sub/extra.wav",
+                "other/Ep103_Original.mov"):
+        _touch(os.path.join(root, rel))
+
+
+def test_listing_search_and_pairs(tmp_path):
+    root = str(tmp_path / "mount")
+    _tree(root)
+    index = MediaIndex(root, str(tmp_path / "index.sqlite3"), extensions={".mov", ".wav"})
+    assert not index.ready
+    index.list_dir(root)  # scans the root row only
+    index.refresh(os.path.join(root, "show"))
+    assert not index.ready
+    index.refresh()
+    assert index.ready
+    assert MediaIndex(root, str(tmp_path / "index.sqlite3")).ready
+
+    files, dirs = index.list_dir(os.path.join(root, "show", "ep102"))
+    assert [f.name for f in files] == ["Ep102_Original.mov", "Ep102_v1.1.mov"]
+    assert [(d.name, d.item_count) for d in dirs] == [("sub", 1)]
+    _, top = index.list_dir(os.path.join(root, "show", "ep101"))
+    assert top == []
+
+    assert {f.name for f in index.search("original")} == {
+        "Ep101_Original.mov", "Ep102_Original.mov", "Ep103_Original.mov"}
+    assert [f.name for f in index.search(extensions=["wav"])] == ["extra.wav"]
+    assert [f.name for f in index.search("original", under=os.path.join(root, "show"), limit=1)] == [
+        "Ep101_Original.mov"]
+
+    pairs = index.find_pairs([("*Original*", "*v1.1*")])
+    assert [(os.path.basename(m), os.path.basename(d)) for m, d in pairs] == [
+        ("Ep101_Original.mov", "Ep101_v1.1.mov"), ("Ep102_Original.mov", "Ep102_v1.1.mov")]
+
+
+def test_rescan_only_reads_changed_directories(tmp_path):
+    root = str(tmp_path / "mount")
+    _tree(root)
+    index = MediaIndex(root, str(tmp_path / "index.sqlite3"), extensions={".mov", ".wav"})
+    first = index.refresh()
+    assert first.dirs_scanned == 6 and first.dirs_unchanged == 0
+
+    again = index.refresh()
+    assert again.dirs_scanned == 0 and again.dirs_unchanged == 6
+
+    ep101 = os.path.join(root, "show", "ep101")
+    _touch(os.path.join(ep101, "Ep101_v1.2.mov"))
+    _bump_mtime(ep101)
+    shutil.rmtree(os.path.join(root, "show", "ep102", "sub"))
+    _bump_mtime(os.path.join(root, "show", "ep102"))
+
+    delta = index.refresh()
+    assert delta.dirs_scanned == 2 and delta.dirs_removed == 1
+    assert "Ep101_v1.2.mov" in {f.name for f in index.search("ep101")}
+    assert index.search(extensions=[".wav"]) == []
+    assert index.counts() == {"directories": 5, "files": 6}
+
+
+def test_directories_added_after_the_first_walk_are_indexed(tmp_path):
+    root = str(tmp_path / "mount")
+    _touch(os.path.join(root, "a", "x.mov"))
+    index = MediaIndex(root, str(tmp_path / "index.sqlite3"), extensions={".mov"})
+    index.refresh()
+
+    _touch(os.path.join(root, "newdir", "y.mov"))
+    _bump_mtime(root)
+    _, dirs = index.list_dir(root)
+    assert [(d.name, d.item_count) for d in dirs] == [("a", 1), ("newdir", 1)]
+
+    index.refresh()
+    assert [f.name for f in index.search("y")] == ["y.mov"]
+    assert index.counts() == {"directories": 3, "files": 2}
+
+    # A shallow refresh leaves a placeholder that the next walk scans
+    _touch(os.path.join(root, "later", "z.mov"))
+    _bump_mtime(root)
+    index.refresh(root, recursive=False)
+    assert index.search("z") == []
+    index.refresh()
+    assert [f.name for f in index.search("z")] == ["z.mov"]
+
+
+def test_reused_database_is_scoped_to_its_root(tmp_path):
+    db = str(tmp_path / "index.sqlite3")
+    first, second = str(tmp_path / "first"), str(tmp_path / "second")
+    _tree(first)
+    _tree(second)
+    MediaIndex(first, db).refresh()
+
+    index = MediaIndex(second, db)
+    assert not index.ready
+    assert index.search("Ep101") == [] and index.find_pairs([("*Original*", "*v1.1*")]) == []
+    index.refresh()
+    assert index.ready
+    assert all(f.path.startswith(second + os.sep) for f in index.search("Ep10"))
+    assert len(index.find_pairs([("*Original*", "*v1.1*")])) == 2
@@ -0,0 +1,57 @@
+import shutil
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+from sync_analyzer.core.media_ingest import (
+    AI_RENDITION,
+    PROXY_RENDITION,
+    Rendition,
+    build_ingest_command,
+    ingest_media,
+    load_manifest,
+    renditions_for_methods,
+)
+from sync_analyzer.core.pcm_cache import PCMCache
+
+
+def test_renditions_follow_requested_methods():
+    assert renditions_for_methods(["mfcc", "onset"]) == [Rendition("analysis", 22050, 1)]
+    assert renditions_for_methods(["ai"]) == [AI_RENDITION]
+    assert renditions_for_methods(["mfcc", "ai"], sample_rate=44100, include_proxy=True) == [
+        Rendition("analysis", 44100, 1), AI_RENDITION, PROXY_RENDITION]
+
+
+def test_single_command_has_one_input_and_one_output_per_rendition():
+    outputs = [(Rendition("analysis", 22050, 1), "/tmp/a.wav"), (AI_RENDITION, "/tmp/b.wav"),
+               (PROXY_RENDITION, "/tmp/c.wav")]
+    cmd = build_ingest_command("/media/src.mxf", outputs)
+    assert cmd.count("-i") == 1
+    assert [cmd[i + 1] for i, arg in enumerate(cmd) if arg == "-ar"] == ["22050", "16000", "48000"]
+    assert [cmd[i + 1] for i, arg in enumerate(cmd) if arg == "-c:a"] == ["pcm_f32le", "pcm_f32le", "pcm_s16le"]
+    assert cmd[-1] == "/tmp/c.wav"
+
+
+def test_cached_renditions_are_registered_without_decoding(tmp_path):
+    source = tmp_path / "src.wav"
+    sf.write(source, np.zeros(1600, dtype=np.float32), 16000)
+    cache = PCMCache(str(tmp_path / "cache"))
+    cache.put(str(source), 16000, np.zeros(1600, dtype=np.float32))
+
+    # The bogus ffmpeg binary would fail if a decode were attempted
+    manifest = ingest_media(str(source), [AI_RENDITION], cache=cache, ffmpeg_bin="/nonexistent/ffmpeg")
+    assert manifest is not None
+    assert manifest.path_for("ai") == cache.lookup(str(source), 16000)
+    assert load_manifest(str(source), cache).renditions.keys() == {"ai"}
+
+
+@pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg not available")
+def test_ingest_decodes_all_renditions_once(tmp_path):
+    source = tmp_path / "src.wav"
+    sf.write(source, 0.1 * np.sin(np.linspace(0, 2000, 44100 * 2)), 44100)
+    cache = PCMCache(str(tmp_path / "cache"))
+    manifest = ingest_media(str(source), renditions_for_methods(["mfcc", "ai"], include_proxy=True), cache=cache)
+    assert set(manifest.renditions) == {"analysis", "ai", "proxy", "peaks"}
+    assert np.load(manifest.path_for("proxy")).shape == (96000, 2)
+    assert len(np.load(manifest.path_for("ai"))) == 32000
@@ -0,0 +1,122 @@
+import json
+import sys
+import threading
+
+import pytest
+
+from sync_analyzer.core.media_probe import MediaProbeService, ProbeError
+
+PROBE_JSON = {
+    "format": {"duration": "5400.250000", "tags": {"creation_time": "2024-01-01"}},
+    "streams": [
+        {"index": 0, "codec_type": "video", "r_frame_rate": "24000/1001", "avg_frame_rate": "0/0"},
+        {"index": 1, "codec_type": "audio", "codec_name": "pcm_s24le", "channels": 6,
+         "channel_layout": "5.1", "sample_rate": "48000"},
+        {"index": 2, "codec_type": "audio", "codec_name": "pcm_s24le", "channels": 1, "sample_rate": "48000"},
+        {"index": 3, "codec_type": "data", "tags": {"timecode": "01:00:00:00"}},
+    ],
+}
+
+
+@pytest.fixture
+def fake_ffprobe(tmp_path):
+    """Executable that answers like ffprobe and counts its invocations."""
+    calls = tmp_path / "calls.log"
+    script = tmp_path / "ffprobe"
+    script.write_text(
+        f"#!{sys.executable}\n"
+        "import sys, time\n"
+        f"open({str(calls)!r}, 'a').write(sys.argv[-1] + '\\n')\n"
+        "if sys.argv[-1].endswith('.bad'):\n"
+        "    sys.stderr.write('Invalid data'); sys.exit(1)\n"
+        "time.sleep(0.2)\n"
+        f"sys.stdout.write({json.dumps(json.dumps(PROBE_JSON))})\n"
+    )
+    script.chmod(0o755)
+    return str(script), lambda: calls.read_text().splitlines() if calls.exists() else []
+
+
+def test_typed_accessors(tmp_path, fake_ffprobe):
+    binary, calls = fake_ffprobe
+    media = tmp_path / "feature.mov"
+    media.write_bytes(b"x")
+    probes = MediaProbeService(None, ffprobe_bin=binary)
+
+    probe = probes.probe(str(media))
+    assert probe.duration == pytest.approx(5400.25)
+    assert probe.frame_rate == pytest.approx(23.976, abs=1e-3)
+    assert probe.timecode == "01:00:00:00"
+    assert probe.sample_rate == 48000
+    layout = probe.audio_layout
+    assert [s["channels"] for s in layout["streams"]] == [6, 1]
+    assert layout["has_multichannel_stream"] and not layout["has_multi_mono"]
+    assert probes.duration(str(media)) == probe.duration
+    assert len(calls()) == 1
+
+
+def test_concurrent_callers_share_one_probe(tmp_path, fake_ffprobe):
+    binary, calls = fake_ffprobe
+    media = tmp_path / "feature.mov"
+    media.write_bytes(b"x")
+    probes = MediaProbeService(None, ffprobe_bin=binary)
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(probes.probe(str(media)))) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(results) == 8 and all(r is results[0] for r in results)
+    assert len(calls()) == 1
+
+
+def test_sqlite_cache_persists_until_file_changes(tmp_path, fake_ffprobe):
+    binary, calls = fake_ffprobe
+    media = tmp_path / "feature.mov"
+    media.write_bytes(b"x")
+    db = str(tmp_path / "probe.sqlite3")
+
+    MediaProbeService(db, ffprobe_bin=binary).probe(str(media))
+    assert MediaProbeService(db, ffprobe_bin=binary).duration(str(media)) == pytest.approx(5400.25)
+    assert len(calls()) == 1
+
+    media.write_bytes(b"xy")  # new size -> new identity
+    MediaProbeService(db, ffprobe_bin=binary).probe(str(media))
+    assert len(calls()) == 2
+
+
+def test_probe_failures(tmp_path, fake_ffprobe):
+    binary, _ = fake_ffprobe
+    broken = tmp_path / "broken.bad"
+    broken.write_bytes(b"x")
+    probes = MediaProbeService(None, ffprobe_bin=binary)
+
+    with pytest.raises(ProbeError):
+        probes.probe(str(broken))
+    with pytest.raises(ProbeError):
+        probes.probe(str(tmp_path / "missing.mov"))
+    assert probes.duration(str(broken)) == 0.0
+    assert probes.audio_layout(str(broken))["streams"] == []
+
+
+def test_cached_lookup_never_runs_ffprobe(tmp_path, fake_ffprobe):
+    binary, calls = fake_ffprobe
+    media = tmp_path / "feature.mov"
+    media.write_bytes(b"x")
+    db = str(tmp_path / "probe.sqlite3")
+
+    assert MediaProbeService(db, ffprobe_bin=binary).cached(str(media)) is None
+    assert calls() == []
+    MediaProbeService(db, ffprobe_bin=binary).probe(str(media))
+    hit = MediaProbeService(db, ffprobe_bin=binary).cached(str(media))
+    assert hit is not None and hit.duration == pytest.approx(5400.25)
+    assert len(calls()) == 1
+
+
+def test_smpte_metadata_from_cached_probe():
+    from scripts.utils.smpte_utils import SMPTEUtils
+
+    metadata = SMPTEUtils.metadata_from_probe("/mnt/data/feature.mov", PROBE_JSON)
+    assert metadata["duration"] == pytest.approx(5400.25)
+    assert metadata["channels"] == 6 and metadata["sample_rate"] == 48000
+    assert metadata["frame_rate"] == pytest.approx(23.976)
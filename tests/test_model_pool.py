@@ -0,0 +1,88 @@
+import threading
+import time
+
+import numpy as np
+import torch
+
+from sync_analyzer.ai.embedding_sync_detector import AISyncDetector, EmbeddingConfig
+from sync_analyzer.ai.model_pool import EmbeddingModelPool, model_bytes
+
+
+class _FakeExtractor:
+    """Stands in for a loaded model: a linear layer of known size, slow to load."""
+
+    loads = 0
+
+    def __init__(self, config, features=256):
+        type(self).loads += 1
+        time.sleep(0.05)
+        self.config = config
+        self.model_type = config.model_name
+        self.model = torch.nn.Linear(features, features)
+        self.warm_calls = 0
+
+    def extract_embeddings(self, audio, sr, progress_callback=None):
+        self.warm_calls += 1
+        return np.zeros((1, 4))
+
+
+def test_each_model_is_loaded_and_warmed_once_across_threads():
+    _FakeExtractor.loads = 0
+    pool = EmbeddingModelPool(factory=_FakeExtractor)
+    config = EmbeddingConfig(model_name="wav2vec2", use_gpu=False)
+    seen = []
+
+    def request():
+        with pool.acquire(config) as extractor:
+            seen.append(extractor)
+
+    threads = [threading.Thread(target=request) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert _FakeExtractor.loads == 1
+    assert len({id(e) for e in seen}) == 1 and seen[0].warm_calls == 1
+    assert pool.size_bytes() == model_bytes(seen[0]) == (256 * 256 + 256) * 4
+
+
+def test_request_config_is_applied_to_the_shared_model():
+    pool = EmbeddingModelPool(factory=_FakeExtractor, warmup=False)
+    with pool.acquire(EmbeddingConfig(model_name="yamnet", use_gpu=False, hop_size=0.25)) as extractor:
+        assert extractor.config.hop_size == 0.25
+    with pool.acquire(EmbeddingConfig(model_name="yamnet", use_gpu=False, hop_size=1.0)) as again:
+        assert again is extractor and again.config.hop_size == 1.0
+
+
+def test_idle_models_are_evicted_lru_under_budget():
+    one_model = (256 * 256 + 256) * 4
+    pool = EmbeddingModelPool(max_bytes=2 * one_model, factory=_FakeExtractor, warmup=False)
+    configs = [EmbeddingConfig(model_name=name, use_gpu=False) for name in ("a", "b", "c")]
+    with pool.acquire(configs[0]):
+        pass
+    with pool.acquire(configs[1]):
+        pass
+    with pool.acquire(configs[0]):  # "a" is now more recent than "b"
+        pass
+    with pool.acquire(configs[2]):
+        loaded = {name for name, _ in pool.loaded()}
+        assert loaded == {"a", "c"}
+
+    # Models in use are never evicted, even over budget
+    pool.max_bytes = 0
+    with pool.acquire(configs[1]):
+        pool.evict()
+        assert {name for name, _ in pool.loaded()} == {"b"}
+
+
+def test_detector_runs_on_pooled_spectral_extractor():
+    pool = EmbeddingModelPool()
+    config = EmbeddingConfig(model_name="spectral-only", use_gpu=False)  # unsupported name -> spectral fallback
+    sr = 16000
+    rng = np.random.default_rng(0)
+    master = rng.standard_normal(sr * 12).astype(np.float32)
+    dub = master[sr * 2:]
+    with pool.acquire(config) as extractor:
+        assert extractor.model_type == "spectral" and model_bytes(extractor) == 0
+        result = AISyncDetector(config, embedding_extractor=extractor).detect_sync(master, dub, sr)
+    assert result.offset_seconds == 2.0
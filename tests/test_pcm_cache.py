@@ -0,0 +1,118 @@
+import os
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+import sync_analyzer.core.pcm_cache as pcm_cache
+from sync_analyzer.core.pcm_cache import PCMCache
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / "master.wav"
+    sf.write(path, np.linspace(-0.5, 0.5, 2205, dtype=np.float32), 22050)
+    return str(path)
+
+
+def test_decode_runs_once_per_source_and_rate(tmp_path, source):
+    cache = PCMCache(str(tmp_path / "cache"))
+    decodes = []
+
+    def decode():
+        decodes.append(1)
+        return np.arange(10, dtype=np.float64)
+
+    first = cache.get_or_decode(source, 22050, decode)
+    second = cache.get_or_decode(source, 22050, decode)
+    assert len(decodes) == 1
+    assert second.dtype == np.float32
+    np.testing.assert_array_equal(first, second)
+
+    cache.get_or_decode(source, 16000, decode)
+    assert len(decodes) == 2
+
+    # Touching the source changes its identity
+    st = os.stat(source)
+    os.utime(source, ns=(st.st_atime_ns, st.st_mtime_ns + 10 ** 9))
+    assert cache.get(source, 22050) is None
+
+
+def test_lru_eviction_keeps_budget(tmp_path):
+    cache = PCMCache(str(tmp_path / "cache"), max_bytes=4100)  # three 300-sample entries fit, four do not
+    sources = []
+    for i in range(3):
+        src = tmp_path / f"s{i}.wav"
+        src.write_bytes(b"x" * (i + 1))
+        sources.append(str(src))
+        cache.put(str(src), 22050, np.zeros(300, dtype=np.float32))
+        os.utime(cache.lookup(str(src), 22050), (i, i))  # deterministic LRU order
+
+    cache.get(sources[0], 22050)  # most recently used
+    cache.put(sources[0], 16000, np.zeros(300, dtype=np.float32))
+    assert cache.size_bytes() <= 4100
+    assert cache.get(sources[1], 22050) is None
+    assert cache.get(sources[0], 22050) is not None
+
+
+def test_put_file_and_export_wav_round_trip(tmp_path, source):
+    cache = PCMCache(str(tmp_path / "cache"))
+    assert cache.put_file(source, 22050, source, block_frames=500)
+    out = str(tmp_path / "restored.wav")
+    assert cache.export_wav(source, 22050, out)
+    original, _ = sf.read(source, dtype="float32")
+    restored, sr = sf.read(out, dtype="float32")
+    assert sr == 22050
+    np.testing.assert_array_equal(original, restored)
+
+
+def test_detector_load_hits_cache(tmp_path, source, monkeypatch):
+    from sync_analyzer.core import audio_sync_detector
+    from pathlib import Path
+
+    monkeypatch.setattr(pcm_cache, "_default_cache", PCMCache(str(tmp_path / "cache")))
+    monkeypatch.setattr(pcm_cache, "_default_configured", True)
+    detector = audio_sync_detector.ProfessionalSyncDetector(use_gpu=False)
+    first, _ = detector.load_and_preprocess_audio(Path(source))
+
+    def fail(*args, **kwargs):
+        raise AssertionError("source decoded again")
+
+    monkeypatch.setattr(audio_sync_detector.librosa, "load", fail)
+    second, _ = detector.load_and_preprocess_audio(Path(source))
+    np.testing.assert_array_equal(first, second)
+
+
+def test_derived_peaks_share_the_lru_budget(tmp_path, source):
+    from sync_analyzer.core.waveform_peaks import ensure_peaks
+
+    cache = PCMCache(str(tmp_path / "cache"))
+    old_entry = cache.put(source, 22050, np.linspace(-0.5, 0.5, 22050, dtype=np.float32))
+    peaks = ensure_peaks(source, 22050, cache=cache)
+    assert peaks in {path for path, _, _ in cache._entries()}
+
+    # The source changes: its old entry and peaks are never used again and age out
+    for stale in (old_entry, peaks):
+        os.utime(stale, (1, 1))
+    st = os.stat(source)
+    os.utime(source, ns=(st.st_atime_ns, st.st_mtime_ns + 10 ** 9))
+    new_entry = cache.put(source, 22050, np.zeros(22050, dtype=np.float32))
+    cache.max_bytes = os.path.getsize(new_entry)
+    cache.evict()
+    assert [path for path, _, _ in cache._entries()] == [new_entry]
+
+
+def test_spectrogram_tiles_share_the_lru_budget(tmp_path, source):
+    from sync_analyzer.core.spectrogram_tiles import SpectrogramTiles
+
+    cache = PCMCache(str(tmp_path / "cache"))
+    cache.put(source, 22050, np.linspace(-0.5, 0.5, 22050, dtype=np.float32))
+    tile = SpectrogramTiles(cache=cache).tile_png(source, 0, 0)
+    assert tile in {path for path, _, _ in cache._entries()}
+
+    os.utime(tile, (1, 1))
+    cache.max_bytes = cache.size_bytes() - 1
+    cache.evict()
+    assert not os.path.exists(os.path.dirname(tile))  # the emptied tile directory is removed
+    assert os.path.isdir(os.path.join(cache.cache_dir, "spectrograms"))
+    assert cache.get(source, 22050) is not None
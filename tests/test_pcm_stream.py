@@ -0,0 +1,174 @@
+import functools
+import os
+import sys
+
+import numpy as np
+import pytest
+
+from sync_analyzer.core import optimized_large_file_detector as detector_module
+from sync_analyzer.core.optimized_large_file_detector import (
+    OptimizedLargeFileDetector,
+)
+from sync_analyzer.core.pcm_cache import NpyStreamWriter
+from sync_analyzer.core.pcm_stream import PCMStream, StreamingWindowReader
+from sync_analyzer.core.sparse_decode import decode_windows_to_npy
+
+# Stands in for ffmpeg: copies raw s16le from a file to stdout in small writes
+_CAT = "import shutil, sys; shutil.copyfileobj(open(sys.argv[1], 'rb'), sys.stdout.buffer, 1000)"
+
+
+def _raw_source(path, y):
+    pcm = np.clip(np.round(y * 32768.0), -32768, 32767).astype("<i2")
+    pcm.tofile(str(path))
+    return [sys.executable, "-c", _CAT, str(path)], pcm.astype(np.float32) / 32768.0
+
+
+def test_streaming_windows_match_decoded_pcm(tmp_path):
+    sr = 8000
+    rng = np.random.default_rng(0)
+    master_cmd, master_ref = _raw_source(tmp_path / "m.raw", 0.3 * rng.standard_normal(sr * 5))
+    dub_cmd, dub_ref = _raw_source(tmp_path / "d.raw", 0.3 * rng.standard_normal(sr * 4))
+    windows = [(0.0, 1.5), (1.2, 2.7), (3.5, 4.5), (4.2, 5.0), (6.0, 7.0)]
+
+    # Ring far smaller than the files: exercises wrap-around and producer backpressure
+    capacity = StreamingWindowReader.capacity_for(windows, sr, lookahead_seconds=0.25)
+    assert capacity < len(dub_ref)
+    master = PCMStream(master_cmd, capacity, tee=NpyStreamWriter(str(tmp_path / "m.npy")), block_frames=700).start()
+    dub = PCMStream(dub_cmd, capacity, block_frames=700).start()
+    try:
+        got = list(StreamingWindowReader(master, dub, sr, windows))
+        assert master.finish() == str(tmp_path / "m.npy")
+        dub.finish()
+    finally:
+        master.close()
+        dub.close()
+
+    assert [w.index for w in got] == list(range(len(windows)))
+    for w, (start, end) in zip(got, windows):
+        a, b = int(start * sr), int(start * sr) + int((end - start) * sr)
+        assert np.array_equal(w.master, master_ref[a:b])
+        assert np.array_equal(w.dub, dub_ref[a:b])
+    assert np.array_equal(np.load(str(tmp_path / "m.npy")), master_ref)
+
+
+def test_released_frames_and_decoder_errors_are_reported(tmp_path):
+    cmd, _ = _raw_source(tmp_path / "m.raw", np.zeros(4000))
+    stream = PCMStream(cmd, capacity_frames=2000).start()
+    try:
+        stream.read(0, 1000)
+        stream.release(1000)
+        with pytest.raises(ValueError):
+            stream.read(500, 100)
+        with pytest.raises(ValueError):
+            stream.read(1000, 5000)
+    finally:
+        stream.close()
+
+    failing = PCMStream([sys.executable, "-c", "import sys; sys.exit(3)"], capacity_frames=100).start()
+    try:
+        with pytest.raises(RuntimeError):
+            failing.read(0, 10)
+    finally:
+        failing.close()
+
+
+def test_streaming_chunk_pass_matches_file_pass(tmp_path):
+    d = OptimizedLargeFileDetector(gpu_enabled=False)
+    d.sample_rate = 8000
+    rng = np.random.default_rng(1)
+    base = 0.3 * rng.standard_normal(d.sample_rate * 12)
+    master_cmd, master_ref = _raw_source(tmp_path / "m.raw", base[: d.sample_rate * 10])
+    dub_cmd, dub_ref = _raw_source(tmp_path / "d.raw", base[400: 400 + d.sample_rate * 10])
+    master_npy, dub_npy = str(tmp_path / "m.npy"), str(tmp_path / "d.npy")
+    np.save(master_npy, master_ref)
+    np.save(dub_npy, dub_ref)
+    chunks = [(0.0, 3.0), (2.0, 5.0), (6.0, 9.0)]
+
+    capacity = StreamingWindowReader.capacity_for(chunks, d.sample_rate, lookahead_seconds=1.0)
+    streams = (PCMStream(master_cmd, capacity).start(), PCMStream(dub_cmd, capacity).start())
+    try:
+        got = d._run_chunk_pass(master_npy, dub_npy, chunks, pass_number=1, streams=streams)
+    finally:
+        for stream in streams:
+            stream.close()
+    expected = d._run_chunk_pass(master_npy, dub_npy, chunks, pass_number=1)
+
+    assert [r["offset_detection"]["offset_samples"] for r in got] == [400, 400, 400]
+    assert repr(got) == repr(expected)
+
+
+def test_uncached_streaming_writes_nothing_and_pass2_seek_decodes(tmp_path, monkeypatch):
+    # Stands in for ``ffmpeg -ss START -t DURATION``
+    seek = ("import sys; path, start, dur, sr = sys.argv[1], float(sys.argv[2]), float(sys.argv[3]), int(sys.argv[4]);"
+            "fh = open(path, 'rb'); fh.seek(int(round(start * sr)) * 2);"
+            "sys.stdout.buffer.write(fh.read(int(round(dur * sr)) * 2))")
+    seeks = []
+
+    def fake_seek(source, start, duration, sample_rate):
+        seeks.append((start, duration))
+        return [sys.executable, "-c", seek, source, repr(start), repr(duration), str(sample_rate)]
+
+    d = OptimizedLargeFileDetector(gpu_enabled=False, chunk_size=10.0, max_chunks=0, stream_decode=True)
+    d.sample_rate = 8000
+    d.gap_analysis_threshold = 2.0  # every chunk is refined
+    rng = np.random.default_rng(2)
+    base = 0.3 * rng.standard_normal(d.sample_rate * 42)
+    master_cmd, _ = _raw_source(tmp_path / "m.raw", base[: d.sample_rate * 40])
+    dub_cmd, _ = _raw_source(tmp_path / "d.raw", base[400: 400 + d.sample_rate * 40])
+    monkeypatch.setattr(d, "get_audio_duration", lambda path: 40.0)
+    monkeypatch.setattr(d, "_should_perform_pass2", lambda results: True)
+    monkeypatch.setattr(detector_module, "build_pipe_command",
+                        lambda path, sr: [sys.executable, "-c", _CAT, path])
+    monkeypatch.setattr(detector_module, "decode_windows_to_npy",
+                        functools.partial(decode_windows_to_npy, build_command=fake_seek))
+    written = []
+    monkeypatch.setattr(detector_module, "PCMStream",
+                        lambda command, capacity, tee=None: written.append(tee) or PCMStream(command, capacity, tee=tee))
+
+    passes = {}
+    run_chunk_pass = d._run_chunk_pass
+
+    def record(master_audio, dub_audio, chunks, pass_number, **kwargs):
+        passes[pass_number] = run_chunk_pass(master_audio, dub_audio, chunks, pass_number, **kwargs)
+        return passes[pass_number]
+
+    monkeypatch.setattr(d, "_run_chunk_pass", record)
+
+    result = d.analyze_sync_chunked(master_cmd[-1], dub_cmd[-1])
+
+    assert written == [None, None]  # no PCM cache: the streamed decode is not teed anywhere
+    assert result['multi_pass_analysis'] and seeks
+    assert passes[2] and all(c['offset_detection']['offset_samples'] == 400 for c in passes[2])
+    assert os.listdir(d.temp_dir) == []
+
+
+def test_cached_master_is_mapped_and_only_the_dub_is_streamed(tmp_path, monkeypatch):
+    from sync_analyzer.core import pcm_cache
+
+    cache = pcm_cache.PCMCache(str(tmp_path / "pcm"))
+    monkeypatch.setattr(pcm_cache, "_default_cache", cache)
+    monkeypatch.setattr(pcm_cache, "_default_configured", True)
+    d = OptimizedLargeFileDetector(gpu_enabled=False, chunk_size=10.0, max_chunks=0, stream_decode=True)
+    d.sample_rate = 8000
+    rng = np.random.default_rng(3)
+    base = 0.3 * rng.standard_normal(d.sample_rate * 42)
+    master_cmd, master_ref = _raw_source(tmp_path / "m.raw", base[: d.sample_rate * 40])
+    dub_cmd, dub_ref = _raw_source(tmp_path / "d.raw", base[400: 400 + d.sample_rate * 40])
+    master_entry = cache.put(master_cmd[-1], d.sample_rate, master_ref)
+    master_inode = os.stat(master_entry).st_ino  # lookups touch the mtime; a rewrite replaces the file
+    monkeypatch.setattr(d, "get_audio_duration", lambda path: 40.0)
+    monkeypatch.setattr(d, "_should_perform_pass2", lambda results: False)
+    monkeypatch.setattr(detector_module, "build_pipe_command",
+                        lambda path, sr: [sys.executable, "-c", _CAT, path])
+    decoded = []
+    monkeypatch.setattr(detector_module, "PCMStream",
+                        lambda command, capacity, tee=None: decoded.append(command[-1]) or
+                        PCMStream(command, capacity, tee=tee))
+
+    result = d.analyze_sync_chunked(master_cmd[-1], dub_cmd[-1])
+
+    assert decoded == [dub_cmd[-1]]
+    assert os.stat(master_entry).st_ino == master_inode
+    assert np.array_equal(cache.get(dub_cmd[-1], d.sample_rate), dub_ref)  # the new dub was teed
+    assert result['chunk_details']
+    assert all(c['offset_detection']['offset_samples'] == 400 for c in result['chunk_details'])
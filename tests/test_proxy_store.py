@@ -0,0 +1,129 @@
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+from sync_analyzer.core import pcm_cache
+from sync_analyzer.core.pcm_cache import PCMCache
+from sync_analyzer.core.proxy_store import ProxyStore, parse_range
+
+# Stands in for ffmpeg: counts builds, then copies the input to the output path
+_FAKE_FFMPEG = """#!{python}
+import sys, time
+args = sys.argv[1:]
+with open({counter!r}, "a") as fh:
+    fh.write("x")
+time.sleep(0.2)
+src = args[args.index("-i") + 1]
+with open(src, "rb") as fin, open(args[-1], "wb") as fout:
+    fout.write(fin.read())
+"""
+
+
+@pytest.fixture
+def fake_ffmpeg(tmp_path):
+    counter = tmp_path / "builds.txt"
+    script = tmp_path / "ffmpeg"
+    script.write_text(_FAKE_FFMPEG.format(python=sys.executable, counter=str(counter)))
+    script.chmod(0o755)
+    return str(script), lambda: len(counter.read_text()) if counter.exists() else 0
+
+
+def _source(tmp_path, name, size):
+    path = tmp_path / name
+    path.write_bytes(os.urandom(size))
+    return str(path)
+
+
+def test_parse_range():
+    assert parse_range(None, 100) is None
+    assert parse_range("bytes=0-9", 100) == (0, 9)
+    assert parse_range("bytes=90-", 100) == (90, 99)
+    assert parse_range("bytes=-10", 100) == (90, 99)
+    assert parse_range("bytes=50-500", 100) == (50, 99)
+    assert parse_range("bytes=0-9,20-29", 100) == (0, 9)
+    assert parse_range("items=0-9", 100) is None
+    assert parse_range("bytes=abc", 100) is None
+    with pytest.raises(ValueError):
+        parse_range("bytes=100-", 100)
+    with pytest.raises(ValueError):
+        parse_range("bytes=-0", 100)
+
+
+def test_concurrent_requests_share_one_build(tmp_path, fake_ffmpeg):
+    ffmpeg, builds = fake_ffmpeg
+    store = ProxyStore(str(tmp_path / "proxies"), max_bytes=10 ** 6, ffmpeg_bin=ffmpeg)
+    src = _source(tmp_path, "a.mov", 1000)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(store.ensure(src, "flac"))) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert builds() == 1
+    assert len(set(results)) == 1 and results[0].endswith(".flac")
+    assert store.ensure(src, "flac") == results[0] and builds() == 1
+    assert store.get(src, "opus") is None
+
+
+def test_changed_source_rebuilds_and_lru_evicts(tmp_path, fake_ffmpeg):
+    ffmpeg, builds = fake_ffmpeg
+    store = ProxyStore(str(tmp_path / "proxies"), max_bytes=2500, ffmpeg_bin=ffmpeg)
+    a, b, c = (_source(tmp_path, f"{n}.mov", 1000) for n in "abc")
+    first = store.ensure(a, "flac")
+    time.sleep(0.05)
+    store.ensure(b, "flac")
+    time.sleep(0.05)
+    store.get(a, "flac")  # a is now more recent than b
+    time.sleep(0.05)
+    store.ensure(c, "flac")
+    assert store.size_bytes() <= 2500
+    assert store.get(b, "flac") is None
+    assert store.get(a, "flac") == first
+
+    with open(a, "ab") as fh:
+        fh.write(b"more")
+    assert store.ensure(a, "flac") != first
+    assert builds() == 4
+
+
+def test_failed_build_raises_and_leaves_no_entry(tmp_path):
+    store = ProxyStore(str(tmp_path / "proxies"), ffmpeg_bin=str(tmp_path / "missing-ffmpeg"))
+    src = _source(tmp_path, "a.mov", 10)
+    with pytest.raises(RuntimeError):
+        store.ensure(src, "flac")
+    assert store.size_bytes() == 0
+    with pytest.raises(ValueError):
+        store.ensure(src, "mp3")
+
+
+def test_wav_proxy_is_16_bit_and_not_copied_into_the_pcm_cache(tmp_path, fake_ffmpeg, monkeypatch):
+    ffmpeg, builds = fake_ffmpeg
+    cache = PCMCache(str(tmp_path / "pcm"))
+    monkeypatch.setattr(pcm_cache, "_default_cache", cache)
+    store = ProxyStore(str(tmp_path / "proxies"), ffmpeg_bin=ffmpeg)
+
+    # A cached 48 kHz stereo decode is exported as 16-bit PCM
+    cached = _source(tmp_path, "cached.mov", 100)
+    cache.put(cached, 48000, np.full((4800, 2), 0.25, dtype=np.float32), channels="stereo")
+    proxy = store.ensure(cached, "wav")
+    info = sf.info(proxy)
+    assert (info.subtype, info.channels, info.samplerate, builds()) == ("PCM_16", 2, 48000, 0)
+    assert os.path.getsize(proxy) < 4800 * 2 * 4
+
+    # An ffmpeg-built proxy is served as is, not duplicated as float32 in the cache
+    other = _source(tmp_path, "other.mov", 100)
+    store.ensure(other, "wav")
+    assert builds() == 1 and cache.lookup(other, 48000, channels="stereo") is None
+
+
+def test_opus_and_webm_share_one_proxy(tmp_path, fake_ffmpeg):
+    ffmpeg, builds = fake_ffmpeg
+    store = ProxyStore(str(tmp_path / "proxies"), max_bytes=10 ** 6, ffmpeg_bin=ffmpeg)
+    src = _source(tmp_path, "a.mov", 1000)
+    assert store.key(src, "opus") == store.key(src, "webm")
+    assert store.ensure(src, "opus") == store.ensure(src, "WebM") and builds() == 1
@@ -0,0 +1,126 @@
+import functools
+import os
+import sys
+
+import numpy as np
+import pytest
+
+from sync_analyzer.core import optimized_large_file_detector as detector_module
+from sync_analyzer.core.optimized_large_file_detector import (
+    OptimizedLargeFileDetector,
+)
+from sync_analyzer.core.sparse_decode import (
+    decode_windows_to_npy,
+    plan_spans,
+    span_coverage,
+)
+
+# Stands in for ``ffmpeg -ss START -t DURATION``: slices raw s16le by time
+_SEEK = (
+    "import sys; path, start, dur, sr = sys.argv[1], float(sys.argv[2]), float(sys.argv[3]), int(sys.argv[4]);"
+    "fh = open(path, 'rb'); fh.seek(int(round(start * sr)) * 2);"
+    "sys.stdout.buffer.write(fh.read(int(round(dur * sr)) * 2))"
+)
+
+
+def _fake_seek(source, start, duration, sample_rate):
+    return [sys.executable, "-c", _SEEK, source, repr(start), repr(duration), str(sample_rate)]
+
+
+def _raw_source(path, y):
+    pcm = np.clip(np.round(y * 32768.0), -32768, 32767).astype("<i2")
+    pcm.tofile(str(path))
+    return str(path), pcm.astype(np.float32) / 32768.0
+
+
+def test_plan_spans_merges_margins_and_clips():
+    spans = plan_spans([(10.0, 12.0), (0.0, 2.0), (12.5, 14.0), (30.0, 40.0)], 100,
+                       margin_seconds=1.0, total_frames=3500)
+    assert spans == [(0, 300), (900, 1500), (2900, 3500)]
+    assert span_coverage(spans, 3500) == pytest.approx(1500 / 3500)
+
+
+def test_sparse_npy_matches_full_decode_inside_windows(tmp_path):
+    sr = 8000
+    rng = np.random.default_rng(0)
+    source, ref = _raw_source(tmp_path / "m.raw", 0.3 * rng.standard_normal(sr * 60))
+    windows = [(0.0, 3.0), (20.0, 23.0), (21.5, 24.5), (56.0, 60.0)]
+    out = decode_windows_to_npy(source, str(tmp_path / "m.npy"), windows, sr, 60.0,
+                                margin_seconds=0.5, jobs=3, build_command=_fake_seek)
+
+    pcm = np.load(out, mmap_mode="r")
+    assert len(pcm) == len(ref)
+    for start, end in windows:
+        a, b = int(start * sr), int(start * sr) + int((end - start) * sr)
+        assert np.array_equal(pcm[a:b], ref[a:b])
+    assert not np.any(pcm[int(5 * sr):int(15 * sr)])  # gaps were never decoded
+
+
+def test_failed_span_raises(tmp_path):
+    def failing(source, start, duration, sample_rate):
+        return [sys.executable, "-c", "import sys; sys.exit(2)"]
+
+    with pytest.raises(RuntimeError):
+        decode_windows_to_npy("missing", str(tmp_path / "x.npy"), [(0.0, 1.0)], 8000, 2.0,
+                              build_command=failing)
+
+
+def test_detector_uses_sparse_decode_only_when_subsampling(tmp_path, monkeypatch):
+    d = OptimizedLargeFileDetector(gpu_enabled=False, sparse_decode=True, max_chunks=3)
+    d.sample_rate = 8000
+    monkeypatch.setattr(d, "get_audio_duration", lambda path: 600.0)
+    calls = []
+
+    def fake_decode(path, out_path, chunks, sr, duration, jobs):
+        calls.append((path, len(chunks), duration))
+        return out_path
+
+    monkeypatch.setattr(
+        "sync_analyzer.core.optimized_large_file_detector.decode_windows_to_npy", fake_decode)
+    master, dub, md, dd, chunks, pass2_sources = d._extract_sparse("m.mov", "d.mov")
+    assert len(chunks) <= 4 and md == dd == 600.0
+    assert [c[0] for c in calls] == ["m.mov", "d.mov"] and pass2_sources == ("m.mov", "d.mov")
+    assert os.path.dirname(master) == d.temp_dir
+
+    # A cached master is sliced from its entry; only the dub is seek-decoded
+    calls.clear()
+    monkeypatch.setattr(d, "_cached_entries", lambda *paths: ["/cache/m.npy", None])
+    master, dub, _, _, _, pass2_sources = d._extract_sparse("m.mov", "d.mov")
+    assert [c[0] for c in calls] == ["d.mov"] and pass2_sources == (None, "d.mov")
+    assert master == "/cache/m.npy" and os.path.dirname(dub) == d.temp_dir
+
+    d.max_chunks = 0  # every window analyzed: a full decode is cheaper
+    assert d._extract_sparse("m.mov", "d.mov") is None
+
+
+def test_pass2_on_sparse_decode_refines_decoded_audio(tmp_path, monkeypatch):
+    sr = 8000
+    d = OptimizedLargeFileDetector(gpu_enabled=False, chunk_size=10.0, max_chunks=3, sparse_decode=True)
+    d.sample_rate = sr
+    d.gap_analysis_threshold = 2.0  # every chunk is refined
+    rng = np.random.default_rng(3)
+    base = 0.3 * rng.standard_normal(sr * 122)
+    master, _ = _raw_source(tmp_path / "m.raw", base[: sr * 120])
+    dub, _ = _raw_source(tmp_path / "d.raw", base[400: 400 + sr * 120])
+    monkeypatch.setattr(d, "get_audio_duration", lambda path: 120.0)
+    monkeypatch.setattr(d, "_should_perform_pass2", lambda results: True)
+    monkeypatch.setattr(detector_module, "decode_windows_to_npy",
+                        functools.partial(decode_windows_to_npy, build_command=_fake_seek))
+    passes = {}
+    run_chunk_pass = d._run_chunk_pass
+
+    def record(master_audio, dub_audio, chunks, pass_number, **kwargs):
+        passes[pass_number] = (chunks, run_chunk_pass(master_audio, dub_audio, chunks, pass_number, **kwargs))
+        return passes[pass_number][1]
+
+    monkeypatch.setattr(d, "_run_chunk_pass", record)
+
+    result = d.analyze_sync_chunked(master, dub)
+
+    pass1_windows, pass2_windows = passes[1][0], passes[2][0]
+    decoded = plan_spans(pass1_windows, sr, total_frames=sr * 120)
+    assert any(not any(a <= int(s * sr) and int(e * sr) <= b for a, b in decoded)
+               for s, e in pass2_windows)  # refinement reaches past the pass-1 spans
+    assert result['multi_pass_analysis']
+    assert all(c['offset_detection']['offset_samples'] == 400 for c in passes[2][1])
+    assert os.listdir(d.temp_dir) == []
@@ -0,0 +1,104 @@
+import os
+import struct
+import zlib
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+from sync_analyzer.core import spectrogram_tiles
+from sync_analyzer.core.feature_graph import SpectralFeatureGraph
+from sync_analyzer.core.pcm_cache import PCMCache
+from sync_analyzer.core.spectrogram_tiles import (
+    DB_CEIL,
+    DB_FLOOR,
+    TILE_COLUMNS,
+    SpectrogramTiles,
+    encode_png_gray,
+)
+
+
+def _decode_png_gray(data):
+    assert data[:8] == b"\x89PNG\r\n\x1a\n"
+    width, height = struct.unpack(">II", data[16:24])
+    idat_len = struct.unpack(">I", data[33:37])[0]
+    raw = zlib.decompress(data[41:41 + idat_len])
+    return np.frombuffer(raw, dtype=np.uint8).reshape(height, width + 1)[:, 1:]
+
+
+def test_png_round_trip():
+    image = np.arange(12 * 7, dtype=np.uint8).reshape(7, 12)
+    assert np.array_equal(_decode_png_gray(encode_png_gray(image)), image)
+
+
+def test_tile_range_geometry():
+    tiles = SpectrogramTiles()
+    span = tiles.tile_seconds(0)
+    assert span == pytest.approx(TILE_COLUMNS * 512 / 22050)
+    specs = tiles.tiles_for_range(600.0, 0, start=span * 3.5, end=span * 5.2)
+    assert [s.index for s in specs] == [3, 4, 5]
+    assert tiles.tiles_for_range(600.0, 2)[-1].end == 600.0
+    assert tiles.level_for_range(0.0, 4 * span) == 0
+    assert tiles.level_for_range(0.0, 4 * span + 1) == 1
+
+
+def test_tiles_are_seamless_and_levels_pool_columns():
+    sr = 22050
+    t = np.arange(sr * 40) / sr
+    audio = (0.3 * np.sin(2 * np.pi * (200 + 40 * t) * t)).astype(np.float32)
+    tiles = SpectrogramTiles()
+
+    # A tile rendered from its own slice matches the same columns of a full-file STFT
+    first = tiles.render(audio, 0, 1)
+    assert first.shape == (128, TILE_COLUMNS)
+    mel = tiles._mel_basis.dot(SpectralFeatureGraph(audio, sr).power())
+    db = 10.0 * np.log10(np.maximum(mel[:, TILE_COLUMNS:2 * TILE_COLUMNS], 1e-10))
+    reference = np.clip(np.round((db - DB_FLOOR) * 255.0 / (DB_CEIL - DB_FLOOR)), 0, 255)
+    assert np.max(np.abs(first.astype(int) - reference)) <= 1
+
+    # A level-1 column averages the power of two level-0 columns, so it lies between them
+    joined = np.hstack([tiles.render(audio, 0, 0), first]).astype(int)
+    level1 = tiles.render(audio, 1, 0).astype(int)
+    low = np.minimum(joined[:, 0::2], joined[:, 1::2])
+    high = np.maximum(joined[:, 0::2], joined[:, 1::2])
+    assert np.all(level1 >= low - 1) and np.all(level1 <= high + 1)
+
+    # Columns past the end of the file are blank
+    last = tiles.render(audio, 0, len(audio) // (512 * TILE_COLUMNS))
+    assert not last[:, -1].any()
+
+
+def test_coarse_tiles_render_in_blocks_without_changing_columns(monkeypatch):
+    sr = 22050
+    rng = np.random.default_rng(1)
+    audio = (0.2 * rng.standard_normal(sr * 100)).astype(np.float32)
+    audio[sr * 30:sr * 50] *= 0.01
+    tiles = SpectrogramTiles()
+    whole = [tiles.render(audio, 4, index) for index in range(2)]
+    renders = []
+    graph = spectrogram_tiles.SpectralFeatureGraph
+    monkeypatch.setattr(spectrogram_tiles, "SpectralFeatureGraph",
+                        lambda y, *a, **k: renders.append(len(y)) or graph(y, *a, **k))
+    monkeypatch.setattr(spectrogram_tiles, "BLOCK_COLUMNS", 200)  # not a multiple of the pool
+    blocked = [tiles.render(audio, 4, index) for index in range(2)]
+    assert max(renders) < 300 * 512 and len(renders) > 20
+    for a, b in zip(whole, blocked):
+        assert np.max(np.abs(a.astype(int) - b.astype(int))) <= 1
+    assert blocked[1][:, -1].any() == whole[1][:, -1].any()
+
+
+def test_tile_png_is_rendered_once_from_cached_decode(tmp_path):
+    source = tmp_path / "src.wav"
+    sf.write(source, np.zeros(100, dtype=np.float32), 22050)
+    cache = PCMCache(str(tmp_path / "cache"))
+    tiles = SpectrogramTiles(cache=cache)
+    assert tiles.tile_png(str(source), 0, 0) is None  # no analysis decode cached
+
+    cache.put(str(source), 22050, 0.1 * np.random.default_rng(0).standard_normal(22050 * 10))
+    path = tiles.tile_png(str(source), 1, 0)
+    image = _decode_png_gray(open(path, "rb").read())
+    assert image.shape == (128, TILE_COLUMNS) and image.any()
+    inode = os.stat(path).st_ino  # a re-render would replace the file
+    assert tiles.tile_png(str(source), 1, 0) == path and os.stat(path).st_ino == inode
+    with pytest.raises(ValueError):
+        tiles.tile_png(str(source), 99, 0)
@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+import soundfile as sf
+
+from sync_analyzer.core.media_ingest import ANALYSIS_RENDITION, ingest_media, load_manifest
+from sync_analyzer.core.pcm_cache import PCMCache
+from sync_analyzer.core.waveform_peaks import (
+    PeakPyramid,
+    build_peak_pyramid,
+    ensure_peaks,
+    load_peaks,
+)
+
+
+def test_levels_halve_resolution_and_match_direct_reduction():
+    rng = np.random.default_rng(0)
+    audio = (0.5 * rng.standard_normal(256 * 4000 + 100)).clip(-1, 1).astype(np.float32)
+    pyramid = build_peak_pyramid(audio, 22050, base_bin=256, min_bins=500, block_bins=1000)
+
+    assert [lvl.samples_per_bin for lvl in pyramid.levels] == [256, 512, 1024, 2048]
+    assert [len(lvl) for lvl in pyramid.levels] == [4001, 2001, 1001, 501]
+    assert pyramid.levels[0].max.dtype == np.int8
+
+    # Level 2 equals a direct reduction over 1024-sample bins
+    grid = audio[:1024 * 1000].reshape(1000, 1024)
+    lvl = pyramid.levels[2]
+    assert np.array_equal(lvl.max[:1000], np.round(grid.max(axis=1) * 127).astype(np.int8))
+    assert np.array_equal(lvl.min[:1000], np.round(grid.min(axis=1) * 127).astype(np.int8))
+    rms = np.round(np.sqrt(np.mean(grid.astype(np.float64) ** 2, axis=1)) * 127)
+    assert np.max(np.abs(lvl.rms[:1000].astype(int) - rms)) <= 1
+
+
+def test_tile_selects_level_and_aligns_to_bins(tmp_path):
+    audio = np.sin(np.linspace(0, 600, 22050 * 60)).astype(np.float32)
+    pyramid = build_peak_pyramid(audio, 22050, bits=16)
+    path = pyramid.save(str(tmp_path / "p.npz"))
+    loaded = PeakPyramid.load(path)
+    assert loaded.duration == pytest.approx(60.0)
+
+    whole = loaded.tile(start=0.0, bins=1000)
+    assert len(whole["max"]) >= 1000 and whole["scale"] == 32767
+    assert whole["end"] == pytest.approx(60.0)
+    zoomed = loaded.tile(level=0, start=10.0, end=11.0)
+    assert zoomed["start"] <= 10.0 < zoomed["start"] + 256 / 22050
+    assert len(zoomed["max"]) == pytest.approx(22050 / 256, abs=2)
+    with pytest.raises(ValueError):
+        loaded.tile(level=len(loaded.levels))
+
+    # The finest level over the whole file is clipped to max_bins, reporting what it covers
+    assert not zoomed["truncated"]
+    clipped = loaded.tile(level=0, start=5.0, max_bins=500)
+    assert len(clipped["max"]) == len(clipped["rms"]) == 500 and clipped["truncated"]
+    assert clipped["end"] == pytest.approx(clipped["start"] + 500 * 256 / 22050)
+
+
+def test_ingest_builds_peaks_from_cached_analysis(tmp_path):
+    source = tmp_path / "src.wav"
+    sf.write(source, np.zeros(22050, dtype=np.float32), 22050)
+    cache = PCMCache(str(tmp_path / "cache"))
+    assert ensure_peaks(str(source), 22050, cache) is None  # nothing decoded yet
+
+    cache.put(str(source), 22050, 0.25 * np.ones(22050 * 3, dtype=np.float32))
+    manifest = ingest_media(str(source), [ANALYSIS_RENDITION], cache=cache, ffmpeg_bin="/nonexistent/ffmpeg")
+    assert manifest.path_for("peaks") is not None
+    assert "peaks" in load_manifest(str(source), cache).renditions
+    pyramid = load_peaks(str(source), 22050, cache)
+    assert pyramid.frames == 22050 * 3
+    assert set(pyramid.levels[0].max.tolist()) == {32}
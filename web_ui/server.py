@@ -5,7 +5,6 @@ Provides file system access and sync analysis API endpoints
 """
 
 import os
-import json
 import time
 import asyncio
 import subprocess
@@ -14,8 +13,9 @@ from flask import Flask, jsonify, request, send_from_directory, send_file
 from flask_cors import CORS
 import logging
 import mimetypes
-import json as _json
 from sync_analyzer.analysis import analyze
+from sync_analyzer.core.media_probe import get_media_probe
+from sync_analyzer.core.proxy_store import get_proxy_store
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -26,10 +26,6 @@ CORS(app)
 
 # Configuration
 MOUNT_PATH = "/mnt/data"
-PROXY_CACHE_DIR = os.path.abspath(
-    os.path.join(os.path.dirname(__file__), "proxy_cache")
-)
-os.makedirs(PROXY_CACHE_DIR, exist_ok=True)
 ALLOWED_EXTENSIONS = {
     ".wav",
     ".mp3",
@@ -65,97 +61,22 @@ def get_file_type(filepath):
         return "file"
 
 
-def _hash_for_proxy(path: str) -> str:
-    import hashlib
+def _ensure_wav_proxy(src_path: str) -> str:
+    """Create or reuse a WAV proxy for the given source. Returns absolute output path.
 
-    try:
-        st = os.stat(path)
-        key = f"{path}|{st.st_size}|{int(st.st_mtime)}".encode("utf-8")
-    except Exception:
-        key = path.encode("utf-8")
-    return hashlib.sha1(key).hexdigest()
-
-
-def _ensure_wav_proxy(src_path: str, role: str) -> str:
-    """Create or reuse a WAV proxy for the given source. Returns absolute output path."""
-    h = _hash_for_proxy(src_path)
-    base = f"{h}_{role}.wav"
-    out_path = os.path.join(PROXY_CACHE_DIR, base)
-    if os.path.exists(out_path) and os.path.getsize(out_path) > 0:
-        return out_path
-    # Transcode to WAV 48k stereo for Chrome/WebAudio compatibility
-    cmd = [
-        "ffmpeg",
-        "-hide_banner",
-        "-loglevel",
-        "error",
-        "-y",
-        "-i",
-        src_path,
-        "-vn",
-        "-ac",
-        "2",
-        "-ar",
-        "48000",
-        "-acodec",
-        "pcm_s16le",
-        out_path,
-    ]
-    logger.info(f"Creating WAV proxy: {' '.join(cmd)}")
-    result = subprocess.run(cmd, capture_output=True, text=True, timeout=600)
-    if result.returncode != 0:
-        logger.error(f"Proxy creation failed: {result.stderr}")
-        raise RuntimeError(f"ffmpeg failed: {result.stderr}")
-    return out_path
+    Proxies come from the shared proxy store: 16-bit 48k stereo WAV, exported
+    from a cached decode when there is one, built once and LRU-bounded.
+    """
+    return get_proxy_store().ensure(src_path, "wav")
 
 
 def _probe_audio_layout(path: str) -> dict:
-    """Minimal ffprobe helper mirroring core util for server-side repair."""
-    try:
-        cmd = [
-            "ffprobe",
-            "-v",
-            "quiet",
-            "-print_format",
-            "json",
-            "-show_format",
-            "-show_streams",
-            path,
-        ]
-        pr = subprocess.run(cmd, capture_output=True, text=True, timeout=15)
-        if pr.returncode != 0:
-            return {"streams": []}
-        data = _json.loads(pr.stdout)
-        streams = []
-        for s in data.get("streams", []):
-            if s.get("codec_type") == "audio":
-                streams.append(
-                    {
-                        "index": s.get("index"),
-                        "codec_name": s.get("codec_name"),
-                        "channels": int(s.get("channels") or 0),
-                        "channel_layout": s.get("channel_layout") or "",
-                    }
-                )
-        return {"streams": streams}
-    except Exception:
-        return {"streams": []}
+    """Audio stream layout from the shared probe service (empty on failure)."""
+    return get_media_probe().audio_layout(path)
 
 
 def _probe_duration_seconds(path: str) -> float:
-    try:
-        pr = subprocess.run(
-            ["ffprobe", "-v", "quiet", "-print_format", "json", "-show_format", path],
-            capture_output=True,
-            text=True,
-            timeout=10,
-        )
-        if pr.returncode == 0:
-            data = _json.loads(pr.stdout)
-            return float(data.get("format", {}).get("duration") or 0.0)
-    except Exception:
-        pass
-    return 0.0
+    return get_media_probe().duration(path)
 
 
 @app.route("/api/v1/files/raw")
@@ -449,8 +370,8 @@ def prepare_proxies():
             404,
         )
     try:
-        m_out = _ensure_wav_proxy(master_path, "master")
-        d_out = _ensure_wav_proxy(dub_path, "dub")
+        m_out = _ensure_wav_proxy(master_path)
+        d_out = _ensure_wav_proxy(dub_path)
         m_name = os.path.basename(m_out)
         d_name = os.path.basename(d_out)
         return jsonify(
@@ -470,14 +391,15 @@ def prepare_proxies():
 
 @app.route("/proxy/<path:filename>")
 def serve_proxy(filename):
-    """Serve files from the proxy cache directory."""
-    full = os.path.join(PROXY_CACHE_DIR, filename)
-    if not os.path.abspath(full).startswith(PROXY_CACHE_DIR):
+    """Serve files from the proxy store directory."""
+    proxy_dir = get_proxy_store().cache_dir
+    full = os.path.join(proxy_dir, filename)
+    if not os.path.abspath(full).startswith(os.path.join(proxy_dir, "")):
         return jsonify({"success": False, "error": "Invalid path"}), 400
     if not os.path.exists(full):
         return jsonify({"success": False, "error": "Not found"}), 404
     # Assume WAV for now
-    return send_from_directory(PROXY_CACHE_DIR, filename, mimetype="audio/wav")
+    return send_from_directory(proxy_dir, filename, mimetype="audio/wav")
 
 
 @app.route("/api/status")